@@ -0,0 +1,3 @@
+"""
+Benchmarks and load tests for AI Search API (stubbed LLM/embedding backends)
+"""
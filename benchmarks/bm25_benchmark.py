@@ -0,0 +1,108 @@
+"""
+BM25 검색 지연시간 벤치마크.
+
+기존 bm25 검색기(LangChain BM25Retriever = rank_bm25.BM25Okapi.get_scores + 전체 정렬)와
+core.bm25_index.BM25Index(검색어 포스팅만 합산 + argpartition)를 합성 코퍼스에서 비교합니다.
+형태소 분석 비용을 빼고 점수 계산/상위 k 선택만 비교하기 위해 미리 토큰화된 문서를 사용합니다.
+
+    python -m benchmarks.bm25_benchmark --sizes 10000 100000 1000000 --queries 50 --k 500
+
+rank_bm25 는 1M 문서에서 색인/검색이 매우 느리므로 --baseline-max-docs 로 건너뛸 수 있습니다.
+"""
+
+import time
+import argparse
+from typing import List
+
+import numpy as np
+
+from core.bm25_index import BM25Index
+
+
+def make_corpus(size: int, vocab_size: int, seed: int) -> List[List[str]]:
+    """Zipf 분포로 용어를 뽑아 상품 문서 길이(8~40 토큰)의 합성 코퍼스를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"t{i}" for i in range(vocab_size)], dtype=object)
+    lengths = rng.integers(8, 40, size=size)
+    term_ids = (rng.zipf(1.2, size=int(lengths.sum())) - 1) % vocab_size
+    tokens = vocab[term_ids].tolist()
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+    return [tokens[offsets[i]:offsets[i + 1]] for i in range(size)]
+
+
+def make_queries(count: int, vocab_size: int, seed: int) -> List[List[str]]:
+    """흔한 용어와 드문 용어가 섞인 2~4 토큰 검색어를 만듭니다."""
+    rng = np.random.default_rng(seed + 1)
+    queries = []
+    for _ in range(count):
+        term_ids = (rng.zipf(1.2, size=rng.integers(2, 5)) - 1) % vocab_size
+        queries.append([f"t{i}" for i in term_ids])
+    return queries
+
+
+def measure(search, queries: List[List[str]]) -> np.ndarray:
+    latencies = []
+    for tokens in queries:
+        started = time.perf_counter()
+        search(tokens)
+        latencies.append(time.perf_counter() - started)
+    return np.array(latencies) * 1000
+
+
+def summary(latencies: np.ndarray) -> str:
+    return f"p50 {np.percentile(latencies, 50):8.2f}ms | p95 {np.percentile(latencies, 95):8.2f}ms | 평균 {latencies.mean():8.2f}ms"
+
+
+def run(size: int, args: argparse.Namespace) -> None:
+    print(f"\n=== 문서 {size:,}개 ===")
+    started = time.perf_counter()
+    corpus = make_corpus(size, args.vocab_size, args.seed)
+    queries = make_queries(args.queries, args.vocab_size, args.seed)
+    print(f"코퍼스 생성 {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    index = BM25Index.build(corpus, [str(i) for i in range(size)])
+    index.weights(args.k1, args.b)
+    print(f"[BM25Index] 색인 {time.perf_counter() - started:.1f}s ({index.meta['num_postings']:,} 포스팅)")
+
+    new_latencies = measure(lambda tokens: index.search(tokens, args.k, args.k1, args.b), queries)
+    print(f"[BM25Index] {summary(new_latencies)}")
+
+    if size > args.baseline_max_docs:
+        print(f"[rank_bm25] 건너뜀 (--baseline-max-docs {args.baseline_max_docs:,})")
+        return
+
+    from rank_bm25 import BM25Okapi
+
+    started = time.perf_counter()
+    baseline = BM25Okapi(corpus, k1=args.k1, b=args.b)
+    print(f"[rank_bm25] 색인 {time.perf_counter() - started:.1f}s")
+
+    # BM25Retriever.get_top_n 과 같은 방식: 전체 문서 점수 계산 후 전체 정렬
+    def baseline_search(tokens: List[str]) -> np.ndarray:
+        scores = baseline.get_scores(tokens)
+        return np.argsort(scores)[::-1][:args.k]
+
+    old_latencies = measure(baseline_search, queries)
+    print(f"[rank_bm25] {summary(old_latencies)}")
+    print(f"속도 향상 (평균) x{old_latencies.mean() / new_latencies.mean():.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BM25 검색 지연시간 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="코퍼스 문서 수")
+    parser.add_argument("--queries", type=int, default=50, help="검색어 수")
+    parser.add_argument("--k", type=int, default=500, help="반환할 문서 수")
+    parser.add_argument("--k1", type=float, default=1.2)
+    parser.add_argument("--b", type=float, default=0.75)
+    parser.add_argument("--vocab-size", type=int, default=50000, help="어휘 크기")
+    parser.add_argument("--baseline-max-docs", type=int, default=1000000, help="rank_bm25 를 실행할 최대 문서 수")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+/search, /report 동시 요청 부하 테스트.
+
+OpenAI 대신 지연시간만 흉내내는 스텁 LLM/임베딩을 사용하여, 동시 요청이 이벤트 루프를 막지 않고
+서로 겹쳐서(overlap) 처리되는지 확인합니다.
+
+    python -m benchmarks.load_test --requests 20 --llm-latency 0.3 --embedding-latency 0.1
+
+overlap = (요청별 소요시간 합) / (전체 경과시간). 요청이 직렬로 처리되면 1.0 에 가깝고,
+동시에 처리되면 동시 요청 수에 가까워집니다.
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+import httpx
+from langchain_community.vectorstores import FAISS
+
+from benchmarks.stubs import StubEmbeddings, StubChatModel, make_catalog
+
+
+def build_stub_index(directory: str, catalog_size: int) -> None:
+    """합성 카탈로그로 FAISS 인덱스를 만들어 저장합니다."""
+    db = FAISS.from_documents(make_catalog(catalog_size), StubEmbeddings())
+    db.save_local(directory)
+
+
+def install_stubs(llm_latency: float, embedding_latency: float):
+    """
+    매니저들이 OpenAI 대신 스텁 백엔드를 사용하도록 교체합니다. 매니저를 초기화하기 전에 호출해야 합니다.
+    매니저는 초기화할 때 langchain_openai 에서 모델 클래스를 import 하므로 langchain_openai 의 이름을 바꿉니다.
+    """
+    import langchain_openai
+
+    langchain_openai.OpenAIEmbeddings = lambda model=None, **kwargs: StubEmbeddings(latency=embedding_latency)
+    langchain_openai.ChatOpenAI = lambda **kwargs: StubChatModel(latency=llm_latency)
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, params: dict) -> float:
+    started = time.perf_counter()
+    response = await client.get(url, params=params)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def run_phase(client: httpx.AsyncClient, name: str, url: str, params_list: list) -> None:
+    # 단건 기준 소요시간
+    single = await timed_get(client, url, params_list[0])
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(timed_get(client, url, params) for params in params_list[1:]))
+    wall = time.perf_counter() - started
+
+    overlap = sum(latencies) / wall if wall else 0.0
+    print(f"[{name}] 단건 {single:.3f}s | 동시 {len(latencies)}건 전체 {wall:.3f}s | "
+          f"요청별 평균 {sum(latencies) / len(latencies):.3f}s | overlap x{overlap:.1f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    import main as app_module
+
+    # 프로덕션 서버처럼 선택 단계(BM25, 형태소 분석기, 리포트 LLM)까지 모두 불러온 뒤 측정합니다.
+    await asyncio.to_thread(app_module.initialize_managers)
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.lifespan(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            # 의도분석 캐시에 걸리지 않도록 요청마다 다른 검색어를 사용합니다.
+            # 키워드 검색어는 LLM 대신 규칙으로 의도를 분석하므로(keyword_fast_path) 자연어 검색어로 LLM 을 호출합니다.
+            count = args.requests + 1
+            await run_phase(client, "search/intent_with_llm", "/search",
+                            [{"query": f"{i}인 가구가 쓰기 좋은 조용한 냉장고 추천해주세요", "retriever_type": "intent_with_llm"}
+                             for i in range(count)])
+            await run_phase(client, "search/faiss", "/search",
+                            [{"query": f"무선 이어폰 {i}", "retriever_type": "faiss"} for i in range(count)])
+            await run_phase(client, "report", "/report",
+                            [{"query": f"대용량 세탁기 {i}", "goodsNo": f"{i:010d}"} for i in range(count)])
+            await run_phase(client, "report/batch", "/report/batch",
+                            [{"query": f"저소음 에어컨 {i}", "goodsNo": [f"{n:010d}" for n in range(10)]} for i in range(count)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="스텁 백엔드 기반 동시 요청 부하 테스트")
+    parser.add_argument("--requests", type=int, default=20, help="동시 요청 수")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="LLM 호출 지연(초)")
+    parser.add_argument("--embedding-latency", type=float, default=0.1, help="임베딩 호출 지연(초)")
+    parser.add_argument("--catalog-size", type=int, default=2000, help="합성 카탈로그 상품 수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_stub_index(directory, args.catalog_size)
+        os.environ["FAISS_PERSIST_DIRECTORY"] = directory
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        install_stubs(args.llm_latency, args.embedding_latency)
+        asyncio.run(main(args))
@@ -0,0 +1,174 @@
+"""
+벤치마크/부하 테스트용 스텁(stub) 백엔드.
+OpenAI 호출 없이 지연시간만 흉내내는 임베딩/LLM 과 합성 상품 카탈로그를 제공합니다.
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, List, Optional
+
+import numpy as np
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class StubEmbeddings(Embeddings):
+    """토큰 해시 기반의 결정적(deterministic) 임베딩. 호출당 latency 초만큼 지연합니다."""
+
+    def __init__(self, dim: int = 64, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.split():
+            vector[int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+
+class StubChatModel(BaseChatModel):
+    """
+    의도분석/리포트 프롬프트에 고정된 JSON 을 응답하는 채팅 모델.
+    실제 체인(prompt | model | parser)을 그대로 통과하도록 JSON 문자열을 반환합니다.
+    스트리밍(astream)에서는 latency 를 나누어 응답을 몇 글자씩 보냅니다.
+    """
+
+    latency: float = 0.0
+    # intent 또는 report. 비어 있으면 프롬프트로 정합니다 (의도분석 형식 지시사항에는 INTENTED_QUERY 가 있음).
+    kind: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        question = str(messages[-1].content).split("#Question:")[-1].strip()
+        kind = self.kind or ("intent" if "INTENTED_QUERY" in str(messages[-1].content) else "report")
+        if kind == "intent":
+            payload = {
+                "INTENTED_QUERY": question,
+                "PRICE_GTE": 0,
+                "PRICE_LTE": 0,
+                "BRND_NM": "",
+                "ARTC_NM": "냉장고" if "냉장고" in question else "",
+                "LGRP_NM": [],
+                "FEATURES": [],
+                "CARD_DC_NMS": [],
+                "REVIEW_GTE": 0.0,
+                "REVIEW_LTE": 0.0,
+                "SERVICE_YN": "N",
+            }
+        elif "reports" in str(messages[-1].content):
+            # 여러 상품 리포트: Context 의 [상품번호: ...] 마다 하나씩 응답
+            goods_nos = re.findall(r"\[상품번호: (\w+)\]", str(messages[-1].content))
+            payload = {"reports": [
+                {"goodsNo": goods_no, "recommendation": f"'{question}' 검색어에 적합한 상품입니다."}
+                for goods_no in goods_nos
+            ]}
+        else:
+            payload = {"goodsNo": "", "recommendation": f"'{question}' 검색어에 적합한 상품입니다."}
+        content = json.dumps(payload, ensure_ascii=False)
+        # 토큰 사용량(메트릭)은 글자 수로 대신합니다.
+        input_tokens = sum(len(str(m.content)) for m in messages)
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": len(content), "total_tokens": input_tokens + len(content)
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        content = self._respond(messages).generations[0].message.content
+        chunks = [content[i:i + 8] for i in range(0, len(content), 8)]
+        for chunk in chunks:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+
+BRANDS = ["삼성전자", "LG전자", "Apple", "PLUX", "네스프레소", "신일", "다이슨", "위니아", "쿠쿠", "필립스"]
+ARTICLES = [
+    ("냉장고", "냉장고·주방가전", "냉장고", "양문형냉장고"),
+    ("에어컨", "에어컨·계절가전", "에어컨", "스탠드에어컨"),
+    ("이어폰", "음향가전", "이어폰·헤드폰", "무선이어폰"),
+    ("노트북", "컴퓨터·노트북", "노트북", "일반노트북"),
+    ("선풍기", "에어컨·계절가전", "선풍기·서큘레이터", "선풍기"),
+    ("커피머신", "냉장고·주방가전", "커피머신", "캡슐커피머신"),
+    ("세탁기", "세탁기·건조기·의류관리기", "세탁기", "드럼세탁기"),
+    ("TV", "TV·영상가전", "TV", "OLED TV"),
+]
+FEATURES = ["방수", "노이즈캔슬링", "16GB", "15인치", "4도어", "저소음", "인버터", "OLED", "대용량", "무선"]
+
+
+def make_catalog(size: int, seed: int = 0) -> List[Document]:
+    """실제 카탈로그와 같은 메타데이터 스키마를 갖는 합성 상품 Document 목록을 생성합니다."""
+    rnd = random.Random(seed)
+    docs = []
+    for i in range(size):
+        brand = rnd.choice(BRANDS)
+        artc, lgrp, mgrp, sgrp = rnd.choice(ARTICLES)
+        features = rnd.sample(FEATURES, 2)
+        goods_nm = f"{brand} {artc} {' '.join(features)} 모델{i}"
+        metadata = {
+            "GOODS_NO": f"{i:010d}",
+            "GOODS_STAT_SCT_NM": rnd.choice(["정상상품", "정상상품", "진열상품"]),
+            "GOODS_STAT_SCT_CD": rnd.choice(["01", "02", "03"]),
+            "BRND_NM": brand,
+            "GOODS_NM": goods_nm,
+            "ARTC_NM": artc,
+            "LGRP_NM": lgrp,
+            "MGRP_NM": mgrp,
+            "SGRP_NM": sgrp,
+            "SALE_PRC": rnd.randint(1, 300) * 10000,
+            "DSCNT_SALE_PRC": rnd.randint(1, 300) * 10000,
+            "MAX_BENEFIT_PRICE": rnd.randint(1, 300) * 10000,
+            "CARD_DC_RATE": rnd.choice([0, 5, 7]),
+            "CARD_DC_NAME_LIST": rnd.choice(["롯데카드,신한카드", "", "KB국민카드"]),
+            "FEATURES": ", ".join(features),
+            "SCH_KWD_NM": "#" + "#".join(features + [artc]),
+            "SALE_QTY": str(rnd.randint(0, 500)),
+            "SALES_UNIT": str(rnd.randint(0, 50)),
+            "GDAS_SCR_SUM": round(rnd.uniform(3.0, 5.0), 1),
+            "GDAS_CNT": rnd.randint(0, 999),
+            "ENERGEY_GRADE": rnd.choice(["1등급", "2등급", ""]),
+            "MDL_LNCH_DT": f"{rnd.randint(2019, 2025)}0101",
+            "SALE_STAT_CD": rnd.choice(["01", "01", "02"]),
+            "APPLIANCES_YN": rnd.choice(["Y", "N"]),
+            "GOODS_TP_CD": rnd.choice(["01", "05", "10"]),
+            "SERVICE_YN": "N",
+        }
+        page_content = f"상품명: {goods_nm}\n브랜드: {brand}\n품목: {artc}\n특징: {', '.join(features)}"
+        docs.append(Document(page_content=page_content, metadata=metadata))
+    return docs
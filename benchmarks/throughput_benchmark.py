@@ -0,0 +1,176 @@
+"""
+프로덕션 서버(python -m server) 워커 수별 처리량(RPS) 벤치마크.
+
+OpenAI 대신 스텁 LLM/임베딩을 사용하는 합성 카탈로그 스냅샷으로 워커 수마다 서버를 실행하고,
+여러 부하 생성 프로세스가 동시에 /search 를 호출하여 초당 처리 요청 수와 p50/p99 지연시간을 측정합니다.
+스텁 백엔드의 지연시간이 0 이면 요청은 CPU 작업(의도분석 체인, 검색, 정렬, 직렬화)만 하므로
+RPS 는 워커 수(CPU 코어 수까지)에 비례해야 합니다.
+
+    python -m benchmarks.throughput_benchmark --workers 1 2 4 --duration 15
+
+검색어마다 번호를 붙여 의도분석/검색 결과 캐시에 걸리지 않도록 합니다.
+부하 생성 프로세스도 같은 CPU 를 쓰므로 코어 수보다 충분히 많은 코어가 있는 서버에서 측정합니다.
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.stubs import ARTICLES, FEATURES, StubEmbeddings, make_catalog
+
+
+def build_stub_snapshot(directory: str, catalog_size: int) -> None:
+    """합성 카탈로그로 스냅샷을 만듭니다."""
+    from scripts.build_snapshot import build_snapshot
+
+    build_snapshot(make_catalog(catalog_size), StubEmbeddings(), directory, "stub", 1024, source="throughput_benchmark")
+
+
+def serve(args: argparse.Namespace) -> None:
+    """스텁 백엔드로 프로덕션 서버를 실행합니다. (벤치마크가 워커 수마다 하위 프로세스로 실행)"""
+    from benchmarks.load_test import install_stubs
+    import server
+
+    install_stubs(args.llm_latency, args.embedding_latency)
+    server.main()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 종료되었습니다 (종료 코드 {process.returncode})")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"서버가 {timeout}초 안에 시작되지 않았습니다: {url}")
+
+
+async def generate_load(base_url: str, client_id: int, connections: int, duration: float, retriever_type: str) -> Dict:
+    """connections 개 연결로 duration 초 동안 /search 를 계속 호출합니다."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    words = [article for article, *_ in ARTICLES] + FEATURES
+
+    async def loop(connection: int) -> None:
+        nonlocal errors
+        i = 0
+        while time.perf_counter() < deadline:
+            query = f"{words[(connection + i) % len(words)]} {client_id}-{connection}-{i}"
+            started = time.perf_counter()
+            try:
+                response = await client.get("/search", params={"query": query, "retriever_type": retriever_type, "pageSize": 30})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                errors += 1
+            i += 1
+
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(loop(connection) for connection in range(connections)))
+    return {"latencies": latencies, "errors": errors}
+
+
+def run_client(args: tuple) -> Dict:
+    return asyncio.run(generate_load(*args))
+
+
+def measure(args: argparse.Namespace, workers: int, snapshot_directory: str) -> Dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "SNAPSHOT_DIRECTORY": snapshot_directory,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "stub"),
+        "EMBEDDING_MODEL": "stub",
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "WORKERS": str(workers),
+        "MAX_CONCURRENT_REQUESTS": str(args.connections * args.clients),
+        "LOG_LEVEL": "WARNING",
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.throughput_benchmark", "--serve",
+        "--llm-latency", str(args.llm_latency), "--embedding-latency", str(args.embedding_latency),
+    ]
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(base_url + "/", process, args.startup_timeout)
+        # 워커마다 첫 요청의 지연(지연 로드 등)이 측정에 들어가지 않도록 먼저 호출합니다.
+        asyncio.run(generate_load(base_url, -1, workers * 2, args.warmup, args.retriever_type))
+
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(
+                run_client,
+                [(base_url, client_id, args.connections, args.duration, args.retriever_type) for client_id in range(args.clients)],
+            )
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+    latencies = np.array([latency for result in results for latency in result["latencies"]]) * 1000
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+        "p99": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+        "errors": sum(result["errors"] for result in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="프로덕션 서버 워커 수별 처리량(RPS) 벤치마크")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="비교할 워커 수")
+    parser.add_argument("--clients", type=int, default=2, help="부하 생성 프로세스 수")
+    parser.add_argument("--connections", type=int, default=16, help="부하 생성 프로세스당 동시 연결 수")
+    parser.add_argument("--duration", type=float, default=15, help="워커 수별 측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=3, help="측정 전 준비 호출 시간(초)")
+    parser.add_argument("--retriever-type", default="intent_with_llm", help="/search 검색 방식")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="스텁 LLM 호출 지연(초)")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="스텁 임베딩 호출 지연(초)")
+    parser.add_argument("--catalog-size", type=int, default=5000, help="합성 카탈로그 상품 수")
+    parser.add_argument("--startup-timeout", type=float, default=300, help="서버 시작 대기 시간(초)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    print(f"CPU 코어 {os.cpu_count()}개, 부하 생성 {args.clients}개 프로세스 x {args.connections}개 연결, 워커 수별 {args.duration:.0f}초")
+    with tempfile.TemporaryDirectory() as directory:
+        build_stub_snapshot(directory, args.catalog_size)
+        baseline = None
+        for workers in args.workers:
+            result = measure(args, workers, directory)
+            baseline = baseline or result["rps"]
+            print(
+                f"[워커 {workers:2}] {result['rps']:8.1f} RPS (x{result['rps'] / baseline:.2f})"
+                f" | p50 {result['p50']:7.1f}ms | p99 {result['p99']:7.1f}ms | 오류 {result['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
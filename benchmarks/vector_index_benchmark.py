@@ -0,0 +1,156 @@
+"""
+FAISS 인덱스 종류별 재현율/지연시간/메모리 벤치마크.
+
+core.vector_index 의 인덱스 종류(flat, sq8, ivf_flat, ivf_sq8, ivf_pq, hnsw, hnsw_sq8)를 같은 벡터로 만들고
+정확한 전체 비교(Flat) 결과 대비 recall@k, 검색어 하나씩 검색한 p50/p99 지연시간, 상품당 메모리를 비교합니다.
+
+    # 실제 카탈로그: 스냅샷(또는 FAISS 데이터베이스)의 벡터 사용
+    python -m benchmarks.vector_index_benchmark --faiss ./.db/snapshots/<버전>/faiss --scale 1 10
+
+    # 합성 카탈로그 (1536차원, 군집 분포)
+    python -m benchmarks.vector_index_benchmark --size 20000 --scale 1 10
+
+--scale 10 은 카탈로그 벡터에 잡음을 더한 복사본으로 10배 큰 합성 카탈로그를 만듭니다.
+검색어는 카탈로그 벡터에 잡음을 더해 만들며 카탈로그에는 넣지 않습니다.
+"""
+
+import os
+import time
+import argparse
+from typing import Dict
+
+import faiss
+import numpy as np
+
+from core.config import settings
+from core.vector_index import INDEX_TYPES, build_vector_index, configure_search, index_memory_bytes
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """임베딩 모델처럼 길이 1 로 정규화합니다."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def load_vectors(path: str) -> np.ndarray:
+    """FAISS 데이터베이스 경로(index.faiss 가 있는 디렉토리)의 벡터를 모두 꺼냅니다."""
+    index = faiss.read_index(os.path.join(path, "index.faiss"))
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def make_catalog(size: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """카테고리처럼 군집을 이루는 합성 임베딩을 만듭니다."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension), dtype=np.float32)
+    assignments = rng.integers(0, clusters, size=size)
+    vectors = centers[assignments] + 0.6 * rng.standard_normal((size, dimension), dtype=np.float32)
+    return normalize(vectors)
+
+
+def scale_catalog(vectors: np.ndarray, scale: int, noise: float, seed: int) -> np.ndarray:
+    """카탈로그 벡터에 잡음을 더한 복사본을 붙여 scale 배 큰 카탈로그를 만듭니다."""
+    if scale <= 1:
+        return vectors
+    rng = np.random.default_rng(seed)
+    copies = [vectors]
+    for _ in range(scale - 1):
+        copies.append(normalize(vectors + noise * rng.standard_normal(vectors.shape, dtype=np.float32)))
+    return np.concatenate(copies)
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, seed: int) -> np.ndarray:
+    """카탈로그 벡터에 잡음을 더해 검색어 벡터를 만듭니다."""
+    rng = np.random.default_rng(seed + 1)
+    picked = vectors[rng.choice(len(vectors), size=count, replace=False)]
+    return normalize(picked + noise * rng.standard_normal(picked.shape, dtype=np.float32))
+
+
+def measure(index: faiss.Index, queries: np.ndarray, k: int) -> Dict:
+    """검색어를 하나씩 검색해 결과와 지연시간(ms)을 반환합니다. 서버처럼 요청마다 검색어 하나입니다."""
+    results = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        _, indices = index.search(query.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - started)
+        results[i] = indices[0]
+    return {"results": results, "latencies": np.array(latencies) * 1000}
+
+
+def recall(results: np.ndarray, truth: np.ndarray) -> float:
+    """정확한 상위 k 중 근사 검색이 찾은 비율의 평균"""
+    hits = [len(np.intersect1d(found[found >= 0], exact)) for found, exact in zip(results, truth)]
+    return float(np.mean(hits)) / truth.shape[1]
+
+
+def run(vectors: np.ndarray, label: str, args: argparse.Namespace) -> None:
+    num_vectors, dimension = vectors.shape
+    print(f"\n=== {label}: 상품 {num_vectors:,}개, {dimension}차원 ===")
+    queries = make_queries(vectors, args.queries, args.query_noise, args.seed)
+
+    truth = None
+    for index_type in args.index_types:
+        started = time.perf_counter()
+        try:
+            index = build_vector_index(vectors, index_type, args.nlist, args.pq_m, args.hnsw_m)
+        except ValueError as e:
+            print(f"[{index_type:8}] 건너뜀: {e}")
+            continue
+        build_seconds = time.perf_counter() - started
+        configure_search(index, args.nprobe, args.ef_search)
+
+        measured = measure(index, queries, args.k)
+        if truth is None:
+            # 정확한 기준 결과는 한 번에 검색합니다.
+            exact = faiss.IndexFlatL2(dimension)
+            exact.add(vectors)
+            _, truth = exact.search(queries, args.k)
+            del exact
+
+        latencies = measured["latencies"]
+        print(
+            f"[{index_type:8}] 생성 {build_seconds:7.1f}s | 상품당 {index_memory_bytes(index) / num_vectors:7.0f}B"
+            f" | recall@{args.k} {recall(measured['results'], truth):.3f}"
+            f" | p50 {np.percentile(latencies, 50):7.2f}ms | p99 {np.percentile(latencies, 99):7.2f}ms"
+        )
+        del index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류별 재현율/지연시간/메모리 벤치마크")
+    parser.add_argument("--faiss", default="", help="벡터를 꺼낼 FAISS 데이터베이스 경로. 없으면 합성 카탈로그 사용")
+    parser.add_argument("--size", type=int, default=20000, help="합성 카탈로그 상품 수")
+    parser.add_argument("--dimension", type=int, default=1536, help="합성 카탈로그 임베딩 차원")
+    parser.add_argument("--clusters", type=int, default=200, help="합성 카탈로그 군집 수")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10], help="카탈로그 크기 배수")
+    parser.add_argument("--scale-noise", type=float, default=0.05, help="확대한 카탈로그 복사본에 더할 잡음")
+    parser.add_argument("--index-types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES), help="비교할 인덱스 종류")
+    parser.add_argument("--queries", type=int, default=200, help="검색어 수")
+    parser.add_argument("--query-noise", type=float, default=0.02, help="검색어 벡터에 더할 잡음")
+    parser.add_argument("--k", type=int, default=100, help="반환할 상품 수 (recall@k)")
+    parser.add_argument("--nlist", type=int, default=settings.faiss_nlist, help="IVF 클러스터 수. 0 이면 상품 수로 결정")
+    parser.add_argument("--pq-m", type=int, default=settings.faiss_pq_m, help="IVF-PQ 벡터당 바이트 수")
+    parser.add_argument("--hnsw-m", type=int, default=settings.faiss_hnsw_m, help="HNSW 노드당 이웃 수")
+    parser.add_argument("--nprobe", type=int, default=settings.faiss_nprobe, help="IVF 검색 클러스터 수")
+    parser.add_argument("--ef-search", type=int, default=settings.faiss_ef_search, help="HNSW 검색 후보 수")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.faiss:
+        catalog = normalize(load_vectors(args.faiss))
+        source = os.path.basename(os.path.normpath(args.faiss))
+    else:
+        catalog = make_catalog(args.size, args.dimension, args.clusters, args.seed)
+        source = "합성"
+
+    for scale in args.scale:
+        vectors = scale_catalog(catalog, scale, args.scale_noise, args.seed)
+        run(vectors, f"{source} x{scale}", args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,28 @@
 Core package for AI Search API
 """
 
-from .config import Settings
-from .search_engine import SearchEngineManager
-from .intent_manager import IntentManager
-from .report_manager import ReportManager
+import importlib
+
+# 이름 → 모듈. core.config 처럼 하위 모듈 하나만 import 해도 검색 엔진(langchain, FAISS)까지 불러오지 않도록
+# 처음 사용할 때 import 합니다.
+_EXPORTS = {
+    "Settings": ".config",
+    "SearchEngineManager": ".search_engine",
+    "IntentManager": ".intent_manager",
+    "ReportManager": ".report_manager",
+    "ProductFeatureTable": ".feature_table",
+}
 
 __all__ = [
     "Settings",
     "SearchEngineManager",
     "IntentManager",
-    "ReportManager"
+    "ReportManager",
+    "ProductFeatureTable"
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
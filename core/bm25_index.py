@@ -0,0 +1,289 @@
+import os
+import json
+import threading
+import hashlib
+import logging
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+
+from core.document_store import DocumentStore
+from utils import metrics
+from utils.tokenizer import kiwi_tokenize_batch
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def goods_fingerprint(goods_nos: Iterable[str]) -> str:
+    """문서 순서(FAISS 문서 위치)와 상품번호 목록이 같은지 확인하기 위한 지문"""
+    digest = hashlib.sha1()
+    for goods_no in goods_nos:
+        digest.update(str(goods_no).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class BM25Index:
+    """
+    디스크에 저장되는 BM25 역색인.
+
+    문서 번호는 FAISS 문서 위치와 같고, 용어별 포스팅은 CSR 형태의 배열로 저장합니다.
+        - vocab.json: 용어 목록 (용어 번호 순서)
+        - indptr.npy: 용어별 포스팅 시작 위치 (용어 수 + 1)
+        - doc_ids.npy: 포스팅 문서 번호
+        - tfs.npy: 포스팅 단어 빈도
+        - doc_lens.npy: 문서 길이 (토큰 수)
+        - meta.json: 문서 수, 평균 문서 길이, 상품번호 지문 등
+    .npy 파일은 np.load(mmap_mode='r') 로 메모리 매핑하여 읽으므로 로드가 즉시 끝납니다.
+
+    updated() 로 바뀐 문서의 포스팅만 바꾼 새 색인을 만들 수 있습니다. 삭제한 문서는 번호를 비워 두므로
+    다른 문서 번호는 바뀌지 않으며, meta 의 num_docs 와 avgdl 은 남아 있는 문서 기준입니다.
+
+    검색 시에는 (k1, b) 별로 포스팅마다 BM25 가중치(idf * tf 포화값)를 미리 계산해 두고,
+    검색어 토큰의 포스팅 가중치만 np.bincount 로 합산한 뒤 np.argpartition 으로 상위 k 개를 고릅니다.
+    """
+
+    def __init__(
+        self,
+        vocab: List[str],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lens: np.ndarray,
+        meta: Dict,
+    ):
+        self.vocab = vocab
+        self.term_ids: Dict[str, int] = {term: i for i, term in enumerate(vocab)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lens = doc_lens
+        self.meta = meta
+        self.num_docs = int(meta["num_docs"])
+        self.avgdl = float(meta["avgdl"]) or 1.0
+        self._weights: Dict[Tuple[float, float], np.ndarray] = {}
+        self._weights_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, token_lists: Iterable[List[str]], goods_nos: List[str], tokenizer: str = "kiwi") -> "BM25Index":
+        """문서별 토큰 목록으로 역색인을 만듭니다. token_lists 순서가 문서 번호가 됩니다."""
+        token_lists = list(token_lists)
+        doc_lens = np.array([len(tokens) for tokens in token_lists], dtype=np.int32)
+        tokens = [token for doc_tokens in token_lists for token in doc_tokens]
+
+        vocab = sorted(set(tokens))
+        term_ids = {term: i for i, term in enumerate(vocab)}
+        posting_terms = np.array([term_ids[token] for token in tokens], dtype=np.int64)
+        posting_docs = np.repeat(np.arange(len(doc_lens), dtype=np.int64), doc_lens)
+
+        # (용어, 문서) 쌍을 하나의 키로 묶어 정렬/집계하면 용어별 → 문서 번호 순 포스팅과 단어 빈도가 됩니다.
+        stride = max(len(doc_lens), 1)
+        keys, counts = np.unique(posting_terms * stride + posting_docs, return_counts=True)
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(keys // stride, minlength=len(vocab)))
+        doc_ids = (keys % stride).astype(np.int32)
+        tfs = np.minimum(counts, np.iinfo(np.uint16).max).astype(np.uint16)
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "tokenizer": tokenizer,
+            "num_docs": len(doc_lens),
+            "num_terms": len(vocab),
+            "num_postings": int(indptr[-1]),
+            "avgdl": float(doc_lens.mean()) if len(doc_lens) else 0.0,
+            "fingerprint": goods_fingerprint(goods_nos),
+        }
+        return cls(vocab, indptr, doc_ids, tfs, doc_lens, meta)
+
+    def updated(self, tokens_by_doc: Dict[int, List[str]], deleted: Iterable[int] = ()) -> "BM25Index":
+        """
+        tokens_by_doc 문서의 포스팅을 새 토큰으로 바꾸고(문서 수 이상의 번호는 추가) deleted 문서의 포스팅을 지운 새 색인을 반환합니다.
+        바뀌지 않은 문서는 다시 토큰화하지 않고 CSR 배열을 NumPy 연산으로 다시 만들며, 이 색인은 바꾸지 않습니다.
+        새 용어는 용어 목록 끝에 추가합니다.
+        """
+        deleted = [doc_id for doc_id in deleted if doc_id not in tokens_by_doc]
+        stale = np.array(sorted(set(tokens_by_doc) | set(deleted)), dtype=np.int64)
+        old_size = len(self.doc_lens)
+        size = max(old_size, max(tokens_by_doc, default=-1) + 1)
+        num_added = sum(1 for doc_id in tokens_by_doc if doc_id >= old_size)
+
+        vocab = list(self.vocab)
+        term_ids = dict(self.term_ids)
+        doc_lens = np.zeros(size, dtype=np.int32)
+        doc_lens[:old_size] = self.doc_lens
+        doc_lens[stale] = 0
+
+        new_terms, new_docs, new_tfs = [], [], []
+        for doc_id, tokens in tokens_by_doc.items():
+            doc_lens[doc_id] = len(tokens)
+            for token, tf in Counter(tokens).items():
+                term_id = term_ids.get(token)
+                if term_id is None:
+                    term_id = term_ids[token] = len(vocab)
+                    vocab.append(token)
+                new_terms.append(term_id)
+                new_docs.append(doc_id)
+                new_tfs.append(min(tf, np.iinfo(np.uint16).max))
+
+        # 남길 포스팅과 새 포스팅을 합쳐 용어, 문서 번호 순으로 정렬합니다.
+        doc_ids = np.asarray(self.doc_ids)
+        keep = ~np.isin(doc_ids, stale)
+        posting_terms = np.repeat(np.arange(len(self.vocab), dtype=np.int64), np.diff(self.indptr))
+        terms = np.concatenate([posting_terms[keep], np.array(new_terms, dtype=np.int64)])
+        docs = np.concatenate([doc_ids[keep].astype(np.int64), np.array(new_docs, dtype=np.int64)])
+        tfs = np.concatenate([np.asarray(self.tfs)[keep], np.array(new_tfs, dtype=np.uint16)])
+        order = np.lexsort((docs, terms))
+
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(terms, minlength=len(vocab)))
+        num_docs = self.num_docs + num_added - len(deleted)
+        meta = {
+            **self.meta,
+            "num_docs": num_docs,
+            "num_terms": len(vocab),
+            "num_postings": int(indptr[-1]),
+            "avgdl": float(doc_lens.sum() / num_docs) if num_docs else 0.0,
+            "fingerprint": None,
+        }
+        return BM25Index(vocab, indptr, docs[order].astype(np.int32), tfs[order], doc_lens, meta)
+
+    def save(self, directory: str) -> None:
+        """역색인을 디렉터리에 저장합니다. meta.json 을 마지막에 써서, meta.json 이 있으면 완전한 색인입니다."""
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+        np.save(os.path.join(directory, "indptr.npy"), self.indptr)
+        np.save(os.path.join(directory, "doc_ids.npy"), self.doc_ids)
+        np.save(os.path.join(directory, "tfs.npy"), self.tfs)
+        np.save(os.path.join(directory, "doc_lens.npy"), self.doc_lens)
+
+        # 계산해 둔 포스팅별 가중치도 저장하여, 읽을 때 다시 계산하지 않고 메모리 매핑합니다.
+        meta = dict(self.meta, weights=[])
+        for (k1, b), weights in self._weights.items():
+            np.save(os.path.join(directory, f"weights_{k1:g}_{b:g}.npy"), weights)
+            meta["weights"].append([k1, b])
+
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> Optional["BM25Index"]:
+        """저장된 역색인을 읽습니다. 완전한 색인이 없거나 형식이 다르면 None 을 반환합니다."""
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            logger.warning(f"BM25 색인 형식이 다릅니다: {meta.get('format_version')} != {FORMAT_VERSION}")
+            return None
+
+        with open(os.path.join(directory, "vocab.json"), encoding="utf-8") as f:
+            vocab = json.load(f)
+        mmap_mode = "r" if mmap else None
+        saved_weights = meta.pop("weights", [])
+        index = cls(
+            vocab,
+            np.load(os.path.join(directory, "indptr.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, "doc_ids.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, "tfs.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, "doc_lens.npy"), mmap_mode=mmap_mode),
+            meta,
+        )
+        for k1, b in saved_weights:
+            index._weights[(float(k1), float(b))] = np.load(os.path.join(directory, f"weights_{k1:g}_{b:g}.npy"), mmap_mode=mmap_mode)
+        return index
+
+    def weights(self, k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+        """
+        포스팅별 BM25 가중치 배열을 반환합니다. (k1, b) 별로 한 번만 계산합니다.
+        idf 는 음수가 되지 않도록 log(1 + (N - df + 0.5) / (df + 0.5)) 를 사용합니다.
+        """
+        key = (float(k1), float(b))
+        weights = self._weights.get(key)
+        if weights is not None:
+            return weights
+
+        with self._weights_lock:
+            weights = self._weights.get(key)
+            if weights is None:
+                df = np.diff(self.indptr).astype(np.float32)
+                idf = np.log1p((self.num_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+                tfs = np.asarray(self.tfs, dtype=np.float32)
+                doc_lens = np.asarray(self.doc_lens, dtype=np.float32)
+                norm = k1 * (1.0 - b + b * doc_lens[self.doc_ids] / self.avgdl)
+                weights = np.repeat(idf, np.diff(self.indptr)) * tfs * (k1 + 1.0) / (tfs + norm)
+                weights = weights.astype(np.float32)
+                self._weights[key] = weights
+        return weights
+
+    def search(self, tokens: List[str], k: int, k1: float = 1.2, b: float = 0.75) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 점수 상위 k 개 문서의 (문서 번호, 점수)를 점수 내림차순으로 반환합니다.
+        검색어 토큰의 포스팅만 점수를 계산하며, 토큰이 하나도 포함되지 않은 문서는 반환하지 않습니다.
+        동점은 문서 번호 오름차순으로 정렬합니다.
+        """
+        weights = self.weights(k1, b)
+        spans = []
+        for token in tokens:
+            term_id = self.term_ids.get(token)
+            if term_id is not None:
+                spans.append((int(self.indptr[term_id]), int(self.indptr[term_id + 1])))
+        if not spans:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        doc_ids = np.concatenate([self.doc_ids[start:end] for start, end in spans])
+        posting_weights = np.concatenate([weights[start:end] for start, end in spans])
+
+        # 포스팅 문서 번호로 점수를 합산합니다. 검색어 토큰이 반복되면 그만큼 더해집니다.
+        scores = np.bincount(doc_ids, weights=posting_weights, minlength=self.num_docs)
+        candidates = np.flatnonzero(scores)
+        scores = scores[candidates].astype(np.float32)
+
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((candidates, -scores))
+        return candidates[order].astype(np.int64), scores[order]
+
+
+def build_bm25_index(docs: List[Document]) -> BM25Index:
+    """상품 문서(page_content)를 Kiwi 형태소 분석으로 토큰화하여 BM25 역색인을 만듭니다."""
+    token_lists = kiwi_tokenize_batch(doc.page_content for doc in docs)
+    return BM25Index.build(token_lists, [doc.metadata.get("GOODS_NO", "") for doc in docs])
+
+
+class BM25IndexRetriever(BaseRetriever):
+    """
+    BM25Index 기반 검색기. 검색어를 색인과 같은 형태소 분석기로 토큰화하여 검색합니다.
+    LangChain 검색기 인터페이스를 따르므로 EnsembleRetriever 의 하위 검색기로 사용할 수 있습니다.
+    """
+
+    index: BM25Index
+    documents: DocumentStore
+    tokenize: Callable[[str], List[str]]
+    k: int = 500
+    k1: float = 1.2
+    b: float = 0.75
+
+    def search_ids(self, query: str, k: Optional[int] = None) -> np.ndarray:
+        """검색어의 BM25 상위 문서 번호(FAISS 문서 위치)를 점수 내림차순으로 반환합니다."""
+        with metrics.stage("bm25"):
+            doc_ids, _ = self.index.search(self.tokenize(query), k or self.k, self.k1, self.b)
+        return doc_ids
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [self.documents[i] for i in self.search_ids(query).tolist()]
@@ -18,29 +18,88 @@ class Settings(BaseSettings):
     # 서버 설정
     host: str = Field("localhost", description="서버 호스트")
     port: int = Field(8000, description="서버 포트")
-    reload: bool = Field(True, description="자동 재로드")
+    reload: bool = Field(True, description="개발 서버(python main.py)의 코드 변경 시 자동 재로드. 프로덕션 서버(python -m server)는 사용하지 않음")
+    workers: int = Field(1, description="프로덕션 서버 워커 프로세스 수. 0 이면 CPU 코어 수")
+    max_concurrent_requests: int = Field(64, description="워커당 동시에 처리할 최대 검색/리포트 요청 수. 초과 요청은 대기")
+    limit_concurrency: Optional[int] = Field(None, description="워커당 최대 동시 연결 수. 초과 연결은 바로 503 으로 응답. 지정하지 않으면 제한 없음")
+    backlog: int = Field(2048, description="프로덕션 서버 리스닝 소켓의 연결 대기열 크기")
+    graceful_timeout: int = Field(30, description="종료 시 진행 중인 요청을 기다리는 최대 시간(초). 지나면 워커를 강제 종료")
     
     # OpenAI 설정
     openai_api_key: Optional[str] = Field(None, description="OpenAI API 키")
     embedding_model: str = Field("text-embedding-3-small", description="임베딩 모델")
+
+    # 검색어 임베딩 캐시 설정
+    embedding_cache_size: int = Field(4096, description="메모리 임베딩 캐시 최대 항목 수. 1536차원 기준 항목당 약 6KB")
+    embedding_cache_path: Optional[str] = Field(None, description="memmap 디스크 임베딩 캐시 파일 경로(확장자 제외). 지정하지 않으면 메모리 캐시만 사용")
+    embedding_cache_disk_size: int = Field(50000, description="디스크 임베딩 캐시 최대 항목 수")
     
     # 검색 설정
     default_search_k: int = Field(50, description="기본 검색 결과 수")
     max_search_k: int = Field(100, description="최대 검색 결과 수")
+    content_preview_chars: int = Field(200, description="/search 에서 fields 로 content 를 요청했을 때 반환할 상품 내용 글자 수. 0 이면 전체")
+    
+    # 검색 결과 캐시 설정
+    result_cache_size: int = Field(1000, description="검색 결과 캐시 최대 항목 수(검색어 x 검색 방식). 항목당 정렬된 상품번호 최대 500개")
+    result_cache_ttl: int = Field(600, description="검색 결과 캐시 만료 시간(초). 가격/재고 변경 반영 주기")
     
     # BM25 설정
     bm25_k1: float = Field(1.2, description="BM25 k1 파라미터. 단어빈도 중요도. 높을 수록 단어빈도에 따른 점수 증가. 1.2 ~ 2.0 디폴트 1.2")
     bm25_b: float = Field(0.75, description="BM25 b 파라미터. 문서길이 정규화 정도. 0에 가까울 수록 문서길이의 영향을 덜 받음. 0 ~ 1. 디폴트 0.75")
+    bm25_k: int = Field(500, description="BM25 검색기가 반환할 최대 문서 수")
+    bm25_persist_directory: str = Field("./.db/bm25", description="BM25 역색인 경로. python -m scripts.build_bm25_index 로 생성")
+    tokenizer_warmup: bool = Field(False, description="개발 서버 시작 시 형태소 분석기를 미리 로드. 로드하는 몇 초 동안 요청 처리가 멈추므로 기본값은 처음 사용할 때 로드. 프로덕션 서버는 항상 워커 fork 전에 로드")
+    
+    # 하이브리드(BM25 + FAISS) 검색 설정
+    hybrid_bm25_k: int = Field(500, description="하이브리드 검색에서 BM25 후보 문서 수")
+    hybrid_faiss_k: int = Field(100, description="하이브리드 검색에서 FAISS 후보 문서 수")
     
     # FAISS 설정
     faiss_persist_directory: str = Field("./.db/faiss", description="FAISS 데이터베이스 경로")
+    faiss_index_type: str = Field("flat", description="스냅샷 빌드 시 FAISS 인덱스 종류. flat, sq8, ivf_flat, ivf_sq8, ivf_pq, hnsw, hnsw_sq8 (core/vector_index.py 참고)")
+    faiss_nlist: int = Field(0, description="IVF 클러스터 수. 0 이면 상품 수로 결정 (4 x sqrt(상품 수))")
+    faiss_pq_m: int = Field(96, description="IVF-PQ 벡터당 바이트 수(부분 벡터 수). 임베딩 차원의 약수")
+    faiss_hnsw_m: int = Field(32, description="HNSW 노드당 이웃 수. 클수록 재현율과 메모리 증가")
+    faiss_nprobe: int = Field(32, description="IVF 검색 시 비교할 클러스터 수. 클수록 재현율과 지연시간 증가")
+    faiss_ef_search: int = Field(128, description="HNSW 검색 후보 수. 검색 결과 수(k) 이상이어야 하며 클수록 재현율과 지연시간 증가")
+
+    # 검색 색인 스냅샷 설정
+    snapshot_directory: str = Field("./.db/snapshots", description="검색 색인 스냅샷 경로. python -m scripts.build_snapshot 으로 생성. 완전한 스냅샷이 있으면 faiss/bm25 경로 대신 가장 최근 스냅샷을 사용")
+    snapshot_mmap: bool = Field(True, description="스냅샷의 FAISS 인덱스, 문서 저장소, 피처 테이블을 메모리 매핑으로 읽음. 워커 프로세스끼리 페이지 캐시를 공유")
+    product_row_cache_size: int = Field(20000, description="워커별로 변환해 둘 응답용 상품 필드 최대 항목 수 (문서 저장소에서 읽은 상품)")
+    snapshot_keep: int = Field(3, description="스냅샷 빌드 후 남겨둘 최근 스냅샷 수")
+    embedding_batch_size: int = Field(256, description="스냅샷 빌드 시 임베딩 API 1회 호출로 임베딩할 상품 수. 배치마다 체크포인트를 저장")
+    snapshot_watch_interval: float = Field(0, description="새 스냅샷을 확인하여 자동으로 핫 리로드하는 주기(초). 0 이면 POST /admin/reload 로만 리로드")
+    admin_token: Optional[str] = Field(None, description="관리 API(/admin/*) 토큰. X-Admin-Token 헤더가 일치해야 호출 가능. 지정하지 않으면 관리 API 는 404")
     
+    # 의도분석 설정
+    keyword_fast_path: bool = Field(True, description="키워드 검색어는 LLM 대신 규칙 기반으로 의도를 분석")
+    speculative_retrieval: bool = Field(False, description="LLM 의도분석 중에 원본 검색어로 후보를 미리 검색(추측 검색)")
+    speculative_fetch_k: int = Field(1000, description="추측 검색으로 미리 가져올 후보 문서 수")
+    speculative_min_overlap: float = Field(0.8, description="추측 검색 후보를 재사용할 정제된 쿼리와 원본 검색어의 최소 형태소 일치도. 0 ~ 1")
+    
+    # 의도분석 캐시 설정
+    intent_cache_size: int = Field(10000, description="의도분석 캐시 최대 항목 수")
+    intent_cache_ttl: int = Field(86400, description="의도분석 캐시 만료 시간(초). 0 이면 만료 없음")
+    intent_cache_path: Optional[str] = Field(None, description="의도분석 캐시 SQLite 파일 경로. 지정하면 재시작 후에도 유지되고 워커 간에 공유됨")
+
+    # 추천 이유(리포트) 설정
+    report_batch_size: int = Field(10, description="LLM 1회 호출로 추천 이유를 생성할 최대 상품 수. 초과분은 묶음별로 동시에 호출")
+    report_cache_size: int = Field(50000, description="추천 이유 캐시 최대 항목 수")
+    report_cache_ttl: int = Field(86400, description="추천 이유 캐시 만료 시간(초). 0 이면 만료 없음")
+    report_cache_path: Optional[str] = Field(None, description="추천 이유 캐시 SQLite 파일 경로. 지정하지 않으면 메모리 캐시만 사용")
+
     # 페이지네이션 설정
     default_page_size: int = Field(30, description="기본 페이지 크기")
     max_page_size: int = Field(100, description="최대 페이지 크기")
     
     # 로깅 설정
     log_level: str = Field("INFO", description="로그 레벨")
+
+    # 메트릭 설정
+    stage_timing_header: bool = Field(False, description="응답 헤더 Server-Timing 에 요청별 검색 단계 소요 시간(ms)을 포함")
+    metrics_directory: Optional[str] = Field(None, description="워커별 메트릭 파일 경로. 지정하면 /metrics 가 모든 워커의 메트릭을 합쳐서 반환. 프로덕션 서버는 워커가 여러 개면 임시 디렉터리를 사용")
+    metrics_flush_interval: float = Field(5, description="워커별 메트릭을 metrics_directory 에 저장하는 주기(초)")
     
     class Config:
         env_file = "../.env"
@@ -0,0 +1,421 @@
+"""
+메모리 매핑으로 읽는 상품 문서 저장소.
+
+LangChain FAISS.save_local 의 pickle(상품번호 → Document dict) 대신 스냅샷의 documents/ 에 컬럼 단위로 저장합니다.
+np.load(mmap_mode='r') 로 읽으므로 로드가 바로 끝나고, 같은 스냅샷을 읽는 워커 프로세스들이
+운영체제 페이지 캐시를 함께 사용합니다 (워커마다 문서 사본을 만들지 않음).
+
+    documents/
+        page_content.offsets.npy, page_content.data.npy   ← 문서 내용 문자열 테이블
+        text.offsets.npy, text.data.npy, text_bounds.npy   ← 문자열 메타데이터 필드 (행마다 이어 붙인 값과 필드 경계)
+        ints.npy, floats.npy                               ← 정수/실수 메타데이터 필드 (행 x 필드)
+        json{번호}.offsets.npy, json{번호}.data.npy        ← 그 밖의 메타데이터 필드 (JSON)
+        present.npy                                        ← 행 x 필드 값 존재 여부
+        meta.json                                          ← 필드 이름과 종류, 행 수, 상품번호 지문
+
+Document 는 요청한 행만 그때그때 만듭니다 (store[row]).
+"""
+
+import os
+import copy
+import json
+import logging
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from langchain.schema import Document
+from langchain_community.docstore.base import Docstore
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 저장 형식 버전. 파일 구성이 바뀌면 올립니다.
+FORMAT_VERSION = 1
+
+
+def load_array(directory: str, name: str, mmap: bool = True) -> np.ndarray:
+    """.npy 파일을 읽습니다. mmap 이면 메모리 매핑한 읽기 전용 배열입니다."""
+    array = np.load(os.path.join(directory, name), mmap_mode="r" if mmap else None)
+    # np.memmap 은 인덱싱할 때마다 memmap 객체를 새로 만들어 느리므로 같은 메모리를 보는 ndarray 로 바꿉니다.
+    return array.view(np.ndarray) if isinstance(array, np.memmap) else array
+
+
+class StringTable:
+    """
+    문자열 배열. UTF-8 바이트를 이어 붙인 data 와 문자열별 시작 위치 offsets(문자열 수 + 1)로 저장하며,
+    문자열은 읽을 때 디코딩합니다. table[row] 는 문자열, table[행 번호 배열] 은 object 배열입니다.
+    updated() 는 바뀐 행만 dict 로 덮어쓴 새 테이블을 만들고 이 테이블은 바꾸지 않습니다.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray, overrides: Optional[Dict[int, str]] = None, size: Optional[int] = None):
+        self.offsets = offsets
+        self.data = data
+        self.overrides: Dict[int, str] = overrides or {}
+        self.size = len(offsets) - 1 if size is None else size
+        self._bytes = memoryview(data)
+
+    @classmethod
+    def build(cls, values: Iterable[Any]) -> "StringTable":
+        encoded = [str(value).encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded)))
+        return cls(offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._get(row) for row in range(self.size))
+
+    def __getitem__(self, key: Union[int, np.ndarray, List[int]]) -> Union[str, np.ndarray]:
+        if isinstance(key, (int, np.integer)):
+            return self._get(int(key))
+
+        rows = np.asarray(key, dtype=np.int64)
+        values = np.empty(len(rows), dtype=object)
+        if self.overrides:
+            values[:] = [self._get(row) for row in rows.tolist()]
+        else:
+            data = self._bytes
+            values[:] = [
+                str(data[start:end], "utf-8")
+                for start, end in zip(self.offsets[rows].tolist(), self.offsets[rows + 1].tolist())
+            ]
+        return values
+
+    def _get(self, row: int) -> str:
+        if self.overrides:
+            value = self.overrides.get(row)
+            if value is not None:
+                return value
+        return str(self._bytes[self.offsets[row]:self.offsets[row + 1]], "utf-8")
+
+    def updated(self, values: Dict[int, str]) -> "StringTable":
+        """values({행 번호: 문자열})를 덮어쓴 새 테이블을 반환합니다. 테이블 크기 이상의 행은 추가합니다."""
+        size = max(self.size, max(values) + 1) if values else self.size
+        return StringTable(self.offsets, self.data, {**self.overrides, **values}, size)
+
+    def save(self, directory: str, name: str) -> None:
+        table = StringTable.build(self) if self.overrides else self
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), table.offsets)
+        np.save(os.path.join(directory, f"{name}.data.npy"), table.data)
+
+    @classmethod
+    def load(cls, directory: str, name: str, mmap: bool = True) -> "StringTable":
+        return cls(load_array(directory, f"{name}.offsets.npy", mmap), load_array(directory, f"{name}.data.npy", mmap))
+
+
+class KeyIndex(Mapping):
+    """
+    문자열 키(상품번호) → 행 번호. dict 대신 정렬된 고정 길이 바이트 배열을 이진 탐색하므로
+    메모리 매핑으로 읽어 여러 프로세스가 공유할 수 있습니다.
+    updated() 는 추가/삭제한 키만 따로 둔 새 인덱스를 만들고 이 인덱스는 바꾸지 않습니다.
+    """
+
+    def __init__(self, sorted_keys: np.ndarray, rows: np.ndarray):
+        # keys 는 Mapping.keys() 이므로 정렬된 키 배열은 sorted_keys 에 둡니다.
+        self.sorted_keys = sorted_keys
+        self.rows = rows
+        self.added: Dict[str, int] = {}
+        self.removed: set = set()
+        self.size = len(sorted_keys)
+
+    @classmethod
+    def build(cls, keys: Iterable[str], rows: Optional[Iterable[int]] = None) -> "KeyIndex":
+        """
+        키 목록으로 만듭니다. rows 가 없으면 키 목록 순서가 행 번호입니다.
+        같은 키가 여러 번 있으면 마지막 것을 씁니다.
+        """
+        encoded = np.array([str(key).encode("utf-8") for key in keys], dtype=bytes)
+        rows = np.arange(len(encoded), dtype=np.int64) if rows is None else np.fromiter(rows, dtype=np.int64, count=len(encoded))
+        order = np.argsort(encoded, kind="stable")
+        sorted_keys = encoded[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = sorted_keys[1:] != sorted_keys[:-1]
+        return cls(sorted_keys[last], rows[order[last]])
+
+    def _find(self, key: str) -> int:
+        """정렬된 키 배열에서 키의 행 번호를 찾습니다. 없으면 -1 입니다."""
+        encoded = key.encode("utf-8")
+        if not len(self.sorted_keys) or len(encoded) > self.sorted_keys.dtype.itemsize:
+            return -1
+        i = int(np.searchsorted(self.sorted_keys, encoded))
+        if i < len(self.sorted_keys) and self.sorted_keys[i] == encoded:
+            return int(self.rows[i])
+        return -1
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        row = self.added.get(key)
+        if row is not None:
+            return row
+        if key in self.removed:
+            return default
+        row = self._find(key)
+        return default if row < 0 else row
+
+    def __getitem__(self, key: str) -> int:
+        row = self.get(key)
+        if row is None:
+            raise KeyError(key)
+        return row
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.sorted_keys.tolist():
+            key = key.decode("utf-8")
+            if key not in self.removed and key not in self.added:
+                yield key
+        yield from self.added
+
+    def lookup(self, keys: List[str]) -> Optional[np.ndarray]:
+        """키 목록을 행 번호 배열로 변환합니다. 없는 키가 있으면 None 을 반환합니다."""
+        if self.added or self.removed:
+            rows = [self.get(key) for key in keys]
+            return None if None in rows else np.array(rows, dtype=np.int64)
+
+        encoded = [key.encode("utf-8") for key in keys]
+        if not encoded:
+            return np.empty(0, dtype=np.int64)
+        if not len(self.sorted_keys) or max(map(len, encoded)) > self.sorted_keys.dtype.itemsize:
+            return None
+        encoded = np.array(encoded, dtype=self.sorted_keys.dtype)
+        found = np.minimum(np.searchsorted(self.sorted_keys, encoded), len(self.sorted_keys) - 1)
+        if not np.array_equal(self.sorted_keys[found], encoded):
+            return None
+        return self.rows[found].astype(np.int64)
+
+    def updated(self, removed: Iterable[str] = (), added: Iterable[Tuple[str, int]] = ()) -> "KeyIndex":
+        """removed 키를 빼고 added((키, 행 번호))를 더한 새 인덱스를 반환합니다."""
+        index = copy.copy(self)
+        index.added = dict(self.added)
+        index.removed = set(self.removed)
+        for key in removed:
+            if key in index:
+                index.size -= 1
+            index.added.pop(key, None)
+            index.removed.add(key)
+        for key, row in added:
+            if key not in index:
+                index.size += 1
+            index.added[key] = int(row)
+            index.removed.discard(key)
+        return index
+
+    def save(self, directory: str, name: str) -> None:
+        if self.added or self.removed:
+            items = list(self.items())
+            index = KeyIndex.build([key for key, _ in items], [row for _, row in items])
+        else:
+            index = self
+        np.save(os.path.join(directory, f"{name}.keys.npy"), index.sorted_keys)
+        np.save(os.path.join(directory, f"{name}.rows.npy"), index.rows)
+
+    @classmethod
+    def load(cls, directory: str, name: str, mmap: bool = True) -> "KeyIndex":
+        return cls(load_array(directory, f"{name}.keys.npy", mmap), load_array(directory, f"{name}.rows.npy", mmap))
+
+
+def _field_kind(values: List[Any]) -> str:
+    """메타데이터 필드의 저장 종류. 한 종류의 값만 있는 문자열/정수/실수 필드는 그대로, 나머지는 JSON 으로 저장합니다."""
+    types = {type(value) for value in values}
+    if types <= {str}:
+        return "str"
+    if types <= {int} and all(-2 ** 63 <= value < 2 ** 63 for value in values):
+        return "int"
+    if types <= {float}:
+        return "float"
+    return "json"
+
+
+class DocumentStore:
+    """
+    FAISS 문서 위치 순서의 상품 문서 (Document 목록 대신 사용). store[row] 가 그 행의 Document 를 새로 만듭니다.
+
+    - page_content: 문서 내용 문자열 테이블
+    - 문자열 필드: 행마다 문자열 필드 값을 이어 붙인 문자열 테이블(text)과 필드 경계(text_bounds, 행 x (필드 수 + 1), 글자 위치)
+      한 번의 디코딩으로 한 행의 문자열 필드를 모두 읽습니다.
+    - 정수/실수 필드: 행 x 필드 배열 (ints, floats)
+    - 그 밖의 필드(목록, 불리언, 여러 종류가 섞인 값): 필드별 JSON 문자열 테이블
+    - present: 행 x 필드 값 존재 여부. 값이 없는 필드는 메타데이터에 넣지 않습니다.
+
+    updated() 는 바뀐 행의 Document 만 따로 둔 새 저장소를 만들고 이 저장소는 바꾸지 않습니다.
+    """
+
+    def __init__(
+        self,
+        page_content: StringTable,
+        fields: List[str],
+        kinds: List[str],
+        text: StringTable,
+        text_bounds: np.ndarray,
+        ints: np.ndarray,
+        floats: np.ndarray,
+        json_columns: List[StringTable],
+        present: np.ndarray,
+        fingerprint: Optional[str] = None,
+    ):
+        self.page_content = page_content
+        self.fields = fields
+        self.kinds = kinds
+        self.text = text
+        self.text_bounds = text_bounds
+        self.ints = ints
+        self.floats = floats
+        self.json_columns = json_columns
+        self.present = present
+        self.fingerprint = fingerprint
+        self.overrides: Dict[int, Document] = {}
+        self.size = len(page_content)
+
+        # 필드 → (종류, 종류별 번호)
+        counters = {kind: 0 for kind in ("str", "int", "float", "json")}
+        self._layout: List[Tuple[str, str, int]] = []
+        for field, kind in zip(fields, kinds):
+            self._layout.append((field, kind, counters[kind]))
+            counters[kind] += 1
+
+    @classmethod
+    def build(cls, docs: Iterable[Document], fingerprint: Optional[str] = None) -> "DocumentStore":
+        docs = list(docs)
+        metadatas = [doc.metadata for doc in docs]
+        fields = list(dict.fromkeys(key for metadata in metadatas for key in metadata))
+        kinds = [_field_kind([metadata[field] for metadata in metadatas if field in metadata]) for field in fields]
+
+        def of_kind(kind: str) -> List[str]:
+            return [field for field, field_kind in zip(fields, kinds) if field_kind == kind]
+
+        str_fields = of_kind("str")
+        texts = []
+        text_bounds = np.zeros((len(docs), len(str_fields) + 1), dtype=np.int32)
+        for row, metadata in enumerate(metadatas):
+            values = [metadata.get(field, "") for field in str_fields]
+            text_bounds[row, 1:] = np.cumsum([len(value) for value in values], dtype=np.int64)
+            texts.append("".join(values))
+
+        ints = np.array([[metadata.get(field, 0) for field in of_kind("int")] for metadata in metadatas], dtype=np.int64)
+        floats = np.array([[metadata.get(field, 0.0) for field in of_kind("float")] for metadata in metadatas], dtype=np.float64)
+        json_columns = [
+            StringTable.build(json.dumps(metadata.get(field), ensure_ascii=False) for metadata in metadatas)
+            for field in of_kind("json")
+        ]
+        present = np.array([[field in metadata for field in fields] for metadata in metadatas], dtype=bool)
+
+        return cls(
+            StringTable.build(doc.page_content for doc in docs), fields, kinds,
+            StringTable.build(texts), text_bounds,
+            ints.reshape(len(docs), -1), floats.reshape(len(docs), -1), json_columns,
+            present.reshape(len(docs), len(fields)), fingerprint,
+        )
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Document]:
+        return (self[row] for row in range(self.size))
+
+    def __getitem__(self, row: int) -> Document:
+        if self.overrides:
+            doc = self.overrides.get(row)
+            if doc is not None:
+                return doc
+
+        text = self.text._get(row)
+        bounds = self.text_bounds[row].tolist()
+        ints = self.ints[row].tolist()
+        floats = self.floats[row].tolist()
+        metadata = {}
+        for (field, kind, i), present in zip(self._layout, self.present[row].tolist()):
+            if not present:
+                continue
+            if kind == "str":
+                metadata[field] = text[bounds[i]:bounds[i + 1]]
+            elif kind == "int":
+                metadata[field] = ints[i]
+            elif kind == "float":
+                metadata[field] = floats[i]
+            else:
+                metadata[field] = json.loads(self.json_columns[i]._get(row))
+        return Document(page_content=self.page_content._get(row), metadata=metadata)
+
+    def updated(self, docs: Dict[int, Document]) -> "DocumentStore":
+        """docs({행 번호: 문서})를 덮어쓴 새 저장소를 반환합니다. 저장소 크기 이상의 행은 추가합니다."""
+        store = copy.copy(self)
+        store.overrides = {**self.overrides, **docs}
+        store.size = max(self.size, max(docs) + 1) if docs else self.size
+        return store
+
+    def save(self, directory: str) -> None:
+        """저장소를 디렉터리에 저장합니다. meta.json 을 마지막에 써서, meta.json 이 있으면 완전한 저장소입니다."""
+        store = DocumentStore.build(self, self.fingerprint) if self.overrides else self
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        store.page_content.save(directory, "page_content")
+        store.text.save(directory, "text")
+        np.save(os.path.join(directory, "text_bounds.npy"), store.text_bounds)
+        np.save(os.path.join(directory, "ints.npy"), store.ints)
+        np.save(os.path.join(directory, "floats.npy"), store.floats)
+        for i, column in enumerate(store.json_columns):
+            column.save(directory, f"json{i}")
+        np.save(os.path.join(directory, "present.npy"), store.present)
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "size": store.size,
+            "fields": store.fields,
+            "kinds": store.kinds,
+            "fingerprint": store.fingerprint,
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> Optional["DocumentStore"]:
+        """저장된 문서 저장소를 읽습니다. 완전한 저장소가 없거나 형식이 다르면 None 을 반환합니다."""
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            logger.warning(f"문서 저장소 형식이 다릅니다: {meta.get('format_version')} != {FORMAT_VERSION}")
+            return None
+
+        return cls(
+            StringTable.load(directory, "page_content", mmap),
+            meta["fields"],
+            meta["kinds"],
+            StringTable.load(directory, "text", mmap),
+            load_array(directory, "text_bounds.npy", mmap),
+            load_array(directory, "ints.npy", mmap),
+            load_array(directory, "floats.npy", mmap),
+            [StringTable.load(directory, f"json{i}", mmap) for i in range(meta["kinds"].count("json"))],
+            load_array(directory, "present.npy", mmap),
+            meta.get("fingerprint"),
+        )
+
+
+class DocumentStoreDocstore(Docstore):
+    """
+    DocumentStore 를 LangChain FAISS 의 문서 저장소로 쓰기 위한 어댑터.
+    문서 저장소 ID 는 FAISS 문서 위치(행 번호)이므로 index_to_docstore_id 는 range(문서 수)입니다.
+    """
+
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    def search(self, search: Union[int, str]) -> Union[str, Document]:
+        try:
+            return self.store[int(search)]
+        except (IndexError, TypeError, ValueError):
+            return f"ID {search} not found."
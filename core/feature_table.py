@@ -0,0 +1,376 @@
+import os
+import copy
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from core.document_store import KeyIndex, StringTable, load_array
+from utils.score_calculator import FLAGSHIP_BRANDS, PB_BRAND, FLAGSHIP_BRANDS_BY_ARTC, FLAGSHIP_PRODUCTS_BY_ARTC
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+# 저장 형식 버전. 파일 구성이 바뀌면 올립니다.
+FORMAT_VERSION = 1
+
+
+def _hashtag_tokens(value: str) -> List[str]:
+    return value.split('#')
+
+
+def _category_tokens(value: str) -> List[str]:
+    return value.replace('일반', '').split('·')
+
+
+# 토큰 포스팅 속성 → (메타데이터 필드, 토큰 분리 함수)
+POSTING_FIELDS = {
+    'hashtag_postings': ('SCH_KWD_NM', _hashtag_tokens),
+    'sgrp_postings': ('SGRP_NM', _category_tokens),
+    'mgrp_postings': ('MGRP_NM', _category_tokens),
+    'lgrp_postings': ('LGRP_NM', _category_tokens),
+}
+
+# 문자열 순서를 정수 코드로 바꾼 정렬 키 속성 → 메타데이터 필드
+ORDINAL_FIELDS = {
+    'sale_stat_cd': 'SALE_STAT_CD',
+    'stat_sct_cd': 'GOODS_STAT_SCT_CD',
+}
+
+# 행마다 값이 하나인 배열 속성. updated() 가 바뀐 행의 값만 옮겨 씁니다.
+ROW_COLUMNS = (
+    'goods_no', 'brnd_nm', 'goods_nm', 'features', 'card_dc_name_list', 'artc_nm',
+    'stat_sct_cd_is_not_03', 'is_appliance', 'is_target_type', 'is_normal_goods', 'is_service',
+    'mdl_lnch_dt', 'sales_unit', 'sale_qty', 'is_flagship_brand', 'is_pb',
+)
+
+# 문자열 컬럼. 저장한 테이블을 읽으면 StringTable 입니다.
+STRING_COLUMNS = ('goods_no', 'brnd_nm', 'goods_nm', 'features', 'card_dc_name_list', 'artc_nm')
+
+
+def _flagship_constants() -> Dict:
+    """대표 브랜드/상품 플래그를 만든 상수. 저장한 플래그가 현재 상수로 만든 것인지 확인하는 데 씁니다."""
+    return {
+        'flagship_brands': list(FLAGSHIP_BRANDS),
+        'pb_brand': PB_BRAND,
+        'flagship_brands_by_artc': {artc: list(brands) for artc, brands in FLAGSHIP_BRANDS_BY_ARTC.items()},
+        'flagship_products_by_artc': {artc: list(products) for artc, products in FLAGSHIP_PRODUCTS_BY_ARTC.items()},
+    }
+
+
+def _to_int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class ProductFeatureTable:
+    """
+    정렬/가중치 계산에 쓰이는 상품 메타데이터를 미리 파싱해 둔 컬럼형 테이블.
+    행 번호(position)는 FAISS 인덱스의 문서 위치와 같습니다.
+
+    - 정수/불리언 컬럼: 판매상태, 출시일, 판매량 등 정렬 키 (NumPy 배열)
+    - 토큰 포스팅: 해시태그(SCH_KWD_NM), 대/중/소 카테고리 토큰 → 행 번호 배열
+    - 대표 브랜드/상품 플래그: 품목별 대표 브랜드, 대표 상품 여부
+    - 문자열 컬럼: 검색어에 따라 달라지는 부분문자열 매칭용 (object 배열, 저장한 테이블을 읽으면 StringTable)
+
+    save() 로 스냅샷에 저장하고 load() 로 메모리 매핑하여 읽으면 파싱 없이 바로 쓸 수 있습니다.
+    """
+
+    def __init__(self, docs: Iterable[Document], fingerprint: Optional[str] = None):
+        docs = list(docs)
+        size = len(docs)
+        metadatas = [doc.metadata for doc in docs]
+
+        def column(name: str, default: str = '') -> np.ndarray:
+            values = np.empty(size, dtype=object)
+            values[:] = [str(metadata.get(name, default)) for metadata in metadatas]
+            return values
+
+        # 상품번호 → 행 번호
+        self.fingerprint = fingerprint
+        self.goods_no = column('GOODS_NO')
+        self.positions = KeyIndex.build(self.goods_no)
+
+        # 문자열 컬럼 (부분문자열 매칭용)
+        self.brnd_nm = column('BRND_NM')
+        self.goods_nm = column('GOODS_NM')
+        self.features = column('FEATURES')
+        self.card_dc_name_list = column('CARD_DC_NAME_LIST')
+        self.artc_nm = np.array([value.replace('일반', '') for value in column('ARTC_NM')], dtype=object)
+
+        # 정렬 키 컬럼. 문자열 코드는 정렬 순서가 같은 정수 코드로 바꾸고, 코드별 문자열은 ordinal_values 에 둡니다.
+        self.ordinal_values: Dict[str, np.ndarray] = {}
+        for name, field in ORDINAL_FIELDS.items():
+            self.ordinal_values[name], codes = self._ordinal(column(field))
+            setattr(self, name, codes)
+        self.stat_sct_cd_is_not_03 = column('GOODS_STAT_SCT_CD') != '03'
+        self.is_appliance = column('APPLIANCES_YN') == 'Y'
+        self.is_target_type = np.isin(column('GOODS_TP_CD'), ['05', '10'])
+        self.is_normal_goods = column('GOODS_STAT_SCT_NM') == '정상상품'
+        self.is_service = column('SERVICE_YN') == 'Y'
+        self.mdl_lnch_dt = np.array([_to_int(m.get('MDL_LNCH_DT', '99991231'), 99991231) for m in metadatas], dtype=np.int64)
+        self.sales_unit = np.array([_to_int(m.get('SALES_UNIT', 0), 0) for m in metadatas], dtype=np.int64)
+        self.sale_qty = np.array([_to_int(m.get('SALE_QTY', 0), 0) for m in metadatas], dtype=np.int64)
+        self.goods_no_key = self._goods_no_key(self.goods_no)
+
+        # 대표 브랜드/상품 플래그
+        self.is_flagship_brand = np.isin(self.brnd_nm, FLAGSHIP_BRANDS)
+        self.is_pb = self.brnd_nm == PB_BRAND
+        self.flagship_brand_by_artc = {
+            artc: self.contains_any(self.brnd_nm, flagships)
+            for artc, flagships in FLAGSHIP_BRANDS_BY_ARTC.items()
+        }
+        self.flagship_product_by_artc = {
+            artc: self.contains_any(self.goods_nm, flagships)
+            for artc, flagships in FLAGSHIP_PRODUCTS_BY_ARTC.items()
+        }
+
+        # 토큰 포스팅 (hashtag_postings, sgrp_postings, mgrp_postings, lgrp_postings)
+        for name, (field, split) in POSTING_FIELDS.items():
+            setattr(self, name, self._postings(split(value) for value in column(field)))
+
+    def __len__(self) -> int:
+        return len(self.goods_no)
+
+    def updated(
+        self,
+        rows: List[int],
+        docs: List[Document],
+        previous: Dict[int, Document],
+        deleted: Iterable[int] = (),
+    ) -> "ProductFeatureTable":
+        """
+        rows 행을 docs 로 바꾸고(테이블 크기 이상의 행은 추가) deleted 행을 상품번호 조회에서 뺀 새 테이블을 반환합니다.
+        바뀐 상품만 파싱하고 나머지 행은 배열을 복사하며, 이 테이블은 바꾸지 않습니다.
+        previous 는 바뀌거나 삭제되는 행의 이전 문서로, 이전 토큰의 포스팅만 골라 고치는 데 씁니다.
+        삭제한 행은 비워 두므로 다른 행 번호(FAISS 문서 위치)는 바뀌지 않습니다.
+        """
+        part = ProductFeatureTable(docs)
+        rows = np.asarray(rows, dtype=np.int64)
+        size = max(len(self), int(rows.max()) + 1 if len(rows) else 0)
+        table = copy.copy(self)
+
+        def scatter(column: np.ndarray, values: np.ndarray) -> np.ndarray:
+            if isinstance(column, StringTable):
+                return column.updated(dict(zip(rows.tolist(), values)))
+            result = np.empty(size, dtype=column.dtype)
+            result[:len(column)] = column
+            result[rows] = values
+            return result
+
+        for name in ROW_COLUMNS:
+            setattr(table, name, scatter(getattr(self, name), getattr(part, name)))
+        table.flagship_brand_by_artc = {
+            artc: scatter(column, part.flagship_brand_by_artc[artc]) for artc, column in self.flagship_brand_by_artc.items()
+        }
+        table.flagship_product_by_artc = {
+            artc: scatter(column, part.flagship_product_by_artc[artc]) for artc, column in self.flagship_product_by_artc.items()
+        }
+
+        # 새 코드 값이 생기면 정수 코드를 합친 값 목록 기준으로 다시 매깁니다.
+        table.ordinal_values = {}
+        for name, values in self.ordinal_values.items():
+            merged = np.union1d(values, part.ordinal_values[name])
+            codes = np.searchsorted(merged, values)[getattr(self, name)]
+            part_codes = np.searchsorted(merged, part.ordinal_values[name])[getattr(part, name)]
+            table.ordinal_values[name] = merged
+            setattr(table, name, scatter(codes, part_codes))
+
+        # 숫자 상품번호의 키는 행마다 독립적이므로 옮겨 쓰고, 숫자가 아닌 상품번호가 있으면 다시 계산합니다.
+        if all(goods_no.isdigit() for goods_no in part.goods_no):
+            table.goods_no_key = scatter(self.goods_no_key, part.goods_no_key)
+        else:
+            table.goods_no_key = self._goods_no_key(table.goods_no)
+
+        removed = []
+        for row in deleted:
+            goods_no = str(previous[row].metadata.get('GOODS_NO', ''))
+            if self.positions.get(goods_no) == row:
+                removed.append(goods_no)
+        table.positions = self.positions.updated(removed, zip(part.goods_no, rows.tolist()))
+
+        stale_rows = np.array(sorted(previous), dtype=np.int64)
+        for name, (field, split) in POSTING_FIELDS.items():
+            postings = dict(getattr(self, name))
+            stale_tokens = {token for doc in previous.values() for token in split(str(doc.metadata.get(field, '')))}
+            for token in stale_tokens:
+                token_rows = postings.get(token)
+                if token_rows is None:
+                    continue
+                token_rows = token_rows[~np.isin(token_rows, stale_rows)]
+                if len(token_rows):
+                    postings[token] = token_rows
+                else:
+                    del postings[token]
+            for token, part_rows in getattr(part, name).items():
+                postings[token] = np.union1d(postings.get(token, _EMPTY_POSITIONS), rows[part_rows])
+            setattr(table, name, postings)
+
+        return table
+
+    def save(self, directory: str) -> None:
+        """
+        테이블을 디렉터리에 저장합니다. 문자열 컬럼은 문자열 테이블, 나머지 컬럼은 .npy, 포스팅은 토큰별 행 번호를
+        이어 붙인 배열(CSR)로 저장합니다. meta.json 을 마지막에 써서, meta.json 이 있으면 완전한 테이블입니다.
+        """
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        for name in ROW_COLUMNS + tuple(ORDINAL_FIELDS) + ('goods_no_key',):
+            column = getattr(self, name)
+            if name in STRING_COLUMNS:
+                if not isinstance(column, StringTable):
+                    column = StringTable.build(column)
+                column.save(directory, name)
+            else:
+                np.save(os.path.join(directory, f"{name}.npy"), column)
+        self.positions.save(directory, "positions")
+
+        flagships = {}
+        for name in ('flagship_brand_by_artc', 'flagship_product_by_artc'):
+            flags = getattr(self, name)
+            flagships[name] = list(flags)
+            stacked = np.stack(list(flags.values())) if flags else np.zeros((0, len(self)), dtype=bool)
+            np.save(os.path.join(directory, f"{name}.npy"), stacked)
+
+        posting_tokens = {}
+        for name in POSTING_FIELDS:
+            postings = getattr(self, name)
+            posting_tokens[name] = list(postings)
+            indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(rows) for rows in postings.values()])
+            rows = np.concatenate(list(postings.values())) if postings else _EMPTY_POSITIONS
+            np.save(os.path.join(directory, f"{name}.indptr.npy"), indptr)
+            np.save(os.path.join(directory, f"{name}.rows.npy"), rows.astype(np.int64))
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "size": len(self),
+            "fingerprint": self.fingerprint,
+            "ordinal_values": {name: values.tolist() for name, values in self.ordinal_values.items()},
+            "flagships": flagships,
+            "flagship_constants": _flagship_constants(),
+            "posting_tokens": posting_tokens,
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> Optional["ProductFeatureTable"]:
+        """
+        저장한 테이블을 읽습니다. 완전한 테이블이 없거나 형식이 다르면 None 을 반환합니다.
+        대표 브랜드/상품 상수가 저장할 때와 다르면 플래그만 다시 계산합니다.
+        """
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            logger.warning(f"피처 테이블 형식이 다릅니다: {meta.get('format_version')} != {FORMAT_VERSION}")
+            return None
+
+        table = cls.__new__(cls)
+        table.fingerprint = meta.get("fingerprint")
+        for name in ROW_COLUMNS + tuple(ORDINAL_FIELDS) + ('goods_no_key',):
+            if name in STRING_COLUMNS:
+                setattr(table, name, StringTable.load(directory, name, mmap))
+            else:
+                setattr(table, name, load_array(directory, f"{name}.npy", mmap))
+        table.positions = KeyIndex.load(directory, "positions", mmap)
+        table.ordinal_values = {name: np.array(values, dtype=str) for name, values in meta["ordinal_values"].items()}
+
+        if meta["flagship_constants"] == _flagship_constants():
+            for name, artcs in meta["flagships"].items():
+                stacked = load_array(directory, f"{name}.npy", mmap)
+                setattr(table, name, {artc: stacked[i] for i, artc in enumerate(artcs)})
+        else:
+            logger.warning("대표 브랜드/상품 상수가 바뀌어 플래그를 다시 계산합니다.")
+            brnd_nm = table.brnd_nm[np.arange(len(table))]
+            goods_nm = table.goods_nm[np.arange(len(table))]
+            table.is_flagship_brand = np.isin(brnd_nm, FLAGSHIP_BRANDS)
+            table.is_pb = brnd_nm == PB_BRAND
+            table.flagship_brand_by_artc = {
+                artc: cls.contains_any(brnd_nm, flagships) for artc, flagships in FLAGSHIP_BRANDS_BY_ARTC.items()
+            }
+            table.flagship_product_by_artc = {
+                artc: cls.contains_any(goods_nm, flagships) for artc, flagships in FLAGSHIP_PRODUCTS_BY_ARTC.items()
+            }
+
+        for name, tokens in meta["posting_tokens"].items():
+            indptr = load_array(directory, f"{name}.indptr.npy", mmap).tolist()
+            rows = load_array(directory, f"{name}.rows.npy", mmap)
+            setattr(table, name, {token: rows[indptr[i]:indptr[i + 1]] for i, token in enumerate(tokens)})
+        return table
+
+    def lookup(self, goods_nos: Iterable[str]) -> Optional[np.ndarray]:
+        """상품번호 목록을 행 번호 배열로 변환합니다. 테이블에 없는 상품번호가 있으면 None 을 반환합니다."""
+        return self.positions.lookup(list(goods_nos))
+
+    def has_token(self, postings: Dict[str, np.ndarray], token: str, positions: np.ndarray) -> np.ndarray:
+        """positions 행들이 token 을 가지고 있는지 여부를 반환합니다. 포스팅은 정렬되어 있어 이진 탐색합니다."""
+        rows = postings.get(token, _EMPTY_POSITIONS)
+        if not len(rows):
+            return np.zeros(len(positions), dtype=bool)
+        found = np.searchsorted(rows, positions)
+        return rows[np.minimum(found, len(rows) - 1)] == positions
+
+    @staticmethod
+    def as_str(values: np.ndarray) -> np.ndarray:
+        """object 문자열 배열을 np.char 함수로 찾을 수 있는 고정 길이 문자열 배열로 바꿉니다. 같은 배열을 여러 번 찾을 때 한 번만 바꿉니다."""
+        return values.astype(str) if values.dtype == object else values
+
+    @classmethod
+    def contains(cls, values: np.ndarray, needle: str) -> np.ndarray:
+        """문자열 배열의 각 값에 needle 이 포함되어 있는지 여부를 반환합니다 (np.char.find)."""
+        return np.char.find(cls.as_str(values), needle) >= 0
+
+    @staticmethod
+    def contains_any(values: np.ndarray, needles: List[str]) -> np.ndarray:
+        """
+        문자열 배열의 각 값에 needles 중 하나라도 포함되어 있는지 여부를 반환합니다.
+        테이블을 만들 때 전체 상품에 한 번 쓰므로, 전체 컬럼을 고정 길이 문자열로 복사하지 않고 값마다 찾습니다.
+        """
+        return np.fromiter((any(needle in value for needle in needles) for value in values), dtype=bool, count=len(values))
+
+    @staticmethod
+    def _ordinal(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """문자열 컬럼을 오름차순 순서가 유지되는 정수 코드로 변환합니다. (코드별 문자열, 코드) 를 반환합니다."""
+        unique, codes = np.unique(values.astype(str), return_inverse=True)
+        return unique, codes.astype(np.int64)
+
+    @staticmethod
+    def _goods_no_key(goods_nos: np.ndarray) -> np.ndarray:
+        """상품번호 내림차순(숫자) 정렬을 위한 오름차순 키. 숫자가 아닌 상품번호는 문자열 순서로 뒤에 둡니다."""
+        key = np.zeros(len(goods_nos), dtype=np.int64)
+        non_digits = []
+        for i, goods_no in enumerate(goods_nos):
+            if goods_no.isdigit():
+                key[i] = -int(goods_no)
+            else:
+                non_digits.append(i)
+        if non_digits:
+            offset = int(key.max()) + 1 if len(key) else 0
+            order = sorted(non_digits, key=lambda i: goods_nos[i])
+            for rank, i in enumerate(order):
+                key[i] = offset + rank
+        return key
+
+    @staticmethod
+    def _postings(token_lists: Iterable[List[str]]) -> Dict[str, np.ndarray]:
+        """행별 토큰 목록으로 토큰 → 행 번호 배열 포스팅을 만듭니다."""
+        postings: Dict[str, List[int]] = {}
+        for position, tokens in enumerate(token_lists):
+            for token in set(tokens):
+                postings.setdefault(token, []).append(position)
+        return {token: np.array(rows, dtype=np.int64) for token, rows in postings.items()}
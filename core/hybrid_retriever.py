@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+import numpy as np
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from core.bm25_index import BM25IndexRetriever
+from core.document_store import DocumentStore
+from core.prefiltered_retriever import search_faiss_ids
+from utils import metrics
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(rankings: List[np.ndarray], weights: List[float], c: int = 60) -> List[int]:
+    """
+    가중 RRF(Reciprocal Rank Fusion)로 여러 문서 번호 순위 목록을 합칩니다.
+    문서 점수는 sum(weight / (rank + c)) 이며 rank 는 1부터 시작합니다 (EnsembleRetriever 와 동일).
+    동점은 먼저 나온 순위 목록, 앞 순위 순서를 따릅니다.
+    """
+    scores: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking.tolist(), start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (rank + c)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    BM25 + FAISS 하이브리드 검색기.
+
+    두 검색을 동시에 실행하고, 문서 내용 대신 정수 문서 번호(FAISS 문서 위치)로 가중 RRF 를 계산합니다.
+    검색 지연시간은 두 검색의 합이 아니라 느린 쪽에 가깝습니다.
+    weights, bm25_k, faiss_k 는 configurable_fields 로 요청마다 바꿀 수 있습니다.
+    """
+
+    bm25: BM25IndexRetriever
+    vectorstore: FAISS
+    embeddings: Embeddings
+    documents: DocumentStore
+    weights: List[float] = [0.5, 0.5]  # [BM25, FAISS]
+    bm25_k: int = 500  # BM25 후보 문서 수
+    faiss_k: int = 100  # FAISS 후보 문서 수
+    c: int = 60  # RRF 상수
+
+    def _bm25_ids(self, query: str) -> np.ndarray:
+        return self.bm25.search_ids(query, self.bm25_k)
+
+    def _faiss_ids(self, embedding: List[float]) -> np.ndarray:
+        return search_faiss_ids(self.vectorstore, embedding, self.faiss_k)
+
+    def _fuse(self, bm25_ids: np.ndarray, faiss_ids: np.ndarray) -> List[Document]:
+        with metrics.stage("fusion"):
+            doc_ids = reciprocal_rank_fusion([bm25_ids, faiss_ids], self.weights, self.c)
+            docs = [self.documents[i] for i in doc_ids]
+        metrics.observe_candidates("fusion", len(bm25_ids) + len(faiss_ids), len(doc_ids))
+        return docs
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        bm25_ids = self._bm25_ids(query)
+        faiss_ids = self._faiss_ids(self.embeddings.embed_query(query))
+        return self._fuse(bm25_ids, faiss_ids)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        async def faiss_leg() -> np.ndarray:
+            embedding = await self.embeddings.aembed_query(query)
+            return await asyncio.to_thread(self._faiss_ids, embedding)
+
+        # BM25(형태소 분석 + 점수 계산)와 FAISS(임베딩 + 벡터 검색)를 동시에 실행합니다.
+        bm25_ids, faiss_ids = await asyncio.gather(asyncio.to_thread(self._bm25_ids, query), faiss_leg())
+        return self._fuse(bm25_ids, faiss_ids)
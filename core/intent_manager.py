@@ -1,9 +1,13 @@
+import copy
 import logging
-from langchain_openai import ChatOpenAI
+from typing import Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
-from utils import intent_cleaner
+from utils import intent_cleaner, metrics
+from utils.cache import create_cache, prompt_cache_version
+from utils.NL_processor import normalize_query
+from core.config import settings
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +30,9 @@ class IntentManager:
 
             logger.info("의도분석 LLM 초기화 시작...")
 
+            # langchain_openai(openai SDK)는 import 에 1초 이상 걸리므로 서버 시작 단계에서 불러옵니다.
+            from langchain_openai import ChatOpenAI
+
             # 원하는 데이터 구조를 정의합니다.
             class Intent(BaseModel):
                 INTENTED_QUERY: str = Field(description="사용자 검색어에서 가격 관련 내용은 제거하고 자연스런 문장으로 변환.")
@@ -78,10 +85,21 @@ class IntentManager:
             prompt = prompt.partial(format_instructions=parser.get_format_instructions())
 
             # # OpenAI 객체를 생성합니다.
-            model = ChatOpenAI(temperature=0, model_name="gpt-4.1-mini")
+            model_name = "gpt-4.1-mini"
+            model = ChatOpenAI(temperature=0, model_name=model_name)
+
+            # 체인을 구성합니다. 토큰 사용량은 메트릭으로 집계합니다.
+            self.intent_chain = prompt | model.with_config(callbacks=[metrics.LLMUsageCallback("intent")]) | parser
 
-            # 체인을 구성합니다.
-            self.intent_chain = prompt | model | parser
+            # 의도분석 캐시
+            # 모델이나 프롬프트가 바뀌면 이전 캐시를 사용하지 않도록 키에 버전을 포함합니다.
+            self.intent_cache = create_cache(
+                maxsize=settings.intent_cache_size,
+                ttl=settings.intent_cache_ttl,
+                path=settings.intent_cache_path,
+                table="intent_cache",
+            )
+            self._intent_cache_version = prompt_cache_version(model_name, prompt)
 
             self._initialized = True
             logger.info(f"의도분석 LLM 체인구성 완료!")
@@ -101,7 +119,32 @@ class IntentManager:
             raise Exception("의도분석 LLM 이 아직 초기화되지 않았습니다.")
         return self.intent_chain
     
+    async def aget_intent(self, query: str, index_version: Optional[str] = None) -> dict:
+        """
+        검색어의 의도를 분석합니다. 정규화된 검색어 기준으로 캐시된 의도가 있으면 LLM 을 호출하지 않습니다.
+        반환되는 dict 는 호출자가 수정해도 캐시에 영향을 주지 않습니다.
+        LLM 호출과 SQLite 캐시 조회/저장 중 이벤트 루프를 막지 않습니다.
+        index_version(검색 색인 스냅샷 버전)을 캐시 키에 넣어, 스냅샷을 교체하면 이전 색인에서 만든 의도를 사용하지 않습니다.
+        """
+        key = self._intent_cache_key(query, index_version)
+        intent = await self.intent_cache.aget(key)
+        if intent is None:
+            with metrics.stage("intent_llm"):
+                intent = await self.get_intent_chain().ainvoke({"query": query})
+            await self.intent_cache.aset(key, intent)
+        return copy.deepcopy(intent)
+
+    def get_cache_stats(self) -> dict:
+        """의도분석 캐시 적중 통계를 반환합니다."""
+        if not self._initialized:
+            return {}
+        return self.intent_cache.stats()
+
+    def _intent_cache_key(self, query: str, index_version: Optional[str] = None) -> str:
+        return f"{self._intent_cache_version}:{index_version or ''}:{normalize_query(query)}"
+
     def get_cleaned_intent(self, intent, query):
-        return intent_cleaner.get_cleaned_intent(intent, query)
+        with metrics.stage("intent_cleaning"):
+            return intent_cleaner.get_cleaned_intent(intent, query)
 
 
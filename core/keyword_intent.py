@@ -0,0 +1,194 @@
+import os
+import copy
+import json
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from langchain.schema import Document
+
+from utils.intent_cleaner import extract_price_range, extract_review_range, get_default_intent
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 브랜드 별칭 → 카탈로그 브랜드명. 카탈로그에 있는 브랜드만 사용합니다.
+BRAND_ALIASES = {
+    '삼성': '삼성전자',
+    'samsung': '삼성전자',
+    '엘지': 'LG전자',
+    'lg': 'LG전자',
+    '애플': 'Apple',
+    '플럭스': 'PLUX',
+}
+
+# 품목 별칭 → 카탈로그 품목명. 카탈로그에 있는 품목만 사용합니다.
+ARTICLE_ALIASES = {
+    '티비': 'TV',
+    '텔레비전': 'TV',
+    '노트북컴퓨터': '노트북',
+    '에어콘': '에어컨',
+}
+
+# 검색어 하나로 볼 수 있는 최대 LGRP_NM 수 (LLM 의도분석과 동일)
+MAX_CATEGORIES = 3
+
+
+class KeywordIntentExtractor:
+    """
+    키워드 검색어(예: '삼성 냉장고', 'LG 에어컨 인버터')의 의도를 LLM 없이 규칙으로 추출합니다.
+
+    카탈로그 메타데이터로 만든 사전을 사용합니다.
+        - 브랜드: BRND_NM 과 BRAND_ALIASES
+        - 품목: ARTC_NM('일반' 제거)과 ARTICLE_ALIASES, 품목별로 가장 많이 속한 LGRP_NM
+        - 할인카드: CARD_DC_NAME_LIST
+    가격/평점은 intent_cleaner 의 정규식으로 인식하고, 사전에 없는 나머지 단어는 FEATURES 로 둡니다.
+    결과는 LLM 의도분석(Intent)과 같은 형태의 dict 입니다.
+    스냅샷에는 사전을 JSON 으로 저장하여(save) 서버 시작 시 카탈로그를 다시 읽지 않습니다(load).
+    """
+
+    def __init__(self, docs: Iterable[Document], max_features: int = 2):
+        self.max_features = max_features
+        self.brands: Dict[str, str] = {}
+        self.articles: Dict[str, str] = {}
+        self.cards: Dict[str, str] = {}
+        self._category_counts: Dict[str, Counter] = {}
+        self._add_documents(docs)
+        logger.info(
+            f"키워드 의도 사전 구성 완료: 브랜드 {len(self.brands)}개, 품목 {len(self.articles)}개, 할인카드 {len(self.cards)}개"
+        )
+
+    def extended(self, docs: List[Document], removed: Iterable[Document] = ()) -> "KeywordIntentExtractor":
+        """
+        docs 의 브랜드/품목/할인카드를 더한 새 추출기를 반환합니다. 이 추출기는 바꾸지 않습니다.
+        removed(바뀌거나 삭제된 상품의 이전 문서)는 품목별 카테고리 집계에서만 빼고, 이미 있는 사전 단어는 지우지 않습니다.
+        """
+        extractor = copy.copy(self)
+        extractor.brands = dict(self.brands)
+        extractor.articles = dict(self.articles)
+        extractor.cards = dict(self.cards)
+        extractor._category_counts = {article: Counter(counter) for article, counter in self._category_counts.items()}
+        for doc in removed:
+            article = str(doc.metadata.get('ARTC_NM', '')).replace('일반', '').strip()
+            lgrp_nm = str(doc.metadata.get('LGRP_NM', '')).strip()
+            counter = extractor._category_counts.get(article)
+            if counter is not None and lgrp_nm:
+                counter[lgrp_nm] -= 1
+                if counter[lgrp_nm] <= 0:
+                    del counter[lgrp_nm]
+        extractor._add_documents(docs)
+        return extractor
+
+    def save(self, path: str) -> None:
+        """사전(브랜드, 품목, 할인카드, 품목별 카테고리 집계)을 JSON 파일로 저장합니다."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "brands": self.brands,
+                "articles": self.articles,
+                "cards": self.cards,
+                "category_counts": self._category_counts,
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, max_features: int = 2) -> Optional["KeywordIntentExtractor"]:
+        """저장한 사전을 읽습니다. 파일이 없으면 None 을 반환합니다."""
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        extractor = cls.__new__(cls)
+        extractor.max_features = max_features
+        extractor.brands = data["brands"]
+        extractor.articles = data["articles"]
+        extractor.cards = data["cards"]
+        extractor._category_counts = {article: Counter(counts) for article, counts in data["category_counts"].items()}
+        extractor._index_terms()
+        return extractor
+
+    def _add_documents(self, docs: Iterable[Document]) -> None:
+        categories = self._category_counts
+        for doc in docs:
+            metadata = doc.metadata
+            brand = str(metadata.get('BRND_NM', '')).strip()
+            if brand:
+                self.brands[brand.lower()] = brand
+
+            article = str(metadata.get('ARTC_NM', '')).replace('일반', '').strip()
+            if article:
+                self.articles[article.lower()] = article
+                lgrp_nm = str(metadata.get('LGRP_NM', '')).strip()
+                if lgrp_nm:
+                    categories.setdefault(article, Counter())[lgrp_nm] += 1
+
+            for card in str(metadata.get('CARD_DC_NAME_LIST', '')).split(','):
+                card = card.strip()
+                if card:
+                    self.cards[card.lower()] = card
+        self._index_terms()
+
+    def _index_terms(self) -> None:
+        """별칭을 더하고 품목별 카테고리와 붙여 쓴 검색어를 나누기 위한 단어 목록을 만듭니다."""
+        for alias, brand in BRAND_ALIASES.items():
+            if brand.lower() in self.brands:
+                self.brands.setdefault(alias, brand)
+        for alias, article in ARTICLE_ALIASES.items():
+            if article.lower() in self.articles:
+                self.articles.setdefault(alias, article)
+
+        self.categories: Dict[str, List[str]] = {
+            article: [lgrp_nm for lgrp_nm, _ in counter.most_common(MAX_CATEGORIES)]
+            for article, counter in self._category_counts.items()
+        }
+
+        # 붙여 쓴 검색어(예: '삼성냉장고')를 나누기 위한 사전 단어 목록. 긴 단어부터 매칭합니다.
+        self._terms = sorted(set(self.brands) | set(self.articles) | set(self.cards), key=len, reverse=True)
+
+    def _segment(self, token: str) -> List[str]:
+        """사전 단어로 시작하는 붙여 쓴 토큰을 나눕니다. 예) '삼성냉장고' → ['삼성', '냉장고']"""
+        lowered = token.lower()
+        if lowered in self.brands or lowered in self.articles or lowered in self.cards:
+            return [token]
+        for term in self._terms:
+            if len(term) < len(lowered) and lowered.startswith(term):
+                return [token[:len(term)]] + self._segment(token[len(term):])
+        return [token]
+
+    def extract(self, query: str) -> Optional[Dict]:
+        """
+        검색어의 의도를 추출합니다.
+        브랜드/품목 중 하나도 찾지 못했거나 사전에 없는 단어가 max_features 개보다 많으면
+        규칙으로 판단하기 어려운 검색어로 보고 None 을 반환합니다.
+        """
+        intent = get_default_intent(query)
+        text = ' '.join(query.split())
+
+        intent['PRICE_GTE'], intent['PRICE_LTE'], text = extract_price_range(text)
+        intent['REVIEW_GTE'], intent['REVIEW_LTE'], text = extract_review_range(text)
+
+        features = []
+        cards = []
+        for token in text.split():
+            for word in self._segment(token):
+                lowered = word.lower()
+                if not intent['BRND_NM'] and lowered in self.brands:
+                    intent['BRND_NM'] = self.brands[lowered]
+                elif not intent['ARTC_NM'] and lowered in self.articles:
+                    intent['ARTC_NM'] = self.articles[lowered]
+                elif lowered in self.cards:
+                    cards.append(self.cards[lowered])
+                else:
+                    features.append(word)
+
+        if not intent['BRND_NM'] and not intent['ARTC_NM']:
+            return None
+        if len(features) > self.max_features:
+            return None
+
+        intent['INTENTED_QUERY'] = ' '.join(text.split()) or query
+        intent['LGRP_NM'] = list(self.categories.get(intent['ARTC_NM'], []))
+        intent['FEATURES'] = features
+        intent['CARD_DC_NMS'] = cards
+        return intent
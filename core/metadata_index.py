@@ -0,0 +1,301 @@
+import os
+import copy
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from langchain.schema import Document
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 범위 조건($gte, $lte 등)에 쓰이는 숫자 필드
+NUMERIC_FIELDS = ("DSCNT_SALE_PRC", "GDAS_SCR_SUM")
+# 값 조건($in, $eq 등)에 쓰이는 범주 필드
+CATEGORY_FIELDS = ("LGRP_NM", "MGRP_NM")
+
+# 저장 형식 버전. 파일 구성이 바뀌면 올립니다.
+FORMAT_VERSION = 1
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class MetadataIndex:
+    """
+    FAISS 검색 전에 필터를 적용하기 위한 메타데이터 색인. 행 번호는 FAISS 문서 위치와 같습니다.
+
+    - 숫자 필드: 값으로 정렬된 (값, 행 번호) 배열. 범위 조건은 이진 탐색으로 구간을 찾습니다.
+    - 범주 필드: 값 → 비트맵 (np.packbits, little bit order). faiss.IDSelectorBitmap 에 그대로 넘길 수 있습니다.
+
+    FilterService 가 만드는 Mongo 형식 필터(LangChain FAISS 필터와 같은 의미)를 비트맵으로 변환합니다.
+    색인하지 않은 필드나 지원하지 않는 조건이 있으면 None 을 반환하여 기존 방식으로 검색하게 합니다.
+
+    updated() 로 바뀐 상품의 행만 고친 새 색인을 만들 수 있습니다. 삭제한 행은 어떤 조건과도 일치하지 않습니다.
+
+    save/load 로 디렉터리에 저장하고 읽을 수 있습니다.
+        - {숫자 필드}.values.npy, {숫자 필드}.positions.npy: 정렬된 값과 행 번호
+        - {범주 필드}.bitmaps.npy: 값별 비트맵 (값 수 x 비트맵 바이트 수)
+        - {범주 필드}.values.json: 비트맵 행 순서의 값 목록
+        - meta.json: 행 수, 상품번호 지문 등
+    """
+
+    def __init__(self, docs: List[Document], fingerprint: Optional[str] = None):
+        self.size = len(docs)
+        self.fingerprint = fingerprint
+        metadatas = [doc.metadata for doc in docs]
+
+        # 숫자 필드: 정렬된 값과 행 번호. 숫자가 아닌 값(NaN)은 어떤 범위 조건과도 일치하지 않습니다.
+        self.sorted_values: Dict[str, np.ndarray] = {}
+        self.sorted_positions: Dict[str, np.ndarray] = {}
+        for field in NUMERIC_FIELDS:
+            values = np.array([_to_float(metadata.get(field)) for metadata in metadatas], dtype=np.float64)
+            valid = np.flatnonzero(~np.isnan(values))
+            order = valid[np.argsort(values[valid], kind="stable")]
+            self.sorted_values[field] = values[order]
+            self.sorted_positions[field] = order
+
+        # 범주 필드: 값별 비트맵
+        self.bitmaps: Dict[str, Dict[Any, np.ndarray]] = {}
+        for field in CATEGORY_FIELDS:
+            rows: Dict[Any, List[int]] = {}
+            for position, metadata in enumerate(metadatas):
+                value = metadata.get(field)
+                if isinstance(value, (str, int, float)):
+                    rows.setdefault(value, []).append(position)
+            self.bitmaps[field] = {value: self._bitmap(positions) for value, positions in rows.items()}
+
+        self._init_masks()
+
+    def _init_masks(self) -> None:
+        self._empty = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._full = np.packbits(np.ones(self.size, dtype=bool), bitorder="little")
+
+    def updated(self, rows: List[int], docs: List[Document], deleted: Iterable[int] = ()) -> "MetadataIndex":
+        """
+        rows 행을 docs 의 메타데이터로 바꾸고(색인 크기 이상의 행은 추가) deleted 행을 지운 새 색인을 반환합니다.
+        바뀐 행의 값만 정렬 배열과 비트맵에서 옮기며, 이 색인은 바꾸지 않습니다.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        deleted = np.asarray(list(deleted), dtype=np.int64)
+        stale = np.union1d(rows, deleted)
+        metadatas = [doc.metadata for doc in docs]
+
+        index = copy.copy(self)
+        index.size = max(self.size, int(rows.max()) + 1 if len(rows) else 0)
+        index.fingerprint = None
+        num_bytes = (index.size + 7) // 8
+        stale_bitmap = index._bitmap(stale)
+
+        # 숫자 필드: 바뀐 행을 빼고, 새 값을 정렬 위치에 끼워 넣습니다.
+        index.sorted_values = {}
+        index.sorted_positions = {}
+        for field in NUMERIC_FIELDS:
+            positions = self.sorted_positions[field]
+            keep = ~np.isin(positions, stale)
+            values, positions = self.sorted_values[field][keep], positions[keep]
+
+            new_values = np.array([_to_float(metadata.get(field)) for metadata in metadatas], dtype=np.float64)
+            valid = np.flatnonzero(~np.isnan(new_values))
+            order = valid[np.argsort(new_values[valid], kind="stable")]
+            at = np.searchsorted(values, new_values[order], side="right")
+            index.sorted_values[field] = np.insert(values, at, new_values[order])
+            index.sorted_positions[field] = np.insert(positions, at, rows[order])
+
+        # 범주 필드: 바뀐 행의 비트를 모두 지운 뒤 새 값의 비트맵에 켭니다.
+        index.bitmaps = {}
+        for field in CATEGORY_FIELDS:
+            new_rows: Dict[Any, List[int]] = {}
+            for row, metadata in zip(rows.tolist(), metadatas):
+                value = metadata.get(field)
+                if isinstance(value, (str, int, float)):
+                    new_rows.setdefault(value, []).append(row)
+
+            bitmaps = {}
+            for value in set(self.bitmaps[field]) | set(new_rows):
+                bitmap = np.zeros(num_bytes, dtype=np.uint8)
+                previous = self.bitmaps[field].get(value)
+                if previous is not None:
+                    bitmap[:len(previous)] = previous
+                    bitmap &= ~stale_bitmap
+                if value in new_rows:
+                    bitmap |= index._bitmap(new_rows[value])
+                if bitmap.any():
+                    bitmaps[value] = bitmap
+            index.bitmaps[field] = bitmaps
+
+        # 전체 행 비트맵: 추가한 행을 켜고 삭제한 행을 끕니다.
+        index._empty = np.zeros(num_bytes, dtype=np.uint8)
+        full = index._empty.copy()
+        full[:len(self._full)] = self._full
+        index._full = (full | index._bitmap(rows)) & ~index._bitmap(deleted)
+        return index
+
+    def save(self, directory: str) -> None:
+        """색인을 디렉터리에 저장합니다. meta.json 을 마지막에 써서, meta.json 이 있으면 완전한 색인입니다."""
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        for field in NUMERIC_FIELDS:
+            np.save(os.path.join(directory, f"{field}.values.npy"), self.sorted_values[field])
+            np.save(os.path.join(directory, f"{field}.positions.npy"), self.sorted_positions[field])
+
+        for field in CATEGORY_FIELDS:
+            values = list(self.bitmaps[field])
+            bitmaps = np.zeros((len(values), len(self._empty)), dtype=np.uint8)
+            for row, value in enumerate(values):
+                bitmaps[row] = self.bitmaps[field][value]
+            np.save(os.path.join(directory, f"{field}.bitmaps.npy"), bitmaps)
+            with open(os.path.join(directory, f"{field}.values.json"), "w", encoding="utf-8") as f:
+                json.dump(values, f, ensure_ascii=False)
+
+        meta = {"format_version": FORMAT_VERSION, "size": self.size, "fingerprint": self.fingerprint}
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> Optional["MetadataIndex"]:
+        """저장된 색인을 읽습니다. 완전한 색인이 없거나 형식이 다르면 None 을 반환합니다."""
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            logger.warning(f"메타데이터 색인 형식이 다릅니다: {meta.get('format_version')} != {FORMAT_VERSION}")
+            return None
+
+        mmap_mode = "r" if mmap else None
+        index = cls.__new__(cls)
+        index.size = int(meta["size"])
+        index.fingerprint = meta.get("fingerprint")
+        index.sorted_values = {}
+        index.sorted_positions = {}
+        for field in NUMERIC_FIELDS:
+            index.sorted_values[field] = np.load(os.path.join(directory, f"{field}.values.npy"), mmap_mode=mmap_mode)
+            index.sorted_positions[field] = np.load(os.path.join(directory, f"{field}.positions.npy"), mmap_mode=mmap_mode)
+
+        index.bitmaps = {}
+        for field in CATEGORY_FIELDS:
+            bitmaps = np.load(os.path.join(directory, f"{field}.bitmaps.npy"), mmap_mode=mmap_mode)
+            with open(os.path.join(directory, f"{field}.values.json"), encoding="utf-8") as f:
+                values = json.load(f)
+            index.bitmaps[field] = {value: bitmaps[row] for row, value in enumerate(values)}
+
+        index._init_masks()
+        return index
+
+    def _bitmap(self, positions) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask, bitorder="little")
+
+    def _range(self, field: str, low: float, high: float, include_low: bool, include_high: bool) -> np.ndarray:
+        """숫자 필드가 low ~ high 범위인 행의 비트맵"""
+        values = self.sorted_values[field]
+        start = np.searchsorted(values, low, side="left" if include_low else "right")
+        end = np.searchsorted(values, high, side="right" if include_high else "left")
+        return self._bitmap(self.sorted_positions[field][start:max(start, end)])
+
+    def _values(self, field: str, values) -> np.ndarray:
+        """범주 필드가 values 중 하나인 행의 비트맵"""
+        bitmaps = self.bitmaps[field]
+        result = self._empty.copy()
+        for value in values:
+            bitmap = bitmaps.get(value)
+            if bitmap is not None:
+                result |= bitmap
+        return result
+
+    def _condition(self, field: str, condition) -> Optional[np.ndarray]:
+        if field in self.bitmaps:
+            if isinstance(condition, list):
+                return self._values(field, condition)
+            if not isinstance(condition, dict):
+                return self._values(field, [condition])
+
+            result = self._full.copy()
+            for op, value in condition.items():
+                if op == "$in":
+                    result &= self._values(field, value)
+                elif op == "$nin":
+                    result &= ~self._values(field, value)
+                elif op == "$eq":
+                    result &= self._values(field, [value])
+                elif op == "$neq":
+                    result &= ~self._values(field, [value])
+                else:
+                    return None
+            return result
+
+        if field in self.sorted_values and isinstance(condition, dict):
+            low, high = -np.inf, np.inf
+            include_low = include_high = True
+            for op, value in condition.items():
+                value = _to_float(value)
+                if np.isnan(value):
+                    return None
+                if op in ("$gte", "$gt"):
+                    if value > low or (value == low and op == "$gt"):
+                        low, include_low = value, op == "$gte"
+                elif op in ("$lte", "$lt"):
+                    if value < high or (value == high and op == "$lt"):
+                        high, include_high = value, op == "$lte"
+                elif op == "$eq":
+                    if value > low or (value == low and not include_low):
+                        low, include_low = value, True
+                    if value < high or (value == high and not include_high):
+                        high, include_high = value, True
+                else:
+                    return None
+            return self._range(field, low, high, include_low, include_high)
+
+        return None
+
+    def to_bitmap(self, filter_dict: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        필터를 조건에 맞는 행의 비트맵으로 변환합니다. 변환할 수 없는 조건이 있으면 None 을 반환합니다.
+        비트맵의 패딩 비트(size 이후)는 사용하지 않습니다.
+        """
+        if "$and" in filter_dict:
+            result = self._full.copy()
+            for sub_filter in filter_dict["$and"]:
+                bitmap = self.to_bitmap(sub_filter)
+                if bitmap is None:
+                    return None
+                result &= bitmap
+            return result
+
+        if "$or" in filter_dict:
+            result = self._empty.copy()
+            for sub_filter in filter_dict["$or"]:
+                bitmap = self.to_bitmap(sub_filter)
+                if bitmap is None:
+                    return None
+                result |= bitmap
+            return result
+
+        if "$not" in filter_dict:
+            bitmap = self.to_bitmap(filter_dict["$not"])
+            return None if bitmap is None else ~bitmap & self._full
+
+        result = self._full.copy()
+        for field, condition in filter_dict.items():
+            bitmap = self._condition(field, condition)
+            if bitmap is None:
+                return None
+            result &= bitmap
+        return result
+
+    def count(self, bitmap: np.ndarray) -> int:
+        """비트맵에서 조건에 맞는 행 수"""
+        return int(np.count_nonzero(np.unpackbits(bitmap, count=self.size, bitorder="little")))
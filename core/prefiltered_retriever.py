@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from core.document_store import DocumentStore
+from core.metadata_index import MetadataIndex
+from core.vector_index import search_index
+from utils import metrics
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def search_faiss_ids(vectorstore: FAISS, embedding: List[float], k: int, bitmap: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    FAISS 인덱스에서 가까운 문서 번호(FAISS 문서 위치)를 거리순으로 반환합니다.
+    bitmap 이 있으면 비트맵에 포함된 문서 안에서만 검색합니다 (faiss.IDSelectorBitmap).
+    근사 인덱스(IVF, HNSW)는 인덱스에 설정된 nprobe/efSearch 범위 안에서 찾으므로, 조건이 까다로우면 k 개보다 적을 수 있습니다.
+    """
+    vector = np.array([embedding], dtype=np.float32)
+    if vectorstore._normalize_L2:
+        faiss.normalize_L2(vector)
+
+    with metrics.stage("faiss"):
+        _, indices = search_index(vectorstore.index, vector, k, bitmap)
+    ids = indices[0]
+    return ids[ids >= 0]
+
+
+class PrefilteredFaissRetriever(BaseRetriever):
+    """
+    메타데이터 필터를 먼저 적용하고 FAISS 가 조건에 맞는 문서 안에서만 검색하는 검색기.
+
+    LangChain FAISS 검색기는 fetch_k 개를 가져온 뒤 파이썬에서 필터링하므로, 조건이 까다로우면 결과가 k 개보다 적고
+    조건이 느슨하면 불필요하게 많이 가져옵니다. 이 검색기는 필터를 비트맵으로 바꿔 FAISS 에 넘기므로
+    필터 선택도와 관계없이 조건에 맞는 상위 k 개를 정확히 반환합니다.
+    search_kwargs(k, filter)는 기존 configuable_faiss 검색기와 같은 형식입니다.
+    """
+
+    vectorstore: FAISS
+    embeddings: Embeddings
+    documents: DocumentStore
+    metadata_index: MetadataIndex
+    search_kwargs: Dict[str, Any] = {}
+
+    def _search_by_vector(self, embedding: List[float]) -> List[Document]:
+        k = self.search_kwargs.get("k", 4)
+        filter_dict = self.search_kwargs.get("filter")
+
+        bitmap = None
+        if filter_dict:
+            bitmap = self.metadata_index.to_bitmap(filter_dict)
+            if bitmap is None:
+                # 색인하지 않은 필드 조건은 기존 방식(fetch_k 후 필터링)으로 검색합니다.
+                logger.warning(f"메타데이터 색인으로 변환할 수 없는 필터입니다: {filter_dict}")
+                fetch_k = self.search_kwargs.get("fetch_k", 20)
+                with metrics.stage("faiss"):
+                    docs = self.vectorstore.similarity_search_by_vector(embedding, k=k, filter=filter_dict, fetch_k=fetch_k)
+                metrics.observe_candidates("fetch_k", fetch_k, len(docs))
+                return docs
+            matched = self.metadata_index.count(bitmap)
+            metrics.observe_candidates("prefilter", self.metadata_index.size, matched)
+            if not matched:
+                return []
+
+        ids = search_faiss_ids(self.vectorstore, embedding, k, bitmap)
+        return [self.documents[i] for i in ids.tolist()]
+
+    async def asearch_ids(self, query: str, k: int) -> np.ndarray:
+        """필터 없이 검색어와 가까운 문서 번호를 거리순으로 반환합니다. 추측 검색의 후보로 사용합니다."""
+        embedding = await self.embeddings.aembed_query(query)
+        return await asyncio.to_thread(search_faiss_ids, self.vectorstore, embedding, k)
+
+    def refilter(self, candidate_ids: np.ndarray, filter_dict: Optional[Dict[str, Any]], k: int) -> Optional[List[Document]]:
+        """
+        미리 가져온 후보(거리순 문서 번호)에 필터를 적용하여 상위 k 개 문서를 반환합니다.
+        후보는 전체 문서 중 가장 가까운 문서들이므로, 후보 안에서 조건에 맞는 앞쪽 k 개가 곧 정확한 상위 k 개입니다.
+        후보 밖에도 조건에 맞는 문서가 있어 k 개를 채울 수 없거나, 필터를 색인으로 변환할 수 없으면 None 을 반환합니다.
+        """
+        size = self.metadata_index.size
+        if filter_dict:
+            bitmap = self.metadata_index.to_bitmap(filter_dict)
+            if bitmap is None:
+                return None
+            mask = np.unpackbits(bitmap, count=size, bitorder="little").astype(bool)
+            matched = candidate_ids[mask[candidate_ids]]
+            total = int(np.count_nonzero(mask))
+        else:
+            matched = candidate_ids
+            total = size
+
+        metrics.observe_candidates("speculation", len(candidate_ids), len(matched))
+        if len(matched) < k and total > len(matched):
+            return None
+        return [self.documents[i] for i in matched[:k].tolist()]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self._search_by_vector(self.embeddings.embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        embedding = await self.embeddings.aembed_query(query)
+        return await asyncio.to_thread(self._search_by_vector, embedding)
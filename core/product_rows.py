@@ -0,0 +1,50 @@
+from typing import Any, Dict
+
+from langchain.schema import Document
+
+# 상품 응답 필드 → (메타데이터 키, 변환 함수, 기본값). 변환 함수가 None 이면 값을 그대로 사용합니다.
+PRODUCT_METADATA_FIELDS = {
+    "goodsNo": ("GOODS_NO", None, "unknown"),
+    "goodsStatSctNm": ("GOODS_STAT_SCT_NM", None, "unknown"),
+    "brndNm": ("BRND_NM", None, "unknown"),
+    "goodsNm": ("GOODS_NM", None, "unknown"),
+    "artcNm": ("ARTC_NM", None, "unknown"),
+    "categoryNm": ("LGRP_NM", None, "unknown"),
+    "salePrc": ("SALE_PRC", int, 0),
+    "dscntSalePrc": ("DSCNT_SALE_PRC", int, 0),
+    "maxBenefitPrice": ("MAX_BENEFIT_PRICE", int, 0),
+    "cardDcRate": ("CARD_DC_RATE", int, 0),
+    "cardDcNameList": ("CARD_DC_NAME_LIST", None, "unknown"),
+    "features": ("FEATURES", None, "unknown"),
+    "schKwdNm": ("SCH_KWD_NM", None, "unknown"),
+    "saleQty": ("SALE_QTY", int, 0),
+    "salesUnit": ("SALES_UNIT", int, 0),
+    "gdasScrSum": ("GDAS_SCR_SUM", float, 0),
+    "gdasCnt": ("GDAS_CNT", int, 0),
+    "energeyGrade": ("ENERGEY_GRADE", None, "unknown"),
+    "mdlLnchDt": ("MDL_LNCH_DT", None, "unknown"),
+}
+
+
+def default_page_content(metadata: Dict[str, Any]) -> str:
+    """문서 내용이 없는 상품의 문서 내용을 주요 메타데이터로 만듭니다."""
+    lines = [
+        f"상품명: {metadata.get('GOODS_NM', '')}",
+        f"브랜드: {metadata.get('BRND_NM', '')}",
+        f"품목: {metadata.get('ARTC_NM', '')}",
+        f"특징: {metadata.get('FEATURES', '')}",
+    ]
+    return "\n".join(lines)
+
+
+def build_product_row(doc: Document) -> Dict[str, Any]:
+    """
+    상품 문서의 응답용 메타데이터 필드를 변환해 둔 dict 를 만듭니다. 검색 엔진 초기화와 상품 변경 시 상품마다 한 번 호출합니다.
+    content 에는 page_content 를 복사하지 않고 그대로 참조합니다.
+    """
+    row = {}
+    for field, (key, convert, default) in PRODUCT_METADATA_FIELDS.items():
+        value = doc.metadata.get(key, default)
+        row[field] = convert(value) if convert is not None else value
+    row["content"] = doc.page_content
+    return row
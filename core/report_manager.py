@@ -1,9 +1,15 @@
+import asyncio
+import hashlib
 import logging
-from langchain_openai import ChatOpenAI
+from typing import AsyncIterator, Dict, List, Optional
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
+from utils import metrics
+from utils.cache import create_cache, prompt_cache_version
+from utils.NL_processor import normalize_query
+from core.config import settings
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -26,12 +32,18 @@ class ReportManager:
 
             logger.info("리포트 LLM 초기화 시작...")
 
-            # TODO: 10개씩 조회해서 리스트로 반환하는 형태로 변경하기 - LLM 호출 횟수를 최소화 하여 성능개선
+            # langchain_openai(openai SDK)는 import 에 1초 이상 걸리므로 서버 시작 단계에서 불러옵니다.
+            from langchain_openai import ChatOpenAI
+
             # 원하는 데이터 구조를 정의합니다.
             class Report(BaseModel):
                 goodsNo: str = Field(..., description="상품번호")
                 recommendation: str = Field(..., description="상품 추천 이유")
 
+            # 여러 상품의 추천 이유를 한 번의 LLM 호출로 받기 위한 구조
+            class Reports(BaseModel):
+                reports: List[Report] = Field(..., description="Context 에 주어진 모든 상품의 상품번호별 추천 이유")
+
             # 파서를 설정하고 프롬프트 템플릿에 지시사항을 주입합니다.
             parser = JsonOutputParser(pydantic_object=Report)
             # print(parser.get_format_instructions())
@@ -46,11 +58,36 @@ class ReportManager:
 
             prompt = prompt.partial(format_instructions=parser.get_format_instructions())
 
+            # 여러 상품용 프롬프트를 생성합니다.
+            batch_parser = JsonOutputParser(pydantic_object=Reports)
+            batch_prompt = ChatPromptTemplate.from_messages(
+                [
+                    ("system", "당신은 가전전문 e커머스 상품 추천 AI 어시스턴트 입니다. 사용자 검색어(Question)를 참고하여 Context 에 주어진 각 상품의 추천 이유를 상품마다 간단하고. 친절하게 설명해주세요. Context 의 모든 상품번호에 대해 빠짐없이 하나씩 응답해야 합니다. 주어진 Context 외 확인되지 않은 사실을 이야기 해서는 안됩니다."),
+                    ("user", "#Format: {format_instructions}\n\n#Context: {context}\n\n#Question: {query}"),
+                ]
+            )
+
+            batch_prompt = batch_prompt.partial(format_instructions=batch_parser.get_format_instructions())
+
             # OpenAI 객체를 생성합니다.
-            model = ChatOpenAI(temperature=0, model_name="gpt-4.1-nano")
+            model_name = "gpt-4.1-nano"
+            # 스트리밍 응답에도 토큰 사용량이 포함되도록 stream_usage 를 켭니다.
+            model = ChatOpenAI(temperature=0, model_name=model_name, stream_usage=True)
+            model = model.with_config(callbacks=[metrics.LLMUsageCallback("report")])
 
-            # 체인을 구성합니다.
+            # 체인을 구성합니다. 토큰 사용량은 메트릭으로 집계합니다.
             self.report_chain = prompt | model | parser
+            self.batch_report_chain = batch_prompt | model | batch_parser
+
+            # 추천 이유 캐시 (검색어, 상품번호) → 추천 이유
+            self.report_cache = create_cache(
+                maxsize=settings.report_cache_size,
+                ttl=settings.report_cache_ttl,
+                path=settings.report_cache_path,
+                table="report_cache",
+            )
+            # 단건/묶음 프롬프트가 같은 캐시를 쓰므로 두 프롬프트를 모두 버전에 포함합니다.
+            self._report_cache_version = prompt_cache_version(model_name, prompt, batch_prompt)
 
             self._initialized = True
             logger.info(f"리포트 LLM 체인구성 완료!")
@@ -70,6 +107,133 @@ class ReportManager:
             raise Exception("리포트 LLM 이 아직 초기화되지 않았습니다.")
         return self.report_chain
 
+    async def aget_report(self, query: str, goods_no: str, context: str, index_version: Optional[str] = None) -> str:
+        """
+        상품 하나의 추천 이유를 반환합니다. (검색어, 상품번호) 기준으로 캐시합니다.
+        index_version(검색 색인 스냅샷 버전)을 캐시 키에 넣어, 스냅샷을 교체하면 추천 이유를 새로 만듭니다.
+        """
+        key = self._report_cache_key(query, goods_no, context, index_version)
+        recommendation = await self.report_cache.aget(key)
+        if recommendation is None:
+            with metrics.stage("report_llm"):
+                report = await self.get_report_chain().ainvoke({"query": query, "context": context})
+            recommendation = report['recommendation']
+            await self.report_cache.aset(key, recommendation)
+        return recommendation
+
+    async def astream_report(
+        self, query: str, goods_no: str, context: str, index_version: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        상품 하나의 추천 이유를 생성되는 대로 조금씩(추가된 텍스트만) 반환합니다.
+        JsonOutputParser 의 스트리밍 파싱으로 부분 JSON 에서 recommendation 을 읽으며,
+        완성된 추천 이유는 aget_report 와 같은 캐시에 저장합니다. 캐시에 있으면 한 번에 반환합니다.
+        """
+        key = self._report_cache_key(query, goods_no, context, index_version)
+        recommendation = await self.report_cache.aget(key)
+        if recommendation is not None:
+            yield recommendation
+            return
+
+        recommendation = ""
+        with metrics.stage("report_llm"):
+            async for partial in self.get_report_chain().astream({"query": query, "context": context}):
+                text = partial.get('recommendation') if isinstance(partial, dict) else None
+                if isinstance(text, str) and len(text) > len(recommendation):
+                    yield text[len(recommendation):]
+                    recommendation = text
+
+        if recommendation:
+            await self.report_cache.aset(key, recommendation)
+
+    async def aget_reports(self, query: str, contexts: Dict[str, str], index_version: Optional[str] = None) -> Dict[str, str]:
+        """
+        여러 상품의 추천 이유를 한 번에 반환합니다.
+
+        캐시에 없는 상품만 report_batch_size 개씩 묶어 LLM 을 호출하고, 묶음이 여러 개면 동시에 호출합니다.
+        LLM 응답에서 누락되었거나 호출이 실패한 묶음의 상품은 단건 호출로 보완하며, 그 묶음의 상품에 없는 상품번호 응답은 버립니다.
+        단건 호출도 실패한 상품은 결과에서 빠지고, 모든 상품이 실패한 경우에만 예외를 전달합니다.
+
+        Args:
+            query: 사용자 검색어
+            contexts: {상품번호: 상품정보}
+            index_version: 검색 색인 스냅샷 버전 (캐시 키에 포함)
+        Returns:
+            {상품번호: 추천 이유}
+        """
+        if not self._initialized:
+            raise Exception("리포트 LLM 이 아직 초기화되지 않았습니다.")
+
+        recommendations: Dict[str, str] = {}
+        pending: List[str] = []
+        for goods_no in contexts:
+            recommendation = await self.report_cache.aget(
+                self._report_cache_key(query, goods_no, contexts[goods_no], index_version)
+            )
+            if recommendation is None:
+                pending.append(goods_no)
+            else:
+                recommendations[goods_no] = recommendation
+
+        batch_size = settings.report_batch_size
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        results = []
+        if batches:
+            with metrics.stage("report_llm"):
+                # 한 묶음이 실패해도 다른 묶음의 응답은 사용합니다.
+                results = await asyncio.gather(*(
+                    self.batch_report_chain.ainvoke({
+                        "query": query,
+                        "context": "\n\n".join(f"[상품번호: {goods_no}]\n{contexts[goods_no]}" for goods_no in batch)
+                    })
+                    for batch in batches
+                ), return_exceptions=True)
+
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.warning(f"묶음 추천 이유 생성 실패 ({len(batch)}개 상품): {result}")
+                continue
+            requested = set(batch)
+            reports = result.get('reports', []) if isinstance(result, dict) else []
+            for report in reports:
+                goods_no = report.get('goodsNo') if isinstance(report, dict) else None
+                if goods_no not in requested:
+                    logger.warning(f"묶음 추천 이유에 요청하지 않은 상품번호가 있어 버립니다: {goods_no}")
+                    continue
+                if goods_no not in recommendations and report.get('recommendation'):
+                    recommendations[goods_no] = report['recommendation']
+                    await self.report_cache.aset(
+                        self._report_cache_key(query, goods_no, contexts[goods_no], index_version), report['recommendation']
+                    )
+
+        # 묶음 응답에서 빠진 상품은 단건으로 다시 요청
+        missing = [goods_no for goods_no in pending if goods_no not in recommendations]
+        if missing:
+            logger.warning(f"묶음 추천 이유 누락, 단건 재요청: {missing}")
+            retried = await asyncio.gather(*(
+                self.aget_report(query, goods_no, contexts[goods_no], index_version) for goods_no in missing
+            ), return_exceptions=True)
+            for goods_no, recommendation in zip(missing, retried):
+                if isinstance(recommendation, Exception):
+                    logger.warning(f"추천 이유 생성 실패: {goods_no} ({recommendation})")
+                else:
+                    recommendations[goods_no] = recommendation
+            if not recommendations:
+                raise retried[0]
+
+        return {goods_no: recommendations[goods_no] for goods_no in contexts if goods_no in recommendations}
+
+    def get_cache_stats(self) -> dict:
+        """추천 이유 캐시 적중 통계를 반환합니다."""
+        if not self._initialized:
+            return {}
+        return self.report_cache.stats()
+
+    def _report_cache_key(self, query: str, goods_no: str, context: str, index_version: Optional[str] = None) -> str:
+        # 상품정보 해시를 키에 넣어, 증분 업데이트로 상품정보가 바뀐 상품은 추천 이유를 새로 만듭니다.
+        context_hash = hashlib.md5(context.encode("utf-8")).hexdigest()[:8]
+        return f"{self._report_cache_version}:{index_version or ''}:{normalize_query(query)}:{goods_no}:{context_hash}"
+
     # LLM 을 통한 검색 백업 코드(미사용)
     @staticmethod
     def search_proudct(query, retriever):
@@ -98,6 +262,7 @@ class ReportManager:
         prompt = prompt.partial(format_instructions=parser.get_format_instructions())
 
         # # OpenAI 객체를 생성합니다.
+        from langchain_openai import ChatOpenAI
         model = ChatOpenAI(temperature=0, model_name="gpt-4.1-mini")
 
         # 체인을 구성합니다.
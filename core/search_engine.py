@@ -1,160 +1,831 @@
 import os
+import copy
+import time
+import asyncio
 import logging
-from typing import List
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import faiss
+import numpy as np
 from dotenv import load_dotenv
 from core.config import settings
 from langchain_community.vectorstores import FAISS
-from langchain_openai.embeddings import OpenAIEmbeddings
-from langchain_community.retrievers import BM25Retriever
-from langchain.retrievers import EnsembleRetriever
 from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.runnables import ConfigurableField
+from core.document_store import DocumentStore, DocumentStoreDocstore
+from core.feature_table import ProductFeatureTable
+from core.bm25_index import BM25Index, BM25IndexRetriever, build_bm25_index, goods_fingerprint
+from core.hybrid_retriever import HybridRetriever
+from core.metadata_index import MetadataIndex
+from core.keyword_intent import KeywordIntentExtractor
+from core.prefiltered_retriever import PrefilteredFaissRetriever
+from core.product_rows import build_product_row, default_page_content
+from core.vector_index import DeltaIndex, configure_search, read_vector_index
+from core.snapshot import (
+    BM25_DIRECTORY, DOCUMENTS_DIRECTORY, FAISS_DIRECTORY, FEATURES_DIRECTORY, KEYWORD_INTENT_FILE, METADATA_DIRECTORY,
+    latest_snapshot, mark_in_use, read_manifest,
+)
+from utils.cache import LRUCache
+from utils.embedding_cache import CachedQueryEmbeddings
+from utils.NL_processor import normalize_query
+from utils.tokenizer import kiwi_tokenize, kiwi_tokenize_batch
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 상품 추가/변경 행의 문서 내용 열 이름 (스냅샷 빌드의 기본 --content-column 과 같습니다)
+CONTENT_COLUMN = "page_content"
+
+
+def locate_indexes() -> Dict[str, Any]:
+    """
+    읽을 검색 색인 경로와 버전을 찾습니다.
+    완전한 스냅샷(python -m scripts.build_snapshot) 중 가장 최근 버전을 사용하고,
+    스냅샷이 없으면 기존 FAISS/BM25 경로를 사용하며 버전은 FAISS 인덱스 파일 수정 시각입니다.
+    """
+    snapshot = latest_snapshot(settings.snapshot_directory)
+    if snapshot:
+        manifest = read_manifest(snapshot)
+        return {
+            'version': manifest['version'],
+            'snapshot': snapshot,
+            'manifest': manifest,
+            'faiss': os.path.join(snapshot, FAISS_DIRECTORY),
+            'bm25': os.path.join(snapshot, BM25_DIRECTORY),
+            'metadata': os.path.join(snapshot, METADATA_DIRECTORY),
+            'documents': os.path.join(snapshot, DOCUMENTS_DIRECTORY),
+            'features': os.path.join(snapshot, FEATURES_DIRECTORY),
+            'keyword_intent': os.path.join(snapshot, KEYWORD_INTENT_FILE),
+        }
+
+    index_file = os.path.join(settings.faiss_persist_directory, "index.faiss")
+    return {
+        'version': str(int(os.path.getmtime(index_file))) if os.path.exists(index_file) else None,
+        'snapshot': None,
+        'manifest': None,
+        'faiss': settings.faiss_persist_directory,
+        'bm25': settings.bm25_persist_directory,
+        'metadata': None,
+        'documents': None,
+        'features': None,
+        'keyword_intent': None,
+    }
+
+
+class SearchIndexes:
+    """
+    한 버전의 검색 색인 묶음 (FAISS, 상품 조회 인덱스, 피처 테이블, 메타데이터 색인, BM25, 검색기).
+
+    load() 로 만든 뒤에는 바꾸지 않으며, 카탈로그가 바뀌면 새 SearchIndexes 를 만들어 통째로 교체합니다.
+    상품 단위 변경은 updated() 가 바뀐 부분만 고친 새 SearchIndexes 를 만듭니다.
+    요청은 시작할 때 SearchEngineManager().indexes 를 한 번 읽어 끝날 때까지 같은 버전을 사용하므로,
+    교체 중에도 진행 중인 요청은 이전 버전으로 끝납니다.
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self.version: Optional[str] = None
+        self.snapshot: Optional[str] = None
+        # 읽은 색인 경로(locate_indexes 결과)와 FAISS 문서 지문. BM25 를 나중에 불러올 때 씁니다.
+        self.location: Optional[Dict[str, Any]] = None
+        self.fingerprint: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        # 스냅샷을 읽은 뒤 반영한 증분 업데이트 횟수와 마지막 반영 시각
+        self.revision = 0
+        self.updated_at: Optional[float] = None
+        # FAISS 문서 위치 순서의 상품 문서. 삭제한 상품의 위치에는 이전 문서가 남아 있습니다.
+        self.documents: Optional[DocumentStore] = None
+        self.bm25_index: Optional[BM25Index] = None
+        # BM25 역색인을 불러왔는지 여부 (실패하거나 문서가 없어 BM25 없이 검색하는 경우도 True)
+        self.bm25_loaded = False
+
+    @property
+    def generation(self) -> str:
+        """
+        검색 결과 캐시 키에 쓰는 버전. 스냅샷 버전과 증분 업데이트 횟수입니다.
+        BM25 를 불러오기 전에는 BM25/하이브리드 검색 결과가 FAISS 검색 결과이므로 버전을 구분합니다.
+        """
+        generation = f"{self.version}+{self.revision}" if self.revision else str(self.version)
+        return generation if self.bm25_loaded else f"{generation}:faiss"
+
+    def load(self, location: Optional[Dict[str, Any]] = None, bm25: bool = True) -> "SearchIndexes":
+        """
+        location(locate_indexes 결과)의 색인을 읽어 검색기를 구성합니다.
+        bm25 가 아니면 BM25 역색인은 with_bm25 로 나중에 불러오며,
+        그때까지 BM25/하이브리드 검색은 FAISS 검색기로 대신합니다. (서버 시작 시 FAISS 검색을 먼저 시작)
+        """
+        location = location or locate_indexes()
+        persist_directory = location['faiss']
+        manifest = location['manifest']
+        self.version = location['version']
+        self.snapshot = location['snapshot']
+        self.location = location
+
+        if manifest:
+            logger.info(f"검색 색인 스냅샷 사용: {self.snapshot} ({manifest['num_docs']}개 상품)")
+            try:
+                mark_in_use(self.snapshot)
+            except OSError as e:
+                logger.warning(f"스냅샷 사용 기록 실패: {e}")
+            if manifest.get('embedding_model') != settings.embedding_model:
+                logger.warning(f"스냅샷 임베딩 모델({manifest.get('embedding_model')})이 설정({settings.embedding_model})과 다릅니다.")
+
+        # FAISS 벡터 스토어 로드
+        if not os.path.exists(persist_directory):
+            logger.error(f"FAISS 데이터베이스를 찾을 수 없습니다: {persist_directory}")
+            raise FileNotFoundError(f"FAISS 데이터베이스를 찾을 수 없습니다: {persist_directory}")
+        documents = DocumentStore.load(location['documents'], settings.snapshot_mmap) if location['documents'] else None
+        if documents is not None:
+            # 스냅샷의 인덱스와 문서 저장소는 메모리 매핑으로 읽어 워커 프로세스끼리 공유합니다.
+            index = read_vector_index(os.path.join(persist_directory, "index.faiss"), settings.snapshot_mmap)
+        else:
+            # 문서 저장소가 없는 기존 FAISS 데이터베이스(FAISS.save_local)는 pickle 문서를 읽어 문서 저장소로 바꿉니다.
+            faiss_db = FAISS.load_local(
+                persist_directory,
+                self.embeddings,
+                allow_dangerous_deserialization=True
+            )
+            docs = self._get_all_documents_from_faiss(faiss_db)
+            documents = DocumentStore.build(docs, goods_fingerprint(doc.metadata.get('GOODS_NO', '') for doc in docs))
+            index = faiss_db.index
+        if index.ntotal > len(documents):
+            raise ValueError(f"FAISS 인덱스 벡터 수({index.ntotal})가 문서 수({len(documents)})보다 많습니다: {persist_directory}")
+        self.documents = documents
+
+        # 문서 저장소 ID 는 FAISS 문서 위치입니다.
+        self.faiss_db = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=DocumentStoreDocstore(documents),
+            index_to_docstore_id=range(len(documents)),
+        )
+        configure_search(self.faiss_db.index, settings.faiss_nprobe, settings.faiss_ef_search)
+        index_type = manifest.get('index_type', 'flat') if manifest else type(self.faiss_db.index).__name__
+        logger.info(f"FAISS 데이터베이스 로드 완료: {persist_directory} ({index_type}, {len(documents)}개 문서)")
+
+        # 스냅샷의 색인들이 현재 FAISS 문서와 같은 순서인지 확인하기 위한 지문
+        fingerprint = documents.fingerprint or goods_fingerprint(doc.metadata.get('GOODS_NO', '') for doc in documents)
+        self.fingerprint = fingerprint
+
+        # 정렬/가중치 계산용 상품 피처 테이블 (FAISS 문서 위치 순서). 상품번호 → 행 번호 조회도 이 테이블을 씁니다.
+        self.feature_table = self._load_feature_table(location['features'], fingerprint)
+
+        # 상품번호 → 응답용 상품 필드. 요청한 상품만 변환하여 워커별로 settings.product_row_cache_size 개까지 둡니다.
+        self.product_rows = LRUCache(maxsize=settings.product_row_cache_size)
+
+        # 키워드 검색어의 규칙 기반 의도분석 사전 (브랜드, 품목, 할인카드)
+        self.keyword_intent_extractor = self._load_keyword_intent_extractor(location['keyword_intent'])
+
+        # 필터 조건을 FAISS 검색 전에 적용하기 위한 메타데이터 색인 (가격/평점 정렬 컬럼, 카테고리 비트맵)
+        self.metadata_index = self._load_metadata_index(documents, location['metadata'], fingerprint)
+
+        # BM25 역색인 로드
+        if bm25:
+            self._load_bm25()
+        self._build_retrievers()
+        if bm25:
+            self._log_retrievers()
+        else:
+            logger.info("BM25 역색인은 나중에 불러옵니다. 그때까지 FAISS 검색기만 사용")
+
+        self.loaded_at = time.time()
+        return self
+
+    def with_bm25(self) -> "SearchIndexes":
+        """
+        load(bm25=False) 로 미룬 BM25 역색인을 불러와 하이브리드 검색기를 구성한 새 버전을 반환합니다.
+        이 버전은 바꾸지 않으며, 이미 불러왔으면 이 버전을 그대로 반환합니다.
+        """
+        if self.bm25_loaded:
+            return self
+        indexes = copy.copy(self)
+        indexes._load_bm25()
+        indexes._build_retrievers()
+        indexes._log_retrievers()
+        return indexes
+
+    def _load_bm25(self) -> None:
+        """
+        BM25 역색인을 읽습니다. 실패하면 BM25 없이 검색합니다.
+        형태소 분석기는 처음 사용할 때 불러오며, 서버 시작 단계(core.startup)에서 미리 불러올 수 있습니다.
+        """
+        try:
+            if len(self.documents):
+                self.bm25_index = self._load_bm25_index(self.documents, self.location['bm25'], self.fingerprint)
+            else:
+                logger.warning("BM25 검색기 초기화 실패: 문서가 없습니다")
+        except Exception as e:
+            logger.error(f"BM25 검색기 초기화 실패: {e}")
+        self.bm25_loaded = True
+
+    def _log_retrievers(self) -> None:
+        if self.bm25_retriever:
+            logger.info(f"BM25 검색기 초기화 완료: {len(self.documents)}개 문서")
+            logger.info("하이브리드 검색기 초기화 완료")
+        else:
+            logger.info("하이브리드 검색기 대신 FAISS 검색기만 사용")
+
+    def _build_retrievers(self) -> None:
+        """현재 색인(FAISS, 메타데이터 색인, BM25 역색인)과 문서 목록으로 검색기를 구성합니다."""
+        # 검색기 초기화
+        # self.faiss_retriever = self.faiss_db.as_retriever(
+        #     search_type="similarity", # similarity, similarity_score_threshold, mmr
+        #     search_kwargs={
+        #         "k": 30, # 상위 30개 결과 반환
+        #         # "score_threshold": 0.7, #similarity_score_threshold 일 경우 사용 가능
+        #         # "filter": filter_dict
+        #     } ,
+        # )
+        self.faiss_retriever = self.faiss_db.as_retriever(search_kwargs={"k": 100})
+
+        self.prefiltered_faiss_retriever = PrefilteredFaissRetriever(
+            vectorstore=self.faiss_db,
+            embeddings=self.embeddings,
+            documents=self.documents,
+            metadata_index=self.metadata_index,
+        )
+        self.configuable_faiss_retriever = self.prefiltered_faiss_retriever.configurable_fields(
+            search_kwargs=ConfigurableField(
+                # 검색 매개변수의 고유 식별자를 설정
+                id="search_kwargs",
+                # 검색 매개변수의 이름을 설정
+                name="Search Kwargs",
+                # 검색 매개변수에 대한 설명을 작성
+                description="The search kwargs to use",
+            )
+        )
+
+        # BM25 검색기 초기화
+        self.bm25_retriever = None
+        if self.bm25_index is not None:
+            self.bm25_retriever = BM25IndexRetriever(
+                index=self.bm25_index,
+                documents=self.documents,
+                tokenize=kiwi_tokenize,
+                k=settings.bm25_k,
+                k1=settings.bm25_k1,
+                b=settings.bm25_b,
+            )
+
+        # 하이브리드 검색기 초기화
+        # BM25 와 FAISS 를 동시에 검색하고 문서 번호로 RRF 를 계산합니다. 가중치와 검색기별 후보 수는 요청마다 바꿀 수 있습니다.
+        if self.bm25_retriever:
+            self.hybrid_retriever = HybridRetriever(
+                bm25=self.bm25_retriever,
+                vectorstore=self.faiss_db,
+                embeddings=self.embeddings,
+                documents=self.documents,
+                bm25_k=settings.hybrid_bm25_k,
+                faiss_k=settings.hybrid_faiss_k,
+            ).configurable_fields(
+                weights=ConfigurableField(id="hybrid_weights", name="Hybrid Weights", description="[BM25, FAISS] RRF 가중치"),
+                bm25_k=ConfigurableField(id="hybrid_bm25_k", name="BM25 k", description="BM25 후보 문서 수"),
+                faiss_k=ConfigurableField(id="hybrid_faiss_k", name="FAISS k", description="FAISS 후보 문서 수"),
+            )
+            self.bm25_faiss_73_retriever = self.hybrid_retriever.with_config(
+                configurable={"hybrid_weights": [7, 3]}  # BM25: 70%, FAISS: 30%
+            )
+            self.bm25_faiss_37_retriever = self.hybrid_retriever.with_config(
+                configurable={"hybrid_weights": [3, 7]}  # BM25: 30%, FAISS: 70%
+            )
+        else:
+            self.bm25_faiss_73_retriever = self.faiss_retriever
+            self.bm25_faiss_37_retriever = self.faiss_retriever
+
+    def updated(self, upserts: List[Dict[str, Any]], deletes: List[str]) -> Tuple["SearchIndexes", Dict[str, Any]]:
+        """
+        상품을 추가/변경/삭제한 새 버전과 처리 결과를 반환합니다 (증분 업데이트). 이 버전은 바꾸지 않습니다.
+
+        upserts 는 카탈로그 행(dict)이며 문서 내용은 page_content 열입니다. 이미 있는 상품은 넘긴 열만 바꾸고
+        (값이 None 이면 열을 지움), 없는 상품은 끝에 추가합니다. 새 상품에 문서 내용이 없으면 주요 메타데이터로 만듭니다.
+            - 메타데이터만 바뀐 상품: 피처 테이블, 메타데이터 색인, 응답 필드, 문서 저장소의 해당 행만 고칩니다.
+            - 문서 내용이 바뀌거나 추가된 상품: 그 상품만 토큰화/임베딩하여 BM25 포스팅과 FAISS 벡터를 바꿉니다.
+            - 삭제한 상품: 모든 색인에서 빼고 행 번호는 비워 둡니다.
+        다른 상품의 행 번호(FAISS 문서 위치)는 바뀌지 않으므로 바뀌지 않은 상품은 다시 계산하지 않습니다.
+        바뀐 상품이 없으면 이 버전을 그대로 반환합니다.
+
+        Raises:
+            ValueError: GOODS_NO 가 없거나, 같은 상품이 두 번 있거나, 추가/변경과 삭제에 모두 있는 경우
+        """
+        if not self.bm25_loaded:
+            # 스냅샷의 BM25 역색인을 먼저 불러와야 바뀐 상품의 포스팅을 고칠 수 있습니다.
+            return self.with_bm25().updated(upserts, deletes)
+
+        deletes = list(dict.fromkeys(str(goods_no).strip() for goods_no in deletes))
+        delete_set = set(deletes)
+        result = {"inserted": 0, "updated": 0, "reindexed": 0, "deleted": 0, "unchanged": 0, "not_found": []}
+
+        # 바뀐 상품의 새 문서
+        changed: Dict[str, Document] = {}
+        seen = set()
+        for row in upserts:
+            row = dict(row)
+            content = row.pop(CONTENT_COLUMN, None)
+            goods_no = str(row.get('GOODS_NO') or '').strip()
+            if not goods_no:
+                raise ValueError("GOODS_NO 가 없는 상품이 있습니다.")
+            if goods_no in seen:
+                raise ValueError(f"같은 상품이 두 번 있습니다: {goods_no}")
+            seen.add(goods_no)
+            if goods_no in delete_set:
+                raise ValueError(f"추가/변경과 삭제에 모두 있는 상품입니다: {goods_no}")
+            row['GOODS_NO'] = goods_no
+
+            previous = self.get_product(goods_no)
+            metadata = {**previous.metadata, **row} if previous else row
+            metadata = {key: value for key, value in metadata.items() if value is not None}
+            if content is not None:
+                page_content = str(content)
+            elif previous:
+                page_content = previous.page_content
+            else:
+                page_content = default_page_content(metadata)
+
+            if previous and previous.metadata == metadata and previous.page_content == page_content:
+                result["unchanged"] += 1
+                continue
+            changed[goods_no] = Document(page_content=page_content, metadata=metadata)
+
+        # 행 번호. 새 상품은 끝에 추가합니다.
+        rows: List[int] = []
+        docs: List[Document] = []
+        previous_docs: Dict[int, Document] = {}
+        text_rows: List[int] = []
+        for goods_no, doc in changed.items():
+            previous = self.get_product(goods_no)
+            if previous is None:
+                row = len(self.documents) + result["inserted"]
+                result["inserted"] += 1
+                text_rows.append(row)
+            else:
+                row = self.feature_table.positions[goods_no]
+                previous_docs[row] = previous
+                if previous.page_content != doc.page_content:
+                    result["reindexed"] += 1
+                    text_rows.append(row)
+                else:
+                    result["updated"] += 1
+            rows.append(row)
+            docs.append(doc)
+
+        deleted_rows: List[int] = []
+        for goods_no in deletes:
+            previous = self.get_product(goods_no)
+            if previous is None:
+                result["not_found"].append(goods_no)
+                continue
+            row = self.feature_table.positions[goods_no]
+            previous_docs[row] = previous
+            deleted_rows.append(row)
+        result["deleted"] = len(deleted_rows)
+
+        if not rows and not deleted_rows:
+            return self, result
+
+        documents = self.documents.updated(dict(zip(rows, docs)))
+        text_docs = [documents[row] for row in text_rows]
+
+        # 문서 내용이 바뀐 상품만 임베딩합니다. 가장 오래 걸리고 실패할 수 있으므로 먼저 합니다.
+        vectors = self._embed_documents([doc.page_content for doc in text_docs]) if text_docs else None
+
+        indexes = copy.copy(self)
+        indexes.revision = self.revision + 1
+        indexes.updated_at = time.time()
+        indexes.documents = documents
+
+        indexes.product_rows = LRUCache(maxsize=settings.product_row_cache_size)
+        indexes.feature_table = self.feature_table.updated(rows, docs, previous_docs, deleted_rows)
+        indexes.metadata_index = self.metadata_index.updated(rows, docs, deleted_rows)
+        indexes.keyword_intent_extractor = self.keyword_intent_extractor.extended(docs, previous_docs.values())
+
+        if self.bm25_index is not None and (text_rows or deleted_rows):
+            tokens = kiwi_tokenize_batch(doc.page_content for doc in text_docs)
+            indexes.bm25_index = self.bm25_index.updated(dict(zip(text_rows, tokens)), deleted_rows)
+            indexes.bm25_index.weights(settings.bm25_k1, settings.bm25_b)
+
+        indexes.faiss_db = self._updated_vectorstore(documents, text_rows, vectors, deleted_rows)
+        indexes._build_retrievers()
+        return indexes, result
+
+    def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        """문서 내용을 settings.embedding_batch_size 개씩 임베딩합니다."""
+        batch_size = settings.embedding_batch_size
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            vectors.extend(self.embeddings.embed_documents(texts[start:start + batch_size]))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _updated_vectorstore(
+        self,
+        documents: DocumentStore,
+        text_rows: List[int],
+        vectors: Optional[np.ndarray],
+        deleted_rows: List[int],
+    ) -> FAISS:
+        """
+        문서 저장소를 바꾼 FAISS 벡터 스토어를 만듭니다. 이 버전의 벡터 스토어는 바꾸지 않습니다.
+        문서 내용이 바뀌었거나 삭제한 상품이 있으면 스냅샷 인덱스는 그대로 두고 그 상품의 벡터만 DeltaIndex 에서 바꿉니다.
+        삭제한 상품은 벡터를 지우므로 문서 저장소에 이전 문서가 남아 있어도 검색되지 않습니다.
+        """
+        faiss_db = copy.copy(self.faiss_db)
+        faiss_db.docstore = DocumentStoreDocstore(documents)
+        faiss_db.index_to_docstore_id = range(len(documents))
+
+        if text_rows or deleted_rows:
+            index = DeltaIndex.wrap(self.faiss_db.index)
+            if text_rows:
+                if vectors.shape[1] != index.d:
+                    raise ValueError(f"임베딩 차원({vectors.shape[1]})이 FAISS 인덱스 차원({index.d})과 다릅니다.")
+                if faiss_db._normalize_L2:
+                    faiss.normalize_L2(vectors)
+            faiss_db.index = index.updated(
+                np.array(text_rows, dtype=np.int64), vectors, np.array(deleted_rows, dtype=np.int64)
+            )
+        return faiss_db
+
+    def _load_feature_table(self, directory: Optional[str], fingerprint: str) -> ProductFeatureTable:
+        """
+        스냅샷의 피처 테이블을 불러옵니다.
+        스냅샷이 없거나 테이블이 현재 FAISS 문서와 맞지 않으면 문서 저장소에서 새로 만듭니다.
+        """
+        table = ProductFeatureTable.load(directory, settings.snapshot_mmap) if directory else None
+        if table is not None and table.fingerprint == fingerprint:
+            logger.info(f"상품 피처 테이블 로드 완료: {directory} ({len(table)}개 상품)")
+            return table
+
+        if table is not None:
+            logger.warning(f"상품 피처 테이블이 현재 FAISS 문서와 다릅니다: {directory}")
+        table = ProductFeatureTable(self.documents, fingerprint)
+        logger.info(f"상품 피처 테이블 구성 완료: {len(table)}개 상품")
+        return table
+
+    def _load_keyword_intent_extractor(self, path: Optional[str]) -> KeywordIntentExtractor:
+        """스냅샷의 키워드 의도분석 사전을 불러옵니다. 없으면 문서 저장소에서 새로 만듭니다."""
+        extractor = KeywordIntentExtractor.load(path) if path else None
+        if extractor is not None:
+            logger.info(f"키워드 의도 사전 로드 완료: {path}")
+            return extractor
+        return KeywordIntentExtractor(self.documents)
+
+    def _load_metadata_index(self, all_docs: Iterable[Document], directory: Optional[str], fingerprint: str) -> MetadataIndex:
+        """
+        스냅샷의 메타데이터 색인을 불러옵니다.
+        스냅샷이 없거나 색인이 현재 FAISS 문서와 맞지 않으면 메모리에서 새로 만듭니다.
+        """
+        index = MetadataIndex.load(directory) if directory else None
+        if index is not None and index.fingerprint == fingerprint:
+            logger.info(f"메타데이터 색인 로드 완료: {directory}")
+            return index
+
+        if index is not None:
+            logger.warning(f"메타데이터 색인이 현재 FAISS 문서와 다릅니다: {directory}")
+        index = MetadataIndex(all_docs, fingerprint)
+        logger.info("메타데이터 색인 구성 완료")
+        return index
+
+    def _load_bm25_index(self, all_docs: DocumentStore, directory: str, fingerprint: str) -> BM25Index:
+        """
+        오프라인에서 만든 BM25 역색인을 불러옵니다.
+        색인이 없거나 현재 FAISS 문서와 맞지 않으면 경고 후 메모리에서 새로 만듭니다.
+        설정된 k1, b 로 포스팅별 BM25 가중치를 미리 계산해 둡니다.
+        """
+        index = BM25Index.load(directory)
+        if index is not None and index.meta.get('fingerprint') == fingerprint:
+            logger.info(f"BM25 역색인 로드 완료: {directory} ({index.meta['num_terms']}개 용어)")
+        else:
+            if index is None:
+                logger.warning(f"BM25 역색인을 찾을 수 없습니다: {directory}")
+            else:
+                logger.warning(f"BM25 역색인이 현재 FAISS 문서와 다릅니다: {directory}")
+            logger.warning("BM25 역색인을 메모리에서 새로 만듭니다. python -m scripts.build_snapshot 또는 python -m scripts.build_bm25_index 로 미리 만들어 두세요.")
+            index = build_bm25_index(all_docs)
+
+        index.weights(settings.bm25_k1, settings.bm25_b)
+        return index
+
+    @staticmethod
+    def _get_all_documents_from_faiss(faiss_db: FAISS) -> List[Document]:
+        """FAISS에서 모든 문서를 FAISS 인덱스 위치 순서대로 가져오는 헬퍼 메서드"""
+        try:
+            # FAISS 인덱스에서 문서 정보 추출
+            index_to_docstore_id = faiss_db.index_to_docstore_id
+            docs = [
+                faiss_db.docstore.search(index_to_docstore_id[i])
+                for i in range(len(index_to_docstore_id))
+            ]
+
+            return docs
+        except Exception as e:
+            logger.error(f"FAISS에서 문서 추출 실패: {e}")
+            return []
+
+    def get_product(self, goods_no: str) -> Optional[Document]:
+        """상품번호로 상품 문서를 조회합니다. 없으면 None 을 반환합니다."""
+        row = self.feature_table.positions.get(goods_no)
+        return None if row is None else self.documents[row]
+
+    def get_products(self, goods_nos: Iterable[str]) -> Dict[str, Document]:
+        """여러 상품번호를 한 번에 조회합니다. 찾은 상품만 {상품번호: 문서} 형태로 반환합니다."""
+        products = {}
+        for goods_no in goods_nos:
+            doc = self.get_product(goods_no)
+            if doc is not None:
+                products[goods_no] = doc
+        return products
+
+    def get_product_rows(self, goods_nos: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 상품번호의 응답용 상품 필드를 한 번에 조회합니다. 찾은 상품만 {상품번호: 필드 dict} 형태로 반환합니다.
+        처음 조회한 상품은 문서 저장소에서 읽어 변환하고 캐시합니다.
+        """
+        rows = {}
+        for goods_no in goods_nos:
+            row = self.product_rows.get(goods_no)
+            if row is None:
+                doc = self.get_product(goods_no)
+                if doc is None:
+                    continue
+                row = build_product_row(doc)
+                self.product_rows.set(goods_no, row)
+            rows[goods_no] = row
+        return rows
+
+    def get_vectorestore(self, retriever_type: str):
+        if retriever_type == "faiss":
+            return self.faiss_db
+        else:
+            raise ValueError(f"지원하지 않는 검색기 타입: {retriever_type}")
+
+    def get_retriever(self, retriever_type: str):
+        if retriever_type == "bm25":
+            if self.bm25_retriever is None:
+                logger.warning("BM25 검색기가 없습니다. FAISS 검색기를 대신 사용합니다.")
+                return self.faiss_retriever
+            return self.bm25_retriever
+        elif retriever_type == "faiss":
+            return self.faiss_retriever
+        elif retriever_type == "bm25_faiss_73":
+            return self.bm25_faiss_73_retriever
+        elif retriever_type == "bm25_faiss_37":
+            return self.bm25_faiss_37_retriever
+        elif retriever_type == "configuable_faiss":
+            return self.configuable_faiss_retriever
+        else:
+            raise ValueError(f"지원하지 않는 검색기 타입: {retriever_type}")
+
+
 class SearchEngineManager:
     _instance = None
     _initialized = False
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
-    def initialize(self):
+
+    def initialize(self, bm25: bool = True):
+        """
+        임베딩 모델과 검색 색인을 불러옵니다.
+        bm25 가 아니면 BM25 역색인은 load_bm25 로 나중에 불러옵니다. (SearchIndexes.load 참고)
+        """
         if self._initialized:
             return
-        
+
         try:
             # 상수
-            persist_directory = settings.faiss_persist_directory
             model = settings.embedding_model
-            
+
             logger.info("검색 엔진 초기화 시작...")
-            
+
             # 환경 변수 로드
             load_dotenv(settings.Config.env_file)
-            
+
             # OpenAI API 키 확인
             if not os.getenv("OPENAI_API_KEY"):
                 raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
-            
+
             # 임베딩 모델 초기화
-            self.embeddings = OpenAIEmbeddings(model=model)
-
-            # FAISS 벡터 스토어 로드
-            if os.path.exists(persist_directory):
-                self.faiss_db = FAISS.load_local(
-                    persist_directory, 
-                    self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
-                logger.info(f"FAISS 데이터베이스 로드 완료: {persist_directory}")
-            else:
-                logger.error(f"FAISS 데이터베이스를 찾을 수 없습니다: {persist_directory}")
-            
-            # 검색기 초기화
-            # self.faiss_retriever = self.faiss_db.as_retriever(
-            #     search_type="similarity", # similarity, similarity_score_threshold, mmr
-            #     search_kwargs={
-            #         "k": 30, # 상위 30개 결과 반환
-            #         # "score_threshold": 0.7, #similarity_score_threshold 일 경우 사용 가능
-            #         # "filter": filter_dict
-            #     } ,  
-            # )
-            self.faiss_retriever = self.faiss_db.as_retriever(search_kwargs={"k": 100})
-
-            self.configuable_faiss_retriever = self.faiss_db.as_retriever().configurable_fields(
-                search_kwargs=ConfigurableField(
-                    # 검색 매개변수의 고유 식별자를 설정
-                    id="search_kwargs",
-                    # 검색 매개변수의 이름을 설정
-                    name="Search Kwargs",
-                    # 검색 매개변수에 대한 설명을 작성
-                    description="The search kwargs to use",
-                )
+            # langchain_openai(openai SDK)는 import 에 1초 이상 걸리므로 서버 시작 단계에서 불러옵니다.
+            from langchain_openai import OpenAIEmbeddings
+            # 검색어 임베딩은 캐시를 거쳐 같은(정규화 기준) 검색어의 임베딩 API 재호출을 피합니다.
+            # 검색어 임베딩은 카탈로그와 무관하므로 색인을 교체해도 유지합니다.
+            self.embeddings = CachedQueryEmbeddings(
+                OpenAIEmbeddings(model=model),
+                namespace=model,
+                maxsize=settings.embedding_cache_size,
+                disk_path=settings.embedding_cache_path,
+                disk_capacity=settings.embedding_cache_disk_size,
             )
-            
-            # BM25 검색기를 위한 문서 준비
-            try:
-                # FAISS에서 모든 문서 가져오기
-                all_docs = self._get_all_documents_from_faiss()
-                if all_docs:
-                    self.bm25_retriever = BM25Retriever.from_documents(
-                        all_docs,
-                        # k1=1.2,
-                        # b=0.75
-                        )
-                    self.bm25_retriever.k = 500
-                    logger.info(f"BM25 검색기 초기화 완료: {len(all_docs)}개 문서")
-                else:
-                    logger.warning("BM25 검색기 초기화 실패: 문서가 없습니다")
-                    self.bm25_retriever = None
-            except Exception as e:
-                logger.error(f"BM25 검색기 초기화 실패: {e}")
-                self.bm25_retriever = None
-            
-            # 앙상블 검색기 초기화
-            if self.bm25_retriever:
-                self.bm25_faiss_73_retriever = EnsembleRetriever(
-                    retrievers=[self.bm25_retriever, self.faiss_retriever],
-                    weights=[7, 3]  # BM25: 70%, FAISS: 30%
-                )
-                self.bm25_faiss_37_retriever = EnsembleRetriever(
-                    retrievers=[self.bm25_retriever, self.faiss_retriever],
-                    weights=[3, 7]  # BM25: 30%, FAISS: 70%
-                )
-                logger.info("앙상블 검색기 초기화 완료")
-            else:
-                self.bm25_faiss_73_retriever = self.faiss_retriever
-                self.bm25_faiss_37_retriever = self.faiss_retriever
-                logger.info("앙상블 검색기 대신 FAISS 검색기만 사용")
-            
+
+            # 검색 색인. 핫 리로드 시 새 버전을 만들어 이 속성 하나만 교체합니다.
+            self.indexes = SearchIndexes(self.embeddings).load(bm25=bm25)
+
+            # 검색 결과 캐시. 같은 검색어의 다음 페이지는 정렬된 결과를 잘라서 반환합니다.
+            self.result_cache = LRUCache(maxsize=settings.result_cache_size, ttl=settings.result_cache_ttl)
+
+            # 핫 리로드 상태. 리로드와 증분 업데이트는 _swap_lock 으로 한 번에 하나씩 indexes 를 교체합니다.
+            self._reload_lock = threading.Lock()
+            self._swap_lock = threading.Lock()
+            self.last_reload_error: Optional[str] = None
+            self.failed_version: Optional[str] = None
+
             self._initialized = True
             logger.info("검색 엔진 초기화 완료!")
-            
+
         except Exception as e:
             logger.error(f"검색 엔진 초기화 실패: {e}")
             raise e
-    
-    def _get_all_documents_from_faiss(self) -> List[Document]:
-        """FAISS에서 모든 문서를 가져오는 헬퍼 메서드"""
+
+    def load_bm25(self) -> None:
+        """
+        initialize(bm25=False) 로 미룬 BM25 역색인을 불러와 현재 색인 버전에 반영합니다.
+        오래 걸리므로 스레드에서 호출하며, 이미 불러왔으면 아무것도 하지 않습니다.
+        """
+        if not self._initialized:
+            raise Exception("검색 엔진이 초기화되지 않았습니다.")
+
+        timestamp = time.time()
+        with self._swap_lock:
+            indexes = self.indexes.with_bm25()
+            if indexes is self.indexes:
+                return
+            self.indexes = indexes
+            self.invalidate_caches()
+        logger.info(f"BM25 역색인 반영 완료 ({time.time() - timestamp:.1f}초)")
+
+    @property
+    def index_version(self) -> Optional[str]:
+        return self.indexes.generation
+
+    @property
+    def reloading(self) -> bool:
+        return self._initialized and self._reload_lock.locked()
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        최신 색인으로 새 버전을 만들어 교체합니다 (핫 리로드). 오래 걸리므로 스레드에서 호출합니다.
+
+        새 버전을 모두 만든 뒤 indexes 속성 하나만 바꾸므로, 그동안 검색은 이전 버전으로 계속되고
+        교체 전에 시작한 요청은 이전 버전으로 끝납니다. 새 버전을 만들다 실패하면 이전 버전을 그대로 사용합니다.
+        색인 버전이 그대로이면 force 가 아닌 한 다시 만들지 않습니다.
+        새 스냅샷으로 교체하면 이전 버전에 반영한 증분 업데이트는 사라집니다 (스냅샷에 포함되어 있어야 합니다).
+
+        Returns:
+            색인을 교체했으면 True. 이미 리로드 중이거나 바뀐 색인이 없거나 실패하면 False
+        """
+        if not self._initialized:
+            raise Exception("검색 엔진이 초기화되지 않았습니다.")
+        if not self._reload_lock.acquire(blocking=False):
+            logger.info("이미 검색 색인을 리로드하고 있습니다.")
+            return False
+
+        location = None
         try:
-            # FAISS 인덱스에서 문서 정보 추출
-            docs = list(self.faiss_db.docstore._dict.values())
-            
-            return docs
+            location = locate_indexes()
+            if not force and location['version'] == self.indexes.version:
+                return False
+
+            timestamp = time.time()
+            logger.info(f"검색 색인 리로드 시작: {self.indexes.version} → {location['version']}")
+            with self._swap_lock:
+                indexes = SearchIndexes(self.embeddings).load(location)
+                previous = self.indexes
+                self.indexes = indexes
+            self.invalidate_caches()
+            self.last_reload_error = None
+            self.failed_version = None
+            logger.info(f"검색 색인 리로드 완료: {previous.version} → {indexes.version} ({time.time() - timestamp:.1f}초)")
+            return True
         except Exception as e:
-            logger.error(f"FAISS에서 문서 추출 실패: {e}")
-            return []
-        
+            self.last_reload_error = str(e)
+            self.failed_version = location['version'] if location else None
+            logger.error(f"검색 색인 리로드 실패, 이전 버전을 계속 사용합니다: {e}")
+            return False
+        finally:
+            self._reload_lock.release()
+
+    def update_products(self, upserts: List[Dict[str, Any]], deletes: List[str]) -> dict:
+        """
+        상품 추가/변경/삭제를 반영한 새 버전을 만들어 교체합니다 (증분 업데이트).
+        문서 내용이 바뀐 상품은 임베딩 API 를 호출하므로 스레드에서 호출합니다.
+
+        리로드와 동시에 교체하지 않으며, 리로드 중이면 끝날 때까지 기다렸다가 새 버전에 반영합니다.
+        증분 업데이트는 메모리에만 반영되므로 카탈로그 원본에도 반영해야 다음 스냅샷에 포함됩니다.
+
+        Raises:
+            ValueError: 요청한 상품 목록이 올바르지 않은 경우 (SearchIndexes.updated 참고)
+        """
+        if not self._initialized:
+            raise Exception("검색 엔진이 초기화되지 않았습니다.")
+
+        timestamp = time.time()
+        with self._swap_lock:
+            indexes, result = self.indexes.updated(upserts, deletes)
+            if indexes is not self.indexes:
+                self.indexes = indexes
+                self.invalidate_caches()
+        elapsed = time.time() - timestamp
+        logger.info(
+            f"상품 증분 업데이트 완료: 추가 {result['inserted']}, 변경 {result['updated']}, 재색인 {result['reindexed']}, "
+            f"삭제 {result['deleted']} ({elapsed:.2f}초)"
+        )
+        return {**result, "version": indexes.version, "revision": indexes.revision, "elapsed": round(elapsed, 3)}
+
+    async def watch_snapshots(self, interval: float) -> None:
+        """
+        interval 초마다 새 스냅샷이 있는지 확인하고, 있으면 백그라운드 스레드에서 리로드합니다.
+        리로드에 실패한 버전은 다시 시도하지 않습니다. (POST /admin/reload?force=true 로 다시 시도)
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if not self._initialized or self.reloading:
+                continue
+            try:
+                version = locate_indexes()['version']
+                if version != self.indexes.version and version != self.failed_version:
+                    await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"스냅샷 확인 실패: {e}")
+
+    def get_index_status(self) -> dict:
+        """현재 검색 색인 버전과 리로드 상태를 반환합니다."""
+        if not self._initialized:
+            return {}
+        indexes = self.indexes
+        return {
+            "version": indexes.version,
+            "revision": indexes.revision,
+            "snapshot": indexes.snapshot,
+            "num_docs": len(indexes.feature_table.positions),
+            "bm25_loaded": indexes.bm25_loaded,
+            "loaded_at": indexes.loaded_at,
+            "updated_at": indexes.updated_at,
+            "reloading": self.reloading,
+            "last_reload_error": self.last_reload_error,
+            "failed_version": self.failed_version,
+        }
+
+    def get_product(self, goods_no: str) -> Optional[Document]:
+        """상품번호로 상품 문서를 조회합니다. 없으면 None 을 반환합니다."""
+        if not self._initialized:
+            raise Exception("검색 엔진이 초기화되지 않았습니다.")
+        return self.indexes.get_product(goods_no)
+
+    def get_products(self, goods_nos: Iterable[str]) -> Dict[str, Document]:
+        """여러 상품번호를 한 번에 조회합니다. 찾은 상품만 {상품번호: 문서} 형태로 반환합니다."""
+        if not self._initialized:
+            raise Exception("검색 엔진이 초기화되지 않았습니다.")
+        return self.indexes.get_products(goods_nos)
+
+    def get_product_rows(self, goods_nos: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 상품번호의 응답용 상품 필드를 한 번에 조회합니다. 찾은 상품만 {상품번호: 필드 dict} 형태로 반환합니다."""
+        if not self._initialized:
+            raise Exception("검색 엔진이 초기화되지 않았습니다.")
+        return self.indexes.get_product_rows(goods_nos)
+
+    def get_cached_results(self, query: str, retriever_type: str, top_k: int, index_version: Optional[str] = None) -> Optional[dict]:
+        """캐시된 검색 결과를 반환합니다. 없으면 None 을 반환합니다. index_version 을 생략하면 현재 색인 버전입니다."""
+        return self.result_cache.get(self._result_cache_key(query, retriever_type, top_k, index_version))
+
+    def set_cached_results(self, query: str, retriever_type: str, top_k: int, results: dict, index_version: Optional[str] = None) -> None:
+        """검색 결과를 캐시합니다. 결과를 만든 색인 버전을 index_version 으로 넘깁니다."""
+        self.result_cache.set(self._result_cache_key(query, retriever_type, top_k, index_version), results)
+
+    def invalidate_caches(self) -> None:
+        """
+        인덱스가 바뀌었을 때 인덱스에 의존하는 캐시를 비웁니다.
+        의도분석/추천이유 캐시는 키에 스냅샷 버전이 있어 새 스냅샷에서는 이전 결과를 쓰지 않고,
+        여러 워커가 함께 쓰는 SQLite 캐시일 수 있으므로 비우지 않습니다.
+        검색어 임베딩 캐시는 카탈로그와 무관하므로 유지합니다.
+        """
+        self.result_cache.clear()
+
+    def _result_cache_key(self, query: str, retriever_type: str, top_k: int, index_version: Optional[str] = None) -> str:
+        # 필터는 검색어의 의도에서 결정되므로 검색어와 검색 방식으로 결과가 정해집니다.
+        # 색인 버전을 키에 넣어, 리로드 직전에 시작한 요청의 결과가 새 버전의 캐시로 쓰이지 않도록 합니다.
+        version = index_version if index_version is not None else self.index_version
+        return f"{version}:{retriever_type}:{top_k}:{normalize_query(query)}"
+
+    def get_cache_stats(self) -> dict:
+        """검색어 임베딩 캐시 적중 통계를 반환합니다."""
+        if not self._initialized:
+            return {}
+        return self.embeddings.stats()
+
+    def get_result_cache_stats(self) -> dict:
+        """검색 결과 캐시 적중 통계를 반환합니다."""
+        if not self._initialized:
+            return {}
+        return self.result_cache.stats()
+
     def get_vectorestore(self, retriever_type: str):
         if not self._initialized:
             raise Exception("검색 엔진이 초기화되지 않았습니다.")
-        
-        if retriever_type == "faiss":
-            return self.faiss_db
-        else:
-            raise ValueError(f"지원하지 않는 검색기 타입: {retriever_type}")
-    
+        return self.indexes.get_vectorestore(retriever_type)
+
     def get_retriever(self, retriever_type: str):
         if not self._initialized:
             raise Exception("검색 엔진이 초기화되지 않았습니다.")
-        
-        if retriever_type == "bm25":
-            if self.bm25_retriever is None:
-                logger.warning("BM25 검색기가 없습니다. FAISS 검색기를 대신 사용합니다.")
-                return self.faiss_retriever
-            return self.bm25_retriever
-        elif retriever_type == "faiss":
-            return self.faiss_retriever
-        elif retriever_type == "bm25_faiss_73":
-            return self.bm25_faiss_73_retriever
-        elif retriever_type == "bm25_faiss_37":
-            return self.bm25_faiss_37_retriever
-        elif retriever_type == "configuable_faiss":
-            return self.configuable_faiss_retriever
-        else:
-            raise ValueError(f"지원하지 않는 검색기 타입: {retriever_type}")
\ No newline at end of file
+        return self.indexes.get_retriever(retriever_type)
@@ -0,0 +1,174 @@
+"""
+버전별 검색 색인 스냅샷.
+
+    {스냅샷 경로}/
+        20250101T120000.000000/ ← 버전 (만든 시각, 마이크로초까지). 버전 순서가 곧 시간 순서입니다.
+            faiss/              ← FAISS 인덱스 (index.faiss)
+            documents/          ← 상품 문서 저장소 (DocumentStore.save)
+            features/           ← 정렬용 상품 피처 테이블 (ProductFeatureTable.save)
+            bm25/               ← BM25 역색인 (BM25Index.save)
+            metadata/           ← 필터용 메타데이터 색인 (MetadataIndex.save)
+            keyword_intent.json ← 키워드 의도분석 사전 (KeywordIntentExtractor.save)
+            manifest.json       ← 버전, 문서 수, 임베딩 모델, 상품번호 지문 등
+        20250102T120000.000000.tmp/ ← 만들고 있는 스냅샷
+        .in_use/{호스트}-{pid}   ← 서버 프로세스가 읽은 버전. 정리할 때 삭제하지 않습니다.
+
+스냅샷은 {버전}.tmp 에 모두 쓴 뒤 manifest.json 을 쓰고 이름을 바꾸므로,
+서버는 빌드 중에도 manifest.json 이 있는 가장 최근 버전만 읽습니다.
+구성요소는 메모리 매핑으로 읽으므로 스냅샷 파일은 서버가 사용하는 동안 바꾸지 않습니다 (새 버전으로 만듭니다).
+"""
+
+import os
+import json
+import shutil
+import socket
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 스냅샷이 완전히 만들어졌음을 나타내는 파일. 모든 구성요소를 쓴 뒤 마지막에 씁니다.
+MANIFEST_FILE = "manifest.json"
+
+# 스냅샷 구성요소 디렉터리 이름
+FAISS_DIRECTORY = "faiss"
+BM25_DIRECTORY = "bm25"
+METADATA_DIRECTORY = "metadata"
+DOCUMENTS_DIRECTORY = "documents"
+FEATURES_DIRECTORY = "features"
+KEYWORD_INTENT_FILE = "keyword_intent.json"
+
+# 만들고 있는 스냅샷 디렉터리 접미사. 서버는 이 디렉터리를 읽지 않습니다.
+BUILDING_SUFFIX = ".tmp"
+
+# 서버 프로세스별로 읽은 버전을 기록하는 디렉터리
+IN_USE_DIRECTORY = ".in_use"
+
+
+def new_snapshot_version() -> str:
+    """
+    현재 시각으로 스냅샷 버전을 만듭니다. 문자열 순서가 시간 순서와 같습니다.
+    같은 초에 여러 번 빌드해도 겹치지 않도록 마이크로초까지 씁니다. (이전 초 단위 버전과도 순서가 맞습니다)
+    """
+    return datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+
+
+def list_snapshots(root: str) -> List[str]:
+    """완전한 스냅샷(manifest.json 이 있는) 버전 목록을 오래된 순서로 반환합니다."""
+    if not root or not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if not name.startswith(".")
+        and not name.endswith(BUILDING_SUFFIX)
+        and os.path.isfile(os.path.join(root, name, MANIFEST_FILE))
+    )
+
+
+def latest_snapshot(root: str) -> Optional[str]:
+    """가장 최근의 완전한 스냅샷 경로를 반환합니다. 없으면 None 을 반환합니다."""
+    versions = list_snapshots(root)
+    return os.path.join(root, versions[-1]) if versions else None
+
+
+def read_manifest(snapshot: str) -> Dict:
+    """스냅샷의 manifest.json 을 읽습니다."""
+    with open(os.path.join(snapshot, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def publish_snapshot(building: str, manifest: Dict) -> str:
+    """
+    만들고 있던 스냅샷 디렉터리에 manifest.json 을 쓰고 버전 이름으로 바꿉니다.
+    같은 파일시스템 안의 이름 변경이므로 서버는 완성된 스냅샷만 보게 됩니다.
+    """
+    with open(os.path.join(building, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    snapshot = building[:-len(BUILDING_SUFFIX)] if building.endswith(BUILDING_SUFFIX) else building
+    os.rename(building, snapshot)
+    return snapshot
+
+
+def _in_use_marker(root: str) -> str:
+    return os.path.join(root, IN_USE_DIRECTORY, f"{socket.gethostname()}-{os.getpid()}")
+
+
+def mark_in_use(snapshot: str) -> None:
+    """
+    이 프로세스가 스냅샷을 읽었음을 기록합니다. 프로세스마다 마지막으로 읽은 버전 하나만 남습니다.
+    구성요소는 메모리 매핑으로 읽고 BM25 처럼 나중에 읽는 구성요소도 있으므로, 사용 중인 버전은 정리할 때 삭제하지 않습니다.
+    """
+    root, version = os.path.split(os.path.normpath(snapshot))
+    marker = _in_use_marker(root)
+    os.makedirs(os.path.dirname(marker), exist_ok=True)
+    with open(f"{marker}{BUILDING_SUFFIX}", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(f"{marker}{BUILDING_SUFFIX}", marker)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def in_use_versions(root: str) -> Set[str]:
+    """
+    서버 프로세스가 읽은 스냅샷 버전을 반환합니다.
+    같은 호스트에서 이미 종료한 프로세스의 기록은 지우고, 다른 호스트의 기록은 확인할 수 없으므로 그대로 사용합니다.
+    """
+    directory = os.path.join(root, IN_USE_DIRECTORY)
+    if not os.path.isdir(directory):
+        return set()
+
+    hostname = socket.gethostname()
+    versions = set()
+    for name in os.listdir(directory):
+        if name.endswith(BUILDING_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        host, _, pid = name.rpartition("-")
+        if host == hostname and pid.isdigit() and not _process_alive(int(pid)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                versions.add(f.read().strip())
+        except FileNotFoundError:
+            continue
+    return versions
+
+
+def prune_snapshots(root: str, keep: int) -> List[str]:
+    """
+    가장 최근 keep 개를 제외한 오래된 스냅샷을 삭제하고, 삭제한 버전 목록을 반환합니다.
+    서버가 사용 중인 버전(in_use_versions)은 오래되었어도 삭제하지 않습니다.
+    """
+    versions = list_snapshots(root)
+    candidates = versions[:-keep] if keep > 0 else []
+    in_use = in_use_versions(root) if candidates else set()
+
+    removed = []
+    for version in candidates:
+        if version in in_use:
+            logger.info(f"사용 중인 스냅샷은 삭제하지 않습니다: {version}")
+            continue
+        try:
+            shutil.rmtree(os.path.join(root, version))
+        except OSError as e:
+            logger.warning(f"오래된 스냅샷 삭제 실패: {version} ({e})")
+            continue
+        logger.info(f"오래된 스냅샷 삭제: {version}")
+        removed.append(version)
+    return removed
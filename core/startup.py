@@ -0,0 +1,117 @@
+"""
+서버 시작 단계.
+
+    단계        내용                                                        필수
+    search      임베딩 모델, 검색 색인(FAISS, 문서, 피처 테이블, 메타데이터 색인)    O
+    intent      의도분석 LLM 체인                                            O
+    report      리포트 LLM 체인
+    bm25        BM25 역색인과 하이브리드 검색기 (search 이후)
+    tokenizer   형태소 분석기 모델 (BM25 검색, 추측 검색 재사용 판단에 사용)
+
+매니저 초기화는 스레드에서 동시에 실행합니다. 개발 서버는 필수 단계가 끝나면 요청을 받기 시작하므로
+나머지 단계가 끝나기 전에도 faiss/intent_with_llm 검색은 응답하고, 그동안 BM25/하이브리드 검색은 FAISS 검색기로 대신하며
+리포트 요청은 503 으로 응답합니다.
+
+형태소 분석기(Kiwi)는 모델을 읽는 몇 초 동안 GIL 을 놓지 않아 그동안 요청 처리도 멈추므로,
+개발 서버는 settings.tokenizer_warmup 이 아니면 처음 사용할 때 불러옵니다.
+프로덕션 서버(python -m server)는 fork 한 워커에 초기화 스레드가 없으므로 워커를 fork 하기 전에 모든 단계를 기다립니다.
+"""
+
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List
+
+from core.search_engine import SearchEngineManager
+from core.intent_manager import IntentManager
+from core.report_manager import ReportManager
+from utils.tokenizer import warm_up_kiwi
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 요청을 받기 전에 끝나야 하는 단계
+REQUIRED_STAGES = ("search", "intent")
+STAGES = ("search", "intent", "report", "bm25", "tokenizer")
+
+
+class StartupManager:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            # 단계 → 실행 결과(성공 여부), 소요 시간(초), 오류
+            cls._instance.futures = {}
+            cls._instance.elapsed = {}
+            cls._instance.errors = {}
+            cls._instance._executor = None
+        return cls._instance
+
+    def start(self, tokenizer: bool = True) -> None:
+        """
+        단계를 스레드에서 시작합니다. tokenizer 가 아니면 형태소 분석기는 처음 사용할 때 불러옵니다.
+        이미 시작했으면 아무것도 하지 않습니다.
+        """
+        if self.futures:
+            return
+
+        search_manager = SearchEngineManager()
+        self.started_at = time.time()
+        self._executor = ThreadPoolExecutor(max_workers=len(STAGES), thread_name_prefix="startup")
+        self.futures["search"] = self._submit("search", lambda: search_manager.initialize(bm25=False))
+        self.futures["intent"] = self._submit("intent", IntentManager().initialize)
+        self.futures["report"] = self._submit("report", ReportManager().initialize)
+        # BM25 역색인은 검색 색인의 문서 지문을 확인하여 불러옵니다.
+        self.futures["bm25"] = self._submit("bm25", search_manager.load_bm25, after=["search"])
+        if tokenizer:
+            # 형태소 분석기는 불러오는 동안 다른 스레드를 멈추므로 필수 단계가 끝난 뒤 불러옵니다.
+            self.futures["tokenizer"] = self._submit("tokenizer", warm_up_kiwi, after=REQUIRED_STAGES)
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, stage: str, initialize: Callable[[], None], after: Iterable[str] = ()) -> Future:
+        return self._executor.submit(self._run, stage, initialize, [self.futures[name] for name in after])
+
+    def _run(self, stage: str, initialize: Callable[[], None], after: List[Future]) -> bool:
+        """단계를 실행합니다. 실패해도 서버는 계속 시작하며, 실패한 단계를 쓰는 요청만 503 으로 응답합니다."""
+        wait(after)
+        timestamp = time.time()
+        try:
+            initialize()
+        except Exception as e:
+            self.elapsed[stage] = time.time() - timestamp
+            self.errors[stage] = str(e)
+            logger.error(f"시작 단계 실패: {stage}: {e}")
+            logger.warning("오류가 있지만 서버를 계속 시작합니다.")
+            return False
+        self.elapsed[stage] = time.time() - timestamp
+        logger.info(f"시작 단계 완료: {stage} ({self.elapsed[stage]:.2f}초, 시작 후 {time.time() - self.started_at:.2f}초)")
+        return True
+
+    def wait(self, stages: Iterable[str] = STAGES, tokenizer: bool = True) -> None:
+        """
+        단계가 끝날 때까지 기다립니다. 시작하지 않았으면 tokenizer 로 시작하며(start 참고), 시작하지 않은 단계는 기다리지 않습니다.
+        모든 단계를 기다리면 초기화 스레드가 끝날 때까지 기다립니다.
+        """
+        self.start(tokenizer)
+        stages = list(stages)
+        wait([self.futures[stage] for stage in stages if stage in self.futures])
+        if set(stages) == set(STAGES):
+            self._executor.shutdown(wait=True)
+
+    def status(self) -> dict:
+        """단계별 상태(pending, running, done, failed, deferred)와 소요 시간(초)"""
+        status = {}
+        for stage in STAGES:
+            future = self.futures.get(stage)
+            if future is None:
+                state = "deferred" if self.futures else "pending"
+            elif not future.done():
+                state = "running" if future.running() else "pending"
+            else:
+                state = "done" if future.result() else "failed"
+            status[stage] = {"state": state, "elapsed": round(self.elapsed[stage], 3) if stage in self.elapsed else None}
+            if stage in self.errors:
+                status[stage]["error"] = self.errors[stage]
+        return status
@@ -0,0 +1,229 @@
+"""
+FAISS 벡터 인덱스 종류.
+
+스냅샷 빌드(python -m scripts.build_snapshot)가 settings.faiss_index_type 의 인덱스를 만들고,
+서버는 스냅샷의 인덱스를 그대로 읽어 settings.faiss_nprobe, settings.faiss_ef_search 로 검색 범위를 정합니다.
+
+    종류        index_factory       1536차원 상품당 메모리      검색
+    flat        Flat                6KB                        전체 비교 (정확)
+    sq8         SQ8                 1.5KB                      전체 비교, 8비트 스칼라 양자화
+    ivf_flat    IVF{nlist},Flat     6KB + ID 8B                가까운 nprobe 개 클러스터만 비교
+    ivf_sq8     IVF{nlist},SQ8      1.5KB + ID 8B
+    ivf_pq      IVF{nlist},PQ{m}    m B + ID 8B (기본 96B)
+    hnsw        HNSW{M}             6KB + 그래프 (약 M x 8B)   그래프 탐색 (efSearch)
+    hnsw_sq8    HNSW{M}_SQ8         1.5KB + 그래프
+
+flat 외의 종류는 근사 검색이므로 재현율(recall)과 지연시간을 python -m benchmarks.vector_index_benchmark 로 확인합니다.
+스냅샷의 인덱스 파일은 메모리 매핑으로 읽어(read_vector_index) 같은 서버의 워커 프로세스가 페이지 캐시를 공유합니다.
+상품 문서 내용 변경/추가/삭제(증분 업데이트)는 스냅샷 인덱스를 바꾸지 않고 바뀐 벡터만 DeltaIndex 에 둡니다.
+"""
+
+import math
+import logging
+from typing import Optional, Tuple, Union
+
+import faiss
+import numpy as np
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "sq8", "ivf_flat", "ivf_sq8", "ivf_pq", "hnsw", "hnsw_sq8")
+
+
+def default_nlist(num_vectors: int) -> int:
+    """IVF 클러스터 수 기본값. 4 x sqrt(벡터 수)이며, 클러스터당 학습 벡터가 39개 이상이 되도록 줄입니다."""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+
+def index_factory_string(
+    index_type: str,
+    dimension: int,
+    num_vectors: int,
+    nlist: int = 0,
+    pq_m: int = 96,
+    hnsw_m: int = 32,
+) -> str:
+    """인덱스 종류를 faiss.index_factory 문자열로 변환합니다. nlist 가 0 이면 벡터 수로 정합니다."""
+    nlist = nlist or default_nlist(num_vectors)
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "sq8":
+        return "SQ8"
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if index_type == "ivf_sq8":
+        return f"IVF{nlist},SQ8"
+    if index_type == "ivf_pq":
+        if dimension % pq_m:
+            raise ValueError(f"PQ 부분 벡터 수({pq_m})가 임베딩 차원({dimension})의 약수가 아닙니다.")
+        return f"IVF{nlist},PQ{pq_m}"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m}"
+    if index_type == "hnsw_sq8":
+        return f"HNSW{hnsw_m}_SQ8"
+    raise ValueError(f"지원하지 않는 FAISS 인덱스 종류입니다: {index_type} ({', '.join(INDEX_TYPES)})")
+
+
+def build_vector_index(
+    vectors: np.ndarray,
+    index_type: str = "flat",
+    nlist: int = 0,
+    pq_m: int = 96,
+    hnsw_m: int = 32,
+) -> faiss.Index:
+    """
+    벡터로 인덱스를 만듭니다. 학습이 필요한 종류(IVF, SQ, PQ)는 같은 벡터로 학습합니다.
+    벡터 ID 는 추가한 순서(FAISS 문서 위치)입니다.
+    """
+    num_vectors, dimension = vectors.shape
+    factory = index_factory_string(index_type, dimension, num_vectors, nlist, pq_m, hnsw_m)
+    index = faiss.index_factory(dimension, factory, faiss.METRIC_L2)
+    if isinstance(index, faiss.IndexIVFPQ):
+        # 폴리세머스(해밍 거리) 검색은 쓰지 않으므로 오래 걸리는 코드 재배치 학습을 건너뜁니다.
+        index.do_polysemous_training = False
+    if not index.is_trained:
+        # k-means 는 클러스터당 최대 256개로 표본을 줄여 학습합니다.
+        index.train(vectors)
+    index.add(vectors)
+    logger.info(f"FAISS 인덱스 생성 완료: {factory} ({num_vectors}개)")
+    return index
+
+
+def read_vector_index(path: str, mmap: bool = True) -> faiss.Index:
+    """
+    인덱스 파일을 읽습니다. mmap 이면 벡터 코드와 IVF 역리스트를 복사하지 않고 메모리 매핑합니다(faiss.IO_FLAG_MMAP_IFC).
+    메모리 매핑한 인덱스는 읽기 전용이므로 벡터를 바꾸려면 DeltaIndex 로 감쌉니다.
+    """
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", 0) if mmap else 0
+    if mmap and not flags:
+        logger.warning("이 faiss 버전은 인덱스 메모리 매핑(IO_FLAG_MMAP_IFC)을 지원하지 않아 인덱스를 메모리로 읽습니다.")
+    return faiss.read_index(path, flags)
+
+
+def configure_search(index: faiss.Index, nprobe: int, ef_search: int) -> None:
+    """IVF 검색 클러스터 수(nprobe)와 HNSW 탐색 후보 수(efSearch)를 설정합니다. 다른 종류는 바꾸지 않습니다."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    hnsw = _base_index(index)
+    if isinstance(hnsw, faiss.IndexHNSW):
+        hnsw.hnsw.efSearch = ef_search
+
+
+def search_parameters(index: faiss.Index, selector: Optional[faiss.IDSelector] = None) -> faiss.SearchParameters:
+    """
+    인덱스 종류에 맞는 검색 매개변수를 만듭니다. IVF 는 전용 매개변수가 필요하며 인덱스의 nprobe 를 그대로 씁니다.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+
+def search_index(
+    index: Union[faiss.Index, "DeltaIndex"],
+    vectors: np.ndarray,
+    k: int,
+    bitmap: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    가까운 벡터의 거리와 ID 를 거리순으로 반환합니다 (faiss.Index.search 와 같은 형식).
+    bitmap 이 있으면 비트맵(bitorder="little")에 포함된 ID 안에서만 검색합니다 (faiss.IDSelectorBitmap).
+    """
+    if isinstance(index, DeltaIndex):
+        return index.search(vectors, k, bitmap)
+    if bitmap is None:
+        return index.search(vectors, k)
+    selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+    return index.search(vectors, k, params=search_parameters(index, selector))
+
+
+class DeltaIndex:
+    """
+    스냅샷 인덱스(base)는 그대로 두고 바뀐 벡터만 작은 인덱스(delta)에 두는 벡터 인덱스 (증분 업데이트).
+
+    문서 내용이 바뀌거나 삭제한 상품은 base 에서 제외하고(live 비트맵), 새 벡터는 delta(IndexIDMap2, 전체 비교)에
+    FAISS 문서 위치를 ID 로 넣습니다. 검색은 두 인덱스의 결과를 거리순으로 합칩니다.
+    base 는 복사하지 않으므로 메모리 매핑한 스냅샷 인덱스를 워커 프로세스끼리 계속 공유하고, HNSW 도 업데이트할 수 있습니다.
+    업데이트마다 delta 와 live 비트맵(상품당 1비트)만 복사하므로 바뀐 상품 수에 비례합니다. delta 는 스냅샷을 다시 만들면 비워집니다.
+    LangChain FAISS 벡터 스토어가 쓰는 search(x, k), d, ntotal, metric_type 을 faiss.Index 와 같은 형식으로 제공합니다.
+    """
+
+    def __init__(self, base: faiss.Index, delta: faiss.IndexIDMap2, live: np.ndarray):
+        self.base = base
+        self.delta = delta
+        self.live = live
+
+    @classmethod
+    def wrap(cls, index: Union[faiss.Index, "DeltaIndex"]) -> "DeltaIndex":
+        """인덱스를 바뀐 벡터가 없는 DeltaIndex 로 감쌉니다. 이미 DeltaIndex 이면 그대로 반환합니다."""
+        if isinstance(index, DeltaIndex):
+            return index
+        delta = faiss.IndexIDMap2(faiss.IndexFlat(index.d, index.metric_type))
+        live = np.packbits(np.ones(index.ntotal, dtype=bool), bitorder="little")
+        return cls(index, delta, live)
+
+    @property
+    def d(self) -> int:
+        return self.base.d
+
+    @property
+    def metric_type(self) -> int:
+        return self.base.metric_type
+
+    @property
+    def ntotal(self) -> int:
+        """검색 대상 벡터 수"""
+        live = np.unpackbits(self.live, count=self.base.ntotal, bitorder="little")
+        return int(np.count_nonzero(live)) + self.delta.ntotal
+
+    def updated(self, ids: np.ndarray, vectors: Optional[np.ndarray], removed: np.ndarray) -> "DeltaIndex":
+        """
+        removed ID 의 벡터를 지우고 ids 에 vectors 를 넣은 새 인덱스를 반환합니다. 이 인덱스는 바꾸지 않습니다.
+        ids 도 먼저 지우므로 이미 있는 ID 는 벡터를 바꿉니다.
+        """
+        removed = np.union1d(removed, ids).astype(np.int64)
+        live = self.live.copy()
+        stale = removed[removed < self.base.ntotal]
+        # 같은 바이트의 비트를 여러 개 지울 수 있으므로 ufunc.at 으로 누적합니다.
+        np.bitwise_and.at(live, stale >> 3, ~np.left_shift(1, stale & 7).astype(np.uint8))
+
+        delta = faiss.clone_index(self.delta)
+        delta.remove_ids(removed)
+        if len(ids):
+            delta.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+        return DeltaIndex(self.base, delta, live)
+
+    def search(self, x: np.ndarray, k: int, bitmap: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """base 와 delta 에서 각각 k 개를 찾아 거리순으로 합칩니다. bitmap 은 search_index 와 같습니다."""
+        if bitmap is None:
+            base_bitmap = self.live
+        else:
+            size = min(len(bitmap), len(self.live))
+            base_bitmap = bitmap[:size] & self.live[:size]
+        distances, ids = search_index(self.base, x, k, base_bitmap)
+        if not self.delta.ntotal:
+            return distances, ids
+
+        delta_distances, delta_ids = search_index(self.delta, x, k, bitmap)
+        distances = np.hstack([distances, delta_distances])
+        ids = np.hstack([ids, delta_ids])
+        # 내적(METRIC_INNER_PRODUCT)은 클수록 가깝습니다. 빈 자리(ID -1)는 뒤로 보냅니다.
+        keys = -distances if self.metric_type == faiss.METRIC_INNER_PRODUCT else distances.copy()
+        keys[ids < 0] = np.inf
+        order = np.argsort(keys, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """인덱스를 직렬화한 크기. 인덱스가 메모리에서 차지하는 크기와 비슷합니다."""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def _base_index(index: faiss.Index) -> faiss.Index:
+    """IndexIDMap 으로 감싼 인덱스의 안쪽 인덱스"""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
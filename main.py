@@ -1,21 +1,26 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Literal, Annotated
+from typing import List, Literal, Annotated, Optional
 import uvicorn
+import asyncio
 import logging
+import secrets
 import time
 from contextlib import asynccontextmanager
-from langchain.globals import set_llm_cache
-from langchain_community.cache import InMemoryCache
 
+from core.config import settings
 from core.search_engine import SearchEngineManager
 from core.intent_manager import IntentManager
 from core.report_manager import ReportManager
-from services.result_service import ResultService
-from services.sort_service import SortService
+from core.startup import REQUIRED_STAGES, StartupManager
+from services.result_service import ResultService, PRODUCT_FIELDS
+from services.search_service import SearchService
 from services.pagination_service import PaginationService
-from services.filter_service import FilterService
-from models.response import ReportResponse, ProductResponse, SearchResponse
+from services.stream_service import StreamService, STREAM_MEDIA_TYPES
+from models.request import CatalogUpdateRequest
+from models.response import ReportResponse, ReportBatchResponse, SearchResponse
+from utils import metrics
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +30,45 @@ logger = logging.getLogger(__name__)
 search_manager = SearchEngineManager()
 intent_manager = IntentManager()
 report_manager = ReportManager()
+startup_manager = StartupManager()
+
+# 동시에 처리할 검색/리포트 요청 수 제한
+request_limiter = asyncio.Semaphore(settings.max_concurrent_requests)
+
+def initialize_managers() -> None:
+    """
+    검색 엔진, 의도분석, 리포트 매니저를 동시에 초기화하고 모든 시작 단계(core.startup)가 끝날 때까지 기다립니다.
+    프로덕션 서버(python -m server)는 워커를 fork 하기 전에 마스터에서 한 번 호출합니다.
+    """
+    startup_manager.wait()
+    logger.info("서버 시작 완료")
+
+def collect_cache_stats() -> dict:
+    """캐시별 적중 통계 (GET /cache/stats, 메트릭)"""
+    return {
+        "intent": intent_manager.get_cache_stats(),
+        "embedding": search_manager.get_cache_stats(),
+        "report": report_manager.get_cache_stats(),
+        "result": search_manager.get_result_cache_stats()
+    }
+
+def collect_cache_metrics() -> None:
+    """캐시별 hits/misses 를 메트릭(ai_search_cache_requests_total)으로 옮깁니다."""
+    for cache, stats in collect_cache_stats().items():
+        if stats:
+            metrics.CACHE_REQUESTS.set(stats["hits"], cache=cache, result="hit")
+            metrics.CACHE_REQUESTS.set(stats["misses"], cache=cache, result="miss")
+
+metrics.register_collector(collect_cache_metrics)
+
+async def flush_metrics(directory: str, interval: float) -> None:
+    """워커의 메트릭을 주기적으로 저장하여 다른 워커가 받은 /metrics 요청에도 포함되도록 합니다."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(metrics.write_snapshot, directory)
+        except Exception as e:
+            logger.warning(f"메트릭 저장 실패: {e}")
 
 # asynccontextmanager 데코레이터를 사용하여 비동기 컨텍스트 매니저를 정의합니다.
 @asynccontextmanager
@@ -33,15 +77,20 @@ async def lifespan(app: FastAPI):
     FastAPI 애플리케이션의 라이프사이클 이벤트를 관리합니다.
     서버 시작 시 검색 엔진을 초기화하고, 서버 종료 시 정리 작업을 수행할 수 있습니다.
     """
-    try:
-        # 서버 시작 시 실행될 코드 (startup)
-        search_manager.initialize()
-        intent_manager.initialize()
-        report_manager.initialize()
-        logger.info("서버 시작 완료")
-    except Exception as e:
-        logger.error(f"서버 시작 중 오류: {e}")
-        logger.warning("오류가 있지만 서버를 계속 시작합니다.")
+    # 서버 시작 시 실행될 코드 (startup). 프로덕션 서버의 워커는 마스터에서 초기화한 매니저를 물려받습니다.
+    # 검색 색인과 의도분석 LLM 이 준비되면 요청을 받기 시작하고, BM25 와 리포트 LLM 은 백그라운드에서 계속 불러옵니다.
+    await asyncio.to_thread(startup_manager.wait, REQUIRED_STAGES, settings.tokenizer_warmup)
+    logger.info("서버 시작 완료")
+
+    # 새 스냅샷을 주기적으로 확인하여 검색 색인을 핫 리로드합니다.
+    snapshot_watcher = None
+    if settings.snapshot_watch_interval > 0:
+        snapshot_watcher = asyncio.create_task(search_manager.watch_snapshots(settings.snapshot_watch_interval))
+
+    # 워커가 여러 개면 워커별 메트릭을 파일로 저장합니다.
+    metrics_flusher = None
+    if settings.metrics_directory:
+        metrics_flusher = asyncio.create_task(flush_metrics(settings.metrics_directory, settings.metrics_flush_interval))
     
     # 이 yield 문 이전의 코드는 서버 시작 시 실행됩니다.
     # 이 yield 문 이후의 코드는 서버 종료 시 실행됩니다.
@@ -49,6 +98,11 @@ async def lifespan(app: FastAPI):
     
     # 서버 종료 시 실행될 코드 (shutdown)
     logger.info("서버 종료 중...")
+    if snapshot_watcher is not None:
+        snapshot_watcher.cancel()
+    if metrics_flusher is not None:
+        metrics_flusher.cancel()
+        metrics.write_snapshot(settings.metrics_directory)
     # 여기에 필요한 정리 작업 (예: DB 연결 해제, 리소스 반환 등)을 추가할 수 있습니다.
     logger.info("서버 종료 완료")
 
@@ -68,8 +122,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 브라우저에서도 단계별 소요 시간을 볼 수 있도록 합니다.
+    expose_headers=["Server-Timing"],
 )
 
+# 요청 처리 시간과 요청별 검색 단계 소요 시간 (stage_timing_header 이면 Server-Timing 헤더)
+app.add_middleware(metrics.MetricsMiddleware, timing_header=settings.stage_timing_header)
+
 
 @app.get("/")
 async def root():
@@ -79,11 +138,25 @@ async def root():
         "ReDoc_documentation": "http://localhost:8000/redoc",
         "description": "서버가 정상적으로 실행 중입니다.",
         "endpoints": {
-            "search": "GET /search - 상품 검색"
+            "search": "GET /search - 상품 검색",
+            "search_stream": "GET /search/stream - 상품 검색 (NDJSON/SSE 스트리밍)",
+            "report": "GET /report - 상품 추천 이유",
+            "report_stream": "GET /report/stream - 상품 추천 이유 (SSE 스트리밍)",
+            "report_batch": "GET /report/batch - 여러 상품 추천 이유",
+            "cache_stats": "GET /cache/stats - 캐시 적중 통계",
+            "metrics": "GET /metrics - Prometheus 메트릭 (검색 단계별 소요 시간, 캐시 적중, LLM 토큰 사용량)",
+            "admin_index": "GET /admin/index - 검색 색인 버전과 리로드 상태",
+            "admin_reload": "POST /admin/reload - 검색 색인 핫 리로드",
+            "admin_products": "POST /admin/products - 상품 추가/변경/삭제 (증분 업데이트)"
         }
     }
 
-@app.get("/search", response_model=SearchResponse)
+# 응답은 요청한 필드만 담아 ORJSONResponse 로 바로 직렬화하므로 응답 모델로 검증하지 않고, 문서에만 SearchResponse 형식을 표시합니다.
+@app.get(
+    "/search",
+    response_model=None,
+    responses={200: {"model": SearchResponse, "description": "검색 결과. products 는 fields 로 요청한 필드만 포함"}},
+)
 async def search_products(
     query: str = Query(
         default="15인치 램 16기가 노트북",
@@ -106,6 +179,20 @@ async def search_products(
         Literal["bm25", "faiss", "bm25_faiss_73", "bm25_faiss_37", "intent_with_llm"],
         Query(description="검색 방식")
     ] = "intent_with_llm",
+    bm25_weight: Optional[float] = Query(
+        default=None,
+        ge=0,
+        le=1,
+        description="하이브리드 검색(bm25_faiss_73, bm25_faiss_37)의 BM25 가중치. FAISS 가중치는 1 - bm25_weight. 미지정 시 검색 방식의 기본 가중치"
+    ),
+    explain: bool = Query(
+        default=False,
+        description="상품별 가중치분석(weight_analysis) 포함 여부"
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        description=f"응답에 포함할 상품 필드(쉼표로 구분). 미지정 시 content 를 제외한 전체 필드. content 는 요청 시 미리보기 길이로 잘라서 반환. 선택 가능: {', '.join(PRODUCT_FIELDS)}"
+    ),
 ):
     """
     # 추천검색어
@@ -125,95 +212,153 @@ async def search_products(
         if not search_manager._initialized:
             raise HTTPException(status_code=503, detail="검색 엔진이 아직 초기화되지 않았습니다.")
         
-        if not intent_manager._initialized:
+        if retriever_type == "intent_with_llm" and not intent_manager._initialized:
             raise HTTPException(status_code=503, detail="의도분석 LLM이 아직 초기화되지 않았습니다.")
         
         if not query.strip():
             raise HTTPException(status_code=400, detail="검색 쿼리가 비어있습니다.")
 
+        try:
+            product_fields = ResultService.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         # 검색할 최대 문서 수
         top_k = 100
-        # 의도
-        intent = {}
 
-        # [검색]
-        if retriever_type == "intent_with_llm":
+        # [검색] 동시 처리 요청 수를 제한합니다.
+        # 같은 검색어의 정렬 결과는 캐시되어, 다음 페이지 요청은 검색 없이 캐시를 잘라서 반환합니다.
+        async with request_limiter:
+            search_result = await SearchService.search(query, retriever_type, top_k, bm25_weight)
 
-            # 1. 의도 분석
-            # LLM을 통한 의도 분석
-            intent_timestamp = time.time()
-            set_llm_cache(InMemoryCache())
-            intent_chain = intent_manager.get_intent_chain()
-            intent = intent_chain.invoke({"query": query})
-            cleaned_intent = intent_manager.get_cleaned_intent(intent, query)
-            print(f"🤔 의도 분석: {intent}")
-            print(f"🤔 정제된 의도 분석: {cleaned_intent}")
-            print(f"⚡ LLM 의도 분석 소요 시간: {time.time() - intent_timestamp:.2f}초")
-
-            # 정제된 쿼리
-            intented_query = intent['INTENTED_QUERY']
-            print(f"🔍 정제된 쿼리: {intented_query}")
-
-            # 2. 필터 생성
-            # 의도 기반 필터
-            filter_dict = FilterService.intent_based_filtering(query, cleaned_intent)
-            print(f"✂️ 필터: {filter_dict}")
-
-            # 3. 검색
-            # 의도 기반 사용자 쿼리와 필터를 넣고 검색
-            retriever = search_manager.get_retriever("configuable_faiss")
-
-            config = {"configurable": {"search_kwargs": {
-                "k": top_k, # 최종적으로 반환할 문서 수
-                "fetch_k": 500, # FAISS로부터 가져올 초기 문서 수
-                "filter": filter_dict
-            }}}
-
-            results = retriever.invoke(intented_query, config=config)
-
-        else:
-            retriever = search_manager.get_retriever(retriever_type)
-            results = retriever.invoke(query)
-
-        # [정렬]
-        sorted_results = SortService.sort_products(results, top_k, cleaned_intent)
-
-        # TODO: query를 key로 캐시를 사용한다면 여기에 구현
+        cleaned_intent = search_result['intent']
+        filter_dict = search_result['filter']
+        if search_result['cached']:
+            logger.debug("💾 검색 결과 캐시 사용")
 
         # [페이징]
-        paginated_results = PaginationService.paginate(
-            items=sorted_results,
-            page=page,
-            page_size=pageSize
-        )
+        with metrics.stage("pagination"):
+            paginated_results = PaginationService.paginate(
+                items=search_result['items'],
+                page=page,
+                page_size=pageSize
+            )
 
         # [결과 변환 ]
-        product_response:List[ProductResponse] = ResultService.convert_to_products(paginated_results['items'])
-        intent_response = ResultService.convert_to_intent_response(cleaned_intent)
-        filter_response = ResultService.convert_to_filter_response(filter_dict)
+        # 상품은 미리 변환해 둔 필드 dict 에서 요청한 필드만 골라 만들고, 모델 검증 없이 orjson 으로 바로 직렬화합니다.
+        with metrics.stage("serialization"):
+            page_items = paginated_results['items']
+            rows = search_result['indexes'].get_product_rows(item.goods_no for item in page_items)
+            products = ResultService.project_products(
+                page_items, rows, product_fields, explain, settings.content_preview_chars
+            )
+            intent_response = ResultService.convert_to_intent_response(cleaned_intent)
+            filter_response = ResultService.convert_to_filter_response(filter_dict)
+
+            response = ORJSONResponse({
+                "intent": intent_response.model_dump(),
+                "filter": filter_response.model_dump(),
+                "intent_path": search_result['intent_path'],
+                "total_count": paginated_results['total_count'],
+                "page": paginated_results['current_page'],
+                "page_size": paginated_results['page_size'],
+                "total_pages": paginated_results['total_pages'],
+                "products": products
+            })
         
-        print(f"⌛ 총 소요 시간: {time.time() - timestamp:.2f}초")
+        logger.debug(f"⌛ 총 소요 시간: {time.time() - timestamp:.2f}초")
         
-        return SearchResponse(
-            intent=intent_response,
-            filter=filter_response,
-            total_count=paginated_results['total_count'],
-            page=paginated_results['current_page'],
-            page_size=paginated_results['page_size'],
-            total_pages=paginated_results['total_pages'],
-            products=product_response   
-        )
+        return response
         
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"에러 발생 라인: {traceback.format_exc()}")
+        logger.exception(f"검색 실패: {e}")
         raise HTTPException(
             status_code=500,
             detail=str(e)
         )
     
+@app.get("/search/stream")
+async def search_products_stream(
+    query: str = Query(
+        default="15인치 램 16기가 노트북",
+        description="검색어",
+        min_length=1,
+        max_length=100
+    ),
+    page: int = Query(
+        default=1,
+        ge=1,
+        description="페이지 번호"
+    ),
+    pageSize: int = Query(
+        default=10,
+        ge=1,
+        le=100,
+        description="페이지당 결과 수"
+    ),
+    retriever_type: Annotated[
+        Literal["bm25", "faiss", "bm25_faiss_73", "bm25_faiss_37", "intent_with_llm"],
+        Query(description="검색 방식")
+    ] = "intent_with_llm",
+    bm25_weight: Optional[float] = Query(
+        default=None,
+        ge=0,
+        le=1,
+        description="하이브리드 검색(bm25_faiss_73, bm25_faiss_37)의 BM25 가중치. FAISS 가중치는 1 - bm25_weight. 미지정 시 검색 방식의 기본 가중치"
+    ),
+    explain: bool = Query(
+        default=False,
+        description="상품별 가중치분석(weight_analysis) 포함 여부"
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        description=f"응답에 포함할 상품 필드(쉼표로 구분). 미지정 시 content 를 제외한 전체 필드. content 는 요청 시 미리보기 길이로 잘라서 반환. 선택 가능: {', '.join(PRODUCT_FIELDS)}"
+    ),
+    format: Annotated[
+        Literal["ndjson", "sse"],
+        Query(description="스트리밍 형식. ndjson: 한 줄에 이벤트 하나, sse: Server-Sent Events")
+    ] = "ndjson",
+):
+    """
+    /search 의 스트리밍 버전. 결과를 단계별 이벤트로 보냅니다.
+
+    이벤트|시점|data
+    --|--|--
+    intent | 의도분석 직후 (검색 전) | intent, filter, intent_path
+    page | 정렬 후 | total_count, page, page_size, total_pages, cached
+    product | 상품 하나씩 (정렬 순서) | 상품 (/search 의 products 항목과 동일)
+    done | 마지막 | elapsed (초)
+    error | 오류 발생 시 | detail
+    """
+    if not search_manager._initialized:
+        raise HTTPException(status_code=503, detail="검색 엔진이 아직 초기화되지 않았습니다.")
+
+    if retriever_type == "intent_with_llm" and not intent_manager._initialized:
+        raise HTTPException(status_code=503, detail="의도분석 LLM이 아직 초기화되지 않았습니다.")
+
+    if not query.strip():
+        raise HTTPException(status_code=400, detail="검색 쿼리가 비어있습니다.")
+
+    try:
+        product_fields = ResultService.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 검색할 최대 문서 수
+    top_k = 100
+
+    events = StreamService.search_events(
+        query, retriever_type, top_k, page, pageSize, bm25_weight, explain, format, request_limiter,
+        product_fields, settings.content_preview_chars
+    )
+    return StreamingResponse(
+        events,
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/report", response_model=ReportResponse)
 async def get_report(
     query: str = Query(
@@ -243,37 +388,223 @@ async def get_report(
             raise HTTPException(status_code=400, detail="상품번호가 비어있습니다.")
         
         # 상품번호 기준으로 상품정보 찾기
-        vectorstore = search_manager.get_vectorestore("faiss")
-        docs = list(vectorstore.docstore._dict.values())
+        indexes = search_manager.indexes
+        product = indexes.get_product(goodsNo)
+        if product is None:
+            raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+        product_context = product.page_content
 
-        product_context = {}
-        for doc in docs:
-            if doc.metadata['GOODS_NO'] == goodsNo:
-                product_context = doc.page_content
-                break
+        # LLM 을 통해 추천 이유 가져오기 (검색어, 상품번호 기준 캐시 사용)
+        async with request_limiter:
+            recommendation = await report_manager.aget_report(query, goodsNo, product_context, indexes.version)
 
-        # LLM 을 통해 추천 이유 가져오기
-        report_chain = report_manager.get_report_chain()
-        report = report_chain.invoke({"query": query, "context": product_context})
-
-        print(f"🤔 추천이유: {report['recommendation']}")
+        logger.debug(f"🤔 추천이유: {recommendation}")
         
-        print(f"⌛ 총 소요 시간: {time.time() - timestamp:.2f}초")
+        logger.debug(f"⌛ 총 소요 시간: {time.time() - timestamp:.2f}초")
         
         return ReportResponse(
             goodsNo=goodsNo,
-            recommendation=report['recommendation']
+            recommendation=recommendation
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"추천이유 생성 실패: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
         )
+
+@app.get("/report/stream")
+async def get_report_stream(
+    query: str = Query(
+        default="롯데카드 할인되는 20만원대 방수 노이즈캔슬링 이어폰",
+        description="검색어",
+        min_length=1,
+        max_length=100
+    ),
+    goodsNo: str = Query(
+        default="0022138866",
+        description="상품번호"
+    )
+):
+    """
+    /report 의 스트리밍 버전. 추천 이유를 생성되는 대로 Server-Sent Events 로 보냅니다.
+
+    이벤트|data
+    --|--
+    delta | text (새로 생성된 추천 이유 텍스트)
+    done | goodsNo, recommendation (완성된 추천 이유)
+    error | detail
+    """
+    if not search_manager._initialized:
+        raise HTTPException(status_code=503, detail="검색 엔진이 아직 초기화되지 않았습니다.")
+
+    if not report_manager._initialized:
+        raise HTTPException(status_code=503, detail="리포트 LLM이 아직 초기화되지 않았습니다.")
+
+    if not query.strip():
+        raise HTTPException(status_code=400, detail="검색 쿼리가 비어있습니다.")
+
+    if not goodsNo.strip():
+        raise HTTPException(status_code=400, detail="상품번호가 비어있습니다.")
+
+    # 상품번호 기준으로 상품정보 찾기
+    indexes = search_manager.indexes
+    product = indexes.get_product(goodsNo)
+    if product is None:
+        raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+
+    events = StreamService.report_events(query, goodsNo, product.page_content, "sse", request_limiter, indexes.version)
+    return StreamingResponse(
+        events,
+        media_type=STREAM_MEDIA_TYPES["sse"],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/report/batch", response_model=ReportBatchResponse)
+async def get_reports(
+    query: str = Query(
+        default="롯데카드 할인되는 20만원대 방수 노이즈캔슬링 이어폰",
+        description="검색어",
+        min_length=1,
+        max_length=100
+    ),
+    goodsNo: List[str] = Query(
+        default=["0022138866"],
+        description="상품번호 목록. 예) ?goodsNo=0022138866&goodsNo=0022138867"
+    )
+):
+    """
+    한 페이지의 상품 추천 이유를 한 번에 반환합니다.
+    상품 report_batch_size 개당 LLM 을 한 번 호출하며, 이미 조회한 (검색어, 상품번호)는 캐시에서 반환합니다.
+    """
+    try:
+        timestamp = time.time()
+
+        if not search_manager._initialized:
+            raise HTTPException(status_code=503, detail="검색 엔진이 아직 초기화되지 않았습니다.")
         
+        if not report_manager._initialized:
+            raise HTTPException(status_code=503, detail="리포트 LLM이 아직 초기화되지 않았습니다.")
+        
+        if not query.strip():
+            raise HTTPException(status_code=400, detail="검색 쿼리가 비어있습니다.")
+
+        goods_nos = list(dict.fromkeys(g.strip() for g in goodsNo if g.strip()))
+        if not goods_nos:
+            raise HTTPException(status_code=400, detail="상품번호가 비어있습니다.")
+
+        if len(goods_nos) > settings.max_page_size:
+            raise HTTPException(status_code=400, detail=f"상품번호는 최대 {settings.max_page_size}개까지 요청할 수 있습니다.")
+
+        # 상품번호 기준으로 상품정보 찾기 (찾을 수 없는 상품번호는 제외)
+        indexes = search_manager.indexes
+        products = indexes.get_products(goods_nos)
+        if not products:
+            raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+        contexts = {goods_no: doc.page_content for goods_no, doc in products.items()}
+
+        # LLM 을 통해 추천 이유 가져오기
+        async with request_limiter:
+            recommendations = await report_manager.aget_reports(query, contexts, indexes.version)
+
+        logger.debug(f"⌛ 총 소요 시간: {time.time() - timestamp:.2f}초")
+
+        return ReportBatchResponse(
+            reports=[
+                ReportResponse(goodsNo=goods_no, recommendation=recommendation)
+                for goods_no, recommendation in recommendations.items()
+            ]
+        )
+
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"에러 발생 라인: {traceback.format_exc()}")
+        logger.exception(f"추천이유 일괄 생성 실패: {e}")
         raise HTTPException(
             status_code=500,
             detail=str(e)
         )
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    캐시별 적중(hit)/미적중(miss) 통계를 반환합니다. 캐시 크기 산정에 사용합니다.
+    """
+    return collect_cache_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus 메트릭. 검색 단계별 소요 시간, 요청 소요 시간, 캐시 적중, 필터 전후 후보 문서 수, LLM 토큰 사용량.
+    metrics_directory 가 있으면(프로덕션 서버의 여러 워커) 모든 워커의 메트릭을 합쳐서 반환합니다.
+    """
+    body = await asyncio.to_thread(metrics.render, settings.metrics_directory)
+    return PlainTextResponse(body, media_type=metrics.CONTENT_TYPE)
+
+def require_admin_token(token: Optional[str]) -> None:
+    """
+    관리 API 토큰을 확인합니다. settings.admin_token 이 없으면 관리 API 를 사용할 수 없습니다(404).
+    토큰은 비교 시간으로 값을 추측할 수 없도록 secrets.compare_digest 로 비교합니다.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="관리 API 가 비활성화되어 있습니다. ADMIN_TOKEN 을 설정하세요.")
+    if token is None or not secrets.compare_digest(token.encode("utf-8"), settings.admin_token.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="관리 API 토큰이 올바르지 않습니다.")
+
+@app.get("/admin/index")
+async def get_index_status(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    현재 검색 색인 버전(스냅샷), 상품 수, 로드 시각과 리로드 진행 여부, 서버 시작 단계별 상태를 반환합니다.
+    """
+    require_admin_token(x_admin_token)
+    if not search_manager._initialized:
+        raise HTTPException(status_code=503, detail="검색 엔진이 아직 초기화되지 않았습니다.")
+    return {**search_manager.get_index_status(), "startup": startup_manager.status()}
+
+@app.post("/admin/reload", status_code=202)
+async def reload_indexes(
+    force: bool = Query(
+        default=False,
+        description="색인 버전이 그대로여도 다시 로드"
+    ),
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    최신 스냅샷으로 검색 색인을 백그라운드에서 다시 만들고 교체합니다 (핫 리로드).
+    리로드 중에도 검색은 이전 색인으로 계속되며, 진행 상황은 GET /admin/index 로 확인합니다.
+    """
+    require_admin_token(x_admin_token)
+    if not search_manager._initialized:
+        raise HTTPException(status_code=503, detail="검색 엔진이 아직 초기화되지 않았습니다.")
+    if search_manager.reloading:
+        return {"status": "already_running", **search_manager.get_index_status()}
+
+    # 태스크 참조를 남겨 두어 완료 전에 가비지 컬렉션되지 않도록 합니다.
+    app.state.reload_task = asyncio.create_task(asyncio.to_thread(search_manager.reload, force))
+    return {"status": "started", **search_manager.get_index_status()}
+
+@app.post("/admin/products")
+async def update_products(
+    request: CatalogUpdateRequest,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    상품을 추가/변경/삭제합니다 (증분 업데이트). 스냅샷을 다시 만들지 않고 바로 검색, 필터, 정렬에 반영합니다.
+    가격, 판매상태, 할인카드, 평점처럼 메타데이터만 바뀐 상품은 다시 임베딩하지 않으며,
+    문서 내용(page_content)이 바뀌거나 추가된 상품만 BM25 색인과 임베딩을 다시 계산합니다.
+    변경은 메모리에만 반영되므로 카탈로그 원본에도 반영해야 다음 스냅샷에 포함됩니다.
+    """
+    require_admin_token(x_admin_token)
+    if not search_manager._initialized:
+        raise HTTPException(status_code=503, detail="검색 엔진이 아직 초기화되지 않았습니다.")
+    try:
+        return await asyncio.to_thread(search_manager.update_products, request.upserts, request.deletes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # 개발 서버 (단일 프로세스). 프로덕션은 python -m server 로 여러 워커를 실행합니다.
+    uvicorn.run("main:app", host="0.0.0.0", port=settings.port, reload=settings.reload)
@@ -0,0 +1,15 @@
+"""
+Request models for API endpoints
+"""
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List
+
+
+class CatalogUpdateRequest(BaseModel):
+    """상품 증분 업데이트 요청 모델"""
+    upserts: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="추가/변경할 상품 카탈로그 행. GOODS_NO 필수. 기존 상품은 넘긴 열만 바꾸고(null 이면 열 삭제), 문서 내용은 page_content 열"
+    )
+    deletes: List[str] = Field(default_factory=list, description="삭제할 상품번호 목록")
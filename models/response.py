@@ -29,8 +29,8 @@ class ProductResponse(BaseModel):
     mdlLnchDt: str = Field(..., description="모델출시일")
     similarity_score: float = Field(..., description="유사도 점수", ge=0.0, le=1.0)
     weight: float = Field(..., description="가중치")
-    weight_analysis: str = Field(..., description="가중치분석")
-    content: Optional[str] = Field(None, description="상품 내용 미리보기")
+    weight_analysis: Optional[str] = Field(None, description="가중치분석 (explain=true 일 때만 포함)")
+    content: Optional[str] = Field(None, description="상품 내용 미리보기 (fields 로 요청할 때만 포함)")
 
 class FilterResponse(BaseModel):
     """필터 응답 모델"""
@@ -55,13 +55,18 @@ class SearchResponse(BaseModel):
     """검색 응답 모델"""
     intent: IntentResponse = Field(..., description="의도분석결과")
     filter: FilterResponse = Field(..., description="의도기반 필터")
+    intent_path: str = Field("llm", description="의도분석 경로 (rule: 규칙 기반 키워드 분석, llm: LLM, none: 의도분석 없음)")
     total_count: int = Field(..., description="전체 검색 결과 수", ge=0)
     page: int = Field(..., description="현재 페이지", ge=1)
     page_size: int = Field(..., description="페이지 크기", ge=1)
     total_pages: int = Field(..., description="전체 페이지 수", ge=0)
-    products: List[ProductResponse] = Field(..., description="검색된 상품 목록")
+    products: List[ProductResponse] = Field(..., description="검색된 상품 목록. fields 를 지정하면 지정한 필드만 포함")
 
 class ReportResponse(BaseModel):
     """리포트 응답 모델"""
     goodsNo: str = Field(..., description="상품번호")
-    recommendation: str = Field(..., description="추천이유")
\ No newline at end of file
+    recommendation: str = Field(..., description="추천이유")
+
+class ReportBatchResponse(BaseModel):
+    """여러 상품 리포트 응답 모델"""
+    reports: List[ReportResponse] = Field(..., description="상품별 추천이유 목록")
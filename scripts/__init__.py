@@ -0,0 +1,3 @@
+"""
+Offline build scripts for AI Search API
+"""
@@ -0,0 +1,52 @@
+"""
+BM25 역색인 오프라인 빌드.
+
+FAISS 문서 저장소의 상품 문서를 Kiwi 형태소 분석으로 한 번만 토큰화하여,
+서버가 메모리 매핑으로 바로 읽을 수 있는 역색인 파일을 만듭니다.
+
+    python -m scripts.build_bm25_index --faiss ./.db/faiss --output ./.db/bm25
+"""
+
+import time
+import shutil
+import argparse
+import logging
+
+from langchain_community.vectorstores import FAISS
+
+from core.config import settings
+from core.bm25_index import build_bm25_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BM25 역색인 오프라인 빌드")
+    parser.add_argument("--faiss", default=settings.faiss_persist_directory, help="FAISS 데이터베이스 경로")
+    parser.add_argument("--output", default=settings.bm25_persist_directory, help="BM25 역색인 저장 경로")
+    args = parser.parse_args()
+
+    # 문서만 읽으므로 임베딩 모델은 필요하지 않습니다.
+    faiss_db = FAISS.load_local(args.faiss, None, allow_dangerous_deserialization=True)
+    index_to_docstore_id = faiss_db.index_to_docstore_id
+    docs = [faiss_db.docstore.search(index_to_docstore_id[i]) for i in range(len(index_to_docstore_id))]
+    logger.info(f"FAISS 문서 로드 완료: {len(docs)}개")
+
+    started = time.time()
+    index = build_bm25_index(docs)
+    # 서버 설정의 포스팅별 가중치를 함께 저장하여 서버가 읽을 때 다시 계산하지 않도록 합니다.
+    index.weights(settings.bm25_k1, settings.bm25_b)
+    logger.info(f"BM25 역색인 생성 완료: {index.meta['num_terms']}개 용어, {time.time() - started:.1f}초")
+
+    # 임시 경로에 저장한 뒤 교체하여, 서버가 쓰다 만 색인을 읽지 않도록 합니다.
+    temp_directory = f"{args.output}.tmp"
+    shutil.rmtree(temp_directory, ignore_errors=True)
+    index.save(temp_directory)
+    shutil.rmtree(args.output, ignore_errors=True)
+    shutil.move(temp_directory, args.output)
+    logger.info(f"BM25 역색인 저장 완료: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+검색 색인 스냅샷 오프라인 빌드.
+
+상품 카탈로그 파일(JSONL/CSV/Parquet)을 읽어 FAISS 인덱스와 문서 저장소, 피처 테이블, BM25 역색인, 메타데이터 색인을
+버전별 스냅샷 디렉터리에 만듭니다. 모든 구성요소는 서버가 메모리 매핑으로 바로 읽는 형식입니다 (pickle 없음). 서버는 가장 최근의 완전한 스냅샷을 읽으므로 빌드 중에도 검색을 계속합니다.
+
+    python -m scripts.build_snapshot --input ./catalog.jsonl --output ./.db/snapshots
+
+카탈로그의 행 하나가 상품 하나이며, --content-column 열(기본 page_content)이 상품 문서 내용,
+나머지 열이 메타데이터(GOODS_NO, BRND_NM, DSCNT_SALE_PRC 등)입니다. 내용 열이 없으면 주요 메타데이터로 만듭니다.
+
+임베딩은 배치 단위로 체크포인트를 저장하므로, 중간에 실패하면 같은 명령을 다시 실행하여 이어서 만들 수 있습니다.
+체크포인트는 카탈로그 내용과 임베딩 모델이 같을 때만 재사용합니다.
+"""
+
+import os
+import csv
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import logging
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+from dotenv import load_dotenv
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from langchain_openai.embeddings import OpenAIEmbeddings
+
+from core.config import settings
+from core.bm25_index import build_bm25_index, goods_fingerprint
+from core.document_store import DocumentStore
+from core.feature_table import ProductFeatureTable
+from core.keyword_intent import KeywordIntentExtractor
+from core.metadata_index import MetadataIndex, NUMERIC_FIELDS
+from core.product_rows import PRODUCT_METADATA_FIELDS, default_page_content
+from core.vector_index import INDEX_TYPES, build_vector_index, index_factory_string
+from core.snapshot import (
+    BM25_DIRECTORY, BUILDING_SUFFIX, DOCUMENTS_DIRECTORY, FAISS_DIRECTORY, FEATURES_DIRECTORY,
+    KEYWORD_INTENT_FILE, METADATA_DIRECTORY, new_snapshot_version, prune_snapshots, publish_snapshot,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# CSV 처럼 값이 문자열로만 읽히는 형식에서 숫자로 변환할 메타데이터 열
+NUMERIC_COLUMNS = set(NUMERIC_FIELDS) | {
+    key for key, convert, _ in PRODUCT_METADATA_FIELDS.values() if convert in (int, float)
+}
+
+
+def read_catalog(path: str, fmt: Optional[str] = None) -> List[Dict]:
+    """카탈로그 파일을 행(dict) 목록으로 읽습니다. 형식을 지정하지 않으면 확장자로 판단합니다."""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt in ("jsonl", "ndjson"):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    if fmt == "csv":
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            return [_parse_csv_row(row) for row in csv.DictReader(f)]
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet 카탈로그를 읽으려면 pyarrow 가 필요합니다: pip install pyarrow") from e
+        return pq.read_table(path).to_pylist()
+    raise ValueError(f"지원하지 않는 카탈로그 형식입니다: {fmt} (jsonl, csv, parquet)")
+
+
+def _parse_csv_row(row: Dict[str, str]) -> Dict:
+    """CSV 행의 숫자 메타데이터 열을 숫자로 변환합니다. 상품번호처럼 앞자리 0 이 의미 있는 열은 그대로 둡니다."""
+    for column in NUMERIC_COLUMNS.intersection(row):
+        value = row[column]
+        try:
+            row[column] = int(value)
+        except (TypeError, ValueError):
+            try:
+                row[column] = float(value)
+            except (TypeError, ValueError):
+                pass
+    return row
+
+
+def to_documents(rows: List[Dict], content_column: str) -> List[Document]:
+    """카탈로그 행을 상품 문서로 변환합니다. 상품번호가 없거나 중복되면 ValueError 를 발생시킵니다."""
+    docs = []
+    seen = set()
+    for line, row in enumerate(rows, start=1):
+        metadata = {key: value for key, value in row.items() if key != content_column and value is not None}
+        goods_no = str(metadata.get("GOODS_NO", "")).strip()
+        if not goods_no:
+            raise ValueError(f"{line}번째 상품에 GOODS_NO 가 없습니다.")
+        if goods_no in seen:
+            raise ValueError(f"{line}번째 상품의 GOODS_NO 가 중복됩니다: {goods_no}")
+        seen.add(goods_no)
+        metadata["GOODS_NO"] = goods_no
+
+        content = row.get(content_column)
+        docs.append(Document(page_content=str(content) if content else default_page_content(metadata), metadata=metadata))
+    return docs
+
+
+def catalog_fingerprint(docs: List[Document], model: str) -> str:
+    """체크포인트 재사용 여부를 판단하기 위한 지문. 상품 순서, 상품번호, 문서 내용, 임베딩 모델이 같으면 같습니다."""
+    digest = hashlib.sha1(model.encode("utf-8"))
+    for doc in docs:
+        digest.update(doc.metadata["GOODS_NO"].encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(doc.page_content.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def embed_with_checkpoints(texts: List[str], embeddings: Embeddings, checkpoint_directory: str, batch_size: int) -> np.ndarray:
+    """
+    문서를 batch_size 개씩 임베딩하고 배치마다 체크포인트 파일(batch-00000.npy)을 저장합니다.
+    체크포인트가 이미 있는 배치는 다시 임베딩하지 않습니다.
+    """
+    os.makedirs(checkpoint_directory, exist_ok=True)
+    num_batches = (len(texts) + batch_size - 1) // batch_size
+    batches = []
+    started = time.time()
+    for batch in range(num_batches):
+        path = os.path.join(checkpoint_directory, f"batch-{batch:05d}.npy")
+        if os.path.exists(path):
+            batches.append(np.load(path))
+            continue
+
+        vectors = np.asarray(
+            embeddings.embed_documents(texts[batch * batch_size:(batch + 1) * batch_size]), dtype=np.float32
+        )
+        # 임시 파일에 쓴 뒤 이름을 바꾸어, 중간에 멈춰도 쓰다 만 체크포인트가 남지 않도록 합니다.
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, vectors)
+        os.replace(temp_path, path)
+        batches.append(vectors)
+        logger.info(f"임베딩 {batch + 1}/{num_batches} 배치 완료 ({time.time() - started:.1f}초)")
+
+    return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+
+def build_snapshot(
+    docs: List[Document],
+    embeddings: Embeddings,
+    output: str,
+    model: str,
+    batch_size: int,
+    source: str = "",
+    index_type: str = "flat",
+    nlist: int = 0,
+    pq_m: int = 96,
+    hnsw_m: int = 32,
+) -> str:
+    """
+    상품 문서로 스냅샷을 만들고 스냅샷 경로를 반환합니다.
+    임베딩 체크포인트는 {output}/.checkpoint-{지문} 에 두고, 스냅샷을 만든 뒤 삭제합니다.
+    FAISS 인덱스 종류(index_type)와 매개변수는 core.vector_index 를 참고합니다.
+    """
+    os.makedirs(output, exist_ok=True)
+    fingerprint = catalog_fingerprint(docs, model)
+    checkpoint_directory = os.path.join(output, f".checkpoint-{fingerprint[:16]}")
+    if os.path.isdir(checkpoint_directory):
+        logger.info(f"임베딩 체크포인트에서 이어서 만듭니다: {checkpoint_directory}")
+
+    started = time.time()
+    vectors = embed_with_checkpoints([doc.page_content for doc in docs], embeddings, checkpoint_directory, batch_size)
+    logger.info(f"임베딩 완료: {len(docs)}개, {time.time() - started:.1f}초")
+
+    version = new_snapshot_version()
+    building = os.path.join(output, version + BUILDING_SUFFIX)
+    # 버전은 마이크로초까지 쓰므로 다른 빌드의 디렉터리와 겹치지 않습니다. 겹치면 지우지 않고 실패합니다.
+    os.makedirs(building)
+
+    index_factory = index_factory_string(index_type, vectors.shape[1], len(docs), nlist, pq_m, hnsw_m)
+    started = time.time()
+    index = build_vector_index(vectors, index_type, nlist, pq_m, hnsw_m)
+    # 벡터 ID 가 곧 FAISS 문서 위치이며, 문서는 같은 위치 순서로 문서 저장소에 저장합니다.
+    os.makedirs(os.path.join(building, FAISS_DIRECTORY))
+    faiss.write_index(index, os.path.join(building, FAISS_DIRECTORY, "index.faiss"))
+    logger.info(f"FAISS 인덱스 저장 완료: {index_factory} ({time.time() - started:.1f}초)")
+
+    goods_nos_fingerprint = goods_fingerprint(doc.metadata["GOODS_NO"] for doc in docs)
+    DocumentStore.build(docs, goods_nos_fingerprint).save(os.path.join(building, DOCUMENTS_DIRECTORY))
+    logger.info("문서 저장소 저장 완료")
+
+    ProductFeatureTable(docs, goods_nos_fingerprint).save(os.path.join(building, FEATURES_DIRECTORY))
+    KeywordIntentExtractor(docs).save(os.path.join(building, KEYWORD_INTENT_FILE))
+    logger.info("피처 테이블, 키워드 의도 사전 저장 완료")
+
+    bm25_index = build_bm25_index(docs)
+    bm25_index.weights(settings.bm25_k1, settings.bm25_b)
+    bm25_index.save(os.path.join(building, BM25_DIRECTORY))
+    logger.info(f"BM25 역색인 저장 완료: {bm25_index.meta['num_terms']}개 용어")
+
+    MetadataIndex(docs, goods_nos_fingerprint).save(os.path.join(building, METADATA_DIRECTORY))
+    logger.info("메타데이터 색인 저장 완료")
+
+    manifest = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "source": source,
+        "num_docs": len(docs),
+        "embedding_model": model,
+        "dimension": int(vectors.shape[1]),
+        "index_type": index_type,
+        "index_factory": index_factory,
+        "fingerprint": goods_nos_fingerprint,
+        "catalog_fingerprint": fingerprint,
+        "bm25_terms": bm25_index.meta["num_terms"],
+    }
+    snapshot = publish_snapshot(building, manifest)
+    shutil.rmtree(checkpoint_directory, ignore_errors=True)
+    return snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="검색 색인 스냅샷 오프라인 빌드")
+    parser.add_argument("--input", required=True, help="상품 카탈로그 파일 (JSONL, CSV, Parquet)")
+    parser.add_argument("--format", choices=["jsonl", "csv", "parquet"], default=None, help="카탈로그 형식. 미지정 시 확장자로 판단")
+    parser.add_argument("--content-column", default="page_content", help="상품 문서 내용 열 이름")
+    parser.add_argument("--output", default=settings.snapshot_directory, help="스냅샷 경로")
+    parser.add_argument("--model", default=settings.embedding_model, help="임베딩 모델")
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_size, help="임베딩 배치 크기 (체크포인트 단위)")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=settings.faiss_index_type, help="FAISS 인덱스 종류")
+    parser.add_argument("--nlist", type=int, default=settings.faiss_nlist, help="IVF 클러스터 수. 0 이면 상품 수로 결정")
+    parser.add_argument("--pq-m", type=int, default=settings.faiss_pq_m, help="IVF-PQ 벡터당 바이트 수")
+    parser.add_argument("--hnsw-m", type=int, default=settings.faiss_hnsw_m, help="HNSW 노드당 이웃 수")
+    parser.add_argument("--keep", type=int, default=settings.snapshot_keep, help="남겨둘 최근 스냅샷 수. 0 이면 삭제하지 않음")
+    args = parser.parse_args()
+
+    load_dotenv(settings.Config.env_file)
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
+
+    docs = to_documents(read_catalog(args.input, args.format), args.content_column)
+    logger.info(f"카탈로그 로드 완료: {len(docs)}개 상품")
+
+    started = time.time()
+    snapshot = build_snapshot(
+        docs, OpenAIEmbeddings(model=args.model), args.output, args.model, args.batch_size, source=os.path.abspath(args.input),
+        index_type=args.index_type, nlist=args.nlist, pq_m=args.pq_m, hnsw_m=args.hnsw_m,
+    )
+    logger.info(f"스냅샷 생성 완료: {snapshot} ({time.time() - started:.1f}초)")
+
+    prune_snapshots(args.output, args.keep)
+
+
+if __name__ == "__main__":
+    main()
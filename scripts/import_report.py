@@ -0,0 +1,109 @@
+"""
+모듈 import 시간 보고서.
+
+새 파이썬 프로세스에서 python -X importtime 으로 모듈을 import 하여, 서버 시작 시간 중 import 에 걸리는 시간을
+패키지별(모듈 자체 실행 시간의 합)과 프로젝트 모듈별(하위 import 를 포함한 누적 시간)로 정리합니다.
+어떤 프로젝트 모듈이 무거운 패키지를 불러오는지 확인하여 그 패키지를 사용하는 곳에서 import 하도록 바꿉니다.
+
+    python -m scripts.import_report                   # import main
+    python -m scripts.import_report core.config --top 10
+    python -m scripts.import_report --raw importtime.txt
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+# 프로젝트 최상위 패키지/모듈. 이 밖의 모듈은 외부 패키지입니다.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ImportTime(NamedTuple):
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def measure(module: str) -> str:
+    """새 프로세스에서 module 을 import 하고 -X importtime 출력을 반환합니다."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr[-2000:]}")
+    return result.stderr
+
+
+def parse(output: str) -> List[ImportTime]:
+    """-X importtime 출력(import time: self [us] | cumulative | imported package)을 읽습니다."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # 머리글
+        stripped = name.lstrip()
+        records.append(ImportTime(stripped.rstrip(), (len(name) - len(stripped) - 1) // 2, int(self_us), int(cumulative_us)))
+    return records
+
+
+def project_names() -> set:
+    names = set()
+    for entry in os.listdir(PROJECT_ROOT):
+        path = os.path.join(PROJECT_ROOT, entry)
+        if entry.endswith(".py"):
+            names.add(entry[:-3])
+        elif os.path.isfile(os.path.join(path, "__init__.py")) or (os.path.isdir(path) and not entry.startswith(".") and any(
+            name.endswith(".py") for name in os.listdir(path)
+        )):
+            names.add(entry)
+    return names
+
+
+def report(module: str, records: List[ImportTime], top: int) -> None:
+    total = sum(record.cumulative_us for record in records if record.depth == 0)
+    print(f"{module} import: {total / 1e6:.2f}초 ({len(records)}개 모듈)")
+
+    # 패키지별: 모듈 자체 실행 시간의 합. 하위 import 는 각 패키지에 따로 들어가므로 합이 전체 시간입니다.
+    packages: Dict[str, int] = defaultdict(int)
+    counts: Dict[str, int] = defaultdict(int)
+    for record in records:
+        root = record.name.split(".")[0]
+        packages[root] += record.self_us
+        counts[root] += 1
+    print(f"\n[패키지별 상위 {top}개] 모듈 자체 시간의 합")
+    for root, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1e3:9.1f}ms {self_us / total:6.1%}  {root} ({counts[root]}개 모듈)")
+
+    # 프로젝트 모듈별: 하위 import 를 포함한 누적 시간. 다른 프로젝트 모듈이 먼저 불러온 패키지는 포함되지 않습니다.
+    project = project_names()
+    own = [record for record in records if record.name.split(".")[0] in project]
+    print(f"\n[프로젝트 모듈별 상위 {top}개] 하위 import 포함 누적 시간")
+    for record in sorted(own, key=lambda record: -record.cumulative_us)[:top]:
+        print(f"  {record.cumulative_us / 1e3:9.1f}ms {record.cumulative_us / total:6.1%}  {'  ' * record.depth}{record.name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="모듈 import 시간 보고서 (python -X importtime)")
+    parser.add_argument("module", nargs="?", default="main", help="import 할 모듈")
+    parser.add_argument("--top", type=int, default=20, help="항목별로 보여줄 개수")
+    parser.add_argument("--raw", help="-X importtime 출력을 저장할 파일")
+    args = parser.parse_args()
+
+    output = measure(args.module)
+    if args.raw:
+        with open(args.raw, "w", encoding="utf-8") as f:
+            f.write(output)
+    report(args.module, parse(output), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+프로덕션 서버.
+
+    python -m server                   # settings.workers 개 워커 (WORKERS=4 python -m server)
+    python main.py                     # 개발 서버 (단일 프로세스, RELOAD=true 이면 코드 변경 시 재시작)
+
+마스터 프로세스가 검색 색인, 형태소 분석기, LLM 체인을 한 번 로드한 뒤 워커를 fork 합니다 (preload).
+워커는 로드한 객체의 메모리 페이지를 copy-on-write 로 공유하고, 시작하자마자 요청을 받습니다.
+스냅샷 색인은 메모리 매핑으로 읽으므로 핫 리로드한 새 버전도 워커끼리 페이지 캐시를 공유합니다.
+
+마스터는 리스닝 소켓을 만들어 워커에게 물려주고(워커들이 같은 소켓에서 연결을 받음) 요청은 처리하지 않습니다.
+워커가 비정상 종료하면 다시 fork 하며, SIGTERM/SIGINT 를 받으면 워커에게 전달하고
+진행 중인 요청이 끝날 때까지 settings.graceful_timeout 초 기다립니다.
+
+워커마다 상태가 따로이므로 POST /admin/reload, /admin/products 는 요청을 받은 워커에만 반영됩니다.
+여러 워커에서는 새 스냅샷을 만들고 SNAPSHOT_WATCH_INTERVAL 로 모든 워커가 리로드하도록 합니다.
+메트릭도 워커별로 집계하므로 워커가 여러 개면 워커별 메트릭 파일(settings.metrics_directory)을 GET /metrics 에서 합칩니다.
+"""
+
+import os
+import time
+import shutil
+import signal
+import socket
+import logging
+import tempfile
+from typing import Dict
+
+import uvicorn
+
+from core.config import settings
+from utils import metrics
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 워커가 이 시간(초)보다 빨리 죽으면 다시 fork 하기 전에 기다립니다 (시작 직후 죽는 워커의 재시작 폭주 방지).
+MIN_WORKER_LIFETIME = 5.0
+
+
+def worker_count() -> int:
+    """워커 프로세스 수. settings.workers 가 0 이면 CPU 코어 수입니다."""
+    return settings.workers if settings.workers > 0 else (os.cpu_count() or 1)
+
+
+def create_config(app) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=settings.host,
+        port=settings.port,
+        backlog=settings.backlog,
+        limit_concurrency=settings.limit_concurrency,
+        timeout_graceful_shutdown=settings.graceful_timeout,
+        log_level=settings.log_level.lower(),
+    )
+
+
+class Master:
+    """워커 프로세스를 fork 하고 감시하는 마스터 프로세스"""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        # 워커 pid → 시작 시각
+        self.children: Dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.children[pid] = time.time()
+        logger.info(f"워커 시작: pid {pid}")
+
+    def _run_worker(self) -> None:
+        """워커 프로세스. uvicorn 서버가 끝나면 마스터의 정리 코드를 실행하지 않고 종료합니다."""
+        # uvicorn 서버가 SIGTERM/SIGINT 를 받아 진행 중인 요청을 마치고 종료합니다.
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[self.sock])
+        except BaseException as e:
+            logger.error(f"워커 오류: {e}")
+            exit_code = 1
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self.stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid, status = 0, 0
+            if pid == 0:
+                time.sleep(0.5)
+                continue
+            started_at = self.children.pop(pid, None)
+            if started_at is None or self.stopping:
+                continue
+            logger.warning(f"워커가 종료되어 다시 시작합니다: pid {pid}, 상태 {status}")
+            if time.time() - started_at < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            if not self.stopping:
+                self.spawn()
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """워커에게 SIGTERM 을 보내고 graceful_timeout 초 안에 끝나지 않은 워커는 강제 종료합니다."""
+        logger.info(f"서버 종료 중... (워커 {len(self.children)}개)")
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+
+        deadline = time.time() + settings.graceful_timeout + 5
+        while self.children and time.time() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.1)
+            else:
+                self.children.pop(pid, None)
+
+        for pid in self.children:
+            logger.warning(f"워커 강제 종료: pid {pid}")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.sock.close()
+        logger.info("서버 종료 완료")
+
+
+def main() -> None:
+    workers = worker_count()
+
+    # 워커를 fork 하기 전에 앱을 import 하고 매니저를 초기화합니다 (preload).
+    # 워커의 lifespan 은 이미 초기화된 매니저를 그대로 사용합니다.
+    started = time.time()
+    import main as app_module
+    app_module.initialize_managers()
+    logger.info(f"프리로드 완료: {time.time() - started:.2f}초")
+
+    # 워커별 메트릭을 합칠 디렉터리. 지정하지 않았으면 임시 디렉터리를 만들고 종료할 때 지웁니다.
+    temporary_metrics_directory = None
+    if workers > 1 and not settings.metrics_directory:
+        settings.metrics_directory = temporary_metrics_directory = tempfile.mkdtemp(prefix="ai-search-metrics-")
+    if settings.metrics_directory:
+        metrics.clear_directory(settings.metrics_directory)
+
+    config = create_config(app_module.app)
+    sock = config.bind_socket()
+    logger.info(f"프로덕션 서버 시작: http://{settings.host}:{settings.port} (워커 {workers}개)")
+    try:
+        Master(config, sock, workers).run()
+    finally:
+        if temporary_metrics_directory:
+            shutil.rmtree(temporary_metrics_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,70 @@
-from typing import List, Dict, Any
-from langchain.schema import Document
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from models.response import ProductResponse, IntentResponse, FilterResponse
+from core.product_rows import PRODUCT_METADATA_FIELDS
+from services.sort_service import RankedResult
+
+# /search 의 fields 로 선택할 수 있는 상품 필드 (응답 순서)
+PRODUCT_FIELDS: Tuple[str, ...] = tuple(ProductResponse.model_fields)
+
+# fields 를 지정하지 않았을 때의 상품 필드. 상품 내용(content)은 응답 크기가 커서 요청할 때만 포함합니다.
+DEFAULT_PRODUCT_FIELDS: Tuple[str, ...] = tuple(field for field in PRODUCT_FIELDS if field != "content")
+
 
 class ResultService:
     @staticmethod
-    def convert_to_products(results: List[Document]) -> List[ProductResponse]:
+    def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+        """
+        쉼표로 구분한 상품 필드 목록을 응답 순서대로 정리합니다. 지정하지 않으면 DEFAULT_PRODUCT_FIELDS 를 반환합니다.
+        알 수 없는 필드가 있으면 ValueError 를 발생시킵니다.
+        """
+        if fields is None or not fields.strip():
+            return DEFAULT_PRODUCT_FIELDS
+
+        requested = {field.strip() for field in fields.split(',') if field.strip()}
+        unknown = requested.difference(PRODUCT_FIELDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 상품 필드입니다: {', '.join(sorted(unknown))}")
+        return tuple(field for field in PRODUCT_FIELDS if field in requested)
+
+    @staticmethod
+    def project_products(
+        results: List[RankedResult],
+        rows: Dict[str, Dict[str, Any]],
+        fields: Iterable[str] = DEFAULT_PRODUCT_FIELDS,
+        explain: bool = False,
+        content_chars: int = 0,
+    ) -> List[Dict[str, Any]]:
         """
-        검색 결과(Document)를 products 형식으로 변환합니다.
+        정렬 결과 레코드를 요청한 필드만 담은 dict 목록으로 변환합니다. ProductResponse 모델을 만들지 않습니다.
+        상품 정보는 미리 변환해 둔 rows({상품번호: build_product_row 결과})에서 가져옵니다.
+        가중치분석(weight_analysis)은 explain 이 True 일 때만 만들고, content 는 content_chars 글자까지 자릅니다 (0 이면 전체).
         """
+        fields = tuple(fields)
+        row_fields = [field for field in fields if field in PRODUCT_METADATA_FIELDS]
+        with_score = "similarity_score" in fields
+        with_weight = "weight" in fields
+        with_analysis = "weight_analysis" in fields
+        with_content = "content" in fields
+
         products = []
-        for doc in results:
-
-            product = ProductResponse(
-                goodsNo=doc.metadata.get("GOODS_NO", "unknown"),
-                goodsStatSctNm=doc.metadata.get("GOODS_STAT_SCT_NM", "unknown"),
-                brndNm=doc.metadata.get("BRND_NM", "unknown"),
-                goodsNm=doc.metadata.get("GOODS_NM", "unknown"),
-                artcNm=doc.metadata.get("ARTC_NM", "unknown"),
-                categoryNm=doc.metadata.get("LGRP_NM", "unknown"),
-                salePrc=int(doc.metadata.get("SALE_PRC", 0)),
-                dscntSalePrc=int(doc.metadata.get("DSCNT_SALE_PRC", 0)),
-                maxBenefitPrice=int(doc.metadata.get("MAX_BENEFIT_PRICE", 0)),
-                cardDcRate=int(doc.metadata.get("CARD_DC_RATE", 0)),
-                cardDcNameList=doc.metadata.get("CARD_DC_NAME_LIST", "unknown"),
-                features=doc.metadata.get("FEATURES", "unknown"),
-                schKwdNm=doc.metadata.get("SCH_KWD_NM", "unknown"),
-                saleQty=int(doc.metadata.get("SALE_QTY", 0)),
-                salesUnit=int(doc.metadata.get("SALES_UNIT", 0)),
-                gdasScrSum=float(doc.metadata.get("GDAS_SCR_SUM", 0)),
-                gdasCnt=int(doc.metadata.get("GDAS_CNT", 0)),
-                energeyGrade=doc.metadata.get("ENERGEY_GRADE", "unknown"),
-                mdlLnchDt=doc.metadata.get("MDL_LNCH_DT", "unknown"),
-                similarity_score=float(doc.metadata.get("similarity_score", 0.0)),
-                weight=float(doc.metadata.get("weight", 0.0)),
-                weight_analysis=doc.metadata.get("weight_analysis", "unknown"),
-                content=doc.page_content
-            )
+        for result in results:
+            row = rows.get(result.goods_no)
+            if row is None:
+                continue
+
+            product = {field: row[field] for field in row_fields}
+            if with_score:
+                product["similarity_score"] = result.similarity_score
+            if with_weight:
+                product["weight"] = result.weight
+            if with_analysis:
+                product["weight_analysis"] = result.weight_analysis() if explain else None
+            if with_content:
+                content = row["content"]
+                product["content"] = content[:content_chars] if content_chars > 0 else content
             products.append(product)
-        return products 
-    
+        return products
+
     @staticmethod
     def convert_to_intent_response(intent: dict) -> IntentResponse:
         """
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+from langchain.schema import Document
+from core.config import settings
+from core.search_engine import SearchEngineManager, SearchIndexes
+from core.intent_manager import IntentManager
+from services.filter_service import FilterService
+from services.sort_service import SortService
+from utils import metrics
+from utils.intent_cleaner import get_default_intent
+from utils.NL_processor import classify_query_type, token_overlap
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 요청별 BM25 가중치(bm25_weight)를 적용할 수 있는 하이브리드 검색 방식
+HYBRID_RETRIEVER_TYPES = ("bm25_faiss_73", "bm25_faiss_37")
+
+class SearchService:
+    @staticmethod
+    async def search(
+        query: str,
+        retriever_type: str,
+        top_k: int,
+        bm25_weight: Optional[float] = None,
+        on_intent: Optional[Callable[[Dict, Dict, str], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        검색 결과를 반환합니다. 같은 (검색어, 검색 방식) 결과가 캐시에 있으면 검색 파이프라인을 건너뜁니다.
+        페이지는 캐시된 정렬 결과(items)를 잘라서 만듭니다.
+        bm25_weight 는 하이브리드 검색 방식에서만 사용하며, 지정하면 검색 방식의 기본 가중치 대신 사용합니다.
+        on_intent(의도, 필터, 의도분석 경로)는 검색 전에 의도와 필터가 정해지는 즉시 호출됩니다. (스트리밍 응답용)
+
+        Returns:
+            {
+                'intent': Dict,  # 정제된 의도
+                'filter': Dict,  # 의도 기반 필터
+                'items': List[RankedResult],  # 정렬 결과 레코드 목록
+                'intent_path': str,  # 의도분석 경로 (rule, llm, none)
+                'cached': bool,  # 캐시 적중 여부
+                'indexes': SearchIndexes  # 검색에 사용한 색인 버전. 상품 정보도 이 버전에서 조회합니다.
+            }
+        """
+        search_manager = SearchEngineManager()
+        # 요청이 끝날 때까지 같은 색인 버전을 사용합니다. (핫 리로드 중에도 일관된 결과)
+        indexes = search_manager.indexes
+
+        if retriever_type not in HYBRID_RETRIEVER_TYPES:
+            bm25_weight = None
+        # 가중치가 다르면 결과도 다르므로 캐시 키에 포함합니다.
+        cache_type = retriever_type if bm25_weight is None else f"{retriever_type}:{bm25_weight:g}"
+
+        cached = search_manager.get_cached_results(query, cache_type, top_k, indexes.generation)
+        if cached is not None:
+            if on_intent is not None:
+                on_intent(cached['intent'], cached['filter'], cached['intent_path'])
+            return {**cached, 'cached': True, 'indexes': indexes}
+
+        search_result = await SearchService.run_pipeline(query, retriever_type, top_k, bm25_weight, on_intent, indexes)
+
+        # 정렬 결과 레코드는 요청별 불변 객체라 그대로 캐시합니다.
+        entry = {
+            'intent': search_result['intent'],
+            'filter': search_result['filter'],
+            'items': search_result['results'],
+            'intent_path': search_result['intent_path']
+        }
+        search_manager.set_cached_results(query, cache_type, top_k, entry, indexes.generation)
+        return {**entry, 'cached': False, 'indexes': indexes}
+
+    @staticmethod
+    def keyword_intent(query: str, indexes: Optional[SearchIndexes] = None) -> Optional[Dict]:
+        """
+        키워드 검색어의 의도를 카탈로그 사전 기반 규칙으로 분석합니다.
+        자연어 검색어이거나 규칙으로 판단하기 어려우면 None 을 반환하며, 이때는 LLM 으로 분석합니다.
+        """
+        if settings.keyword_fast_path and classify_query_type(query) == "keyword":
+            indexes = indexes or SearchEngineManager().indexes
+            return indexes.keyword_intent_extractor.extract(query)
+        return None
+
+    @staticmethod
+    async def reuse_speculation(
+        speculation: asyncio.Task, query: str, intented_query: str, filter_dict: Dict, top_k: int,
+        indexes: Optional[SearchIndexes] = None,
+    ) -> Optional[List[Document]]:
+        """
+        의도분석 중에 원본 검색어로 미리 가져온 후보를 재사용할 수 있으면 필터를 적용한 상위 top_k 문서를 반환합니다.
+        정제된 쿼리에 원본 검색어에 없는 단어가 많거나, 후보 안에서 필터 조건에 맞는 문서가 부족하면 None 을 반환합니다.
+        """
+        try:
+            candidate_ids = await speculation
+        except Exception as e:
+            logger.warning(f"추측 검색 실패: {e}")
+            metrics.SPECULATION_REQUESTS.inc(result="failed")
+            return None
+
+        # 형태소 분석은 CPU 작업이므로 스레드에서 실행합니다.
+        overlap = await asyncio.to_thread(token_overlap, query, intented_query)
+        if overlap < settings.speculative_min_overlap:
+            logger.debug(f"🎲 추측 검색 미사용: 정제된 쿼리 일치도 {overlap:.2f}")
+            metrics.SPECULATION_REQUESTS.inc(result="low_overlap")
+            return None
+
+        retriever = (indexes or SearchEngineManager().indexes).prefiltered_faiss_retriever
+        results = await asyncio.to_thread(retriever.refilter, candidate_ids, filter_dict, top_k)
+        if results is None:
+            logger.debug(f"🎲 추측 검색 미사용: 후보 {len(candidate_ids)}개 중 필터 조건에 맞는 문서 부족")
+            metrics.SPECULATION_REQUESTS.inc(result="filter_miss")
+        else:
+            logger.debug(f"🎲 추측 검색 재사용: 정제된 쿼리 일치도 {overlap:.2f}")
+            metrics.SPECULATION_REQUESTS.inc(result="reused")
+        return results
+
+    @staticmethod
+    async def run_pipeline(
+        query: str,
+        retriever_type: str,
+        top_k: int,
+        bm25_weight: Optional[float] = None,
+        on_intent: Optional[Callable[[Dict, Dict, str], None]] = None,
+        indexes: Optional[SearchIndexes] = None,
+    ) -> Dict[str, Any]:
+        """
+        검색 파이프라인(의도분석 → 필터 생성 → 검색 → 정렬)을 비동기로 실행합니다.
+        LLM/임베딩 호출은 ainvoke 로, FAISS/BM25 검색과 정렬 같은 CPU 작업은 스레드로 넘겨
+        이벤트 루프를 막지 않습니다. on_intent 는 필터 생성 직후(검색 전) 호출됩니다.
+        indexes 를 생략하면 현재 색인 버전을 사용합니다.
+
+        Returns:
+            {
+                'intent': Dict,  # 정제된 의도
+                'filter': Dict,  # 의도 기반 필터
+                'results': List[RankedResult],  # 정렬 결과 레코드 목록
+                'intent_path': str  # 의도분석 경로 (rule, llm, none)
+            }
+        """
+        indexes = indexes or SearchEngineManager().indexes
+        intent_manager = IntentManager()
+
+        if retriever_type == "intent_with_llm":
+
+            # 1. 의도 분석
+            # 키워드 검색어는 규칙 기반, 자연어 검색어는 LLM 으로 분석
+            intent_timestamp = time.time()
+            speculation = None
+            try:
+                intent = SearchService.keyword_intent(query, indexes)
+                intent_path = "rule"
+                if intent is None:
+                    intent_path = "llm"
+
+                    # [추측 검색] LLM 응답을 기다리는 동안 원본 검색어로 필터 없는 후보를 미리 가져옵니다.
+                    if settings.speculative_retrieval:
+                        speculation = asyncio.create_task(
+                            indexes.prefiltered_faiss_retriever.asearch_ids(query, settings.speculative_fetch_k)
+                        )
+
+                    # LLM을 통한 의도 분석 (정규화된 검색어 기준 캐시 사용)
+                    intent = await intent_manager.aget_intent(query, indexes.version)
+
+                cleaned_intent = intent_manager.get_cleaned_intent(intent, query)
+                logger.debug(f"🤔 의도 분석({intent_path}): {intent}")
+                logger.debug(f"🤔 정제된 의도 분석: {cleaned_intent} ({time.time() - intent_timestamp:.2f}초)")
+
+                # 정제된 쿼리
+                intented_query = intent['INTENTED_QUERY']
+                logger.debug(f"🔍 정제된 쿼리: {intented_query}")
+
+                # 2. 필터 생성
+                # 의도 기반 필터
+                with metrics.stage("filter"):
+                    filter_dict = FilterService.intent_based_filtering(query, cleaned_intent)
+                logger.debug(f"✂️ 필터: {filter_dict}")
+                if on_intent is not None:
+                    on_intent(cleaned_intent, filter_dict, intent_path)
+
+                # 3. 검색
+                # 의도 기반 사용자 쿼리와 필터를 넣고 검색
+                # 필터는 메타데이터 색인으로 FAISS 검색 전에 적용되어, 조건에 맞는 상위 k 개를 정확히 가져옵니다.
+                # FAISS 검색은 임베딩(aembed_query) 후 스레드에서 실행됩니다.
+                retriever = indexes.get_retriever("configuable_faiss")
+
+                config = {"configurable": {"search_kwargs": {
+                    "k": top_k, # 최종적으로 반환할 문서 수
+                    "fetch_k": 500, # 메타데이터 색인으로 변환할 수 없는 필터일 때 FAISS로부터 가져올 초기 문서 수
+                    "filter": filter_dict
+                }}}
+
+                # 검색 단계(retrieval)는 임베딩, FAISS 검색 단계를 포함합니다.
+                with metrics.stage("retrieval"):
+                    results = None
+                    if speculation is not None:
+                        results = await SearchService.reuse_speculation(speculation, query, intented_query, filter_dict, top_k, indexes)
+                    if results is None:
+                        results = await retriever.ainvoke(intented_query, config=config)
+            finally:
+                # 의도분석, 필터 생성, on_intent 에서 예외가 나도 추측 검색 작업이 남지 않도록 취소합니다. (끝난 작업은 영향 없음)
+                if speculation is not None:
+                    speculation.cancel()
+
+        else:
+            # 의도분석을 하지 않는 검색 방식은 빈 의도와 빈 필터를 사용
+            cleaned_intent = get_default_intent(query)
+            filter_dict = {}
+            intent_path = "none"
+            if on_intent is not None:
+                on_intent(cleaned_intent, filter_dict, intent_path)
+
+            # BM25 는 비동기 구현이 없어 기본 구현에 따라 스레드에서 실행되고,
+            # 하이브리드 검색기는 BM25 와 FAISS 를 동시에 실행합니다.
+            retriever = indexes.get_retriever(retriever_type)
+            config = None
+            if bm25_weight is not None:
+                config = {"configurable": {"hybrid_weights": [bm25_weight, 1 - bm25_weight]}}
+            with metrics.stage("retrieval"):
+                results = await retriever.ainvoke(query, config=config)
+
+        # [정렬]
+        with metrics.stage("sort"):
+            sorted_results = await asyncio.to_thread(
+                SortService.sort_products, results, top_k, cleaned_intent, indexes.feature_table
+            )
+
+        return {
+            'intent': cleaned_intent,
+            'filter': filter_dict,
+            'results': sorted_results,
+            'intent_path': intent_path
+        }
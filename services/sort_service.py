@@ -1,20 +1,41 @@
 import logging
-from typing import List, Dict, Any, Tuple, Union
+from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Union, Optional
+import numpy as np
 from langchain.schema import Document
-from utils.score_calculator import calculate_default_score
-from utils.score_calculator import calculate_artc_score
-from utils.score_calculator import calculate_brand_score
-from utils.score_calculator import calculate_features_score
-from utils.score_calculator import calculate_hashtag_score
-from utils.score_calculator import calculate_rank_score
-from utils.score_calculator import calculate_cards_score
+from core.feature_table import ProductFeatureTable
+from utils.score_calculator import calculate_default_scores
+from utils.score_calculator import calculate_artc_scores
+from utils.score_calculator import calculate_brand_scores
+from utils.score_calculator import calculate_features_scores
+from utils.score_calculator import calculate_hashtag_scores
+from utils.score_calculator import calculate_rank_scores
+from utils.score_calculator import calculate_cards_scores
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True, slots=True)
+class RankedResult:
+    """
+    정렬 결과 레코드. 요청마다 새로 만들어지며, 공유 문서(Document)의 메타데이터를 수정하지 않습니다.
+    가중치분석 문자열은 weight_analysis() 를 호출할 때만 만듭니다.
+    """
+    goods_no: str  # 상품번호
+    position: int  # 피처 테이블 행 번호(FAISS 문서 위치). 테이블에 없는 상품이면 -1
+    similarity_score: float  # 유사도 점수
+    similarity_rank: int  # 유사도 순위 (1부터 시작)
+    weight: float  # 가중치
+    scores: Tuple[float, ...]  # 가중치 구성: 기본, 랭킹, 브랜드, 품목, 해시태그, 특징, 할인카드
+
+    def weight_analysis(self) -> str:
+        """가중치 구성 설명 문자열"""
+        s = self.scores
+        return f"기본:{s[0]}, 랭킹:{s[1]}, 브랜드:{s[2]}, 품목:{s[3]}, 해시태그:{s[4]}, 특징:{s[5]}, 할인카드:{s[6]}"
+
 class SortService:
     @staticmethod
-    def sort_products(docs: List[Union[Document, Tuple[Document, float]]], top_k:int, intent:Dict) -> List[Document]:
+    def sort_products(docs: List[Union[Document, Tuple[Document, float]]], top_k:int, intent:Dict, feature_table: Optional[ProductFeatureTable] = None) -> List[RankedResult]:
         """
         검색 결과를 정렬 기준에 따라 정렬합니다.
         정렬 기준:
@@ -36,86 +57,78 @@ class SortService:
         4) 품목(ARTC_NM)
         5) 특징(FEATURES)
         6) 할인카드(CARD_DC_NAME_LIST)
+
+        가중치와 정렬 키는 상품 피처 테이블(ProductFeatureTable)의 배열 연산으로 한 번에 계산합니다.
+        feature_table 이 없거나 테이블에 없는 상품이 있으면 후보 문서로 임시 테이블을 만들어 계산합니다.
+
+        입력 문서는 수정하지 않고, 요청별 정렬 결과 레코드(RankedResult)를 정렬된 순서로 반환합니다.
         """
 
-        # 튜플 형태의 결과를 Document로 변환
-        processed_docs = []
-        for i, item in enumerate(docs):
+        # 튜플 형태의 결과를 상품번호와 유사도 점수로 분리
+        goods_nos = []
+        similarity_scores = []
+        for item in docs:
             if isinstance(item, tuple):
                 doc, score = item
-                doc.metadata['similarity_score'] = score
             else:
-                doc = item
-                doc.metadata['similarity_score'] = 0.0
-            doc.metadata['similarity_rank'] = i + 1
-            processed_docs.append(doc)
-
-        def get_sort_key(doc: Document) -> tuple:
-            metadata = doc.metadata
+                doc, score = item, 0.0
+            goods_nos.append(doc.metadata.get('GOODS_NO', ''))
+            similarity_scores.append(float(score))
 
+        if not goods_nos:
+            return []
 
-            # SALE_STAT_CD / ASC
-            sale_stat_cd = metadata.get('SALE_STAT_CD', '')
-            
-            # GOODS_STAT_SCT_CD !='03'/ DESC
-            stat_sct_cd = metadata.get('GOODS_STAT_SCT_CD', '')
-            stat_sct_cd_is_not_03 = 1 if stat_sct_cd != '03' else 0
-            
-            # APPLIANCES_YN = 'Y' / DESC
-            appliances_yn = metadata.get('APPLIANCES_YN', '')
-            is_appliance = 1 if appliances_yn == 'Y' else 0
-            
-            # 가중치(weight) / DESC
-            # rank_score = calculate_rank_score(metadata, top_k)
-            # brand_score = calculate_brand_score(metadata, intent.get('BRND_NM'))
-            # artc_score = calculate_artc_score(metadata, intent.get('ARTC_NM'))
-            # hashtag_score = calculate_hashtag_score(metadata, intent.get('ARTC_NM'), intent.get('FEATURES'))
-            # features_score = calculate_features_score(metadata, intent.get('FEATURES'))
+        # 후보 문서의 테이블 행 번호
+        positions = feature_table.lookup(goods_nos) if feature_table is not None else None
+        in_catalog = positions is not None
+        if not in_catalog:
+            feature_table = ProductFeatureTable([item[0] if isinstance(item, tuple) else item for item in docs])
+            positions = np.arange(len(goods_nos))
 
-            # weight = rank_score + brand_score + artc_score + hashtag_score + features_score
-            # metadata['weight'] = weight
-            # metadata['weight_analysis'] = f"랭킹:{rank_score}, 브랜드:{brand_score}, 품목:{artc_score}, 해시태그:{hashtag_score}, 특징:{features_score}"
+        # 유사도 순위 (1부터 시작)
+        ranks = np.arange(1, len(goods_nos) + 1)
 
-            scores:list[float] = [
-                calculate_default_score(metadata),
-                calculate_rank_score(metadata, top_k),
-                calculate_brand_score(metadata, intent.get('BRND_NM'), intent.get('ARTC_NM')),
-                calculate_artc_score(metadata, intent.get('ARTC_NM')),
-                calculate_hashtag_score(metadata, intent.get('ARTC_NM'), intent.get('FEATURES')),
-                calculate_features_score(metadata, intent.get('FEATURES')),
-                calculate_cards_score(metadata, intent.get('CARD_DC_NMS'))
-            ]
-            weight = sum(scores)
-            metadata['weight'] = weight
-            metadata['weight_analysis'] = f"기본:{scores[0]}, 랭킹:{scores[1]}, 브랜드:{scores[2]}, 품목:{scores[3]}, 해시태그:{scores[4]}, 특징:{scores[5]}, 할인카드:{scores[6]}"
+        # 가중치(weight)
+        scores = [
+            calculate_default_scores(feature_table, positions),
+            calculate_rank_scores(ranks, top_k),
+            calculate_brand_scores(feature_table, positions, intent.get('BRND_NM'), intent.get('ARTC_NM')),
+            calculate_artc_scores(feature_table, positions, intent.get('ARTC_NM')),
+            calculate_hashtag_scores(feature_table, positions, intent.get('ARTC_NM'), intent.get('FEATURES')),
+            calculate_features_scores(feature_table, positions, intent.get('FEATURES')),
+            calculate_cards_scores(feature_table, positions, intent.get('CARD_DC_NMS'))
+        ]
+        weights = scores[0].copy()
+        for score in scores[1:]:
+            weights += score
 
-            # MDL_LNCH_DT 모델출시일 / DESC
-            mdlLnchDt = int(metadata.get('MDL_LNCH_DT', '99991231'))
+        # 정렬 키. np.lexsort 는 마지막 키가 1순위이며 안정 정렬입니다.
+        order = np.lexsort((
+            feature_table.goods_no_key[positions], # GOODS_NO / DESC
+            feature_table.stat_sct_cd[positions], # GOODS_STAT_SCT_CD / ASC
+            -feature_table.is_target_type[positions].astype(np.int64), # GOODS_TP_CD IN ('05', '10') / DESC
+            -feature_table.sale_qty[positions], # SALE_QTY 자사판매량 / DESC
+            -feature_table.sales_unit[positions], # SALES_UNIT 외부판매량 / DESC
+            -feature_table.mdl_lnch_dt[positions], # MDL_LNCH_DT 모델출시일 / DESC
+            -weights, # 가중치(weight) / DESC
+            -feature_table.is_appliance[positions].astype(np.int64), # APPLIANCES_YN = 'Y' / DESC
+            -feature_table.stat_sct_cd_is_not_03[positions].astype(np.int64), # GOODS_STAT_SCT_CD !='03' / DESC
+            feature_table.sale_stat_cd[positions], # SALE_STAT_CD / ASC
+        ))
 
-            # SALES_UNIT 외부판매량 / DESC
-            sales_unit = int(metadata.get('SALES_UNIT', 0))
+        # 정렬 결과 레코드 생성 (NumPy 스칼라 변환 비용을 줄이기 위해 리스트로 변환)
+        score_rows = list(zip(*(score.tolist() for score in scores)))
+        weight_list = weights.tolist()
+        position_list = positions.tolist() if in_catalog else [-1] * len(goods_nos)
 
-            # SALE_QTY 자사판매량 / DESC
-            sale_qty = int(metadata.get('SALE_QTY', 0))
-            
-            # GOODS_TP_CD IN ('05', '10') / DESC
-            goods_tp_cd = metadata.get('GOODS_TP_CD', '')
-            is_target_type = 1 if goods_tp_cd in ('05', '10') else 0        
-            
-            # GOODS_NO / DESC
-            goods_no = metadata.get('GOODS_NO', '')
-            
-            return (
-                sale_stat_cd, # ASC
-                -stat_sct_cd_is_not_03,  # DESC
-                -is_appliance,  # DESC
-                -weight,  # DESC
-                -mdlLnchDt, # DESC
-                -sales_unit, # DESC
-                -sale_qty, # DESC
-                -is_target_type,  # DESC
-                stat_sct_cd,  # ASC
-                -int(goods_no) if goods_no.isdigit() else goods_no  # DESC
+        return [
+            RankedResult(
+                goods_no=goods_nos[i],
+                position=position_list[i],
+                similarity_score=similarity_scores[i],
+                similarity_rank=i + 1,
+                weight=weight_list[i],
+                scores=score_rows[i],
             )
-        
-        return sorted(processed_docs, key=get_sort_key)
\ No newline at end of file
+            for i in order.tolist()
+        ]
@@ -0,0 +1,148 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from core.report_manager import ReportManager
+from services.search_service import SearchService
+from services.result_service import ResultService
+from services.pagination_service import PaginationService
+from utils import metrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 스트리밍 응답 형식별 Content-Type
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+class StreamService:
+    @staticmethod
+    def format_event(event: str, data: Any, fmt: str) -> str:
+        """
+        이벤트 하나를 스트리밍 형식으로 직렬화합니다.
+            - ndjson: {"event": ..., "data": ...} 한 줄
+            - sse: event: ...\\ndata: ...\\n\\n
+        """
+        if fmt == "sse":
+            return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    async def search_events(
+        query: str,
+        retriever_type: str,
+        top_k: int,
+        page: int,
+        page_size: int,
+        bm25_weight: Optional[float],
+        explain: bool,
+        fmt: str,
+        limiter: asyncio.Semaphore,
+        fields: Tuple[str, ...],
+        content_chars: int = 0,
+    ) -> AsyncIterator[str]:
+        """
+        검색 결과를 단계별 이벤트로 스트리밍합니다.
+            1. intent: 의도분석 결과와 필터 (LLM 응답 직후, 검색 전)
+            2. page: 전체 결과 수와 페이지 정보 (정렬 후)
+            3. product: 상품 하나씩, 정렬 순서대로
+            4. done: 총 소요 시간
+        오류가 나면 error 이벤트를 보내고 끝냅니다.
+        상품은 /search 와 같이 fields 의 필드만 담고, content 는 content_chars 글자까지 자릅니다 (ResultService.project_products).
+        """
+        timestamp = time.time()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_intent(intent: Dict, filter_dict: Dict, intent_path: str) -> None:
+            queue.put_nowait(("intent", {
+                "intent": ResultService.convert_to_intent_response(intent).model_dump(),
+                "filter": ResultService.convert_to_filter_response(filter_dict).model_dump(),
+                "intent_path": intent_path,
+            }))
+
+        async def run_search() -> None:
+            try:
+                async with limiter:
+                    search_result = await SearchService.search(
+                        query, retriever_type, top_k, bm25_weight, on_intent=on_intent
+                    )
+                queue.put_nowait(("result", search_result))
+            except Exception as e:
+                logger.error(f"스트리밍 검색 실패: {e}")
+                queue.put_nowait(("error", {"detail": str(e)}))
+
+        task = asyncio.create_task(run_search())
+        try:
+            while True:
+                event, payload = await queue.get()
+                if event != "result":
+                    yield StreamService.format_event(event, payload, fmt)
+                    if event == "error":
+                        return
+                    continue
+
+                with metrics.stage("pagination"):
+                    paginated_results = PaginationService.paginate(
+                        items=payload['items'],
+                        page=page,
+                        page_size=page_size
+                    )
+                yield StreamService.format_event("page", {
+                    "total_count": paginated_results['total_count'],
+                    "page": paginated_results['current_page'],
+                    "page_size": paginated_results['page_size'],
+                    "total_pages": paginated_results['total_pages'],
+                    "cached": payload['cached'],
+                }, fmt)
+
+                # 상품은 /search 와 같이 미리 변환해 둔 필드 dict 에서 요청한 필드만 골라 만듭니다.
+                page_items = paginated_results['items']
+                rows = payload['indexes'].get_product_rows(item.goods_no for item in page_items)
+                products = ResultService.project_products(page_items, rows, fields, explain, content_chars)
+                for product in products:
+                    yield StreamService.format_event("product", product, fmt)
+
+                yield StreamService.format_event("done", {"elapsed": round(time.time() - timestamp, 3)}, fmt)
+                logger.debug(f"⌛ 스트리밍 총 소요 시간: {time.time() - timestamp:.2f}초")
+                return
+        finally:
+            # 클라이언트가 연결을 끊으면 진행 중인 검색을 취소합니다.
+            if not task.done():
+                task.cancel()
+
+    @staticmethod
+    async def report_events(
+        query: str,
+        goods_no: str,
+        context: str,
+        fmt: str,
+        limiter: asyncio.Semaphore,
+        index_version: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        상품 추천 이유를 생성되는 대로 스트리밍합니다.
+            1. delta: 새로 생성된 추천 이유 텍스트 (여러 번)
+            2. done: 상품번호와 완성된 추천 이유
+        오류가 나면 error 이벤트를 보내고 끝냅니다.
+        """
+        timestamp = time.time()
+        recommendation = ""
+        try:
+            async with limiter:
+                async for text in ReportManager().astream_report(query, goods_no, context, index_version):
+                    if not recommendation:
+                        logger.debug(f"⚡ 추천이유 첫 응답: {time.time() - timestamp:.2f}초")
+                    recommendation += text
+                    yield StreamService.format_event("delta", {"text": text}, fmt)
+        except Exception as e:
+            logger.error(f"추천이유 스트리밍 실패: {e}")
+            yield StreamService.format_event("error", {"detail": str(e)}, fmt)
+            return
+
+        yield StreamService.format_event("done", {"goodsNo": goods_no, "recommendation": recommendation}, fmt)
+        logger.debug(f"⌛ 추천이유 스트리밍 총 소요 시간: {time.time() - timestamp:.2f}초")
@@ -0,0 +1,99 @@
+"""
+검색 색인 테스트 공용 픽스처. OpenAI 대신 스텁 임베딩(benchmarks.stubs)으로 합성 카탈로그의 스냅샷을 만듭니다.
+스냅샷은 세션마다 한 번 만들고, 스냅샷을 바꾸는 테스트는 snapshot_root 를 복사하여 씁니다.
+"""
+
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain.schema import Document
+
+from benchmarks.stubs import StubEmbeddings, make_catalog
+from core.config import settings
+from core.intent_manager import IntentManager
+from core.report_manager import ReportManager
+from core.search_engine import SearchEngineManager, SearchIndexes
+
+CATALOG_SIZE = 120
+
+
+@pytest.fixture(scope="session")
+def catalog() -> List[Document]:
+    return make_catalog(CATALOG_SIZE)
+
+
+@pytest.fixture(scope="session")
+def snapshot_root(tmp_path_factory, catalog) -> str:
+    """스텁 임베딩으로 만든 스냅샷 하나가 있는 스냅샷 경로"""
+    from scripts.build_snapshot import build_snapshot
+
+    root = str(tmp_path_factory.mktemp("snapshots"))
+    build_snapshot(catalog, StubEmbeddings(), root, "stub", 64, source="test")
+    return root
+
+
+@pytest.fixture
+def snapshot_settings(monkeypatch, snapshot_root) -> str:
+    """서버가 snapshot_root 의 스냅샷을 읽도록 설정합니다."""
+    monkeypatch.setattr(settings, "snapshot_directory", snapshot_root)
+    return snapshot_root
+
+
+@pytest.fixture
+def indexes(snapshot_settings) -> SearchIndexes:
+    return SearchIndexes(StubEmbeddings()).load()
+
+
+@pytest.fixture
+def stub_openai(monkeypatch):
+    """매니저가 초기화할 때 import 하는 OpenAI 모델 클래스를 스텁으로 바꿉니다. (benchmarks.load_test.install_stubs 와 같음)"""
+    import langchain_openai
+    from benchmarks.stubs import StubChatModel
+
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setattr(langchain_openai, "OpenAIEmbeddings", lambda model=None, **kwargs: StubEmbeddings())
+    monkeypatch.setattr(langchain_openai, "ChatOpenAI", lambda **kwargs: StubChatModel())
+    for name in ("embedding_cache_path", "intent_cache_path", "report_cache_path"):
+        monkeypatch.setattr(settings, name, None)
+
+
+@pytest.fixture
+def manager(monkeypatch, snapshot_settings, stub_openai) -> SearchEngineManager:
+    """snapshot_settings 의 스냅샷을 읽은 새 검색 엔진 싱글톤. 테스트가 끝나면 이전 싱글톤으로 되돌립니다."""
+    monkeypatch.setattr(SearchEngineManager, "_instance", None)
+    manager = SearchEngineManager()
+    manager.initialize()
+    return manager
+
+
+@pytest.fixture
+def intent_manager(monkeypatch, stub_openai) -> IntentManager:
+    """스텁 LLM 으로 초기화한 새 의도분석 싱글톤"""
+    monkeypatch.setattr(IntentManager, "_instance", None)
+    intent_manager = IntentManager()
+    intent_manager.initialize()
+    return intent_manager
+
+
+@pytest.fixture
+def report_manager(monkeypatch, stub_openai) -> ReportManager:
+    """스텁 LLM 으로 초기화한 새 리포트 싱글톤"""
+    monkeypatch.setattr(ReportManager, "_instance", None)
+    report_manager = ReportManager()
+    report_manager.initialize()
+    return report_manager
+
+
+@pytest.fixture
+def client(monkeypatch, manager, intent_manager, report_manager) -> TestClient:
+    """
+    스텁 매니저로 요청을 처리하는 테스트 클라이언트. 서버 시작 단계(lifespan)는 실행하지 않습니다.
+    main 은 import 할 때 매니저 싱글톤을 만들어 두므로 main 의 매니저도 바꿉니다.
+    """
+    import main
+
+    monkeypatch.setattr(main, "search_manager", manager)
+    monkeypatch.setattr(main, "intent_manager", intent_manager)
+    monkeypatch.setattr(main, "report_manager", report_manager)
+    return TestClient(main.app)
@@ -0,0 +1,68 @@
+"""
+비동기 검색/리포트 파이프라인 테스트. 지연이 있는 스텁 LLM/임베딩으로 동시 요청이 겹쳐서 처리되는지 확인합니다.
+(benchmarks.load_test 의 overlap 측정과 같은 방식)
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from benchmarks.stubs import StubChatModel, StubEmbeddings
+from services.search_service import SearchService
+
+LLM_LATENCY = 0.2
+EMBEDDING_LATENCY = 0.05
+QUERIES = [f"조용하고 전기요금 적게 나오는 냉장고 추천 {i}번" for i in range(8)]
+
+
+@pytest.fixture
+def stub_openai(stub_openai, monkeypatch):
+    """호출마다 지연하는 스텁 모델"""
+    import langchain_openai
+
+    monkeypatch.setattr(langchain_openai, "OpenAIEmbeddings", lambda model=None, **kwargs: StubEmbeddings(latency=EMBEDDING_LATENCY))
+    monkeypatch.setattr(langchain_openai, "ChatOpenAI", lambda **kwargs: StubChatModel(latency=LLM_LATENCY))
+
+
+async def gather_timed(coroutines):
+    """코루틴을 동시에 실행하고 (결과, 경과시간)을 반환합니다."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*coroutines)
+    return results, time.perf_counter() - start
+
+
+def test_concurrent_searches_overlap(manager, intent_manager):
+    async def run():
+        # 형태소 분석기, LLM 체인 등 처음 한 번만 준비하는 작업을 미리 실행합니다.
+        warm_up = await SearchService.search("조용하고 전기요금 적게 나오는 에어컨 추천", "intent_with_llm", 100)
+        assert warm_up["intent_path"] == "llm"
+        return await gather_timed(SearchService.search(query, "intent_with_llm", 100) for query in QUERIES)
+
+    results, elapsed = asyncio.run(run())
+
+    assert all(result["intent_path"] == "llm" and not result["cached"] for result in results)
+    # 요청마다 의도분석과 검색어 임베딩을 기다리지만, LLM/임베딩 호출이 이벤트 루프를 막지 않아 요청끼리 겹쳐서 처리됩니다.
+    assert elapsed < len(QUERIES) * (LLM_LATENCY + EMBEDDING_LATENCY) / 3
+
+
+def test_concurrent_requests_overlap(monkeypatch, client, catalog):
+    import main
+
+    async def run(goods_nos):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            requests = [http.get("/search", params={"query": query}) for query in QUERIES]
+            requests += [http.get("/report", params={"query": "냉장고", "goodsNo": goods_no}) for goods_no in goods_nos]
+            return await gather_timed(requests)
+
+    responses, elapsed = asyncio.run(run([doc.metadata["GOODS_NO"] for doc in catalog[:len(QUERIES)]]))
+    assert [response.status_code for response in responses] == [200] * len(responses)
+    assert elapsed < len(responses) * LLM_LATENCY / 3
+
+    # 동시 처리 요청 수를 넘는 요청은 대기합니다. 검색 결과는 캐시되어 있고, 새 상품의 리포트만 LLM 을 호출합니다.
+    monkeypatch.setattr(main, "request_limiter", asyncio.Semaphore(2))
+    goods_nos = [doc.metadata["GOODS_NO"] for doc in catalog[len(QUERIES):len(QUERIES) + 6]]
+    responses, elapsed = asyncio.run(run(goods_nos))
+    assert elapsed >= len(goods_nos) / 2 * LLM_LATENCY
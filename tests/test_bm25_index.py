@@ -0,0 +1,178 @@
+"""core.bm25_index.BM25Index 점수 계산과 증분 업데이트 테스트. 형태소 분석 없이 토큰 목록으로 만듭니다."""
+
+import math
+import random
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from core.bm25_index import BM25Index, BM25IndexRetriever
+from utils.tokenizer import kiwi_tokenize
+
+K1, B = 1.2, 0.75
+
+
+def make_corpus(num_docs: int, seed: int = 0) -> List[List[str]]:
+    rng = random.Random(seed)
+    terms = [f"t{i}" for i in range(40)]
+    # 앞쪽 용어가 더 자주 나오도록 하여 문서 빈도가 고르지 않게 만듭니다.
+    weights = [1 / (i + 1) for i in range(len(terms))]
+    return [rng.choices(terms, weights, k=rng.randint(1, 30)) for _ in range(num_docs)]
+
+
+def brute_force_scores(docs: Dict[int, List[str]], query: List[str], k1: float = K1, b: float = B) -> Dict[int, float]:
+    """BM25 정의대로 문서마다 점수를 계산합니다. 점수가 0 인 문서는 제외합니다."""
+    num_docs = len(docs)
+    avgdl = sum(len(tokens) for tokens in docs.values()) / num_docs
+    df = Counter(term for tokens in docs.values() for term in set(tokens))
+
+    scores = {}
+    for doc_id, tokens in docs.items():
+        tf = Counter(tokens)
+        score = 0.0
+        for term in query:
+            if tf[term]:
+                idf = math.log1p((num_docs - df[term] + 0.5) / (df[term] + 0.5))
+                score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * len(tokens) / avgdl))
+        if score > 0:
+            scores[doc_id] = score
+    return scores
+
+
+def assert_top_k(
+    index: BM25Index, docs: Dict[int, List[str]], query: List[str], k: int, k1: float = K1, b: float = B
+) -> None:
+    expected = brute_force_scores(docs, query, k1, b)
+    ids, scores = index.search(query, k, k1, b)
+
+    assert len(ids) == min(k, len(expected))
+    # 반환한 점수는 정의대로 계산한 점수와 같고, 점수 내림차순(동점은 문서 번호 오름차순)입니다.
+    np.testing.assert_allclose(scores, [expected[doc_id] for doc_id in ids], rtol=1e-5)
+    assert list(zip(-scores, ids)) == sorted(zip(-scores, ids))
+    # 반환하지 않은 문서 중 반환한 마지막 문서보다 점수가 높은 문서는 없습니다.
+    if len(ids):
+        rest = [score for doc_id, score in expected.items() if doc_id not in set(ids.tolist())]
+        assert all(score <= scores[-1] * (1 + 1e-5) for score in rest)
+
+
+@pytest.fixture(scope="module")
+def corpus() -> List[List[str]]:
+    return make_corpus(300)
+
+
+@pytest.mark.parametrize("query", [["t0"], ["t1", "t7"], ["t3", "t3", "t25"], ["t39", "t0", "t12", "t5"]])
+@pytest.mark.parametrize("k", [1, 10, 1000])
+def test_search_matches_brute_force(corpus, query, k):
+    index = BM25Index.build(corpus, [str(i) for i in range(len(corpus))])
+    assert_top_k(index, dict(enumerate(corpus)), query, k)
+
+
+def test_search_unknown_tokens(corpus):
+    index = BM25Index.build(corpus, [str(i) for i in range(len(corpus))])
+    ids, scores = index.search(["없는용어"], 10)
+    assert len(ids) == 0 and len(scores) == 0
+
+
+@pytest.mark.parametrize("k1, b", [(0.5, 0.0), (2.0, 1.0)])
+def test_search_parameters(corpus, k1, b):
+    index = BM25Index.build(corpus, [str(i) for i in range(len(corpus))])
+    assert_top_k(index, dict(enumerate(corpus)), ["t1", "t7"], 20, k1, b)
+    # 포스팅별 가중치는 (k1, b) 별로 한 번만 계산합니다.
+    assert index.weights(k1, b) is index.weights(k1, b)
+    assert set(index._weights) == {(k1, b)}
+
+
+def test_search_ties_at_cutoff():
+    # 점수가 같은 문서는 문서 번호 오름차순으로, 상위 k 경계에 걸린 동점 문서도 번호가 작은 문서를 고릅니다.
+    corpus = [["b"], ["a"], ["b"], ["a"], ["a"], ["a", "a"], ["a"]]
+    index = BM25Index.build(corpus, [str(i) for i in range(len(corpus))])
+    ids, scores = index.search(["a"], 3)
+    assert ids.tolist() == [5, 1, 3]
+    assert scores[1] == scores[2] < scores[0]
+    assert index.search(["a"], 10)[0].tolist() == [5, 1, 3, 4, 6]
+
+
+def test_build_postings():
+    index = BM25Index.build([["a", "b", "a"], ["b"], ["c", "a"]], ["0", "1", "2"])
+
+    assert index.vocab == ["a", "b", "c"]
+    assert index.indptr.tolist() == [0, 2, 4, 5]
+    assert index.doc_ids.tolist() == [0, 2, 0, 1, 2]
+    assert index.tfs.tolist() == [2, 1, 1, 1, 1]
+    assert index.doc_lens.tolist() == [3, 1, 2]
+    assert index.meta["avgdl"] == pytest.approx(2.0)
+
+
+def test_updated_matches_brute_force(corpus):
+    index = BM25Index.build(corpus, [str(i) for i in range(len(corpus))])
+    index.weights(K1, B)
+
+    changed = {3: ["t0", "t0", "새용어"], 10: ["t5"], len(corpus): ["t1", "새용어"], len(corpus) + 1: ["t2", "t2"]}
+    deleted = [0, 7, 10]  # 10 은 변경과 겹치므로 변경이 우선합니다.
+    updated = index.updated(changed, deleted)
+
+    docs = dict(enumerate(corpus))
+    docs.update(changed)
+    for doc_id in (0, 7):
+        del docs[doc_id]
+
+    assert updated.num_docs == len(docs)
+    assert updated.meta["avgdl"] == pytest.approx(sum(len(tokens) for tokens in docs.values()) / len(docs))
+    for query in (["t0"], ["새용어"], ["t1", "t2", "t5"]):
+        assert_top_k(updated, docs, query, 20)
+    ids, _ = updated.search(["t0", "t1", "t2", "t3"], len(corpus) + 2)
+    assert not {0, 7} & set(ids.tolist())
+
+    # 원래 색인은 바뀌지 않습니다.
+    assert index.num_docs == len(corpus)
+    assert "새용어" not in index.term_ids
+    assert_top_k(index, dict(enumerate(corpus)), ["t0"], 20)
+
+
+def test_updated_equals_rebuild(corpus):
+    index = BM25Index.build(corpus, [str(i) for i in range(len(corpus))])
+    changed = {5: ["t1", "t2"], 42: ["t9", "t9", "t0"]}
+    rebuilt_corpus = [changed.get(i, tokens) for i, tokens in enumerate(corpus)]
+    rebuilt = BM25Index.build(rebuilt_corpus, [str(i) for i in range(len(corpus))])
+
+    updated = index.updated(changed)
+    for query in (["t0"], ["t9", "t2"]):
+        ids, scores = updated.search(query, 50)
+        expected_ids, expected_scores = rebuilt.search(query, 50)
+        assert ids.tolist() == expected_ids.tolist()
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+def test_save_and_load(tmp_path, corpus):
+    index = BM25Index.build(corpus, [str(i) for i in range(len(corpus))])
+    index.weights(K1, B)
+    index.save(str(tmp_path))
+
+    loaded = BM25Index.load(str(tmp_path))
+    assert (K1, B) in loaded._weights
+    for query in (["t0", "t4"], ["t30"]):
+        ids, scores = loaded.search(query, 10, K1, B)
+        expected_ids, expected_scores = index.search(query, 10, K1, B)
+        assert ids.tolist() == expected_ids.tolist()
+        np.testing.assert_allclose(scores, expected_scores)
+
+
+def test_load_missing(tmp_path):
+    assert BM25Index.load(str(tmp_path)) is None
+
+
+def test_retriever(indexes, catalog):
+    retriever = indexes.get_retriever("bm25")
+    assert isinstance(retriever, BM25IndexRetriever)
+
+    query = catalog[7].page_content
+    ids, _ = retriever.index.search(kiwi_tokenize(query), 5, retriever.k1, retriever.b)
+    assert retriever.search_ids(query, 5).tolist() == ids.tolist()
+    # 상품 설명 전체로 검색하면 그 상품이 가장 먼저 나옵니다.
+    docs = retriever.invoke(query)
+    assert docs[0] == catalog[7]
+    assert docs[:5] == [indexes.documents[i] for i in ids.tolist()]
+    assert len(retriever.model_copy(update={"k": 3}).invoke(query)) == 3
+    assert retriever.invoke("없는검색어") == []
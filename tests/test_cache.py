@@ -0,0 +1,155 @@
+"""utils.cache 의 LRU/SQLite 캐시 만료(TTL)와 제거 테스트"""
+
+import asyncio
+
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import LRUCache, SQLiteCache, create_cache, prompt_cache_version
+
+
+class Clock:
+    """time.time 대신 사용하는 시계. 테스트에서 시간을 직접 옮깁니다."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a 를 최근 사용으로 옮깁니다.
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_ttl(clock):
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_without_ttl_never_expires(clock):
+    cache = LRUCache(maxsize=10, ttl=0)
+    cache.set("a", 1)
+    clock.now += 10 ** 9
+    assert cache.get("a") == 1
+
+
+def test_sqlite_roundtrip(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    value = {"INTENTED_QUERY": "냉장고", "PRICE": [100000, None]}
+    cache.set("k", value)
+
+    assert cache.get("k") == value
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_sqlite_ttl(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+
+    # 만료된 항목은 다음 제거 때 지웁니다. (maxsize 가 작아 저장할 때마다 제거)
+    cache.set("b", 2)
+    assert len(cache) == 1
+
+
+def test_sqlite_evicts_least_recently_accessed(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), maxsize=3)
+    assert cache.evict_every == 1
+    for key in "abc":
+        clock.now += 1
+        cache.set(key, key)
+
+    # 조회 시각은 모아서 기록되지만, 제거 전에 먼저 기록되므로 a 는 제거되지 않습니다.
+    clock.now += 1
+    assert cache.get("a") == "a"
+    clock.now += 1
+    cache.set("d", "d")
+
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+
+
+def test_sqlite_evicts_in_batches(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), maxsize=1000)
+    assert cache.evict_every == 10
+    for i in range(1000 + cache.evict_every - 1):
+        clock.now += 1
+        cache.set(str(i), i)
+    # 제거 주기 사이에는 최대 개수보다 evict_every 개 미만으로 많을 수 있습니다.
+    assert 1000 <= len(cache) < 1000 + cache.evict_every
+
+    clock.now += 1
+    cache.set("last", -1)
+    assert len(cache) == 1000
+    assert cache.get("0") is None
+    assert cache.get("last") == -1
+
+
+def test_sqlite_shared_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path, table="intent").set("k", [1, 2])
+
+    assert SQLiteCache(path, table="intent").get("k") == [1, 2]
+    assert SQLiteCache(path, table="report").get("k") is None
+
+
+def test_async_methods(tmp_path):
+    async def run(cache):
+        await cache.aset("k", "v")
+        return await cache.aget("k")
+
+    assert asyncio.run(run(LRUCache())) == "v"
+    assert asyncio.run(run(SQLiteCache(str(tmp_path / "cache.sqlite3")))) == "v"
+
+
+def test_create_cache(tmp_path):
+    assert isinstance(create_cache(10), LRUCache)
+    assert isinstance(create_cache(10, path=str(tmp_path / "cache.sqlite3")), SQLiteCache)
+
+
+def test_prompt_cache_version():
+    from langchain_core.prompts import ChatPromptTemplate
+
+    def prompt(system: str, instructions: str = "JSON") -> ChatPromptTemplate:
+        template = ChatPromptTemplate.from_messages([("system", system), ("user", "#Format: {format_instructions}\n\n#Question: {query}")])
+        return template.partial(format_instructions=instructions)
+
+    version = prompt_cache_version("model", prompt("검색 도우미"))
+    assert version == prompt_cache_version("model", prompt("검색 도우미"))
+    # 모델, 시스템 메시지, 출력 형식 지시사항 중 하나라도 바뀌면 버전이 바뀝니다.
+    assert version != prompt_cache_version("other", prompt("검색 도우미"))
+    assert version != prompt_cache_version("model", prompt("추천 도우미"))
+    assert version != prompt_cache_version("model", prompt("검색 도우미", "YAML"))
+    assert version != prompt_cache_version("model", prompt("검색 도우미"), prompt("추천 도우미"))
@@ -0,0 +1,108 @@
+"""
+스냅샷 구성요소(core.document_store, core.feature_table)의 저장과 메모리 매핑 읽기 테스트.
+메모리 매핑으로 읽은 결과가 메모리로 읽은 결과, 원래 문서와 같은지 확인합니다.
+"""
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from benchmarks.stubs import StubEmbeddings
+from core.config import settings
+from core.document_store import DocumentStore, KeyIndex, StringTable
+from core.feature_table import POSTING_FIELDS, ROW_COLUMNS, ProductFeatureTable
+from core.search_engine import SearchIndexes
+from core.snapshot import in_use_versions, list_snapshots
+
+
+def test_string_table(tmp_path):
+    values = ["", "냉장고", "LG전자 🧊", "a" * 1000]
+    StringTable.build(values).save(str(tmp_path), "values")
+
+    for mmap in (True, False):
+        table = StringTable.load(str(tmp_path), "values", mmap)
+        assert list(table) == values
+        assert table[2] == values[2]
+        assert table[np.array([3, 0, 1])].tolist() == [values[3], values[0], values[1]]
+
+    updated = table.updated({1: "세탁기", 4: "추가"})
+    assert list(updated) == ["", "세탁기", "LG전자 🧊", "a" * 1000, "추가"]
+    assert updated[np.array([4, 1])].tolist() == ["추가", "세탁기"]
+    assert list(table) == values
+
+
+def test_key_index(tmp_path):
+    index = KeyIndex.build(["0003", "0001", "상품", "0001"])
+    # 같은 키는 마지막 행 번호를 씁니다.
+    assert dict(index) == {"0001": 3, "0003": 0, "상품": 2}
+    assert index.lookup(["상품", "0003"]).tolist() == [2, 0]
+    assert index.lookup(["0003", "없음"]) is None
+    assert index.get("0000000000000") is None
+
+    updated = index.updated(removed=["0003"], added=[("0009", 5)])
+    assert (len(updated), updated.get("0003"), updated["0009"]) == (3, None, 5)
+    assert index["0003"] == 0
+
+    updated.save(str(tmp_path), "keys")
+    loaded = KeyIndex.load(str(tmp_path), "keys")
+    assert dict(loaded) == dict(updated)
+
+
+@pytest.fixture
+def mixed_docs():
+    """종류별(문자열, 정수, 실수, JSON) 필드와 없는 필드가 섞인 문서"""
+    return [
+        Document(page_content="첫 번째", metadata={"GOODS_NO": "1", "SALE_PRC": 1000, "GDAS_SCR_SUM": 4.5, "TAGS": ["a", "b"]}),
+        Document(page_content="", metadata={"GOODS_NO": "2", "SALE_PRC": 2 ** 40, "TAGS": None, "MIXED": 1}),
+        Document(page_content="세 번째 🧊", metadata={"GOODS_NO": "3", "GDAS_SCR_SUM": 0.0, "MIXED": "일"}),
+    ]
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_document_store_roundtrip(tmp_path, mixed_docs, mmap):
+    DocumentStore.build(mixed_docs, "fingerprint").save(str(tmp_path))
+    store = DocumentStore.load(str(tmp_path), mmap)
+
+    assert list(store) == mixed_docs
+    assert store.fingerprint == "fingerprint"
+    # 메모리 매핑한 배열은 읽기 전용입니다.
+    assert store.present.flags.writeable is not mmap
+    assert DocumentStore.load(str(tmp_path / "missing")) is None
+
+
+def test_updated_document_store_roundtrip(tmp_path, mixed_docs):
+    added = Document(page_content="추가", metadata={"GOODS_NO": "4", "SALE_PRC": 5})
+    DocumentStore.build(mixed_docs).updated({3: added}).save(str(tmp_path))
+    assert list(DocumentStore.load(str(tmp_path))) == mixed_docs + [added]
+
+
+def test_feature_table_roundtrip(tmp_path, catalog):
+    table = ProductFeatureTable(catalog, "fingerprint")
+    table.save(str(tmp_path))
+    rows = np.arange(len(catalog))
+
+    for mmap in (True, False):
+        loaded = ProductFeatureTable.load(str(tmp_path), mmap)
+        assert loaded.fingerprint == "fingerprint"
+        assert dict(loaded.positions) == dict(table.positions)
+        for name in ROW_COLUMNS + ("sale_stat_cd", "stat_sct_cd", "goods_no_key"):
+            assert np.array_equal(np.asarray(getattr(loaded, name)[rows]), np.asarray(getattr(table, name)[rows])), name
+        for name in POSTING_FIELDS:
+            postings = getattr(table, name)
+            assert {token: rows.tolist() for token, rows in getattr(loaded, name).items()} == {
+                token: rows.tolist() for token, rows in postings.items()
+            }, name
+        assert loaded.flagship_brand_by_artc.keys() == table.flagship_brand_by_artc.keys()
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_snapshot_load(monkeypatch, snapshot_settings, catalog, mmap):
+    monkeypatch.setattr(settings, "snapshot_mmap", mmap)
+    indexes = SearchIndexes(StubEmbeddings()).load()
+
+    assert indexes.version == list_snapshots(snapshot_settings)[-1]
+    assert indexes.version in in_use_versions(snapshot_settings)
+    assert indexes.get_product(catalog[5].metadata["GOODS_NO"]) == catalog[5]
+    docs = indexes.get_retriever("faiss").invoke(catalog[5].page_content)
+    assert docs[0] == catalog[5]
+    assert indexes.documents.page_content.data.flags.writeable is not mmap
@@ -0,0 +1,44 @@
+"""utils.embedding_cache.MemmapVectorStore 디스크 캐시 테스트"""
+
+import numpy as np
+
+from utils.embedding_cache import MemmapVectorStore
+
+
+def vector(value: float, dim: int = 1536) -> np.ndarray:
+    return np.full(dim, value, dtype=np.float32)
+
+
+def test_roundtrip_and_reopen(tmp_path):
+    path = str(tmp_path / "embeddings")
+    store = MemmapVectorStore(path, capacity=4)
+    store.set("a", vector(1))
+    store.set("b", vector(2))
+
+    assert np.array_equal(store.get("a"), vector(1))
+    assert store.get("missing") is None
+    # 다른 워커처럼 같은 파일을 다시 열어도 쓴 벡터를 읽습니다.
+    reopened = MemmapVectorStore(path, capacity=4)
+    assert len(reopened) == 2
+    assert np.array_equal(reopened.get("b"), vector(2))
+
+
+def test_evicts_least_recently_accessed(tmp_path):
+    store = MemmapVectorStore(str(tmp_path / "embeddings"), capacity=2)
+    store.set("a", vector(1))
+    store.set("b", vector(2))
+    store.get("a")
+    store.set("c", vector(3))
+
+    assert len(store) == 2
+    assert store.get("b") is None
+    assert np.array_equal(store.get("a"), vector(1))
+    assert np.array_equal(store.get("c"), vector(3))
+
+
+def test_ignores_other_dimension(tmp_path):
+    store = MemmapVectorStore(str(tmp_path / "embeddings"), capacity=2)
+    store.set("a", vector(1, dim=8))
+    store.set("b", vector(2, dim=16))
+
+    assert store.dim == 8 and store.get("b") is None
@@ -0,0 +1,131 @@
+"""
+검색 색인 핫 리로드(SearchEngineManager.reload)와 관리 API 테스트.
+conftest.py 의 스냅샷을 복사한 스냅샷 경로에 새 버전을 추가하여 리로드합니다.
+"""
+
+import os
+import json
+import asyncio
+import shutil
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from core.config import settings
+from core.intent_manager import IntentManager
+from core.snapshot import FAISS_DIRECTORY, MANIFEST_FILE, list_snapshots
+from utils.cache import LRUCache
+
+
+def add_snapshot(root: str, version: str) -> str:
+    """처음 스냅샷을 새 버전으로 복사합니다."""
+    source = os.path.join(root, list_snapshots(root)[0])
+    snapshot = os.path.join(root, version)
+    shutil.copytree(source, snapshot)
+    manifest_path = os.path.join(snapshot, MANIFEST_FILE)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({**manifest, "version": version}, f)
+    return snapshot
+
+
+@pytest.fixture
+def snapshot_settings(monkeypatch, tmp_path, snapshot_root) -> str:
+    """리로드 테스트가 스냅샷을 추가할 수 있도록 세션 스냅샷을 복사한 경로를 씁니다."""
+    root = str(tmp_path / "snapshots")
+    version = list_snapshots(snapshot_root)[-1]
+    shutil.copytree(os.path.join(snapshot_root, version), os.path.join(root, version))
+    monkeypatch.setattr(settings, "snapshot_directory", root)
+    return root
+
+
+def test_reload_switches_version_and_clears_caches(manager, snapshot_settings):
+    previous = manager.indexes
+    manager.update_products([{"GOODS_NO": "0000000007", "DSCNT_SALE_PRC": 5000}], [])
+    manager.set_cached_results("냉장고", "faiss", 10, {"items": []})
+
+    # 버전이 그대로이면 다시 만들지 않습니다.
+    assert manager.reload() is False
+    assert manager.index_version == f"{previous.version}+1"
+
+    add_snapshot(snapshot_settings, "99990101T000000.000000")
+    assert manager.reload() is True
+
+    indexes = manager.indexes
+    assert indexes.version == "99990101T000000.000000"
+    assert indexes.revision == 0
+    assert indexes.snapshot == os.path.join(snapshot_settings, "99990101T000000.000000")
+    assert len(manager.result_cache) == 0
+    assert manager.get_cached_results("냉장고", "faiss", 10) is None
+    # 새 스냅샷에는 이전 버전에 반영한 증분 업데이트가 없습니다.
+    assert manager.get_product("0000000007").metadata["DSCNT_SALE_PRC"] != 5000
+    # 리로드 전에 요청이 읽은 이전 버전은 그대로 검색할 수 있습니다.
+    assert previous.get_retriever("faiss").invoke("냉장고")
+
+    assert manager.reload(force=True) is True
+    assert manager.indexes is not indexes
+
+
+def test_failed_reload_keeps_previous_version(manager, snapshot_settings):
+    indexes = manager.indexes
+    broken = add_snapshot(snapshot_settings, "99990101T000000.000000")
+    os.remove(os.path.join(broken, FAISS_DIRECTORY, "index.faiss"))
+
+    assert manager.reload() is False
+    assert manager.indexes is indexes
+    status = manager.get_index_status()
+    assert status["version"] == indexes.version
+    assert status["failed_version"] == "99990101T000000.000000"
+    assert status["last_reload_error"]
+
+    # 다음 리로드가 성공하면 실패 기록을 지웁니다.
+    add_snapshot(snapshot_settings, "99990102T000000.000000")
+    assert manager.reload() is True
+    assert manager.get_index_status()["failed_version"] is None
+
+
+def test_intent_cache_keyed_by_snapshot_version():
+    calls = []
+    manager = object.__new__(IntentManager)
+    manager._initialized = True
+    manager._intent_cache_version = "test"
+    manager.intent_cache = LRUCache()
+    manager.intent_chain = RunnableLambda(lambda inputs: calls.append(inputs["query"]) or {"INTENTED_QUERY": inputs["query"]})
+
+    asyncio.run(manager.aget_intent("냉장고", "v1"))
+    asyncio.run(manager.aget_intent(" 냉장고 ", "v1"))
+    assert calls == ["냉장고"]
+    asyncio.run(manager.aget_intent("냉장고", "v2"))
+    assert calls == ["냉장고", "냉장고"]
+
+
+@pytest.fixture
+def admin_token(monkeypatch) -> str:
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    return "secret"
+
+
+def test_admin_token(client, admin_token, monkeypatch):
+    assert client.get("/admin/index").status_code == 403
+    assert client.get("/admin/index", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.get("/admin/index", headers={"X-Admin-Token": "secret"}).status_code == 404
+    assert client.post("/admin/products", json={"deletes": ["0000000007"]}).status_code == 404
+
+
+def test_admin_index_and_products(client, admin_token, manager):
+    headers = {"X-Admin-Token": admin_token}
+    status = client.get("/admin/index", headers=headers).json()
+    assert (status["version"], status["revision"], status["num_docs"]) == (manager.indexes.version, 0, 120)
+    assert "startup" in status
+
+    response = client.post("/admin/products", headers=headers, json={"deletes": ["0000000007"]})
+    assert response.status_code == 200
+    assert (response.json()["deleted"], response.json()["revision"]) == (1, 1)
+    assert manager.get_product("0000000007") is None
+
+    response = client.post("/admin/products", headers=headers, json={"upserts": [{"BRND_NM": "유니콘"}]})
+    assert response.status_code == 400
@@ -0,0 +1,57 @@
+"""core.hybrid_retriever.reciprocal_rank_fusion 순위 테스트"""
+
+import random
+
+import numpy as np
+import pytest
+from langchain.retrievers import EnsembleRetriever
+from langchain.schema import Document
+
+from core.hybrid_retriever import reciprocal_rank_fusion
+
+
+def ids(*values: int) -> np.ndarray:
+    return np.array(values, dtype=np.int64)
+
+
+def test_fixed_rankings():
+    # 3 과 2, 1 과 4 는 점수가 같으며 먼저 나온 순위 목록의 순서를 따릅니다.
+    assert reciprocal_rank_fusion([ids(3, 1, 2), ids(2, 4, 3)], [0.5, 0.5]) == [3, 2, 1, 4]
+
+
+def test_weights():
+    rankings = [ids(1, 2, 3), ids(3, 2, 1)]
+    assert reciprocal_rank_fusion(rankings, [0.9, 0.1]) == [1, 2, 3]
+    assert reciprocal_rank_fusion(rankings, [0.1, 0.9]) == [3, 2, 1]
+    # 가중치가 0 인 목록의 문서도 결과에 포함됩니다.
+    assert reciprocal_rank_fusion([ids(1), ids(2)], [1.0, 0.0]) == [1, 2]
+
+
+def test_documents_in_both_rankings_first():
+    assert reciprocal_rank_fusion([ids(1, 2, 3), ids(4, 5, 3)], [0.5, 0.5])[0] == 3
+
+
+def test_rrf_constant():
+    # c 가 크면 두 목록에 모두 있는 문서가, 작으면 한 목록의 1위 문서가 앞섭니다.
+    rankings = [ids(1, 2), ids(3, 4, 2)]
+    assert reciprocal_rank_fusion(rankings, [0.5, 0.5], c=60)[0] == 2
+    assert reciprocal_rank_fusion(rankings, [0.5, 0.5], c=0)[0] == 1
+
+
+def test_empty_rankings():
+    assert reciprocal_rank_fusion([ids(), ids()], [0.5, 0.5]) == []
+    assert reciprocal_rank_fusion([ids(), ids(7, 8)], [0.5, 0.5]) == [7, 8]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_ensemble_retriever(seed):
+    """문서 내용 대신 문서 번호로 합쳐도 EnsembleRetriever 의 가중 RRF 와 순서가 같습니다."""
+    rng = random.Random(seed)
+    rankings = [ids(*rng.sample(range(200), 50)), ids(*rng.sample(range(200), 30))]
+    weights = [0.3, 0.7]
+
+    retriever = EnsembleRetriever(retrievers=[], weights=weights, c=60)
+    expected = retriever.weighted_reciprocal_rank(
+        [[Document(page_content=str(doc_id)) for doc_id in ranking.tolist()] for ranking in rankings]
+    )
+    assert reciprocal_rank_fusion(rankings, weights) == [int(doc.page_content) for doc in expected]
@@ -0,0 +1,197 @@
+"""
+상품 증분 업데이트(SearchIndexes.updated, SearchEngineManager.update_products) 테스트.
+스텁 임베딩으로 만든 스냅샷(conftest.py)을 읽어, 바뀐 상품이 모든 검색기와 필터, 정렬에 반영되는지 확인합니다.
+"""
+
+from typing import List
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from core.document_store import DocumentStore
+from core.feature_table import ProductFeatureTable
+from core.vector_index import DeltaIndex
+from services.sort_service import SortService
+from utils.intent_cleaner import get_default_intent
+
+GOODS_NO = "0000000007"
+NEW_CONTENT = "상품명: 유니콘 레인보우 블렌더\n브랜드: 유니콘\n품목: 블렌더"
+RETRIEVER_TYPES = ("faiss", "bm25", "bm25_faiss_73", "bm25_faiss_37")
+
+
+def goods_nos(docs: List[Document]) -> List[str]:
+    return [doc.metadata["GOODS_NO"] for doc in docs]
+
+
+def search(indexes, retriever_type: str, query: str) -> List[str]:
+    return goods_nos(indexes.get_retriever(retriever_type).invoke(query))
+
+
+def prefiltered(indexes, query: str, filter_dict=None, k: int = 10) -> List[str]:
+    config = {"configurable": {"search_kwargs": {"k": k, "filter": filter_dict}}}
+    return goods_nos(indexes.get_retriever("configuable_faiss").invoke(query, config=config))
+
+
+def test_changed_content_is_searched(indexes):
+    updated, result = indexes.updated([{"GOODS_NO": GOODS_NO, "page_content": NEW_CONTENT}], [])
+
+    assert result["reindexed"] == 1
+    assert (updated.revision, updated.version) == (1, indexes.version)
+    assert updated.generation != indexes.generation
+    assert updated.get_product(GOODS_NO).page_content == NEW_CONTENT
+    for retriever_type in RETRIEVER_TYPES:
+        assert search(updated, retriever_type, NEW_CONTENT)[0] == GOODS_NO, retriever_type
+    assert prefiltered(updated, NEW_CONTENT)[0] == GOODS_NO
+
+    # 이전 버전은 바뀌지 않습니다.
+    previous = indexes.get_product(GOODS_NO).page_content
+    assert previous != NEW_CONTENT
+    assert search(indexes, "faiss", previous)[0] == GOODS_NO
+
+
+def test_snapshot_index_is_shared(indexes):
+    base = indexes.faiss_db.index
+    first, _ = indexes.updated([{"GOODS_NO": GOODS_NO, "page_content": NEW_CONTENT}], [])
+    second, _ = first.updated([], ["0000000008"])
+
+    assert isinstance(second.faiss_db.index, DeltaIndex)
+    assert second.faiss_db.index.base is base
+    assert first.faiss_db.index.ntotal == len(indexes.documents)
+    assert second.faiss_db.index.ntotal == len(indexes.documents) - 1
+
+
+def test_metadata_change_updates_filter_and_sort(indexes):
+    price_filter = {"DSCNT_SALE_PRC": {"$lte": 5000}}
+    assert prefiltered(indexes, "냉장고", price_filter) == []
+
+    # 판매상태 00 은 스냅샷에 없는 코드이며, 판매상태 오름차순이 정렬 1순위입니다.
+    updated, result = indexes.updated([{"GOODS_NO": GOODS_NO, "DSCNT_SALE_PRC": 5000, "SALE_STAT_CD": "00"}], [])
+
+    assert (result["updated"], result["reindexed"]) == (1, 0)
+    assert updated.faiss_db.index is indexes.faiss_db.index
+    assert prefiltered(updated, "냉장고", price_filter) == [GOODS_NO]
+    assert updated.get_product_rows([GOODS_NO])[GOODS_NO]["dscntSalePrc"] == 5000
+    assert updated.get_product(GOODS_NO).page_content == indexes.get_product(GOODS_NO).page_content
+
+    docs = [updated.get_product(f"{i:010d}") for i in range(20)]
+    ranked = SortService.sort_products(docs, 20, get_default_intent(""), updated.feature_table)
+    assert ranked[0].goods_no == GOODS_NO
+    ranked = SortService.sort_products(docs, 20, get_default_intent(""), indexes.feature_table)
+    assert ranked[0].goods_no != GOODS_NO
+
+
+def test_deleted_product_never_appears(indexes):
+    doc = indexes.get_product(GOODS_NO)
+    price = doc.metadata["DSCNT_SALE_PRC"]
+    updated, result = indexes.updated([], [GOODS_NO, "missing"])
+
+    assert (result["deleted"], result["not_found"]) == (1, ["missing"])
+    assert updated.get_product(GOODS_NO) is None
+    for retriever_type in RETRIEVER_TYPES:
+        assert GOODS_NO not in search(updated, retriever_type, doc.page_content), retriever_type
+    assert GOODS_NO not in prefiltered(updated, doc.page_content, k=len(indexes.documents))
+    assert GOODS_NO not in prefiltered(updated, doc.page_content, {"DSCNT_SALE_PRC": {"$eq": price}})
+    assert GOODS_NO not in updated.faiss_db.similarity_search(doc.page_content, k=10, filter={"BRND_NM": doc.metadata["BRND_NM"]})
+
+    # 삭제한 상품을 다시 추가하면 새 행에 들어갑니다.
+    restored, result = updated.updated([{"GOODS_NO": GOODS_NO, "page_content": NEW_CONTENT}], [])
+    assert result["inserted"] == 1
+    assert restored.feature_table.positions[GOODS_NO] == len(indexes.documents)
+    assert search(restored, "faiss", NEW_CONTENT)[0] == GOODS_NO
+
+
+def test_inserted_product(indexes):
+    row = {"GOODS_NO": "9999999999", "GOODS_NM": "유니콘 블렌더", "BRND_NM": "유니콘", "ARTC_NM": "블렌더", "DSCNT_SALE_PRC": 1000}
+    updated, result = indexes.updated([row], [])
+
+    assert result["inserted"] == 1
+    assert len(updated.documents) == len(indexes.documents) + 1
+    doc = updated.get_product("9999999999")
+    assert "유니콘 블렌더" in doc.page_content
+    assert search(updated, "faiss", doc.page_content)[0] == "9999999999"
+    assert prefiltered(updated, "블렌더", {"DSCNT_SALE_PRC": {"$lte": 1000}}) == ["9999999999"]
+    assert updated.keyword_intent_extractor.extract("유니콘 블렌더")["BRND_NM"] == "유니콘"
+    assert indexes.get_product("9999999999") is None
+
+
+def test_unchanged_and_invalid_rows(indexes):
+    doc = indexes.get_product(GOODS_NO)
+    updated, result = indexes.updated([{"GOODS_NO": GOODS_NO, "BRND_NM": doc.metadata["BRND_NM"]}], [])
+    assert updated is indexes
+    assert result["unchanged"] == 1
+
+    with pytest.raises(ValueError):
+        indexes.updated([{"BRND_NM": "유니콘"}], [])
+    with pytest.raises(ValueError):
+        indexes.updated([{"GOODS_NO": GOODS_NO}, {"GOODS_NO": GOODS_NO}], [])
+    with pytest.raises(ValueError):
+        indexes.updated([{"GOODS_NO": GOODS_NO}], [GOODS_NO])
+
+
+def test_document_store_updated(catalog):
+    store = DocumentStore.build(catalog)
+    changed = Document(page_content="새 문서", metadata={"GOODS_NO": "0000000003", "SALE_PRC": 1})
+    added = Document(page_content="추가 문서", metadata={"GOODS_NO": "9999999999"})
+    updated = store.updated({3: changed, len(catalog): added})
+
+    assert len(updated) == len(catalog) + 1
+    assert updated[3] == changed
+    assert updated[len(catalog)] == added
+    assert updated[4] == catalog[4]
+    # 원래 저장소는 바뀌지 않습니다.
+    assert len(store) == len(catalog)
+    assert store[3] == catalog[3]
+
+
+def test_feature_table_updated(catalog):
+    table = ProductFeatureTable(catalog)
+    changed = Document(page_content="", metadata={**catalog[3].metadata, "SALE_STAT_CD": "00", "SCH_KWD_NM": "#유니콘"})
+    added = Document(page_content="", metadata={**catalog[5].metadata, "GOODS_NO": "9999999999"})
+    rows = [3, len(catalog)]
+    updated = table.updated(rows, [changed, added], {3: catalog[3], 9: catalog[9]}, deleted=[9])
+
+    docs = list(catalog) + [added]
+    docs[3] = changed
+    expected = ProductFeatureTable(docs)
+    live = np.array([row for row in range(len(docs)) if row != 9])
+    for name in ("goods_no", "brnd_nm", "is_appliance", "mdl_lnch_dt", "sale_qty", "goods_no_key", "is_flagship_brand"):
+        assert np.array_equal(getattr(updated, name)[live], getattr(expected, name)[live]), name
+    for name in ("sale_stat_cd", "stat_sct_cd"):
+        assert np.array_equal(
+            updated.ordinal_values[name][getattr(updated, name)[live]],
+            expected.ordinal_values[name][getattr(expected, name)[live]],
+        ), name
+    assert np.array_equal(updated.hashtag_postings["유니콘"], [3])
+
+    assert updated.positions["9999999999"] == len(catalog)
+    assert catalog[9].metadata["GOODS_NO"] not in updated.positions
+    assert updated.lookup([catalog[9].metadata["GOODS_NO"]]) is None
+    # 원래 테이블은 바뀌지 않습니다.
+    assert len(table) == len(catalog)
+    assert catalog[9].metadata["GOODS_NO"] in table.positions
+    assert "유니콘" not in table.hashtag_postings
+
+
+def test_manager_update_products(manager):
+    indexes = manager.indexes
+    manager.set_cached_results("냉장고", "faiss", 10, {"items": []})
+    assert manager.get_cached_results("냉장고", "faiss", 10) is not None
+
+    result = manager.update_products([{"GOODS_NO": GOODS_NO, "page_content": NEW_CONTENT}], [])
+
+    assert (result["reindexed"], result["version"], result["revision"]) == (1, indexes.version, 1)
+    assert manager.indexes is not indexes
+    assert manager.index_version == f"{indexes.version}+1"
+    assert manager.get_index_status()["revision"] == 1
+    assert len(manager.result_cache) == 0
+    assert manager.get_product(GOODS_NO).page_content == NEW_CONTENT
+    # 요청이 시작할 때 읽은 이전 버전은 그대로입니다.
+    assert indexes.get_product(GOODS_NO).page_content != NEW_CONTENT
+
+    # 바뀐 상품이 없으면 버전과 캐시를 그대로 둡니다.
+    current = manager.indexes
+    manager.set_cached_results("냉장고", "faiss", 10, {"items": []})
+    manager.update_products([{"GOODS_NO": GOODS_NO, "page_content": NEW_CONTENT}], [])
+    assert manager.indexes is current
+    assert manager.get_cached_results("냉장고", "faiss", 10) is not None
@@ -0,0 +1,48 @@
+"""utils.intent_cleaner 의 가격/평점 조건 추출 테스트"""
+
+import pytest
+
+from utils.intent_cleaner import extract_price_range, extract_review_range
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("30만원", (0, 300000, "")),
+    ("20~30만원", (200000, 300000, "")),
+    ("냉장고 20~30만원", (200000, 300000, "냉장고")),
+    ("20만원-30만원 냉장고", (200000, 300000, "냉장고")),
+    ("30만원에서 50만원 사이 세탁기", (300000, 500000, "세탁기")),
+    ("100만원대 TV", (1000000, 1999999, "TV")),
+    ("150만원대 냉장고", (1500000, 1599999, "냉장고")),
+    ("20만원대", (200000, 299999, "")),
+    ("1.5만원대", (15000, 15999, "")),
+    # 이상/이하가 없는 가격은 예산(이하)으로 봅니다.
+    ("에어컨 30만원", (0, 300000, "에어컨")),
+    ("50만원 이상", (500000, 0, "")),
+    ("에어컨 200만원 미만", (0, 2000000, "에어컨")),
+    ("1,500,000원 이하", (0, 1500000, "")),
+    ("1.5만원", (0, 15000, "")),
+    ("3천원 이하", (0, 3000, "")),
+])
+def test_price_range(text, expected):
+    assert extract_price_range(text) == expected
+
+
+@pytest.mark.parametrize("text", ["4도어 냉장고", "16기가 노트북", "냉장고"])
+def test_numbers_without_price_unit(text):
+    assert extract_price_range(text) == (0, 0, text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("4점 이상", (4.0, 0.0, "")),
+    ("평점 4.5 이상 TV", (4.5, 0.0, "TV")),
+    ("평점이 4점 이상", (4.0, 0.0, "")),
+    ("별점 4점", (4.0, 0.0, "")),
+    ("리뷰 3.5점 이하", (0.0, 3.5, "")),
+])
+def test_review_range(text, expected):
+    assert extract_review_range(text) == expected
+
+
+@pytest.mark.parametrize("text", ["4도어", "4점", "냉장고"])
+def test_no_review_condition(text):
+    assert extract_review_range(text) == (0.0, 0.0, text)
@@ -0,0 +1,100 @@
+"""core.keyword_intent.KeywordIntentExtractor 규칙 기반 의도분석 테스트"""
+
+from typing import List
+
+import pytest
+from langchain.schema import Document
+
+from core.keyword_intent import KeywordIntentExtractor
+
+
+def doc(brand: str, article: str, lgrp_nm: str, cards: str = "") -> Document:
+    return Document(page_content="", metadata={
+        "BRND_NM": brand, "ARTC_NM": article, "LGRP_NM": lgrp_nm, "CARD_DC_NAME_LIST": cards,
+    })
+
+
+def catalog() -> List[Document]:
+    return [
+        doc("삼성전자", "일반냉장고", "생활가전", "삼성카드,현대카드"),
+        doc("삼성전자", "냉장고", "주방가전"),
+        doc("LG전자", "냉장고", "생활가전"),
+        doc("LG전자", "에어컨", "계절가전"),
+        doc("LG전자", "TV", "영상가전"),
+    ]
+
+
+@pytest.fixture
+def extractor() -> KeywordIntentExtractor:
+    return KeywordIntentExtractor(catalog())
+
+
+def test_brand_and_article(extractor):
+    intent = extractor.extract("삼성 냉장고")
+
+    assert intent["BRND_NM"] == "삼성전자"
+    assert intent["ARTC_NM"] == "냉장고"
+    # 품목이 가장 많이 속한 카테고리 순서
+    assert intent["LGRP_NM"] == ["생활가전", "주방가전"]
+    assert intent["INTENTED_QUERY"] == "삼성 냉장고"
+    assert intent["FEATURES"] == []
+    assert (intent["PRICE_GTE"], intent["PRICE_LTE"]) == (0, 0)
+
+
+def test_joined_query(extractor):
+    intent = extractor.extract("삼성냉장고")
+    assert (intent["BRND_NM"], intent["ARTC_NM"]) == ("삼성전자", "냉장고")
+
+
+def test_aliases_and_case(extractor):
+    assert extractor.extract("lg 에어컨")["BRND_NM"] == "LG전자"
+    assert extractor.extract("티비")["ARTC_NM"] == "TV"
+    # 카탈로그에 없는 브랜드의 별칭은 사용하지 않습니다.
+    assert "애플" not in extractor.brands
+
+
+def test_price_review_and_features(extractor):
+    intent = extractor.extract("LG 에어컨 인버터 30만원 이하")
+    assert intent["PRICE_LTE"] == 300000
+    assert intent["FEATURES"] == ["인버터"]
+    assert intent["INTENTED_QUERY"] == "LG 에어컨 인버터"
+
+    intent = extractor.extract("냉장고 20~30만원 평점 4.5 이상")
+    assert (intent["PRICE_GTE"], intent["PRICE_LTE"]) == (200000, 300000)
+    assert intent["REVIEW_GTE"] == 4.5
+    assert intent["INTENTED_QUERY"] == "냉장고"
+
+
+def test_cards(extractor):
+    intent = extractor.extract("냉장고 현대카드")
+    assert intent["CARD_DC_NMS"] == ["현대카드"]
+    assert intent["FEATURES"] == []
+
+
+@pytest.mark.parametrize("query", ["인버터", "조용한 제품", "LG 에어컨 인버터 저소음 무풍"])
+def test_falls_back_to_llm(extractor, query):
+    # 브랜드/품목이 없거나 사전에 없는 단어가 많으면 None 을 반환하여 LLM 으로 분석합니다.
+    assert extractor.extract(query) is None
+
+
+def test_save_and_load(tmp_path, extractor):
+    path = str(tmp_path / "keyword_intent.json")
+    extractor.save(path)
+    loaded = KeywordIntentExtractor.load(path)
+
+    for query in ("삼성냉장고", "lg 에어컨 인버터 30만원 이하", "냉장고 현대카드", "인버터"):
+        assert loaded.extract(query) == extractor.extract(query)
+    assert KeywordIntentExtractor.load(str(tmp_path / "missing.json")) is None
+
+
+def test_extended(extractor):
+    extended = extractor.extended(
+        [doc("다이슨", "청소기", "생활가전"), doc("LG전자", "냉장고", "주방가전")],
+        removed=[catalog()[2]],
+    )
+
+    assert extended.extract("다이슨 청소기")["BRND_NM"] == "다이슨"
+    assert extended.extract("냉장고")["LGRP_NM"] == ["주방가전", "생활가전"]
+    # 원래 추출기는 바뀌지 않습니다.
+    assert extractor.extract("다이슨 청소기") is None
+    assert extractor.extract("냉장고")["LGRP_NM"] == ["생활가전", "주방가전"]
@@ -0,0 +1,137 @@
+"""core.metadata_index.MetadataIndex 비트맵 변환 테스트. LangChain FAISS 필터 함수와 같은 문서를 고르는지 확인합니다."""
+
+import random
+from typing import Dict, List
+
+import faiss
+import numpy as np
+import pytest
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+
+from core.metadata_index import MetadataIndex
+from core.vector_index import search_parameters
+
+LGRP = ["생활가전", "음향가전", "주방가전", "계절가전"]
+MGRP = ["냉장고", "세탁기", "이어폰", "스피커", "에어컨", "선풍기"]
+
+FILTERS = [
+    {},
+    {"LGRP_NM": {"$in": ["생활가전", "주방가전"]}},
+    {"LGRP_NM": {"$in": ["없는분류"]}},
+    {"LGRP_NM": "음향가전"},
+    {"LGRP_NM": {"$nin": ["음향가전"]}, "MGRP_NM": {"$neq": "냉장고"}},
+    {"MGRP_NM": {"$eq": "에어컨"}},
+    {"DSCNT_SALE_PRC": {"$gte": 200000}},
+    {"DSCNT_SALE_PRC": {"$gte": 200000, "$lte": 300000}},
+    {"DSCNT_SALE_PRC": {"$gt": 200000, "$lt": 300000}},
+    {"DSCNT_SALE_PRC": {"$eq": 250000}},
+    {"GDAS_SCR_SUM": {"$gte": 4}},
+    {"LGRP_NM": {"$in": ["생활가전"]}, "MGRP_NM": {"$in": ["냉장고", "세탁기"]}, "DSCNT_SALE_PRC": {"$lte": 500000}},
+    {"$and": [{"LGRP_NM": {"$in": ["계절가전"]}}, {"GDAS_SCR_SUM": {"$gte": 3, "$lte": 4.5}}]},
+    {"$or": [{"MGRP_NM": "이어폰"}, {"DSCNT_SALE_PRC": {"$lt": 100000}}]},
+    {"$not": {"LGRP_NM": {"$in": ["생활가전"]}}},
+]
+
+
+def make_docs(num_docs: int, seed: int = 0) -> List[Document]:
+    rng = random.Random(seed)
+    return [
+        Document(page_content=f"상품 {i}", metadata={
+            "GOODS_NO": f"{i:010d}",
+            "LGRP_NM": rng.choice(LGRP),
+            "MGRP_NM": rng.choice(MGRP),
+            # 같은 값이 여러 개 있도록 만원 단위로 만듭니다.
+            "DSCNT_SALE_PRC": rng.randint(5, 80) * 10000,
+            "GDAS_SCR_SUM": rng.choice([1, 2, 3, 3.5, 4, 4.5, 5]),
+        })
+        for i in range(num_docs)
+    ]
+
+
+def expected_rows(docs: List[Document], filter_dict: Dict) -> List[int]:
+    predicate = FAISS._create_filter_func(filter_dict)
+    return [row for row, doc in enumerate(docs) if predicate(doc.metadata)]
+
+
+def bitmap_rows(index: MetadataIndex, bitmap: np.ndarray) -> List[int]:
+    return np.flatnonzero(np.unpackbits(bitmap, count=index.size, bitorder="little")).tolist()
+
+
+@pytest.fixture(scope="module")
+def docs() -> List[Document]:
+    # 8 의 배수가 아닌 크기로 마지막 바이트의 패딩 비트도 확인합니다.
+    return make_docs(203)
+
+
+@pytest.mark.parametrize("filter_dict", FILTERS)
+def test_bitmap_matches_filter_predicate(docs, filter_dict):
+    index = MetadataIndex(docs)
+    bitmap = index.to_bitmap(filter_dict)
+
+    assert bitmap.dtype == np.uint8 and len(bitmap) == (len(docs) + 7) // 8
+    assert bitmap_rows(index, bitmap) == expected_rows(docs, filter_dict)
+    assert index.count(bitmap) == len(expected_rows(docs, filter_dict))
+
+
+@pytest.mark.parametrize("filter_dict", [
+    {"PRODUCT_NM": {"$in": ["냉장고"]}},
+    {"DSCNT_SALE_PRC": {"$ne": 10000}},
+    {"DSCNT_SALE_PRC": 10000},
+    {"$and": [{"LGRP_NM": "음향가전"}, {"UNKNOWN": 1}]},
+])
+def test_unsupported_filter(docs, filter_dict):
+    assert MetadataIndex(docs).to_bitmap(filter_dict) is None
+
+
+def test_non_numeric_values_never_match():
+    docs = make_docs(10)
+    docs[2].metadata["DSCNT_SALE_PRC"] = None
+    docs[5].metadata["DSCNT_SALE_PRC"] = "가격문의"
+    index = MetadataIndex(docs)
+
+    rows = bitmap_rows(index, index.to_bitmap({"DSCNT_SALE_PRC": {"$gte": 0}}))
+    assert rows == [row for row in range(10) if row not in (2, 5)]
+
+
+def test_idselector_bitmap_bit_order(docs):
+    """비트맵 비트 순서(little)가 faiss.IDSelectorBitmap 과 같아, FAISS 가 조건에 맞는 문서만 반환합니다."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((len(docs), 8)).astype(np.float32)
+    faiss_index = faiss.IndexFlatL2(8)
+    faiss_index.add(vectors)
+    index = MetadataIndex(docs)
+
+    for filter_dict in FILTERS:
+        bitmap = index.to_bitmap(filter_dict)
+        expected = expected_rows(docs, filter_dict)
+        selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+        _, indices = faiss_index.search(vectors[:1], len(docs), params=search_parameters(faiss_index, selector))
+        ids = indices[0]
+        assert sorted(ids[ids >= 0].tolist()) == expected
+        assert all(selector.is_member(row) == (row in set(expected)) for row in range(len(docs)))
+
+
+def test_updated_matches_rebuild(docs):
+    index = MetadataIndex(docs)
+    changed = make_docs(3, seed=1)
+    rows = [4, 100, len(docs)]  # 마지막은 새 행
+    updated = index.updated(rows, changed, deleted=[7, 150])
+
+    new_docs = list(docs) + [changed[2]]
+    new_docs[4], new_docs[100] = changed[0], changed[1]
+    for filter_dict in FILTERS:
+        expected = [row for row in expected_rows(new_docs, filter_dict) if row not in (7, 150)]
+        assert bitmap_rows(updated, updated.to_bitmap(filter_dict)) == expected
+        # 원래 색인은 바뀌지 않습니다.
+        assert bitmap_rows(index, index.to_bitmap(filter_dict)) == expected_rows(docs, filter_dict)
+
+
+def test_save_and_load(tmp_path, docs):
+    index = MetadataIndex(docs, fingerprint="abc")
+    index.save(str(tmp_path))
+    loaded = MetadataIndex.load(str(tmp_path))
+
+    assert loaded.size == index.size and loaded.fingerprint == "abc"
+    for filter_dict in FILTERS:
+        assert np.array_equal(loaded.to_bitmap(filter_dict), index.to_bitmap(filter_dict))
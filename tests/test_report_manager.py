@@ -0,0 +1,97 @@
+"""core.report_manager.ReportManager.aget_reports 묶음 호출 테스트. LLM 체인 대신 RunnableLambda 를 사용합니다."""
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from core.report_manager import ReportManager
+from utils.cache import LRUCache
+
+
+def requested_goods(context: str) -> List[str]:
+    return [line[len("[상품번호: "):-1] for line in context.splitlines() if line.startswith("[상품번호: ")]
+
+
+def make_manager(batch, single=None) -> ReportManager:
+    # 싱글턴을 건드리지 않도록 새 객체를 만듭니다.
+    manager = object.__new__(ReportManager)
+    manager._initialized = True
+    manager._report_cache_version = "test"
+    manager.report_cache = LRUCache()
+    manager.batch_report_chain = RunnableLambda(batch)
+    manager.report_chain = RunnableLambda(single or (lambda inputs: {"recommendation": f"단건 {inputs['context']}"}))
+    return manager
+
+
+@pytest.fixture
+def contexts() -> Dict[str, str]:
+    return {f"{i:03d}": f"상품{i}" for i in range(5)}
+
+
+@pytest.fixture(autouse=True)
+def batch_size(monkeypatch):
+    monkeypatch.setattr("core.report_manager.settings.report_batch_size", 2)
+
+
+def test_batches(contexts):
+    calls = []
+
+    def batch(inputs):
+        goods = requested_goods(inputs["context"])
+        calls.append(goods)
+        return {"reports": [{"goodsNo": goods_no, "recommendation": f"묶음 {goods_no}"} for goods_no in goods]}
+
+    manager = make_manager(batch)
+    reports = asyncio.run(manager.aget_reports("검색어", contexts, "v1"))
+
+    assert reports == {goods_no: f"묶음 {goods_no}" for goods_no in contexts}
+    assert calls == [["000", "001"], ["002", "003"], ["004"]]
+    # 캐시된 상품은 다시 요청하지 않습니다.
+    asyncio.run(manager.aget_reports("검색어", contexts, "v1"))
+    assert len(calls) == 3
+    # 스냅샷 버전이 바뀌면 새로 만듭니다.
+    asyncio.run(manager.aget_reports("검색어", contexts, "v2"))
+    assert len(calls) == 6
+
+
+def test_unrequested_goods_are_dropped(contexts):
+    def batch(inputs):
+        goods = requested_goods(inputs["context"])
+        # 첫 상품은 빠뜨리고, 다른 묶음의 상품과 없는 상품을 섞어 응답합니다.
+        return {"reports": [{"goodsNo": goods_no, "recommendation": f"묶음 {goods_no}"} for goods_no in goods[1:] + ["004", "999"]]}
+
+    reports = asyncio.run(make_manager(batch).aget_reports("검색어", contexts))
+
+    assert "999" not in reports
+    # 요청하지 않은 묶음의 응답은 쓰지 않고, 빠진 상품은 단건으로 보완합니다.
+    assert reports == {
+        "000": "단건 상품0", "001": "묶음 001", "002": "단건 상품2", "003": "묶음 003", "004": "묶음 004",
+    }
+
+
+def test_failed_batch_is_isolated(contexts):
+    def batch(inputs):
+        goods = requested_goods(inputs["context"])
+        if "002" in goods:
+            raise RuntimeError("LLM 오류")
+        return {"reports": [{"goodsNo": goods_no, "recommendation": f"묶음 {goods_no}"} for goods_no in goods]}
+
+    def single(inputs):
+        if inputs["context"] == "상품3":
+            raise RuntimeError("LLM 오류")
+        return {"recommendation": f"단건 {inputs['context']}"}
+
+    reports = asyncio.run(make_manager(batch, single).aget_reports("검색어", contexts))
+
+    # 실패한 묶음의 상품은 단건으로 다시 만들고, 단건도 실패한 상품만 빠집니다.
+    assert reports == {"000": "묶음 000", "001": "묶음 001", "002": "단건 상품2", "004": "묶음 004"}
+
+
+def test_all_failed_raises(contexts):
+    def fail(inputs):
+        raise RuntimeError("LLM 오류")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(make_manager(fail, fail).aget_reports("검색어", contexts))
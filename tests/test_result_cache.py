@@ -0,0 +1,83 @@
+"""검색 결과 캐시(SearchService.search)와 캐시된 정렬 결과의 페이지네이션 테스트"""
+
+import asyncio
+
+import pytest
+
+from services.pagination_service import PaginationService
+from services.search_service import SearchService
+
+
+@pytest.fixture
+def pipeline_calls(monkeypatch):
+    """검색 파이프라인 실행 횟수를 셉니다."""
+    calls = []
+    run_pipeline = SearchService.run_pipeline
+
+    async def counted(query, retriever_type, *args, **kwargs):
+        calls.append((query, retriever_type))
+        return await run_pipeline(query, retriever_type, *args, **kwargs)
+
+    monkeypatch.setattr(SearchService, "run_pipeline", staticmethod(counted))
+    return calls
+
+
+def test_paginate():
+    items = list(range(23))
+    assert PaginationService.paginate(items, 1, 10) == {
+        'items': list(range(10)), 'total_count': 23, 'total_pages': 3, 'current_page': 1, 'page_size': 10,
+    }
+    assert PaginationService.paginate(items, 3, 10)['items'] == [20, 21, 22]
+    assert PaginationService.paginate(items, 4, 10)['items'] == []
+    assert PaginationService.paginate([], 1, 10)['total_pages'] == 0
+
+
+def test_pages_served_from_cache(client, pipeline_calls):
+    params = {"query": "삼성 냉장고 추천", "retriever_type": "faiss", "pageSize": 5}
+    first = client.get("/search", params=params).json()
+    second = client.get("/search", params={**params, "page": 2}).json()
+
+    # 다음 페이지는 검색 없이 캐시된 정렬 결과를 잘라서 반환합니다.
+    assert pipeline_calls == [("삼성 냉장고 추천", "faiss")]
+    assert (second["page"], second["total_count"], second["total_pages"]) == (2, first["total_count"], first["total_pages"])
+    assert (second["intent"], second["filter"]) == (first["intent"], first["filter"])
+
+    whole = client.get("/search", params={**params, "pageSize": 10}).json()
+    assert whole["products"] == first["products"] + second["products"]
+    assert len(pipeline_calls) == 1
+
+
+def test_cache_key(manager, pipeline_calls):
+    def search(query, retriever_type="bm25_faiss_73", bm25_weight=None):
+        return asyncio.run(SearchService.search(query, retriever_type, 100, bm25_weight))
+
+    first = search("LG 에어컨")
+    assert first["cached"] is False
+    # 공백과 대소문자만 다른 검색어는 같은 결과를 씁니다.
+    cached = search("  lg   에어컨 ")
+    assert cached["cached"] is True
+    assert cached["items"] == first["items"]
+    assert len(pipeline_calls) == 1
+
+    # 검색 방식과 하이브리드 가중치가 다르면 따로 캐시합니다.
+    assert search("LG 에어컨", "faiss")["cached"] is False
+    assert search("LG 에어컨", bm25_weight=0.2)["cached"] is False
+    assert search("LG 에어컨", bm25_weight=0.2)["cached"] is True
+    # 하이브리드가 아닌 검색 방식은 가중치를 무시합니다.
+    assert search("LG 에어컨", "faiss", bm25_weight=0.2)["cached"] is True
+    assert len(pipeline_calls) == 3
+
+
+def test_cache_keyed_by_index_version(manager):
+    entry = {"intent": {}, "filter": {}, "items": [], "intent_path": "none"}
+    manager.set_cached_results("냉장고", "faiss", 100, entry, "old-version")
+
+    assert manager.get_cached_results("냉장고", "faiss", 100, "old-version") == entry
+    # 리로드 전에 시작한 요청이 저장한 결과는 새 버전에서 쓰지 않습니다.
+    assert manager.get_cached_results("냉장고", "faiss", 100) is None
+    assert manager.get_cached_results("냉장고", "faiss", 10, "old-version") is None
+
+    manager.set_cached_results("냉장고", "faiss", 100, entry, manager.indexes.generation)
+    assert manager.get_cached_results("냉장고", "faiss", 100) == entry
+    manager.invalidate_caches()
+    assert manager.get_cached_results("냉장고", "faiss", 100) is None
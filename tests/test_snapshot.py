@@ -0,0 +1,99 @@
+"""core.snapshot 버전별 스냅샷 관리와 scripts.build_snapshot 스냅샷 구성 테스트"""
+
+import os
+import socket
+
+import pytest
+
+from core.snapshot import (
+    BUILDING_SUFFIX, IN_USE_DIRECTORY, MANIFEST_FILE,
+    in_use_versions, latest_snapshot, list_snapshots, mark_in_use, new_snapshot_version, prune_snapshots,
+    publish_snapshot, read_manifest,
+)
+
+
+def make_snapshot(root: str, version: str) -> str:
+    building = os.path.join(root, version + BUILDING_SUFFIX)
+    os.makedirs(building)
+    return publish_snapshot(building, {"version": version})
+
+
+def test_build_snapshot_layout(snapshot_root, catalog):
+    snapshot = latest_snapshot(snapshot_root)
+    assert sorted(os.listdir(snapshot)) == [
+        "bm25", "documents", "faiss", "features", "keyword_intent.json", MANIFEST_FILE, "metadata",
+    ]
+    assert os.path.isfile(os.path.join(snapshot, "faiss", "index.faiss"))
+
+    manifest = read_manifest(snapshot)
+    assert manifest["version"] == os.path.basename(snapshot)
+    assert (manifest["num_docs"], manifest["dimension"], manifest["index_type"]) == (len(catalog), 64, "flat")
+    assert (manifest["embedding_model"], manifest["source"]) == ("stub", "test")
+    # 빌드가 끝나면 만들던 디렉터리와 임베딩 체크포인트가 남지 않습니다.
+    assert [name for name in os.listdir(snapshot_root) if name.startswith(".checkpoint") or name.endswith(BUILDING_SUFFIX)] == []
+
+
+def test_latest_snapshot_ignores_incomplete(tmp_path):
+    root = str(tmp_path)
+    assert latest_snapshot(root) is None
+    assert list_snapshots(str(tmp_path / "missing")) == []
+
+    make_snapshot(root, "20250101T000000")
+    make_snapshot(root, "20250102T000000.000000")
+    # 만들고 있는 스냅샷과 manifest.json 이 없는 디렉터리는 읽지 않습니다.
+    os.makedirs(tmp_path / ("20250103T000000.000000" + BUILDING_SUFFIX))
+    os.makedirs(tmp_path / "20250104T000000.000000")
+
+    assert list_snapshots(root) == ["20250101T000000", "20250102T000000.000000"]
+    assert latest_snapshot(root) == os.path.join(root, "20250102T000000.000000")
+
+
+def test_new_versions_are_unique_and_ordered():
+    versions = [new_snapshot_version() for _ in range(100)]
+    assert len(set(versions)) == len(versions)
+    assert versions == sorted(versions)
+    # 초 단위 버전보다 뒤에 옵니다.
+    assert versions[0] > versions[0].split(".")[0]
+
+
+def test_prune_keeps_recent_and_in_use(tmp_path):
+    root = str(tmp_path)
+    versions = [f"2025010{day}T000000.000000" for day in range(1, 6)]
+    for version in versions:
+        make_snapshot(root, version)
+    mark_in_use(os.path.join(root, versions[0]))
+
+    assert in_use_versions(root) == {versions[0]}
+    assert prune_snapshots(root, keep=2) == versions[1:3]
+    assert list_snapshots(root) == [versions[0]] + versions[3:]
+    assert prune_snapshots(root, keep=0) == []
+
+
+def test_in_use_markers(tmp_path):
+    root = str(tmp_path)
+    for version in ("20250101T000000", "20250102T000000", "20250103T000000"):
+        make_snapshot(root, version)
+    # 프로세스마다 마지막으로 읽은 버전 하나만 남습니다.
+    mark_in_use(os.path.join(root, "20250101T000000"))
+    mark_in_use(os.path.join(root, "20250102T000000"))
+    assert in_use_versions(root) == {"20250102T000000"}
+
+    markers = tmp_path / IN_USE_DIRECTORY
+    # 같은 호스트에서 종료한 프로세스의 기록은 지우고, 다른 호스트의 기록은 그대로 씁니다.
+    # 리눅스 PID 최댓값(2^22)보다 큰 번호는 실행 중일 수 없습니다.
+    dead = markers / f"{socket.gethostname()}-{2 ** 22 + 1}"
+    dead.write_text("20250101T000000")
+    (markers / "other-host-123").write_text("20250103T000000")
+
+    assert in_use_versions(root) == {"20250102T000000", "20250103T000000"}
+    assert not dead.exists()
+
+
+@pytest.mark.parametrize("keep", [1, 3])
+def test_prune_without_markers(tmp_path, keep):
+    root = str(tmp_path)
+    versions = [f"2025010{day}T000000" for day in range(1, 4)]
+    for version in versions:
+        make_snapshot(root, version)
+    assert prune_snapshots(root, keep) == versions[:-keep]
+    assert list_snapshots(root) == versions[-keep:]
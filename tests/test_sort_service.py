@@ -0,0 +1,90 @@
+"""services.sort_service.SortService 정렬 결과 레코드 테스트. 입력 문서를 수정하지 않는지 확인합니다."""
+
+import copy
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.feature_table import ProductFeatureTable
+from services.sort_service import RankedResult, SortService
+
+INTENTS = [
+    {"BRND_NM": "삼성전자", "ARTC_NM": "냉장고", "FEATURES": ["대용량", "저소음"], "CARD_DC_NMS": ["신한카드"]},
+    {"BRND_NM": "LG전자", "ARTC_NM": "에어컨", "FEATURES": ["인버터"], "CARD_DC_NMS": []},
+    {},
+]
+
+
+@pytest.fixture(scope="module")
+def feature_table(catalog) -> ProductFeatureTable:
+    return ProductFeatureTable(catalog)
+
+
+def scored(catalog):
+    """유사도 점수가 붙은 검색 결과 (catalog 순서가 유사도 순위)"""
+    return [(doc, 1.0 - i / len(catalog)) for i, doc in enumerate(catalog)]
+
+
+def sort_key(result: RankedResult):
+    return result.goods_no, result.similarity_rank, result.weight, result.scores
+
+
+@pytest.mark.parametrize("intent", INTENTS)
+def test_sort_does_not_mutate_documents(catalog, feature_table, intent):
+    before = copy.deepcopy(catalog)
+    results = SortService.sort_products(scored(catalog), 10, intent, feature_table)
+
+    assert catalog == before
+    assert sorted(result.goods_no for result in results) == sorted(doc.metadata["GOODS_NO"] for doc in catalog)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        results[0].weight = 0.0
+
+
+def test_ranked_result_fields(catalog, feature_table):
+    docs = scored(catalog)
+    results = SortService.sort_products(docs, 10, INTENTS[0], feature_table)
+
+    for result in results:
+        doc, score = docs[result.similarity_rank - 1]
+        assert result.goods_no == doc.metadata["GOODS_NO"]
+        assert result.position == feature_table.positions[result.goods_no]
+        assert result.similarity_score == score
+        assert result.weight == pytest.approx(sum(result.scores))
+        assert result.weight_analysis() == (
+            "기본:{}, 랭킹:{}, 브랜드:{}, 품목:{}, 해시태그:{}, 특징:{}, 할인카드:{}".format(*result.scores)
+        )
+
+    # 판매중(01) 상품이 품절(02) 상품보다 먼저 나옵니다.
+    sale_stat = [catalog[result.position].metadata["SALE_STAT_CD"] for result in results]
+    assert sale_stat == sorted(sale_stat)
+
+
+def test_sort_without_feature_table(catalog, feature_table):
+    """피처 테이블에 없는 상품이 있으면 후보 문서로 만든 임시 테이블로 같은 순서를 계산합니다."""
+    docs = scored(catalog[:30])
+    expected = SortService.sort_products(docs, 10, INTENTS[0], feature_table)
+
+    for table in (None, ProductFeatureTable(catalog[30:])):
+        results = SortService.sort_products(docs, 10, INTENTS[0], table)
+        assert [result.position for result in results] == [-1] * len(docs)
+        assert [sort_key(result) for result in results] == [sort_key(result) for result in expected]
+
+    # 점수 없는 문서는 유사도 점수 0 입니다.
+    results = SortService.sort_products(catalog[:5], 10, {}, feature_table)
+    assert {result.similarity_score for result in results} == {0.0}
+    assert SortService.sort_products([], 10, {}, feature_table) == []
+
+
+def test_concurrent_sorts_are_independent(catalog, feature_table):
+    docs = scored(catalog)
+    expected = [SortService.sort_products(docs, 10, intent, feature_table) for intent in INTENTS]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(
+            lambda i: SortService.sort_products(docs, 10, INTENTS[i % len(INTENTS)], feature_table), range(30)
+        ))
+    for i, result in enumerate(results):
+        assert result == expected[i % len(INTENTS)]
+    # 의도가 다르면 가중치와 순서가 다릅니다.
+    assert expected[0] != expected[1]
@@ -0,0 +1,108 @@
+"""
+추측 검색(의도분석 중 원본 검색어로 미리 가져온 후보) 재사용 테스트.
+PrefilteredFaissRetriever.refilter 가 필터를 적용한 정확한 상위 k 개를 반환하는지와 SearchService.reuse_speculation 의 판단을 확인합니다.
+"""
+
+import asyncio
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from core.config import settings
+from core.prefiltered_retriever import search_faiss_ids
+from services.search_service import SearchService
+from utils import metrics
+
+QUERY = "삼성전자 냉장고 대용량"
+CATEGORY_FILTER = {"LGRP_NM": {"$in": ["냉장고·주방가전"]}}
+
+
+def goods_nos(docs) -> List[str]:
+    return [doc.metadata["GOODS_NO"] for doc in docs]
+
+
+def ranked_ids(indexes, query: str, k: int) -> np.ndarray:
+    return search_faiss_ids(indexes.faiss_db, indexes.embeddings.embed_query(query), k)
+
+
+def prefiltered(indexes, query: str, filter_dict, k: int) -> List[str]:
+    config = {"configurable": {"search_kwargs": {"k": k, "filter": filter_dict}}}
+    return goods_nos(indexes.get_retriever("configuable_faiss").invoke(query, config=config))
+
+
+def speculation_counts() -> Dict[str, float]:
+    return {key[0]: value for key, value in metrics.SPECULATION_REQUESTS.state()}
+
+
+def test_refilter_without_filter(indexes):
+    candidates = ranked_ids(indexes, QUERY, 50)
+    retriever = indexes.prefiltered_faiss_retriever
+    expected = [indexes.documents[i] for i in candidates[:10].tolist()]
+    assert retriever.refilter(candidates, None, 10) == expected
+    assert retriever.refilter(candidates, {}, 10) == expected
+
+
+@pytest.mark.parametrize("filter_dict", [
+    CATEGORY_FILTER,
+    {"DSCNT_SALE_PRC": {"$lte": 500000}},
+    {"$and": [CATEGORY_FILTER, {"GDAS_SCR_SUM": {"$gte": 4}}]},
+])
+def test_refilter_matches_prefiltered_search(indexes, filter_dict):
+    candidates = ranked_ids(indexes, QUERY, len(indexes.documents))
+    docs = indexes.prefiltered_faiss_retriever.refilter(candidates, filter_dict, 10)
+    assert goods_nos(docs) == prefiltered(indexes, QUERY, filter_dict, 10)
+
+
+def test_refilter_not_enough_candidates(indexes):
+    retriever = indexes.prefiltered_faiss_retriever
+    # 후보 밖에도 조건에 맞는 문서가 있으면 정확한 상위 k 개를 알 수 없습니다.
+    assert retriever.refilter(ranked_ids(indexes, QUERY, 5), CATEGORY_FILTER, 10) is None
+    # 색인으로 변환할 수 없는 필터
+    assert retriever.refilter(ranked_ids(indexes, QUERY, 50), {"BRND_NM": "삼성전자"}, 10) is None
+
+    # 조건에 맞는 문서가 모두 후보 안에 있으면 k 개보다 적어도 그대로 반환합니다.
+    price_filter = {"DSCNT_SALE_PRC": {"$lte": 20000}}
+    matched = prefiltered(indexes, QUERY, price_filter, 10)
+    assert 0 < len(matched) < 10
+    docs = retriever.refilter(ranked_ids(indexes, QUERY, len(indexes.documents)), price_filter, 10)
+    assert goods_nos(docs) == matched
+
+
+def run_reuse(indexes, candidates, query: str, intented_query: str, filter_dict: Dict, k: int = 10):
+    async def speculation():
+        if isinstance(candidates, Exception):
+            raise candidates
+        return candidates
+
+    return asyncio.run(SearchService.reuse_speculation(speculation(), query, intented_query, filter_dict, k, indexes))
+
+
+def test_reuse_speculation(indexes):
+    candidates = ranked_ids(indexes, QUERY, len(indexes.documents))
+    before = speculation_counts()
+
+    docs = run_reuse(indexes, candidates, QUERY, QUERY, CATEGORY_FILTER)
+    assert goods_nos(docs) == prefiltered(indexes, QUERY, CATEGORY_FILTER, 10)
+    assert run_reuse(indexes, RuntimeError("검색 실패"), QUERY, QUERY, {}) is None
+    assert run_reuse(indexes, candidates, QUERY, "다이슨 무선 청소기", {}) is None
+    assert run_reuse(indexes, candidates[:5], QUERY, QUERY, CATEGORY_FILTER) is None
+
+    after = speculation_counts()
+    for result in ("reused", "failed", "low_overlap", "filter_miss"):
+        assert after[result] == before.get(result, 0) + 1, result
+
+
+def test_pipeline_reuses_speculation(monkeypatch, manager, intent_manager):
+    query = "조용하고 전기요금 적게 나오는 냉장고 추천해주세요"
+    monkeypatch.setattr(settings, "speculative_retrieval", False)
+    expected = asyncio.run(SearchService.run_pipeline(query, "intent_with_llm", 10))
+
+    monkeypatch.setattr(settings, "speculative_retrieval", True)
+    monkeypatch.setattr(settings, "speculative_fetch_k", len(manager.indexes.documents))
+    before = speculation_counts().get("reused", 0)
+    result = asyncio.run(SearchService.run_pipeline(query, "intent_with_llm", 10))
+
+    assert result["intent_path"] == "llm"
+    assert speculation_counts()["reused"] == before + 1
+    assert [item.goods_no for item in result["results"]] == [item.goods_no for item in expected["results"]]
@@ -0,0 +1,49 @@
+"""core.startup.StartupManager 서버 시작 단계와 단계별 상태 테스트"""
+
+import pytest
+
+from core.intent_manager import IntentManager
+from core.report_manager import ReportManager
+from core.search_engine import SearchEngineManager
+from core.startup import StartupManager
+
+
+@pytest.fixture
+def startup(monkeypatch, snapshot_settings, stub_openai) -> StartupManager:
+    """초기화하지 않은 매니저 싱글톤으로 시작하는 새 시작 단계 싱글톤"""
+    for cls in (StartupManager, SearchEngineManager, IntentManager, ReportManager):
+        monkeypatch.setattr(cls, "_instance", None)
+    return StartupManager()
+
+
+def states(startup: StartupManager) -> dict:
+    return {stage: status["state"] for stage, status in startup.status().items()}
+
+
+def test_stages(startup):
+    assert set(states(startup).values()) == {"pending"}
+
+    startup.wait(tokenizer=False)
+    # 형태소 분석기는 처음 사용할 때 불러옵니다.
+    assert states(startup) == {"search": "done", "intent": "done", "report": "done", "bm25": "done", "tokenizer": "deferred"}
+    assert all(status["elapsed"] >= 0 for stage, status in startup.status().items() if stage != "tokenizer")
+
+    # BM25 단계는 검색 색인을 읽은 뒤 하이브리드 검색기를 구성합니다.
+    indexes = SearchEngineManager().indexes
+    assert indexes.bm25_loaded and indexes.bm25_retriever is not None
+    assert IntentManager()._initialized and ReportManager()._initialized
+
+
+def test_failed_stage(monkeypatch, startup):
+    def fail(self):
+        raise RuntimeError("리포트 모델 없음")
+
+    monkeypatch.setattr(ReportManager, "initialize", fail)
+    startup.wait(tokenizer=False)
+
+    # 실패한 단계가 있어도 나머지 단계는 끝까지 실행합니다.
+    status = startup.status()
+    assert status["report"]["state"] == "failed"
+    assert status["report"]["error"] == "리포트 모델 없음"
+    assert [status[stage]["state"] for stage in ("search", "intent", "bm25")] == ["done"] * 3
+    assert not ReportManager()._initialized
@@ -0,0 +1,77 @@
+"""services.stream_service.StreamService 와 /search/stream 스트리밍 응답 테스트"""
+
+import json
+from typing import List, Tuple
+
+import pytest
+
+from services.search_service import SearchService
+from services.stream_service import StreamService
+
+
+def parse_ndjson(body: str) -> List[Tuple[str, dict]]:
+    return [(line["event"], line["data"]) for line in map(json.loads, body.splitlines())]
+
+
+def parse_sse(body: str) -> List[Tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_format_event():
+    data = {"text": "냉장고\n추천"}
+    assert StreamService.format_event("delta", data, "ndjson") == '{"event": "delta", "data": {"text": "냉장고\\n추천"}}\n'
+    assert StreamService.format_event("delta", data, "sse") == 'event: delta\ndata: {"text": "냉장고\\n추천"}\n\n'
+
+
+@pytest.mark.parametrize("fmt, parse", [("ndjson", parse_ndjson), ("sse", parse_sse)])
+def test_search_stream_events(client, fmt, parse):
+    params = {"query": "삼성 냉장고", "retriever_type": "faiss", "pageSize": 5, "page": 2, "format": fmt}
+    response = client.get("/search/stream", params=params)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith({"ndjson": "application/x-ndjson", "sse": "text/event-stream"}[fmt])
+    events = parse(response.text)
+    names = [event for event, _ in events]
+    assert names == ["intent", "page"] + ["product"] * 5 + ["done"]
+
+    intent, page = events[0][1], events[1][1]
+    assert intent["intent_path"] == "none"
+    assert (page["page"], page["page_size"], page["cached"]) == (2, 5, False)
+
+    # 상품은 /search 와 같은 필드입니다.
+    search = client.get("/search", params={key: value for key, value in params.items() if key != "format"}).json()
+    assert [data for event, data in events if event == "product"] == search["products"]
+    assert page["total_count"] == search["total_count"]
+
+
+def test_search_stream_intent_and_fields(client):
+    params = {"query": "조용하고 전기요금 적게 나오는 냉장고 추천", "fields": "goodsNo,content", "pageSize": 3}
+    events = parse_ndjson(client.get("/search/stream", params=params).text)
+
+    assert events[0][0] == "intent"
+    assert events[0][1]["intent_path"] == "llm"
+    products = [data for event, data in events if event == "product"]
+    assert products and all(set(product) == {"goodsNo", "content"} for product in products)
+
+    # 같은 검색어는 캐시된 결과를 보냅니다.
+    events = parse_ndjson(client.get("/search/stream", params=params).text)
+    assert [event for event, _ in events][:2] == ["intent", "page"]
+    assert events[1][1]["cached"] is True
+
+
+def test_search_stream_error(client, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("검색 실패")
+
+    monkeypatch.setattr(SearchService, "search", fail)
+    events = parse_ndjson(client.get("/search/stream", params={"query": "냉장고", "retriever_type": "faiss"}).text)
+    assert events == [("error", {"detail": "검색 실패"})]
+
+
+def test_search_stream_bad_request(client):
+    assert client.get("/search/stream", params={"query": " "}).status_code == 400
+    assert client.get("/search/stream", params={"query": "냉장고", "fields": "unknown"}).status_code == 400
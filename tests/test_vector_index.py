@@ -0,0 +1,103 @@
+"""core.vector_index.DeltaIndex 테스트. 바뀐 벡터를 반영한 결과를 전체 비교(brute force) 결과와 비교합니다."""
+
+from typing import Optional
+
+import faiss
+import numpy as np
+import pytest
+
+from core.vector_index import DeltaIndex, build_vector_index, configure_search, search_index
+
+NUM_VECTORS, DIM, K = 400, 16, 10
+
+
+def brute_force(vectors: np.ndarray, live: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """live 행 중 가까운 k 개의 ID. 거리가 같으면 ID 순서입니다."""
+    ids = np.flatnonzero(live)
+    distances = ((queries[:, None, :] - vectors[None, ids, :]) ** 2).sum(axis=2)
+    order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    return ids[order]
+
+
+def to_bitmap(mask: np.ndarray) -> np.ndarray:
+    return np.packbits(mask, bitorder="little")
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((NUM_VECTORS, DIM)).astype(np.float32)
+    queries = rng.standard_normal((5, DIM)).astype(np.float32)
+    return vectors, queries
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat"])
+@pytest.mark.parametrize("filtered", [False, True])
+def test_matches_brute_force(data, index_type, filtered):
+    vectors, queries = data
+    index = build_vector_index(vectors, index_type)
+    # 근사 인덱스도 정확한 결과가 나오도록 검색 범위를 넓힙니다.
+    configure_search(index, nprobe=1000, ef_search=1000)
+
+    rng = np.random.default_rng(1)
+    # ID 400 이후는 추가할 자리입니다.
+    current = np.vstack([vectors, np.zeros((20, DIM), dtype=np.float32)])
+    live = np.arange(len(current)) < NUM_VECTORS
+    mask: Optional[np.ndarray] = rng.random(len(live)) < 0.5 if filtered else None
+
+    delta = DeltaIndex.wrap(index)
+    # 같은 ID 를 여러 번 바꾸고, 추가한 벡터를 지우는 업데이트를 이어서 반영합니다.
+    updates = [
+        (np.array([3, 5, 400, 401]), np.array([7, 8, 9])),
+        (np.array([5, 7, 402]), np.array([401, 10, 11, 12, 13, 14, 15])),
+        (np.array([0, 1, 2]), np.array([], dtype=np.int64)),
+    ]
+    for ids, removed in updates:
+        new_vectors = rng.standard_normal((len(ids), DIM)).astype(np.float32)
+        delta = delta.updated(ids, new_vectors, removed)
+        live[removed] = False
+        live[ids] = True
+        current[ids] = new_vectors
+
+        bitmap = to_bitmap(mask) if filtered else None
+        expected = brute_force(current, live & mask if filtered else live, queries, K)
+        _, found = search_index(delta, queries, K, bitmap)
+        assert np.array_equal(found, expected)
+        assert delta.ntotal == int(live.sum())
+        assert delta.base is index
+
+
+def test_original_unchanged(data):
+    vectors, queries = data
+    index = DeltaIndex.wrap(build_vector_index(vectors))
+    _, before = index.search(queries, K)
+
+    index.updated(np.array([int(before[0, 0])]), vectors[:1] + 100, np.arange(50))
+    _, after = index.search(queries, K)
+    assert np.array_equal(before, after)
+    assert DeltaIndex.wrap(index) is index
+
+
+def test_fewer_results_than_k(data):
+    vectors, queries = data
+    index = DeltaIndex.wrap(build_vector_index(vectors)).updated(
+        np.array([NUM_VECTORS]), vectors[:1], np.arange(NUM_VECTORS - 2)
+    )
+    distances, ids = index.search(queries, K)
+
+    assert ids.shape == (len(queries), K)
+    assert np.array_equal(np.sort(ids[:, :3], axis=1), np.tile([NUM_VECTORS - 2, NUM_VECTORS - 1, NUM_VECTORS], (len(queries), 1)))
+    # 빈 자리(ID -1)는 뒤에 옵니다.
+    assert (ids[:, 3:] == -1).all()
+    assert np.all(np.diff(distances[:, :3], axis=1) >= 0)
+
+
+def test_inner_product(data):
+    vectors, queries = data
+    index = faiss.IndexFlatIP(DIM)
+    index.add(vectors)
+    delta = DeltaIndex.wrap(index).updated(np.array([0]), queries[:1] * 10, np.array([], dtype=np.int64))
+
+    distances, ids = delta.search(queries[:1], K)
+    assert ids[0, 0] == 0
+    assert np.all(np.diff(distances[0]) <= 0)
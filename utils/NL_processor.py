@@ -1,4 +1,24 @@
 import re
+import unicodedata
+from utils.tokenizer import kiwi_tokenize
+
+def normalize_query(query: str) -> str:
+    """
+    캐시 키로 사용하기 위해 검색어를 정규화합니다.
+    유니코드 정규화(NFKC), 앞뒤 공백 제거, 연속 공백 축소, 소문자 변환을 적용합니다.
+    """
+    query = unicodedata.normalize("NFKC", query)
+    return " ".join(query.split()).lower()
+
+def token_overlap(query: str, rewritten: str) -> float:
+    """
+    재작성된 검색어의 형태소(명사, 영문, 숫자) 중 원본 검색어에도 있는 비율을 반환합니다. 0 ~ 1
+    재작성된 검색어에 형태소가 없으면 0 을 반환합니다.
+    """
+    rewritten_tokens = set(kiwi_tokenize(rewritten))
+    if not rewritten_tokens:
+        return 0.0
+    return len(rewritten_tokens & set(kiwi_tokenize(query))) / len(rewritten_tokens)
 
 def classify_query_type(query: str) -> str:
     """
@@ -17,7 +37,8 @@ def classify_query_type(query: str) -> str:
     stopwords_korean = ["은", "는", "이", "가", "을", "를", "에", "에서", "와", "과", "로", "으로", "도", "만", "좀", "요", "입니다", "있나요", "해주세요", "추천해주세요", "어떤", "무엇"]
     
     for sw in stopwords_korean:
-        if sw in query:
+        # 조사/어미는 단어 끝에 붙으므로 단어 끝에서만 확인합니다. (예: '에어컨'의 '에'는 조사가 아님)
+        if any(word.endswith(sw) for word in words):
             # 불용어가 포함되어 있으면 자연어일 가능성 높음 (단, 짧은 쿼리 예외 처리 필요)
             if num_words > 2: # 2단어 초과 쿼리에 불용어 포함 시 자연어
                 return "natural_language"
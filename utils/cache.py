@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import hashlib
+import asyncio
+import sqlite3
+import weakref
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class LRUCache:
+    """
+    프로세스 메모리 기반 LRU 캐시. 최대 개수(maxsize)와 만료 시간(ttl, 초)을 지원합니다.
+    ttl 이 0 이하이면 만료되지 않습니다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl if self.ttl > 0 else 0
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get 과 같습니다. 비동기 코드에서 SQLiteCache 와 같은 방식으로 호출하기 위한 메서드입니다."""
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중 통계를 반환합니다."""
+        total = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+# fork 한 자식 프로세스에서 다시 연결할 SQLite 캐시
+_sqlite_caches = weakref.WeakSet()
+
+
+def reconnect_after_fork(cache) -> None:
+    """
+    fork 한 자식 프로세스에서 cache._connect() 를 호출하도록 등록합니다.
+    SQLite 연결은 fork 로 물려받아 쓰면 안 되므로 SQLite 를 쓰는 캐시는 연결을 여는 _connect 를 두고 등록합니다.
+    """
+    _sqlite_caches.add(cache)
+
+
+def _reconnect_sqlite_caches() -> None:
+    for cache in list(_sqlite_caches):
+        cache._connect()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reconnect_sqlite_caches)
+
+
+class SQLiteCache:
+    """
+    SQLite 파일 기반 LRU 캐시. 값은 JSON 으로 저장합니다.
+    서버 재시작 후에도 유지되며, 같은 파일을 여러 uvicorn 워커가 공유할 수 있습니다(WAL 모드).
+    hits/misses 는 프로세스별로 집계됩니다.
+    SQLite 연결은 fork 한 프로세스에서 쓸 수 없으므로, 미리 로드한 마스터에서 fork 한 워커는 다시 연결합니다.
+
+    조회 시각(accessed_at)은 조회마다 쓰지 않고 모아서 TOUCH_BATCH 개마다(또는 다음 저장 때) 한 번에 기록하고,
+    최대 개수를 넘은 항목은 저장할 때마다가 아니라 evict_every 번 저장할 때마다 제거합니다.
+    그 사이에는 최대 개수보다 evict_every 개까지 많을 수 있습니다.
+    쓰기 잠금을 기다릴 수 있으므로 비동기 코드에서는 aget/aset (스레드에서 실행)을 사용합니다.
+    """
+
+    # 모아서 기록할 조회 시각 수
+    TOUCH_BATCH = 256
+
+    def __init__(self, path: str, maxsize: int = 100000, ttl: float = 0, table: str = "cache"):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        # 최대 개수의 1% (1 ~ 256) 번 저장할 때마다 제거
+        self.evict_every = max(1, min(256, maxsize // 100))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connect()
+        reconnect_after_fork(self)
+
+    def _connect(self) -> None:
+        """연결을 엽니다. fork 한 자식 프로세스에서는 물려받은 연결 대신 새로 연결합니다."""
+        self._lock = threading.Lock()
+        # 키 → 아직 기록하지 않은 조회 시각
+        self._touched: Dict[str, float] = {}
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_accessed_at ON {self.table}(accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl > 0 and created_at + self.ttl < now:
+                # 만료된 항목은 다음 제거 때 지우거나 다시 저장할 때 덮어씁니다.
+                self.misses += 1
+                return None
+
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._write_touches()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._touched.pop(key, None)
+            self._writes += 1
+            if self._writes >= self.evict_every:
+                self._writes = 0
+                self._write_touches()
+                self._evict(now)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get 을 스레드에서 실행합니다."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """set 을 스레드에서 실행합니다."""
+        await asyncio.to_thread(self.set, key, value)
+
+    def _write_touches(self) -> None:
+        """모아 둔 조회 시각을 한 번의 트랜잭션으로 기록합니다."""
+        if not self._touched:
+            return
+        touched = [(accessed_at, key) for key, accessed_at in self._touched.items()]
+        self._touched.clear()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", touched)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, now: float) -> None:
+        """만료된 항목과, 최대 개수를 넘은 항목을 가장 오래 조회되지 않은 것부터 제거합니다."""
+        if self.ttl > 0:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at ASC "
+            f"LIMIT MAX(0, (SELECT COUNT(*) FROM {self.table}) - ?))",
+            (self.maxsize,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중 통계를 반환합니다."""
+        total = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self),
+            "maxsize": self.maxsize,
+        }
+
+
+def create_cache(maxsize: int, ttl: float = 0, path: Optional[str] = None, table: str = "cache"):
+    """path 가 지정되면 SQLite 캐시를, 아니면 메모리 LRU 캐시를 생성합니다."""
+    if path:
+        return SQLiteCache(path, maxsize=maxsize, ttl=ttl, table=table)
+    return LRUCache(maxsize=maxsize, ttl=ttl)
+
+
+def prompt_cache_version(model_name: str, *prompts: Any) -> str:
+    """
+    LLM 응답 캐시 키에 넣는 버전. 모델 이름과 프롬프트(ChatPromptTemplate)의 메시지 템플릿, partial 변수(출력 형식 지시사항)로 만들어
+    모델이나 프롬프트, 파서가 바뀌면 이전 캐시를 사용하지 않습니다.
+    """
+    parts = [model_name]
+    for prompt in prompts:
+        for message in prompt.messages:
+            template = getattr(getattr(message, "prompt", None), "template", None)
+            parts.append(f"{type(message).__name__}:{template if template is not None else repr(message)}")
+        parts.extend(f"{name}={value}" for name, value in sorted(prompt.partial_variables.items()))
+    return hashlib.md5("\n".join(parts).encode("utf-8")).hexdigest()[:8]
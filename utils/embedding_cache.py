@@ -0,0 +1,285 @@
+import os
+import mmap
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils import metrics
+from utils.cache import LRUCache, reconnect_after_fork
+from utils.NL_processor import normalize_query
+
+
+class MemmapVectorStore:
+    """
+    고정 길이 float32 벡터를 메모리 매핑(mmap) 파일에 저장하는 디스크 캐시.
+    벡터는 {path}.f32 에, 키 → 행 번호 매핑은 {path}.sqlite3 에 저장하며
+    가득 차면 가장 오래 조회되지 않은 행을 재사용합니다.
+    조회 시각(accessed_at)은 조회마다 쓰지 않고 모아서 TOUCH_BATCH 개마다(또는 다음 저장 때) 한 번에 기록합니다.
+    미리 로드한 마스터에서 fork 한 워커는 SQLite 에 다시 연결하고, memmap 파일은 그대로 공유합니다.
+    SQLite 와 파일 입출력을 하므로 비동기 코드에서는 스레드에서 호출합니다.
+    """
+
+    # 모아서 기록할 조회 시각 수
+    TOUCH_BATCH = 256
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        self._mmap: Optional[mmap.mmap] = None
+        # _mmap 위의 (capacity, dim) 배열 뷰
+        self._vectors: Optional[np.ndarray] = None
+        self.dim: Optional[int] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connect()
+        reconnect_after_fork(self)
+
+    def _connect(self) -> None:
+        """연결을 엽니다. fork 한 자식 프로세스에서는 물려받은 연결 대신 새로 연결합니다."""
+        self._lock = threading.Lock()
+        # 키 → 아직 기록하지 않은 조회 시각
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(f"{self.path}.sqlite3", timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, row INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_vectors_accessed_at ON vectors(accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_vectors_row ON vectors(row)")
+
+        if self._vectors is None:
+            dim = self._stored_dim()
+            if dim:
+                self._open(dim)
+
+    def _stored_dim(self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        return int(row[0]) if row else None
+
+    def _create_file(self, dim: int) -> None:
+        """
+        capacity 크기의 memmap 파일을 만듭니다. SQLite 쓰기 잠금을 잡은 상태에서 호출하며,
+        O_EXCL 로 만들어 여러 워커가 처음 동시에 열어도 다른 워커가 만든 파일을 비우지 않습니다.
+        """
+        file_path = f"{self.path}.f32"
+        size = self.capacity * dim * 4
+        try:
+            fd = os.open(file_path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            # 이전 실행보다 capacity 가 크면 파일을 늘립니다. (줄이지는 않음)
+            if os.path.getsize(file_path) < size:
+                os.truncate(file_path, size)
+            return
+        try:
+            os.ftruncate(fd, size)
+        finally:
+            os.close(fd)
+
+    def _open(self, dim: int) -> None:
+        """
+        벡터 차원이 정해진 파일을 메모리 매핑합니다. 파일은 차원을 기록할 때 만들어 둡니다.
+        행 단위로 디스크에 쓰기 위해 mmap 을 직접 열고 그 위에 배열 뷰를 만듭니다.
+        """
+        file_path = f"{self.path}.f32"
+        if not os.path.exists(file_path):
+            self._create_file(dim)
+        with open(file_path, "r+b") as f:
+            self._mmap = mmap.mmap(f.fileno(), self.capacity * dim * 4)
+        self._vectors = np.frombuffer(self._mmap, dtype=np.float32).reshape(self.capacity, dim)
+        self.dim = dim
+
+    def _flush_row(self, row: int) -> None:
+        """쓴 행이 걸친 페이지만 디스크에 씁니다. (파일 전체를 쓰는 flush 대신) mmap.flush 의 offset 은 페이지 경계여야 합니다."""
+        row_bytes = self.dim * 4
+        start = row * row_bytes // mmap.ALLOCATIONGRANULARITY * mmap.ALLOCATIONGRANULARITY
+        self._mmap.flush(start, (row + 1) * row_bytes - start)
+
+    def _write_touches(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE vectors SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            if self._vectors is None:
+                return None
+            row = self._conn.execute("SELECT row FROM vectors WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._write_touches()
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return np.array(self._vectors[row[0]])
+
+    def set(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            if self.dim is not None and len(vector) != self.dim:
+                return
+
+            # 쓰기 잠금을 잡고 행을 할당하여 여러 워커가 같은 행을 쓰지 않도록 합니다.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._vectors is None:
+                    # 처음 저장할 때 다른 워커가 먼저 차원을 기록했는지 잠금 안에서 다시 확인합니다.
+                    dim = self._stored_dim()
+                    if dim is None:
+                        dim = len(vector)
+                        self._create_file(dim)
+                        self._conn.execute("INSERT INTO meta (name, value) VALUES ('dim', ?)", (str(dim),))
+                    self._open(dim)
+                    if len(vector) != self.dim:
+                        self._conn.execute("COMMIT")
+                        return
+
+                # 모아 둔 조회 시각을 먼저 기록하여 최근 조회한 행을 재사용하지 않도록 합니다.
+                self._write_touches()
+                existing = self._conn.execute("SELECT row FROM vectors WHERE key = ?", (key,)).fetchone()
+                if existing:
+                    row = existing[0]
+                else:
+                    # 행은 앞에서부터 할당하고 재사용만 하므로, 가장 큰 행 번호 + 1 이 사용한 행 수입니다.
+                    used = self._conn.execute("SELECT MAX(row) FROM vectors").fetchone()[0]
+                    used = 0 if used is None else used + 1
+                    if used < self.capacity:
+                        row = used
+                    else:
+                        row, old_key = self._conn.execute(
+                            "SELECT row, key FROM vectors ORDER BY accessed_at ASC LIMIT 1"
+                        ).fetchone()
+                        self._conn.execute("DELETE FROM vectors WHERE key = ?", (old_key,))
+
+                self._vectors[row] = vector
+                self._flush_row(row)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO vectors (key, row, accessed_at) VALUES (?, ?, ?)",
+                    (key, row, time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM vectors")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    검색어 임베딩 캐시. 정규화된 검색어가 같으면 임베딩 API 를 다시 호출하지 않습니다.
+    벡터는 float32 배열로 메모리 LRU 에 저장하고, disk_path 가 있으면 memmap 디스크 캐시를 함께 사용합니다.
+    문서 임베딩(embed_documents)은 캐시하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        namespace: str,
+        maxsize: int = 4096,
+        disk_path: Optional[str] = None,
+        disk_capacity: int = 50000,
+    ):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk = MemmapVectorStore(disk_path, disk_capacity) if disk_path else None
+        self.disk_hits = 0
+
+    def _key(self, text: str) -> str:
+        return f"{self.namespace}:{normalize_query(text)}"
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vector = self.memory.get(key)
+        if vector is None and self.disk is not None:
+            vector = self._lookup_disk(key)
+        return vector
+
+    def _lookup_disk(self, key: str) -> Optional[np.ndarray]:
+        vector = self.disk.get(key)
+        if vector is not None:
+            self.disk_hits += 1
+            self.memory.set(key, vector)
+        return vector
+
+    def _store(self, key: str, embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        self.memory.set(key, vector)
+        if self.disk is not None:
+            self.disk.set(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with metrics.stage("embedding"):
+            key = self._key(text)
+            vector = self._lookup(key)
+            if vector is None:
+                vector = self._store(key, self.embeddings.embed_query(text))
+            return vector.tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        embed_query 의 비동기 버전. 디스크 캐시는 SQLite 잠금과 파일 입출력으로 기다릴 수 있으므로
+        조회와 저장을 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+        """
+        with metrics.stage("embedding"):
+            key = self._key(text)
+            vector = self.memory.get(key)
+            if vector is None and self.disk is not None:
+                vector = await asyncio.to_thread(self._lookup_disk, key)
+            if vector is None:
+                vector = np.asarray(await self.embeddings.aembed_query(text), dtype=np.float32)
+                self.memory.set(key, vector)
+                if self.disk is not None:
+                    await asyncio.to_thread(self.disk.set, key, vector)
+            return vector.tolist()
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """임베딩 캐시 적중 통계를 반환합니다. 디스크 적중도 메모리 미적중으로 한 번 집계됩니다."""
+        memory = self.memory.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.disk_hits
+        return {
+            "backend": "memory+mmap" if self.disk is not None else "memory",
+            "hits": hits,
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": lookups - hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "size": memory["size"],
+            "maxsize": memory["maxsize"],
+            "disk_size": len(self.disk) if self.disk is not None else 0,
+        }
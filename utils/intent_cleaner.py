@@ -68,3 +68,79 @@ def _clean_category_intent(intent, query):
     else:
         return lgrp_nms, mgrp_nms
 
+
+def get_default_intent(query:str) -> Dict:
+    """의도분석을 하지 않는 검색 방식에서 사용할 빈 의도를 반환합니다."""
+    return {
+        'INTENTED_QUERY': query,
+        'PRICE_GTE': 0,
+        'PRICE_LTE': 0,
+        'BRND_NM': '',
+        'ARTC_NM': '',
+        'LGRP_NM': [],
+        'MGRP_NM': [],
+        'FEATURES': [],
+        'CARD_DC_NMS': [],
+        'REVIEW_GTE': 0.0,
+        'REVIEW_LTE': 0.0,
+        'SERVICE_YN': 'N',
+    }
+
+
+# 가격 단위
+_PRICE_UNITS = {'억': 100000000, '천만': 10000000, '백만': 1000000, '만': 10000, '천': 1000}
+_PRICE_NUMBER = r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(억|천만|백만|만|천)?'
+
+def _to_price(number: str, unit: str) -> int:
+    return int(float(number.replace(',', '')) * _PRICE_UNITS.get(unit or '', 1))
+
+def extract_price_range(text: str):
+    """
+    검색어에서 가격 조건을 찾아 (PRICE_GTE, PRICE_LTE, 가격 표현을 제거한 검색어)를 반환합니다. 조건이 없으면 0.
+    '30~50만원', '100만원 이하', '50만원 이상', '100만원대', '30만원' 등의 표현을 인식합니다.
+    숫자 뒤에 단위(만, 천 등)나 '원'이 없으면 가격으로 보지 않습니다. 예) 4도어, 16기가
+    'N대'는 쓴 숫자의 마지막 유효 자리 단위로 범위를 정합니다. 예) 100만원대 100~199만원, 150만원대 150~159만원
+    이상/이하 등이 없는 가격('30만원')은 예산으로 보아 그 가격 이하로 찾습니다.
+    """
+    # 범위: '30~50만원', '30만원에서 50만원'
+    match = re.search(_PRICE_NUMBER + r'\s*원?\s*(?:~|-|에서)\s*' + _PRICE_NUMBER + r'\s*원(?:\s*사이)?', text)
+    if match:
+        low_unit = match.group(2) or match.group(4)
+        gte, lte = _to_price(match.group(1), low_unit), _to_price(match.group(3), match.group(4))
+        return gte, lte, (text[:match.start()] + ' ' + text[match.end():]).strip()
+
+    # 단일 가격: 단위나 '원'이 있어야 합니다.
+    for match in re.finditer(_PRICE_NUMBER + r'\s*(원)?\s*(대|이하|미만|까지|이내|아래|이상|초과|부터|넘는)?', text):
+        number, unit, won, qualifier = match.groups()
+        if not unit and not won:
+            continue
+        price = _to_price(number, unit)
+        remaining = (text[:match.start()] + ' ' + text[match.end():]).strip()
+        if qualifier == '대' and price:
+            step = 1
+            while price % (step * 10) == 0:
+                step *= 10
+            return price, price + step - 1, remaining
+        if qualifier in ('이상', '초과', '부터', '넘는'):
+            return price, 0, remaining
+        return 0, price, remaining
+
+    return 0, 0, text
+
+def extract_review_range(text: str):
+    """
+    검색어에서 평점 조건을 찾아 (REVIEW_GTE, REVIEW_LTE, 평점 표현을 제거한 검색어)를 반환합니다. 조건이 없으면 0.0.
+    '평점 4.5 이상', '별점 4점 이상', '4.5점 이상' 등의 표현을 인식하며, 이상/이하가 없으면 이상으로 봅니다.
+    """
+    match = (
+        re.search(r'(?:평점|별점|리뷰\s*점수|리뷰)\s*(?:이|가)?\s*(\d(?:\.\d+)?)\s*점?\s*(이상|초과|이하|미만)?', text)
+        or re.search(r'(\d(?:\.\d+)?)\s*점\s*(이상|초과|이하|미만)', text)
+    )
+    if not match:
+        return 0.0, 0.0, text
+
+    score = float(match.group(1))
+    remaining = (text[:match.start()] + ' ' + text[match.end():]).strip()
+    if match.group(2) in ('이하', '미만'):
+        return 0.0, score, remaining
+    return score, 0.0, remaining
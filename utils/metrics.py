@@ -0,0 +1,362 @@
+"""
+Prometheus 메트릭.
+
+검색 파이프라인 단계별 소요 시간, 요청 소요 시간, 캐시 적중, 필터 전후 후보 문서 수, LLM 토큰 사용량을 집계하여
+GET /metrics 에서 Prometheus 텍스트 형식(0.0.4)으로 반환합니다. prometheus_client 없이 직접 출력합니다.
+
+    with metrics.stage("sort"):
+        ...
+
+stage() 는 단계 소요 시간을 히스토그램에 기록하고, 요청 중이면 요청별 단계 소요 시간(MetricsMiddleware)에도 더합니다.
+요청별 기록은 ContextVar 로 전달되므로 asyncio.to_thread, create_task 로 넘긴 작업의 단계도 같은 요청에 기록됩니다.
+동시에 실행되는 단계(하이브리드 검색의 BM25 와 FAISS)는 각각 기록되어 합이 요청 시간보다 클 수 있습니다.
+
+메트릭은 프로세스별로 집계합니다. 프로덕션 서버(python -m server)처럼 워커가 여러 개면 워커마다
+metrics_directory 에 <pid>.json 으로 주기적으로 저장하고, /metrics 는 모든 워커의 파일을 합쳐서 반환합니다.
+종료한 워커의 파일도 남겨 두어 카운터가 줄어들지 않습니다.
+"""
+
+import os
+import glob
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 소요 시간(초) 히스토그램 구간. 1ms 미만인 단계(페이징, 필터 생성)부터 LLM 호출까지 포함합니다.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 후보 문서 수 히스토그램 구간
+COUNT_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000)
+
+# 등록된 메트릭 (출력 순서)
+REGISTRY: List["Metric"] = []
+# 메트릭을 저장/출력하기 전에 호출할 함수 (다른 곳에서 집계한 값을 메트릭에 옮김)
+_collectors: List[Callable[[], None]] = []
+# 요청별 단계 소요 시간(초). MetricsMiddleware 가 요청마다 새 dict 를 설정합니다.
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def state(self) -> List[list]:
+        """JSON 으로 저장할 수 있는 [레이블 값 목록, 값] 목록"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, states: List[List[list]]) -> Dict[Tuple[str, ...], Any]:
+        """여러 프로세스의 state() 를 레이블별로 더합니다."""
+        merged: Dict[Tuple[str, ...], Any] = {}
+        for state in states:
+            for key, value in state:
+                key = tuple(key)
+                merged[key] = self._add(merged[key], value) if key in merged else value
+        return merged
+
+    def _add(self, a: Any, b: Any) -> Any:
+        return a + b
+
+    def _labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self, merged: Dict[Tuple[str, ...], Any]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key in sorted(merged):
+            lines.extend(self._samples(key, merged[key]))
+        return lines
+
+    def _samples(self, key: Tuple[str, ...], value: Any) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_format(value)}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: Any) -> None:
+        """다른 곳에서 집계한 누적값(예: 캐시별 hits/misses)을 그대로 기록합니다."""
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [구간별 개수(마지막은 +Inf), 합]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def state(self) -> List[list]:
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+
+    def _add(self, a: Any, b: Any) -> Any:
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1]]
+
+    def _samples(self, key: Tuple[str, ...], value: Any) -> List[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{_format(bound)}"'
+            lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {_format(total)}")
+        lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+REQUEST_SECONDS = Histogram(
+    "ai_search_request_duration_seconds", "HTTP 요청 처리 시간(초)", ("path", "status")
+)
+STAGE_SECONDS = Histogram(
+    "ai_search_stage_duration_seconds",
+    "검색/리포트 파이프라인 단계별 소요 시간(초). "
+    "intent_llm, intent_cleaning, filter, retrieval, embedding, faiss, bm25, fusion, sort, pagination, serialization, report_llm",
+    ("stage",),
+)
+CANDIDATES = Histogram(
+    "ai_search_candidates",
+    "필터 적용 전(before)/후(after) 후보 문서 수. "
+    "source=prefilter(메타데이터 색인), fetch_k(가져온 뒤 필터링), speculation(추측 검색 후보), fusion(하이브리드 합치기)",
+    ("source", "phase"),
+    buckets=COUNT_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "ai_search_cache_requests_total", "캐시 조회 수. cache=intent, embedding, report, result / result=hit, miss", ("cache", "result")
+)
+SPECULATION_REQUESTS = Counter(
+    "ai_search_speculation_requests_total",
+    "추측 검색 후보 재사용 수. result=reused(재사용), low_overlap(정제된 쿼리 일치도 부족), "
+    "filter_miss(후보 안에 필터 조건에 맞는 문서 부족), failed(추측 검색 실패)",
+    ("result",),
+)
+LLM_TOKENS = Counter(
+    "ai_search_llm_tokens_total", "LLM 토큰 사용량. chain=intent, report / type=input, output", ("chain", "type")
+)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """단계 소요 시간을 기록합니다. 요청 중이면 요청별 단계 소요 시간에도 더합니다."""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """with 블록의 소요 시간을 단계 name 으로 기록합니다. 예외가 나도 기록합니다."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def observe_candidates(source: str, before: int, after: int) -> None:
+    """필터 적용 전후 후보 문서 수를 기록합니다."""
+    CANDIDATES.observe(before, source=source, phase="before")
+    CANDIDATES.observe(after, source=source, phase="after")
+
+
+def register_collector(collector: Callable[[], None]) -> None:
+    """메트릭을 저장/출력하기 전에 호출할 함수를 등록합니다."""
+    _collectors.append(collector)
+
+
+def snapshot() -> Dict[str, List[list]]:
+    """이 프로세스의 메트릭 값 (메트릭 이름 → state())"""
+    for collector in _collectors:
+        try:
+            collector()
+        except Exception as e:
+            logger.warning(f"메트릭 수집 실패: {e}")
+    return {metric.name: metric.state() for metric in REGISTRY}
+
+
+def write_snapshot(directory: str) -> None:
+    """이 프로세스의 메트릭을 directory/<pid>.json 에 저장합니다. 읽는 쪽이 쓰다 만 파일을 보지 않도록 바꿔치기합니다."""
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f)
+    os.replace(temp_path, path)
+
+
+def read_snapshots(directory: str) -> List[Dict[str, List[list]]]:
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"메트릭 파일을 읽을 수 없습니다: {path}: {e}")
+    return snapshots
+
+
+def clear_directory(directory: str) -> None:
+    """이전 실행의 워커별 메트릭 파일을 지웁니다. 워커를 시작하기 전에 호출합니다."""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+
+
+def render(directory: Optional[str] = None) -> str:
+    """
+    메트릭을 Prometheus 텍스트 형식으로 반환합니다.
+    directory 가 있으면 이 프로세스의 메트릭을 저장한 뒤 모든 워커의 메트릭을 합칩니다.
+    """
+    if directory:
+        write_snapshot(directory)
+        snapshots = read_snapshots(directory)
+    else:
+        snapshots = [snapshot()]
+
+    lines = []
+    for metric in REGISTRY:
+        merged = metric.merge([s.get(metric.name, []) for s in snapshots])
+        lines.extend(metric.render(merged))
+        if metric is CACHE_REQUESTS:
+            lines.extend(_hit_ratio_lines(merged))
+    return "\n".join(lines) + "\n"
+
+
+def _hit_ratio_lines(merged: Dict[Tuple[str, ...], float]) -> List[str]:
+    """캐시별 적중률. 워커별 비율을 평균하지 않고 합친 hits/misses 로 계산합니다."""
+    name = "ai_search_cache_hit_ratio"
+    lines = [f"# HELP {name} 캐시 적중률 (hits / (hits + misses))", f"# TYPE {name} gauge"]
+    for cache in sorted({cache for cache, _ in merged}):
+        hits = merged.get((cache, "hit"), 0.0)
+        total = hits + merged.get((cache, "miss"), 0.0)
+        lines.append(f'{name}{{cache="{_escape(cache)}"}} {_format(round(hits / total, 4) if total else 0.0)}')
+    return lines
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """
+    LLM 응답의 토큰 사용량을 ai_search_llm_tokens_total 에 기록하는 콜백.
+        model.with_config(callbacks=[LLMUsageCallback("intent")])
+    """
+
+    # 토큰 수만 더하므로 비동기 호출에서도 스레드로 넘기지 않고 바로 실행합니다.
+    run_inline = True
+
+    def __init__(self, chain: str):
+        self.chain = chain
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+
+        # 메시지에 사용량이 없는 모델은 llm_output 의 token_usage (OpenAI 형식)를 사용합니다.
+        if not (input_tokens or output_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
+
+        if input_tokens:
+            LLM_TOKENS.inc(input_tokens, chain=self.chain, type="input")
+        if output_tokens:
+            LLM_TOKENS.inc(output_tokens, chain=self.chain, type="output")
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 처리 시간을 기록하고, 요청별 단계 소요 시간을 모읍니다 (ASGI 미들웨어).
+    timing_header 이면 응답 헤더 Server-Timing 에 단계별 소요 시간(ms)을 넣습니다.
+    헤더는 응답을 시작할 때까지 끝난 단계만 포함하므로 스트리밍 응답에는 대부분의 단계가 빠집니다.
+    """
+
+    def __init__(self, app, timing_header: bool = False):
+        self.app = app
+        self.timing_header = timing_header
+        self._paths: Optional[set] = None
+
+    def _path_label(self, scope) -> str:
+        # 등록된 경로만 레이블로 사용하여, 없는 경로 요청으로 시계열이 늘어나지 않도록 합니다.
+        if self._paths is None:
+            self._paths = {getattr(route, "path", None) for route in scope["app"].routes}
+        return scope["path"] if scope["path"] in self._paths else "other"
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages: Dict[str, float] = {}
+        token = _request_stages.set(stages)
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.timing_header:
+                    timings = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items()]
+                    timings.append(f"total;dur={(time.perf_counter() - started) * 1000:.1f}")
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", ", ".join(timings).encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, path=self._path_label(scope), status=status)
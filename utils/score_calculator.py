@@ -1,144 +1,122 @@
-import re
+import numpy as np
 
-def calculate_rank_score(metadata: dict, top_k:int) -> float:
+# 기본 대표 브랜드
+FLAGSHIP_BRANDS = ['삼성전자', 'LG전자', 'Apple', 'PLUX']
+
+# PB 브랜드
+PB_BRAND = 'PLUX'
+
+# 품목별 대표 브랜드 (브랜드명에 포함되면 대표 브랜드)
+FLAGSHIP_BRANDS_BY_ARTC = {
+    '커피머신': ['네스프레소', '카누'],
+    '선풍기': ['신일', '루메나'],
+}
+
+# 품목별 대표 상품 (상품명에 포함되면 대표 상품)
+FLAGSHIP_PRODUCTS_BY_ARTC = {
+    '이어폰': ['갤럭시', '에어팟'],
+    '냉장고': ['비스포크 ', '오브제컬렉션'],
+    '에어컨': ['휘센 ', '무풍클래식'],
+}
+
+# 점수 함수는 ProductFeatureTable(core.feature_table) 의 컬럼으로, positions(테이블 행 번호) 배열의 점수를 한 번에 계산합니다.
+
+def calculate_rank_scores(ranks: np.ndarray, top_k: int) -> np.ndarray:
     """
-    랭킹 점수 계산 함수. 최대 3점
+    랭킹 점수. 최대 3점. ranks 는 1부터 시작하는 유사도 순위
     top_k 가 100 일 때, 1위는 3.0점 100위는 0.03점
     """
     top_score = 3
-    score = (top_k - metadata.get('similarity_rank') + 1) * top_score / top_k
-    return float(int(score * 10) / 10)  # 소수점 첫째자리까지, 둘째자리 버림
+    scores = (top_k - ranks + 1) * top_score / top_k
+    return (scores * 10).astype(np.int64) / 10  # 소수점 첫째자리까지, 둘째자리 버림
 
-def calculate_default_score(metadata: dict) -> float:
-    """디폴트 점수 계산 함수. 최대 5점"""
-    score = 0.0
+def calculate_default_scores(table, positions: np.ndarray) -> np.ndarray:
+    """디폴트 점수. 정상상품이면 1점"""
+    return np.where(table.is_normal_goods[positions], 1.0, 0.0)
 
-    if metadata.get('GOODS_STAT_SCT_NM') == '정상상품':
-        score += 1.0
-
-    return score
-    
-def calculate_brand_score(metadata: dict, brand: str, artc: str) -> float:
-    """브랜드 매칭 점수 계산 함수. 최대 5점"""
-    score = 0.0
+def calculate_brand_scores(table, positions: np.ndarray, brand: str, artc: str) -> np.ndarray:
+    """
+    브랜드 매칭 점수. 최대 5점
+    브랜드 의도가 없으면 대표 브랜드 2점, PB 1점, 품목별 대표 브랜드 1점.
+    브랜드 의도가 있으면 브랜드명에 있으면 5점, 상품명에 있으면 2점.
+    """
+    scores = np.zeros(len(positions))
 
     # 브랜드 의도가 없는 경우
     if not brand:
-        # 1. 기본 대표 브랜드
-        FLAGSHIP_BRANDS = ['삼성전자', 'LG전자', 'Apple', 'PLUX']
-        if metadata.get('BRND_NM', '') in FLAGSHIP_BRANDS:
-            score += 2.0
-
-        # 2. PB 추가 점수
-        if metadata.get('BRND_NM', '') == 'PLUX':
-            score += 1.0
-    
-        # 3. 품목별 대표 브랜드
-        if artc == '커피머신':
-            FLAGSHIP_PRODUCT_커피머신 = ['네스프레소', '카누']
-            if any(flagship in metadata.get('BRND_NM', '') for flagship in FLAGSHIP_PRODUCT_커피머신):
-                score += 1.0
-        elif artc == '선풍기':
-            FLAGSHIP_PRODUCT_커피머신 = ['신일', '루메나']
-            if any(flagship in metadata.get('BRND_NM', '') for flagship in FLAGSHIP_PRODUCT_커피머신):
-                score += 1.0
-
-        return score
-    
-    # 브랜드 의도가 있을 경우
+        scores += np.where(table.is_flagship_brand[positions], 2.0, 0.0)
+        scores += np.where(table.is_pb[positions], 1.0, 0.0)
+        if artc in table.flagship_brand_by_artc:
+            scores += np.where(table.flagship_brand_by_artc[artc][positions], 1.0, 0.0)
+        return scores
 
-    # TODO: 브랜드명 그룹으로 확장. 예) 대표: 삼성 -> 삼성전자, 삼성전자(주)
-    brands = []
-    brands.append(brand)
-
-    for b in brands:
-        if b in metadata.get('BRND_NM', ''):
-            score += 5.0  # 증가: 브랜드 정확 매칭 더 중요하게
-        elif b in metadata.get('GOODS_NM', ''):
-            score += 2.0  # 증가: 상품명 매칭도 중요도 상승
-
-    return score
+    # 브랜드 의도가 있을 경우
+    in_brand = table.contains(table.brnd_nm[positions], brand)
+    in_goods_nm = table.contains(table.goods_nm[positions], brand)
+    scores += np.where(in_brand, 5.0, np.where(in_goods_nm, 2.0, 0.0))
+    return scores
 
-def calculate_artc_score(metadata: dict, artc:str) -> float:
-    """품목 매칭 점수 계산 함수. 최대 4점"""
-    score = 0.0
+def calculate_artc_scores(table, positions: np.ndarray, artc: str) -> np.ndarray:
+    """
+    품목 매칭 점수. 최대 5점. 서비스 상품은 0점
+    대표 상품 1점, 품목명 매칭 2점, 소/중/대 카테고리 매칭 2/1.5/1점.
+    """
+    scores = np.zeros(len(positions))
     if not artc:
-        return score
-    
-    if metadata.get("SERVICE_YN") == 'Y':
-        return score
-    
+        return scores
+
     # 대표적인 상품
-    if artc == '이어폰':
-        FLAGSHIP_PRODUCT_이어폰 = ['갤럭시', '에어팟']
-        if any(flagship in metadata.get('GOODS_NM', '') for flagship in FLAGSHIP_PRODUCT_이어폰):
-            score += 1.0
-    elif artc == '냉장고':
-        FLAGSHIP_PRODUCT_냉장고 = ['비스포크 ', '오브제컬렉션']
-        if any(flagship in metadata.get('GOODS_NM', '') for flagship in FLAGSHIP_PRODUCT_냉장고):
-            score += 1.0
-    elif artc == '에어컨':
-        FLAGSHIP_PRODUCT_에어컨 = ['휘센 ', '무풍클래식']
-        if any(flagship in metadata.get('GOODS_NM', '') for flagship in FLAGSHIP_PRODUCT_에어컨):
-            score += 1.0
-    
+    if artc in table.flagship_product_by_artc:
+        scores += np.where(table.flagship_product_by_artc[artc][positions], 1.0, 0.0)
+
     # 품목매칭인 경우
-    if artc in metadata.get('ARTC_NM', '').replace('일반', ''):
-        score += 2.0
+    scores += np.where(table.contains(table.artc_nm[positions], artc), 2.0, 0.0)
 
-    # 품목이 카테고리에 있는 경우
-    if artc in metadata.get('SGRP_NM', '').replace('일반', '').split('·'):
-        score += 2.0  # 증가: 소카테고리 매칭 더 중요하게
-    elif artc in metadata.get('MGRP_NM', '').replace('일반', '').split('·'):
-        score += 1.5  # 증가: 중카테고리 매칭
-    elif artc in metadata.get('LGRP_NM', '').replace('일반', '').split('·'):
-        score += 1.0  # 증가: 대카테고리 매칭
+    # 품목이 카테고리에 있는 경우 (소 > 중 > 대 카테고리 순)
+    in_sgrp = table.has_token(table.sgrp_postings, artc, positions)
+    in_mgrp = table.has_token(table.mgrp_postings, artc, positions)
+    in_lgrp = table.has_token(table.lgrp_postings, artc, positions)
+    scores += np.where(in_sgrp, 2.0, np.where(in_mgrp, 1.5, np.where(in_lgrp, 1.0, 0.0)))
 
-    return score
+    # 서비스 상품은 품목 점수 없음
+    scores[table.is_service[positions]] = 0.0
+    return scores
 
-def calculate_hashtag_score(metadata: dict, artc:str, features:list[str]) -> float:
-    """해시태그 매칭 점수 계산 함수. 해시태그 1개당 1.5점"""
-    score = 0.0
+def calculate_hashtag_scores(table, positions: np.ndarray, artc: str, features: list[str]) -> np.ndarray:
+    """해시태그 매칭 점수. 해시태그(SCH_KWD_NM)에 있는 특징 1개당 1.5점"""
+    scores = np.zeros(len(positions))
 
     if not artc and not features:
-        return score
+        return scores
 
-    # 품목이 관련키워드에 있을 경우
-    # if artc and artc in metadata.get('SCH_KWD_NM', ''):
-    #     score += 1.0
-
-    # 특징이 관련키워드에 있을 경우
     for feature in features:
-        if feature in metadata.get('SCH_KWD_NM', '').split('#'):
-            score += 1.5
+        scores += np.where(table.has_token(table.hashtag_postings, feature, positions), 1.5, 0.0)
 
-    return score
+    return scores
 
-def calculate_features_score(metadata: dict, features:list[str]) -> float:
-    """특징 매칭 점수 계산 함수. 특징 1개 당 3.5점"""
-    score = 0.0
+def calculate_features_scores(table, positions: np.ndarray, features: list[str]) -> np.ndarray:
+    """특징 매칭 점수. 주요 특징이나 상품명에 있는 특징 1개당 2.5점"""
+    scores = np.zeros(len(positions))
+    if not features:
+        return scores
 
-    # 특징이 상품명이나 주요 특징 및 기능에 있을 경우
+    # 특징마다 찾으므로 문자열 배열로 한 번만 바꿉니다.
+    feature_values = table.as_str(table.features[positions])
+    goods_nm = table.as_str(table.goods_nm[positions])
     for feature in features:
-        if feature in metadata.get('FEATURES', ''):
-            score += 2.5
-        elif feature in metadata.get('GOODS_NM', ''):
-            score += 2.5
-
-    return score
+        matched = table.contains(feature_values, feature) | table.contains(goods_nm, feature)
+        scores += np.where(matched, 2.5, 0.0)
 
-def calculate_cards_score(metadata: dict, cardDcNms:list[str]) -> float:
-    """카드할인 매칭 점수 계산 함수. 카드 1개당 10점"""
-    score = 0.0
+    return scores
 
-    card_dc_nm_list = []
-    if cardDcNms:
-        card_dc_nm_list = cardDcNms
+def calculate_cards_scores(table, positions: np.ndarray, cardDcNms: list[str]) -> np.ndarray:
+    """카드할인 매칭 점수. 할인카드 목록에 있는 카드 1개당 10점"""
+    scores = np.zeros(len(positions))
+    if not cardDcNms:
+        return scores
 
-    # 원하는 할인카드가 할인카드 목록에 있는 경우
-    for card_dc_nm in card_dc_nm_list:
-        if card_dc_nm in metadata.get('CARD_DC_NAME_LIST', ''):
-            score += 10
-            # print(f"Hit CARD_DC_NAME_LIST: {feature}")
+    card_dc_name_list = table.as_str(table.card_dc_name_list[positions])
+    for card_dc_nm in cardDcNms:
+        scores += np.where(table.contains(card_dc_name_list, card_dc_nm), 10.0, 0.0)
 
-    return score
+    return scores
@@ -1,20 +1,64 @@
-from kiwipiepy import Kiwi
+import os
+import logging
+import threading
+from typing import Iterable, Iterator, List
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 _kiwi = None
+_kiwi_lock = threading.Lock()
+# Kiwi 를 만든 프로세스. 프로덕션 서버는 마스터에서 만든 Kiwi 를 fork 한 워커가 물려받습니다.
+_kiwi_pid = None
 
-def kiwi_tokenized_query(text):
-    global _kiwi
+# BM25 색인/검색에 사용하는 품사. 일반/고유/의존 명사, 외국어(영문), 숫자
+BM25_TAGS = ('NNG', 'NNP', 'NNB', 'SL', 'SN')
+
+def _get_kiwi():
+    """
+    형태소 분석기를 처음 사용할 때 불러옵니다. kiwipiepy 는 BM25/하이브리드 검색 등 일부 경로에서만 쓰므로 그때 import 하고,
+    모델 로드에 몇 초 걸리므로 여러 스레드가 동시에 처음 사용해도 한 번만 불러옵니다.
+    """
+    global _kiwi, _kiwi_pid
     if _kiwi is None:
-        _kiwi = Kiwi()
+        with _kiwi_lock:
+            if _kiwi is None:
+                from kiwipiepy import Kiwi
+                _kiwi_pid = os.getpid()
+                _kiwi = Kiwi()
+    return _kiwi
+
+def warm_up_kiwi() -> None:
+    """
+    형태소 분석기 모델을 미리 불러옵니다. Kiwi 는 모델을 읽는 몇 초 동안 GIL 을 놓지 않으므로
+    같은 프로세스의 다른 스레드(이벤트 루프 포함)도 그동안 멈춥니다.
+    """
+    _get_kiwi().tokenize("검색")
 
-    tokens = _kiwi.tokenize(text)
+def kiwi_tokenized_query(text):
+    tokens = _get_kiwi().tokenize(text)
 
     # 1. 'tag'가 'NNG'인 토큰의 'form' (원형)만 추출하여 리스트 생성
     nng_forms = [token.form for token in tokens if token.tag == 'NNG']
 
     # 2. 추출된 명사들을 공백(' ')으로 연결하여 하나의 문자열로 반환
     result_string = " ".join(nng_forms)
-    
-    print(f"형태소분석을 거쳐 변환된 쿼리: {result_string}")
 
-    return result_string
\ No newline at end of file
+    logger.debug(f"형태소분석을 거쳐 변환된 쿼리: {result_string}")
+
+    return result_string
+
+def kiwi_tokenize(text: str) -> List[str]:
+    """BM25 용 토큰 목록을 반환합니다. 영문은 소문자로 변환합니다."""
+    return [token.form.lower() for token in _get_kiwi().tokenize(text) if token.tag in BM25_TAGS]
+
+def kiwi_tokenize_batch(texts: Iterable[str]) -> Iterator[List[str]]:
+    """
+    여러 문서를 한 번에 형태소 분석하여 문서별 BM25 토큰 목록을 순서대로 반환합니다.
+    fork 로 물려받은 Kiwi 는 스레드 풀 스레드가 없어 일괄 분석이 멈추므로 한 문서씩 분석합니다.
+    """
+    kiwi = _get_kiwi()
+    results = kiwi.tokenize(texts) if _kiwi_pid == os.getpid() else (kiwi.tokenize(text) for text in texts)
+    for tokens in results:
+        yield [token.form.lower() for token in tokens if token.tag in BM25_TAGS]